@@ -0,0 +1,297 @@
+#!/usr/bin/env python3
+"""Hot-path timing benchmark on synthetic large inputs.
+
+Times, against the synthetic data in benchmarks/synthetic.py:
+
+- compute_dxcc_stats on a 340-entity matrix for every mode (realistic fill)
+  and with every entity x band cell set (worst case)
+- publish_sensor payload serialization, for new and for unchanged
+  (suppressed) payloads
+- the HACS SENSOR_DESCRIPTIONS value/attribute lambdas (skipped when
+  Home Assistant is not installed)
+- one full Docker polling cycle (all six endpoints: fake HTTP session,
+  real decode, processing and MQTT payload building), and the same cycle
+  across many callsigns with distinct data
+
+Results are written as JSON (per benchmark: min/median/mean/p95 seconds)
+so runs can be compared across versions with --compare.
+
+Usage: python benchmarks/bench_hot_paths.py [--repeat 20] [--callsigns 100]
+           [--output FILE] [--compare OLD.json]
+"""
+
+from __future__ import annotations
+
+import argparse
+import importlib.util
+import json
+import logging
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / "benchmarks"))
+
+# config.py exits without these; the benchmark never talks to a network
+for _key, _value in {
+    "CLUBLOG_API_KEY": "bench",
+    "CLUBLOG_EMAIL": "bench@example.com",
+    "CLUBLOG_APP_PASSWORD": "bench",
+    "MY_CALLSIGN": "N0CALL",
+    "HA_MQTT_BROKER": "localhost",
+    "DATA_DIR": tempfile.gettempdir(),
+}.items():
+    os.environ.setdefault(_key, _value)
+
+import synthetic  # noqa: E402
+
+from clublog_bridge.fetch_timing import percentile  # noqa: E402
+
+
+def load_bridge() -> Any:
+    """Import clublog-ha-bridge.py (hyphenated, so not importable by name)."""
+    spec = importlib.util.spec_from_file_location("bridge", ROOT / "clublog-ha-bridge.py")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+class FakeResponse:
+    """Just enough of requests.Response for the bridge fetchers."""
+
+    status_code = 200
+
+    def __init__(self, body: bytes) -> None:
+        self.content = body
+
+    def __enter__(self) -> FakeResponse:
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        return None
+
+    def raise_for_status(self) -> None:
+        return None
+
+    def iter_content(self, chunk_size: int):
+        for start in range(0, len(self.content), chunk_size):
+            yield self.content[start:start + chunk_size]
+
+
+class FakeSession:
+    """Serves synthetic bodies by ClubLog script name."""
+
+    def __init__(self, bodies: dict[str, bytes]) -> None:
+        self.bodies = bodies
+
+    def get(self, url: str, **_kwargs: Any) -> FakeResponse:
+        return FakeResponse(self.bodies[url.rsplit("/", 1)[-1]])
+
+
+class FakeClient:
+    """MQTT client stand-in that only counts payload bytes."""
+
+    def __init__(self) -> None:
+        self.bytes = 0
+
+    def publish(self, _topic: str, payload: str, retain: bool = False) -> None:  # noqa: ARG002
+        self.bytes += len(payload)
+
+
+def measure(fn: Callable[[], object], repeat: int, number: int = 1) -> dict[str, float]:
+    """Time fn `number` times per sample, `repeat` samples; seconds per call."""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        samples.append((time.perf_counter() - start) / number)
+    return {
+        "min": min(samples),
+        "median": statistics.median(samples),
+        "mean": statistics.fmean(samples),
+        "p95": percentile(samples, 95),
+        "repeat": repeat,
+        "number": number,
+    }
+
+
+def bench_dxcc_stats(bridge: Any, repeat: int) -> dict[str, dict]:
+    """compute_dxcc_stats for each mode plus the worst case."""
+    results = {}
+    for mode, name in synthetic.MODES.items():
+        matrix = synthetic.matrix(mode)
+        results[f"compute_dxcc_stats[{name}]"] = measure(
+            lambda m=matrix: bridge.compute_dxcc_stats(m), repeat, number=20
+        ) | {"cells": sum(len(b) for b in matrix.values())}
+    worst = synthetic.matrix(fill=1.0)
+    results["compute_dxcc_stats[worst]"] = measure(
+        lambda: bridge.compute_dxcc_stats(worst), repeat, number=20
+    ) | {"cells": sum(len(b) for b in worst.values())}
+    return results
+
+
+def bench_publish(bridge: Any, repeat: int) -> dict[str, dict]:
+    """publish_sensor with a large attribute payload, new vs unchanged."""
+    from clublog_bridge.band_analytics import BandActivityGrid, activity_attributes
+
+    grid = BandActivityGrid.from_activity(synthetic.activity())
+    attributes = {f"band_{b}": sum(h) for b, h in synthetic.activity().items()}
+    attributes.update(activity_attributes(grid))
+    attributes["expeditions"] = [
+        {"call": c, "date": d, "qso_count": q} for c, d, q in synthetic.expeditions(20)
+    ]
+    client = FakeClient()
+
+    def fresh() -> None:
+        bridge._retained.clear()
+        bridge.publish_sensor(client, "bench", "Bench", 42, attributes=attributes)
+
+    def unchanged() -> None:
+        bridge.publish_sensor(client, "bench", "Bench", 42, attributes=attributes)
+
+    return {
+        "publish_sensor[new]": measure(fresh, repeat, number=50)
+        | {"payload_bytes": len(json.dumps(attributes))},
+        "publish_sensor[unchanged]": measure(unchanged, repeat, number=50),
+    }
+
+
+def bench_sensor_lambdas(repeat: int) -> dict[str, dict]:
+    """HACS SENSOR_DESCRIPTIONS value_fn + attr_fn over synthetic data."""
+    try:
+        from custom_components.clublog.coordinator import ClubLogData
+        from custom_components.clublog.models import (
+            LazyMostWanted,
+            decode_watch,
+            lazy_expeditions,
+            lazy_livestreams,
+        )
+        from custom_components.clublog.sensor import SENSOR_DESCRIPTIONS
+    except ImportError as err:
+        return {"sensor_lambdas": {"skipped": f"Home Assistant not installed ({err})"}}
+    from custom_components.clublog.band_analytics import BandActivityGrid
+
+    bodies = synthetic.bodies()
+    activity = synthetic.activity()
+    data = ClubLogData(
+        dxcc_matrix=synthetic.matrix(),
+        watch=decode_watch(bodies["watch.php"]),
+        most_wanted=LazyMostWanted(bodies["mostwanted.php"]),
+        expeditions=lazy_expeditions(bodies["expeditions.php"]),
+        livestreams=lazy_livestreams(bodies["livestreams.php"]),
+        activity=activity,
+        activity_grid=BandActivityGrid.from_activity(activity),
+    )
+
+    def evaluate() -> None:
+        for description in SENSOR_DESCRIPTIONS:
+            description.value_fn(data)
+            description.attr_fn(data)
+
+    return {"sensor_lambdas": measure(evaluate, repeat, number=20)}
+
+
+def run_cycle(bridge: Any, client: FakeClient) -> None:
+    """One polling cycle: every endpoint fetched, decoded and published."""
+    bridge._process_matrix(client)
+    bridge._process_watch(client)
+    bridge._process_most_wanted(client)
+    bridge._process_expeditions(client)
+    bridge._process_livestreams(client)
+    bridge._process_activity(client)
+
+
+def bench_cycle(bridge: Any, repeat: int, callsigns: int) -> dict[str, dict]:
+    """Full Docker polling cycle, for one callsign and across many."""
+    client = FakeClient()
+    bridge.http_session = FakeSession(synthetic.bodies())
+
+    def cycle() -> None:
+        bridge._retained.clear()
+        run_cycle(bridge, client)
+
+    results = {"polling_cycle": measure(cycle, repeat)}
+
+    sessions = [
+        FakeSession(synthetic.bodies(seed=seed))
+        for seed, _call in enumerate(synthetic.callsigns(callsigns), start=1)
+    ]
+
+    def many() -> None:
+        for session in sessions:
+            bridge.http_session = session
+            bridge._retained.clear()
+            run_cycle(bridge, client)
+
+    results[f"polling_cycle[{callsigns}_callsigns]"] = measure(
+        many, max(3, repeat // 5)
+    ) | {"callsigns": callsigns}
+    return results
+
+
+def compare(old_path: str, new: dict) -> None:
+    """Print median ratios new/old for benchmarks present in both files."""
+    old = json.loads(Path(old_path).read_text())["results"]
+    print(f"\nvs {old_path} ({'median new/old':>14})")
+    for name, result in new["results"].items():
+        if "median" in result and "median" in old.get(name, {}):
+            ratio = result["median"] / old[name]["median"]
+            flag = "  REGRESSION" if ratio > 1.10 else ""
+            print(f"  {name:<40}{ratio:>8.2f}x{flag}")
+
+
+def main() -> None:
+    """Run every benchmark, print a table and write the JSON results."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--callsigns", type=int, default=100)
+    parser.add_argument("--output", help="JSON results path")
+    parser.add_argument("--compare", help="previous JSON results to compare against")
+    args = parser.parse_args()
+
+    bridge = load_bridge()
+    logging.getLogger().setLevel(logging.WARNING)  # per-fetch INFO lines
+    results: dict[str, dict] = {}
+    results |= bench_dxcc_stats(bridge, args.repeat)
+    results |= bench_publish(bridge, args.repeat)
+    results |= bench_sensor_lambdas(args.repeat)
+    results |= bench_cycle(bridge, args.repeat, args.callsigns)
+
+    report = {
+        "version": bridge.VERSION,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": results,
+    }
+
+    print(f"{'benchmark':<42}{'median ms':>11}{'p95 ms':>10}")
+    for name, result in results.items():
+        if "median" in result:
+            print(f"{name:<42}{result['median'] * 1000:>11.3f}{result['p95'] * 1000:>10.3f}")
+        else:
+            print(f"{name:<42}  {result.get('skipped', '')}")
+
+    output = Path(
+        args.output
+        or ROOT / "benchmarks" / "results" / f"hot_paths-{bridge.VERSION}.json"
+    )
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2) + "\n")
+    print(f"\nResults written to {output}")
+
+    if args.compare:
+        compare(args.compare, report)
+
+
+if __name__ == "__main__":
+    main()
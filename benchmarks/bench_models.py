@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""Decode-time and memory benchmark: raw resp.json() rows vs typed models.
+
+Builds synthetic expeditions, livestreams and most-wanted bodies, then
+compares the old path (stdlib json.loads into lists/dicts, as
+requests' resp.json() does) with decoding straight into the __slots__
+models in clublog_bridge.models (orjson when installed), and with the
+lazy wrappers that build models only for the prefix the sensors read.
+The lazy wrappers keep the response body alive, so its size is included.
+
+Usage: python benchmarks/bench_models.py [--rows 5000] [--repeat 20]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import timeit
+import tracemalloc
+from collections.abc import Callable
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from clublog_bridge import models  # noqa: E402
+
+
+def expeditions_body(rows: int) -> bytes:
+    """Synthetic expeditions.php body."""
+    return json.dumps(
+        [[f"XX{i}A", "2026-01-15", i * 37 % 90000] for i in range(rows)]
+    ).encode()
+
+
+def livestreams_body(rows: int) -> bytes:
+    """Synthetic livestreams.php body."""
+    return json.dumps(
+        [
+            [f"XX{i}A", str(i % 340), "2026-01-15", f"https://clublog.org/livestream/XX{i}A"]
+            for i in range(rows)
+        ]
+    ).encode()
+
+
+def most_wanted_body(rows: int) -> bytes:
+    """Synthetic mostwanted.php body."""
+    return json.dumps({str(i): str(i % 500) for i in range(1, rows + 1)}).encode()
+
+
+def retained(decode: Callable[[bytes], object], body: bytes, keeps_body: bool) -> int:
+    """Bytes still allocated after decoding (the size of the decoded result)."""
+    tracemalloc.start()
+    result = decode(body)
+    size, _peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return size + (len(body) if keeps_body else 0)
+
+
+def main() -> None:
+    """Run the benchmark and print a table."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    loader = f"{models.json_loads.__module__}.loads"
+    print(f"models decoder: {loader}; {args.rows} rows, best of {args.repeat}")
+    print(f"{'response':<13}{'path':<9}{'decode ms':>10}{'retained KB':>13}{'B/row':>8}")
+    cases = (
+        ("expeditions", expeditions_body, models.decode_expeditions,
+         models.lazy_expeditions),
+        ("livestreams", livestreams_body, models.decode_livestreams,
+         models.lazy_livestreams),
+        ("most_wanted", most_wanted_body, models.decode_most_wanted,
+         models.LazyMostWanted),
+    )
+    for name, make, decode, lazy in cases:
+        body = make(args.rows)
+        for label, path in (("json", json.loads), ("models", decode), ("lazy", lazy)):
+            best = min(
+                timeit.repeat(lambda p=path, b=body: p(b), number=1, repeat=args.repeat)
+            )
+            size = retained(path, body, keeps_body=label == "lazy")
+            print(
+                f"{name:<13}{label:<9}{best * 1000:>10.2f}"
+                f"{size / 1024:>13.1f}{size / args.rows:>8.0f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
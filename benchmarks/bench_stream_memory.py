@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""Peak-memory benchmark: buffered resp.json() vs streamed decoding.
+
+Generates synthetic multi-megabyte activity and DXCC matrix bodies, feeds
+them to both decode paths as a chunk generator (the way requests/aiohttp
+deliver them) and reports tracemalloc peaks.
+
+"retained" is the size of the decoded result, which both paths must keep;
+"transient" (peak - retained) is the overhead of getting there, and is what
+the streaming path keeps flat as the body grows.
+
+Usage: python benchmarks/bench_stream_memory.py [--sizes 1,4,16]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import sys
+import tracemalloc
+from collections.abc import Callable, Iterator
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from clublog_bridge.streaming import (  # noqa: E402
+    STREAM_CHUNK_SIZE,
+    fold_activity,
+    fold_matrix,
+    iter_members,
+)
+
+BANDS = ["160", "80", "60", "40", "30", "20", "17", "15", "12", "10", "6", "4", "2"]
+
+
+def activity_body(megabytes: float) -> bytes:
+    """Build an activity-shaped body ({key: [24 counts]}) of roughly N MB."""
+    rng = random.Random(1)
+    row_bytes = len(json.dumps([rng.randint(0, 99999) for _ in range(24)])) + 12
+    rows = int(megabytes * 1024 * 1024 / row_bytes)
+    return json.dumps(
+        {f"{BANDS[i % len(BANDS)]}_{i}": [rng.randint(0, 99999) for _ in range(24)]
+         for i in range(rows)}
+    ).encode()
+
+
+def matrix_body(megabytes: float) -> bytes:
+    """Build a matrix-shaped body ({dxcc: {band: status}}) of roughly N MB."""
+    rng = random.Random(2)
+    row = {band: rng.randint(1, 3) for band in BANDS}
+    rows = int(megabytes * 1024 * 1024 / (len(json.dumps(row)) + 10))
+    return json.dumps(
+        {str(i): {band: rng.randint(1, 3) for band in BANDS} for i in range(rows)}
+    ).encode()
+
+
+def chunked(body: bytes) -> Iterator[bytes]:
+    """Yield the body in network-sized chunks."""
+    for i in range(0, len(body), STREAM_CHUNK_SIZE):
+        yield body[i:i + STREAM_CHUNK_SIZE]
+
+
+def buffered(chunks: Iterator[bytes], _fold: Callable) -> dict:
+    """What resp.json() does: join the whole body, then decode it."""
+    return json.loads(b"".join(chunks))
+
+
+def streamed(chunks: Iterator[bytes], fold: Callable) -> dict:
+    """Decode member by member and fold as chunks arrive."""
+    return fold(iter_members(chunks))
+
+
+def measure(path: Callable, body: bytes, fold: Callable) -> tuple[int, int]:
+    """Return (peak, retained) bytes allocated while decoding the body."""
+    # The source body is allocated before tracing starts, so it is excluded.
+    tracemalloc.start()
+    result = path(chunked(body), fold)
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return peak, retained
+
+
+def main() -> None:
+    """Run the benchmark and print a table."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="1,4,16", help="body sizes in MB")
+    args = parser.parse_args()
+
+    print(f"{'payload':<10}{'MB':>6}{'path':>10}{'peak MB':>10}"
+          f"{'retained':>10}{'transient':>11}")
+    for name, make, fold in (
+        ("activity", activity_body, fold_activity),
+        ("matrix", matrix_body, fold_matrix),
+    ):
+        for size in (float(s) for s in args.sizes.split(",")):
+            body = make(size)
+            for label, path in (("buffered", buffered), ("streamed", streamed)):
+                peak, retained = measure(path, body, fold)
+                print(
+                    f"{name:<10}{len(body) / 1e6:>6.1f}{label:>10}"
+                    f"{peak / 1e6:>10.1f}{retained / 1e6:>10.1f}"
+                    f"{(peak - retained) / 1e6:>11.2f}"
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""Load scenarios: many callsigns through the Docker bridge against the stand-in.
+
+Starts clublog_bridge.fake_clublog on a free local port, points the bridge
+at it with CLUBLOG_API_BASE and drives full polling cycles (all six
+endpoints: real HTTP, decode, processing and MQTT payload building) for
+hundreds of distinct callsigns from a pool of worker processes. Each
+scenario injects a different fault profile:
+
+- steady:    no faults
+- latency:   50 ms + up to 100 ms jitter on every response
+- flaky:     10% HTTP 500 everywhere, 30% HTTP 504 on activity
+- slowdrip:  matrix and activity bodies dripped in 64-byte chunks, 5 ms apart
+- forbidden: every request answered with HTTP 403
+
+Reports callsign cycles/s and requests/s, client-side p50/p95/p99 latency
+and failures per endpoint, and the stand-in's per-status accounting.
+
+Usage: python benchmarks/load_fake_clublog.py [--scenario steady ...]
+           [--callsigns 200] [--workers 8] [--output FILE]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / "benchmarks"))
+
+from bench_hot_paths import FakeClient, load_bridge  # noqa: E402
+from synthetic import callsigns  # noqa: E402
+
+from clublog_bridge.fake_clublog import ALL, FakeClubLog  # noqa: E402
+from clublog_bridge.fetch_timing import percentile  # noqa: E402
+
+SCENARIOS: dict[str, dict[str, dict[str, Any]]] = {
+    "steady": {},
+    "latency": {ALL: {"latency": 0.05, "jitter": 0.1}},
+    "flaky": {
+        ALL: {"error_rate": 0.1, "error_status": 500},
+        "/activity_json.php": {"error_rate": 0.3, "error_status": 504},
+    },
+    "slowdrip": {
+        "/json_dxccchart.php": {"drip_bytes": 64, "drip_delay": 0.005},
+        "/activity_json.php": {"drip_bytes": 64, "drip_delay": 0.005},
+    },
+    "forbidden": {ALL: {"status": 403}},
+}
+
+# Bridge processing step per endpoint, in polling order
+STEPS = {
+    "matrix": "_process_matrix",
+    "watch": "_process_watch",
+    "most_wanted": "_process_most_wanted",
+    "expeditions": "_process_expeditions",
+    "livestreams": "_process_livestreams",
+    "activity": "_process_activity",
+}
+
+_bridge: Any = None
+
+
+def _init_worker() -> None:
+    """Load the bridge once per worker (CLUBLOG_API_BASE is inherited)."""
+    global _bridge
+    _bridge = load_bridge()
+    logging.getLogger().setLevel(logging.CRITICAL)  # failures are counted instead
+
+
+def _run_callsigns(calls: list[str]) -> list[tuple[str, float, bool]]:
+    """Run one polling cycle per callsign; (endpoint, seconds, ok) per step."""
+    client = FakeClient()
+    samples = []
+    for call in calls:
+        _bridge.MY_CALLSIGN = call
+        _bridge._retained.clear()
+        for endpoint, step in STEPS.items():
+            start = time.perf_counter()
+            try:
+                getattr(_bridge, step)(client)
+                ok = True
+            except Exception:  # noqa: BLE001 - any failure counts, like main()
+                ok = False
+            samples.append((endpoint, time.perf_counter() - start, ok))
+    return samples
+
+
+def run_scenario(name: str, calls: list[str], workers: int) -> dict[str, Any]:
+    """Drive every callsign through the bridge under one fault profile."""
+    with FakeClubLog(seed=1) as fake:
+        for endpoint, fault in SCENARIOS[name].items():
+            fake.set_fault(endpoint, **fault)
+        os.environ["CLUBLOG_API_BASE"] = fake.base_url
+        chunks = [calls[i::workers] for i in range(workers)]
+        start = time.perf_counter()
+        with ProcessPoolExecutor(workers, initializer=_init_worker) as pool:
+            samples = [s for chunk in pool.map(_run_callsigns, chunks) for s in chunk]
+        elapsed = time.perf_counter() - start
+        server = fake.stats()
+        requests = fake.requests()
+
+    durations: dict[str, list[float]] = defaultdict(list)
+    failures: dict[str, int] = defaultdict(int)
+    for endpoint, seconds, ok in samples:
+        durations[endpoint].append(seconds)
+        failures[endpoint] += not ok
+    return {
+        "callsigns": len(calls),
+        "workers": workers,
+        "elapsed": elapsed,
+        "cycles_per_second": len(calls) / elapsed,
+        "requests_per_second": requests / elapsed,
+        "endpoints": {
+            endpoint: {
+                "p50": percentile(values, 50),
+                "p95": percentile(values, 95),
+                "p99": percentile(values, 99),
+                "failures": failures[endpoint],
+            }
+            for endpoint, values in durations.items()
+        },
+        "server_statuses": server["statuses"],
+    }
+
+
+def main() -> None:
+    """Run the selected scenarios, print a summary and write JSON results."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--scenario", action="append", choices=SCENARIOS, help="default: all"
+    )
+    parser.add_argument("--callsigns", type=int, default=200)
+    parser.add_argument("--workers", type=int, default=min(8, os.cpu_count() or 1))
+    parser.add_argument("--output", help="JSON results path")
+    args = parser.parse_args()
+
+    calls = callsigns(args.callsigns)
+    results = {}
+    for name in args.scenario or SCENARIOS:
+        result = results[name] = run_scenario(name, calls, args.workers)
+        print(
+            f"\n{name}: {result['callsigns']} callsigns in {result['elapsed']:.2f} s "
+            f"({result['cycles_per_second']:.1f} cycles/s, "
+            f"{result['requests_per_second']:.1f} req/s)"
+        )
+        print(f"  {'endpoint':<14}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'failed':>8}")
+        for endpoint, stats in result["endpoints"].items():
+            print(
+                f"  {endpoint:<14}{stats['p50'] * 1000:>9.1f}{stats['p95'] * 1000:>9.1f}"
+                f"{stats['p99'] * 1000:>9.1f}{stats['failures']:>8}"
+            )
+
+    output = Path(args.output or ROOT / "benchmarks" / "results" / "load_fake_clublog.json")
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(results, indent=2) + "\n")
+    print(f"\nResults written to {output}")
+
+
+if __name__ == "__main__":
+    main()
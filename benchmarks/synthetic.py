@@ -0,0 +1,97 @@
+"""Synthetic ClubLog responses for benchmarks, realistic and worst case.
+
+All generators are seeded so runs are comparable across versions.
+"""
+
+from __future__ import annotations
+
+import json
+import random
+
+BANDS = ["160", "80", "60", "40", "30", "20", "17", "15", "12", "10", "6", "4", "2"]
+
+# json_dxccchart.php mode parameter: 0 = all, 1 = CW, 2 = phone, 3 = data
+MODES = {0: "all", 1: "cw", 2: "phone", 3: "data"}
+
+# Share of (entity, band) cells worked in a realistic matrix, per mode
+MODE_FILL = {0: 0.55, 1: 0.30, 2: 0.35, 3: 0.40}
+
+DXCC_ENTITIES = 340
+
+
+def matrix(mode: int = 0, *, fill: float | None = None, seed: int = 1) -> dict:
+    """{dxcc: {band: status}} — fill=1.0 is the worst case (every cell set)."""
+    rng = random.Random(seed * 10 + mode)
+    fill = MODE_FILL[mode] if fill is None else fill
+    result: dict[str, dict[str, int]] = {}
+    for dxcc in range(1, DXCC_ENTITIES + 1):
+        bands = {band: rng.choice((1, 2, 3)) for band in BANDS if rng.random() < fill}
+        if bands:
+            result[str(dxcc)] = bands
+    return result
+
+
+def activity(*, seed: int = 1) -> dict:
+    """{band: [24 hourly counts]} for every band."""
+    rng = random.Random(seed)
+    return {band: [rng.randint(0, 5000) for _ in range(24)] for band in BANDS}
+
+
+def most_wanted() -> dict:
+    """{rank: adif} for every DXCC entity."""
+    return {str(rank): str((rank * 7) % DXCC_ENTITIES + 1) for rank in range(1, DXCC_ENTITIES + 1)}
+
+
+def expeditions(rows: int, *, seed: int = 1) -> list:
+    """[[call, date, qso_count], ...]."""
+    rng = random.Random(seed)
+    return [[f"XX{i}DX", "2026-01-15", rng.randint(0, 150000)] for i in range(rows)]
+
+
+def livestreams(rows: int, *, seed: int = 1) -> list:
+    """[[call, dxcc, date, url], ...]."""
+    rng = random.Random(seed)
+    return [
+        [f"XX{i}LS", str(rng.randint(1, DXCC_ENTITIES)), "2026-01-15",
+         f"https://clublog.org/livestream/XX{i}LS"]
+        for i in range(rows)
+    ]
+
+
+def watch(*, seed: int = 1) -> dict:
+    """watch.php object."""
+    rng = random.Random(seed)
+    return {
+        "clublog_user": True,
+        "is_expedition": False,
+        "has_oqrs": True,
+        "clublog_info": {
+            "total_qsos": rng.randint(1000, 2_000_000),
+            "last_clublog_upload": "2026-02-01 14:30:00",
+            "first_qso": "1998-03-01",
+            "last_qso": "2026-02-01",
+        },
+    }
+
+
+def callsigns(count: int) -> list[str]:
+    """Distinct plausible callsigns."""
+    prefixes = ["K", "W", "N", "G", "M", "DL", "JA", "VK", "VE", "F", "EA", "I"]
+    return [
+        f"{prefixes[i % len(prefixes)]}{i % 10}{chr(65 + i // 10 % 26)}{chr(65 + i // 260 % 26)}"
+        for i in range(count)
+    ]
+
+
+def bodies(
+    *, expedition_rows: int = 2000, livestream_rows: int = 2000, seed: int = 1
+) -> dict[str, bytes]:
+    """Encoded response bodies keyed by ClubLog script name."""
+    return {
+        "json_dxccchart.php": json.dumps(matrix(seed=seed)).encode(),
+        "watch.php": json.dumps(watch(seed=seed)).encode(),
+        "mostwanted.php": json.dumps(most_wanted()).encode(),
+        "expeditions.php": json.dumps(expeditions(expedition_rows, seed=seed)).encode(),
+        "livestreams.php": json.dumps(livestreams(livestream_rows, seed=seed)).encode(),
+        "activity_json.php": json.dumps(activity(seed=seed)).encode(),
+    }
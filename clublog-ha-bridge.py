@@ -7,20 +7,85 @@ via MQTT discovery.
 
 import json
 import logging
+import os
+import queue
 import random
 import signal
+import socket
+import sqlite3
+import threading
 import time
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager, nullcontext
+from typing import Any
 
 import paho.mqtt.client as mqtt
 import requests
 
+from clublog_bridge import metrics
+from clublog_bridge.activity_history import ActivityHistory, retry_delays
+from clublog_bridge.adif import AdifTailer
+from clublog_bridge.band_analytics import (
+    BandActivityGrid,
+    activity_attributes,
+    best_band_attributes,
+)
+from clublog_bridge.dxcc import CtyDatabase, ProvisionalCell, ProvisionalMatrix
+from clublog_bridge.loggers import decode_datagram, overlay_record
+from clublog_bridge.models import (
+    Expedition,
+    LazyMostWanted,
+    LazyRows,
+    Livestream,
+    Watch,
+    decode_watch,
+    lazy_expeditions,
+    lazy_livestreams,
+)
+from clublog_bridge.mqtt_outbox import MqttOutbox
+from clublog_bridge.profiling import CycleProfiler
+from clublog_bridge.query_api import QueryApi, serve, serve_unix
+from clublog_bridge.scheduling import (
+    REFRESH_ACCEPTED,
+    REFRESH_BACKOFF,
+    Clock,
+    MatrixRefresh,
+    RefreshGate,
+    RequestBudget,
+    next_due,
+)
+from clublog_bridge.snapshots import (
+    SnapshotStore,
+    dxcc_trend,
+    expeditions_state,
+    matrix_state,
+    most_wanted_state,
+    watch_state,
+)
+from clublog_bridge.spots import INVALID, NeededSpot, SpotMatcher, parse_spot
+from clublog_bridge.streaming import (
+    STREAM_CHUNK_SIZE,
+    fold_activity,
+    fold_matrix,
+    iter_members,
+)
 from config import (
+    ACTIVITY_FULL_HISTORY,
+    ACTIVITY_FULL_HISTORY_INTERVAL,
+    ACTIVITY_FULL_HISTORY_TIMEOUT,
     ACTIVITY_INTERVAL,
+    ADIF_LOG_FILE,
+    ADIF_PROVISIONAL_TTL,
+    CLUBLOG_API_BASE,
     CLUBLOG_API_KEY,
     CLUBLOG_APP_PASSWORD,
     CLUBLOG_EMAIL,
+    CTY_FILE,
+    DATA_DIR,
     DEBUG_MODE,
     EXPEDITIONS_INTERVAL,
+    FULL_HISTORY_RETRY_ATTEMPTS,
+    FULL_HISTORY_RETRY_BASE,
     HA_DISCOVERY_PREFIX,
     HA_ENTITY_BASE,
     HA_MQTT_BROKER,
@@ -29,9 +94,33 @@ from config import (
     HA_MQTT_USER,
     JITTER_FACTOR,
     LIVESTREAMS_INTERVAL,
+    LOGGER_UDP_BIND,
+    LOGGER_UDP_PORT,
     MATRIX_INTERVAL,
+    MATRIX_MAX_INTERVAL,
+    METRICS_BIND,
+    METRICS_PORT,
     MOST_WANTED_INTERVAL,
+    MQTT_DISCOVERY_MODE,
+    MQTT_DRAIN_RATE,
+    MQTT_GROUPED_STATE,
+    MQTT_MAX_INFLIGHT,
+    MQTT_OUTBOX_SIZE,
+    MQTT_QOS,
     MY_CALLSIGN,
+    PROFILE_CYCLES,
+    PROFILE_DIR,
+    PROFILE_MODE,
+    PROFILE_TOP,
+    QUERY_API_BIND,
+    QUERY_API_PORT,
+    QUERY_API_SOCKET,
+    REFRESH_MIN_INTERVAL,
+    REQUEST_BUDGET,
+    SNAPSHOT_HISTORY,
+    SNAPSHOT_RETENTION_DAYS,
+    SPOT_DEDUP_WINDOW,
+    SPOT_TOPIC,
     USER_AGENT,
     VERSION,
     WATCH_INTERVAL,
@@ -49,8 +138,31 @@ log = logging.getLogger("clublog-ha-bridge")
 # ---------------------------------------------------------------------------
 # Constants
 # ---------------------------------------------------------------------------
-CLUBLOG_API_BASE = "https://clublog.org"
 RUNNING = True
+POLL_TICK = 30  # Seconds between scheduler passes
+
+# Time and randomness for the scheduler — the simulation harness swaps in a
+# SimulatedClock and a seeded RNG
+clock: Clock = Clock()
+rng = random.Random()
+
+# Band activity grid from the last activity fetch — the best-band-now sensor
+# is re-evaluated from it every UTC hour without refetching
+activity_grid: BandActivityGrid | None = None
+
+# Last authoritative DXCC matrix {dxcc_id: {band: status}} (None until fetched)
+dxcc_matrix: dict | None = None
+
+# Matrix refreshed soon after an upload shows up in watch, backed off otherwise
+matrix_refresh = MatrixRefresh(MATRIX_INTERVAL, MATRIX_MAX_INTERVAL)
+
+# On-demand refreshes from the command topic, within a request budget that
+# counts every ClubLog request in the last REQUEST_BUDGET_WINDOW seconds
+REQUEST_BUDGET_WINDOW = 3600
+REFRESHABLE = ("matrix", "most_wanted", "watch", "expeditions", "livestreams", "activity")
+refresh_gate = RefreshGate(
+    RequestBudget(REQUEST_BUDGET, REQUEST_BUDGET_WINDOW), REFRESH_MIN_INTERVAL
+)
 
 # Device config shared by all MQTT discovery messages
 DEVICE_CONFIG = {
@@ -62,11 +174,12 @@ DEVICE_CONFIG = {
     "configuration_url": "https://clublog.org",
 }
 
-
-def _jittered(interval: float) -> float:
-    """Apply jitter to an interval: interval ± JITTER_FACTOR * interval."""
-    jitter = interval * JITTER_FACTOR
-    return interval + random.uniform(-jitter, jitter)
+# Origin of device-based discovery configs (MQTT_DISCOVERY_MODE=device)
+ORIGIN_CONFIG = {
+    "name": "clublog-ha-bridge",
+    "sw_version": VERSION,
+    "support_url": "https://github.com/pentafive/clublog-ha-bridge",
+}
 
 
 def signal_handler(_sig, _frame):
@@ -91,8 +204,41 @@ http_session.headers.update({"User-Agent": USER_AGENT})
 # ---------------------------------------------------------------------------
 
 
+def _get(
+    endpoint: str,
+    path: str,
+    params: dict,
+    *,
+    timeout: float = 30,
+    stream: bool = False,
+    session: requests.Session | None = None,
+) -> requests.Response:
+    """GET a ClubLog endpoint, recording latency and status metrics."""
+    start = time.perf_counter()
+    try:
+        resp = (session or http_session).get(
+            f"{CLUBLOG_API_BASE}/{path}", params=params, timeout=timeout, stream=stream
+        )
+    except requests.exceptions.RequestException:
+        metrics.RESPONSES.inc(endpoint, "error")
+        raise
+    finally:
+        metrics.REQUEST_SECONDS.observe(time.perf_counter() - start, endpoint)
+    metrics.RESPONSES.inc(endpoint, str(resp.status_code))
+    if not stream:
+        metrics.RESPONSE_BYTES.observe(len(resp.content), endpoint)
+    return resp
+
+
+def _chunks(resp: requests.Response, endpoint: str):
+    """Iterate a streamed body, recording its size once fully read."""
+    return metrics.counted(
+        resp.iter_content(STREAM_CHUNK_SIZE), metrics.RESPONSE_BYTES, endpoint
+    )
+
+
 def fetch_dxcc_matrix() -> dict:
-    """Fetch DXCC matrix from ClubLog."""
+    """Fetch DXCC matrix from ClubLog (streamed, decoded per entity)."""
     params = {
         "call": MY_CALLSIGN,
         "api": CLUBLOG_API_KEY,
@@ -102,58 +248,438 @@ def fetch_dxcc_matrix() -> dict:
         "date": "0",
         "sat": "0",
     }
-    resp = http_session.get(
-        f"{CLUBLOG_API_BASE}/json_dxccchart.php", params=params, timeout=30
-    )
-    resp.raise_for_status()
-    return resp.json()
+    with _get("matrix", "json_dxccchart.php", params, stream=True) as resp:
+        resp.raise_for_status()
+        with metrics.DECODE_SECONDS.time("matrix"):
+            return fold_matrix(iter_members(_chunks(resp, "matrix")))
 
 
-def fetch_most_wanted() -> dict:
+def fetch_most_wanted() -> LazyMostWanted:
     """Fetch most wanted list (no auth required)."""
-    resp = http_session.get(
-        f"{CLUBLOG_API_BASE}/mostwanted.php", params={"api": "1"}, timeout=30
-    )
+    resp = _get("most_wanted", "mostwanted.php", {"api": "1"})
     resp.raise_for_status()
-    return resp.json()
+    with metrics.DECODE_SECONDS.time("most_wanted"):
+        return LazyMostWanted(resp.content)
 
 
-def fetch_watch() -> dict:
+def fetch_watch() -> Watch | None:
     """Fetch watch/monitor data for callsign."""
     params = {"call": MY_CALLSIGN, "api": CLUBLOG_API_KEY}
-    resp = http_session.get(
-        f"{CLUBLOG_API_BASE}/watch.php", params=params, timeout=30
-    )
+    resp = _get("watch", "watch.php", params)
     resp.raise_for_status()
-    return resp.json()
+    with metrics.DECODE_SECONDS.time("watch"):
+        return decode_watch(resp.content)
 
 
-def fetch_expeditions() -> list:
+def fetch_expeditions() -> LazyRows[Expedition]:
     """Fetch active expeditions (no auth required)."""
-    resp = http_session.get(
-        f"{CLUBLOG_API_BASE}/expeditions.php", params={"api": "1"}, timeout=30
-    )
+    resp = _get("expeditions", "expeditions.php", {"api": "1"})
     resp.raise_for_status()
-    return resp.json()
+    with metrics.DECODE_SECONDS.time("expeditions"):
+        return lazy_expeditions(resp.content)
 
 
-def fetch_livestreams() -> list:
+def fetch_livestreams() -> LazyRows[Livestream]:
     """Fetch active livestreams (no auth required)."""
-    resp = http_session.get(
-        f"{CLUBLOG_API_BASE}/livestreams.php", params={"api": "1"}, timeout=30
-    )
+    resp = _get("livestreams", "livestreams.php", {"api": "1"})
     resp.raise_for_status()
-    return resp.json()
+    with metrics.DECODE_SECONDS.time("livestreams"):
+        return lazy_livestreams(resp.content)
 
 
-def fetch_activity() -> dict:
-    """Fetch band activity data (lastyear=1 to avoid timeout)."""
-    params = {"call": MY_CALLSIGN, "api": CLUBLOG_API_KEY, "lastyear": "1"}
-    resp = http_session.get(
-        f"{CLUBLOG_API_BASE}/activity_json.php", params=params, timeout=30
-    )
-    resp.raise_for_status()
-    return resp.json()
+def fetch_activity(
+    *,
+    lastyear: bool = True,
+    timeout: float = 30,
+    session: requests.Session | None = None,
+) -> dict:
+    """Fetch band activity data (lastyear=1 to avoid timeout).
+
+    Streamed and folded into per-band arrays so the body is never held in
+    memory as a whole. The full history (lastyear=False) is only requested
+    by the background ActivityHistoryJob, with a long timeout, and is
+    recorded under the "activity_full" endpoint label.
+    """
+    endpoint = "activity" if lastyear else "activity_full"
+    params = {"call": MY_CALLSIGN, "api": CLUBLOG_API_KEY}
+    if lastyear:
+        params["lastyear"] = "1"
+    with _get(
+        endpoint,
+        "activity_json.php",
+        params,
+        timeout=timeout,
+        stream=True,
+        session=session,
+    ) as resp:
+        resp.raise_for_status()
+        with metrics.DECODE_SECONDS.time(endpoint):
+            return fold_activity(iter_members(_chunks(resp, endpoint)))
+
+
+# ---------------------------------------------------------------------------
+# Full-history band activity (optional background job)
+# ---------------------------------------------------------------------------
+
+
+class ActivityHistoryJob:
+    """Fetch full-history activity in a background thread, cached on disk.
+
+    The regular loop keeps polling lastyear=1 daily; this job refetches the
+    full history every ACTIVITY_FULL_HISTORY_INTERVAL with a long timeout
+    and an exponential retry budget, and sets `updated` when new all-time
+    data is available for the main loop to publish.
+    """
+
+    def __init__(self, path: str) -> None:
+        """Initialize the job and load any cached history from disk."""
+        self.path = path
+        self.history: ActivityHistory | None = None
+        self.recent: dict = {}
+        self.updated = threading.Event()
+        self._lock = threading.Lock()
+        try:
+            with open(path, encoding="utf-8") as f:
+                self.history = ActivityHistory.from_dict(json.load(f))
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError):
+            log.warning("Ignoring unreadable activity history cache %s", path)
+        if self.history:
+            log.info("Loaded full-history activity cache from %s", path)
+
+    def start(self) -> None:
+        """Start the background thread."""
+        threading.Thread(
+            target=self._run, name="activity-history", daemon=True
+        ).start()
+
+    def merged(self, recent: dict) -> dict | None:
+        """Record the latest lastyear=1 data and return the all-time merge."""
+        with self._lock:
+            self.recent = recent
+            if self.history is None:
+                return None
+            if self.history.adopt_baseline(recent):
+                self._save()
+            return self.history.merged(recent)
+
+    def _run(self) -> None:
+        """Refetch the full history whenever the cached copy is due."""
+        next_attempt = (
+            self.history.due_at(ACTIVITY_FULL_HISTORY_INTERVAL)
+            if self.history
+            else 0.0
+        )
+        while RUNNING:
+            if clock.time() < next_attempt:
+                self._sleep_until(next_attempt)
+                continue
+            full = self._fetch_with_retries()
+            if full is None:
+                # Budget exhausted — try again after a regular activity interval
+                next_attempt = clock.time() + ACTIVITY_INTERVAL
+                continue
+            with self._lock:
+                self.history = ActivityHistory(clock.time(), full)
+                self.history.adopt_baseline(self.recent)
+                self._save()
+            next_attempt = self.history.due_at(ACTIVITY_FULL_HISTORY_INTERVAL)
+            log.info("Full-history activity fetched (%d bands)", len(full))
+            self.updated.set()
+
+    def _sleep_until(self, deadline: float) -> None:
+        """Sleep in short steps so shutdown is not delayed."""
+        while RUNNING and clock.time() < deadline:
+            clock.sleep(min(60.0, deadline - clock.time()))
+
+    def _fetch_with_retries(self) -> dict | None:
+        """Fetch the full history, retrying with exponential backoff."""
+        session = requests.Session()  # requests sessions are not thread-safe
+        session.headers.update({"User-Agent": USER_AGENT})
+        delays = retry_delays(FULL_HISTORY_RETRY_BASE, FULL_HISTORY_RETRY_ATTEMPTS)
+        try:
+            for attempt, delay in enumerate(delays, start=1):
+                refresh_gate.fetched("activity_full", clock.monotonic())
+                try:
+                    return fetch_activity(
+                        lastyear=False,
+                        timeout=ACTIVITY_FULL_HISTORY_TIMEOUT,
+                        session=session,
+                    )
+                except requests.exceptions.HTTPError as err:
+                    if err.response is not None and err.response.status_code == 403:
+                        log.error(
+                            "HTTP 403 fetching full-history activity — "
+                            "giving up until the next attempt"
+                        )
+                        return None
+                    log.warning(
+                        "Full-history activity attempt %d/%d failed: %s",
+                        attempt, len(delays), err,
+                    )
+                except (requests.exceptions.RequestException, ValueError) as err:
+                    log.warning(
+                        "Full-history activity attempt %d/%d failed: %s",
+                        attempt, len(delays), err,
+                    )
+                if attempt < len(delays):
+                    self._sleep_until(clock.time() + delay)
+                if not RUNNING:
+                    break
+        finally:
+            session.close()
+        log.error("Full-history activity retry budget exhausted")
+        return None
+
+    def _save(self) -> None:
+        """Atomically write the cache file (caller holds the lock)."""
+        tmp = f"{self.path}.tmp"
+        try:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(self.history.to_dict(), f)
+            os.replace(tmp, self.path)
+        except OSError:
+            log.exception("Failed to write activity history cache %s", self.path)
+
+
+activity_history = (
+    ActivityHistoryJob(os.path.join(DATA_DIR, "activity_history.json"))
+    if ACTIVITY_FULL_HISTORY
+    else None
+)
+
+
+# ---------------------------------------------------------------------------
+# Local logger QSOs (optional provisional DXCC updates)
+# ---------------------------------------------------------------------------
+
+CTY_INTERVAL = 7 * 86400  # cty.xml refreshed weekly
+ADIF_POLL_LIMIT = 4 * 1024 * 1024  # Bytes of log read per polling pass
+PROVISIONAL_ATTRIBUTE_LIMIT = 50  # Most recent provisional slots listed
+
+# Set to end the polling sleep early (a logger broadcast a QSO)
+wake = threading.Event()
+
+
+class LocalLog:
+    """Overlay QSOs from local loggers on the DXCC matrix, provisionally.
+
+    QSOs come from an ADIF log tailed on each polling pass and from logger
+    UDP broadcasts queued by LoggerListener. Each one's DXCC entity (the
+    record's DXCC field, else cty.xml) and band are resolved, and cells the
+    last matrix fetch did not have are marked worked until the next matrix
+    fetch reconciles them. The log offset and the overlay are kept on disk
+    so a restart neither rereads the log nor forgets cells. Nothing is read
+    until cty.xml is loaded: records without a DXCC field could not be
+    resolved, and the saved offset would skip them for good.
+    """
+
+    def __init__(self, path: str | None, state_path: str) -> None:
+        """Initialize and resume from the saved state, if any."""
+        self.state_path = state_path
+        self.overlay = ProvisionalMatrix(ADIF_PROVISIONAL_TTL)
+        self.cty: CtyDatabase | None = None
+        # (source, record) from the UDP listener thread
+        self.inbox: queue.SimpleQueue[tuple[str, dict[str, str]]] = queue.SimpleQueue()
+        state: dict = {}
+        try:
+            with open(state_path, encoding="utf-8") as f:
+                state = json.load(f)
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError):
+            log.warning("Ignoring unreadable local log state %s", state_path)
+        if not isinstance(state, dict):
+            state = {}
+        self.tailer = AdifTailer(path, state.get("tailer")) if path else None
+        self.overlay.load_list(state.get("provisional"))
+
+    def poll(self) -> tuple[list[ProvisionalCell], bool]:
+        """Apply new QSOs and age out old cells.
+
+        Returns the newly filled cells and whether the overlay changed.
+        """
+        now = clock.time()
+        changed = self.overlay.expire(now) > 0
+        if self.cty is None:  # Logged QSOs wait in the log and the inbox
+            if changed:
+                metrics.PROVISIONAL_CELLS.set(len(self.overlay))
+                self._save()
+            return [], changed
+        records = [("adif", r) for r in self.tailer.poll(ADIF_POLL_LIMIT)] if self.tailer else []
+        while not self.inbox.empty():
+            records.append(self.inbox.get_nowait())
+        filled = []
+        for source, record in records:
+            result, cell = overlay_record(self.overlay, record, self.cty, now)
+            metrics.LOCAL_QSOS.inc(source, result)
+            if cell:
+                log.info(
+                    "New slot from %s: %s, DXCC %s on %s", source, cell.call, cell.dxcc, cell.band
+                )
+                filled.append(cell)
+        if records or changed:
+            metrics.PROVISIONAL_CELLS.set(len(self.overlay))
+            self._save()
+        return filled, changed or bool(filled)
+
+    def reconcile(self, matrix: dict) -> None:
+        """Adopt an authoritative matrix fetch."""
+        before = len(self.overlay)
+        confirmed = self.overlay.reconcile(matrix, clock.time())
+        metrics.PROVISIONAL_CELLS.set(len(self.overlay))
+        if before:
+            log.info(
+                "Matrix fetch showed %d of %d provisional cells, %d still pending",
+                confirmed, before, len(self.overlay),
+            )
+            self._save()
+
+    def _save(self) -> None:
+        """Atomically write the state file."""
+        tmp = f"{self.state_path}.tmp"
+        try:
+            os.makedirs(os.path.dirname(self.state_path) or ".", exist_ok=True)
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(
+                    {
+                        "tailer": self.tailer.to_dict() if self.tailer else None,
+                        "provisional": self.overlay.to_list(),
+                    },
+                    f,
+                )
+            os.replace(tmp, self.state_path)
+        except OSError:
+            log.exception("Failed to write local log state %s", self.state_path)
+
+
+class LoggerListener:
+    """Receive WSJT-X / N1MM logged-QSO datagrams in a background thread.
+
+    Decoded QSOs are queued on the LocalLog and the polling loop is woken,
+    so new slots are published within a second instead of at the next
+    30 s tick. The socket is only ever read here; nothing is sent back.
+    """
+
+    def __init__(self, local: LocalLog, bind: str, port: int) -> None:
+        """Bind the UDP socket (call start() to begin receiving)."""
+        self.local = local
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.sock.bind((bind, port))
+        self.sock.settimeout(1.0)  # Notice shutdown within a second
+
+    @property
+    def address(self) -> tuple[str, int]:
+        """Return the bound (host, port)."""
+        return self.sock.getsockname()[:2]
+
+    def start(self) -> None:
+        """Start the receiving thread."""
+        threading.Thread(target=self._run, name="logger-udp", daemon=True).start()
+
+    def _run(self) -> None:
+        while RUNNING:
+            try:
+                data, _ = self.sock.recvfrom(65535)
+            except TimeoutError:
+                continue
+            except OSError:
+                return  # Socket closed
+            source, records = decode_datagram(data)
+            for record in records:
+                self.local.inbox.put((source, record))
+            if records:
+                wake.set()
+
+    def close(self) -> None:
+        """Close the socket, ending the thread."""
+        self.sock.close()
+
+
+local_log = (
+    LocalLog(ADIF_LOG_FILE or None, os.path.join(DATA_DIR, "adif_tail.json"))
+    if ADIF_LOG_FILE or LOGGER_UDP_PORT
+    else None
+)
+
+
+# Local read-only query API over the cached data (None when disabled)
+query_api = QueryApi() if QUERY_API_PORT or QUERY_API_SOCKET else None
+
+# Delta-encoded history of each fetch, for trends (None when disabled)
+snapshots = (
+    SnapshotStore(os.path.join(DATA_DIR, "history.db"), SNAPSHOT_RETENTION_DAYS * 86400)
+    if SNAPSHOT_HISTORY
+    else None
+)
+
+
+def _record_snapshot(
+    endpoint: str, state_fn: Callable[[Any], dict[str, int]], value: Any
+) -> bool:
+    """Record a fetch in the snapshot history; False when disabled or failed.
+
+    state_fn flattens value only when history is enabled, so lazily decoded
+    responses are not materialized for nothing.
+    """
+    if snapshots is None:
+        return False
+    try:
+        snapshots.record(endpoint, state_fn(value), clock.time())
+    except sqlite3.Error as e:
+        log.warning("Failed to record %s in the snapshot history: %s", endpoint, e)
+        return False
+    return True
+
+
+# ---------------------------------------------------------------------------
+# Spot matching (optional needed-DX alerts)
+# ---------------------------------------------------------------------------
+
+NEEDED_SPOTS_ATTRIBUTE_LIMIT = 20  # Most recent needed spots listed
+
+spot_matcher = SpotMatcher(SPOT_DEDUP_WINDOW) if SPOT_TOPIC else None
+
+# Needed spots found on paho's network thread, published by the polling loop
+needed_spots: queue.SimpleQueue[NeededSpot] = queue.SimpleQueue()
+
+
+def on_spot(payload: bytes) -> None:
+    """Check one spot; queue it and wake the polling loop if needed.
+
+    Runs on paho's network thread for every message on SPOT_TOPIC, so it
+    does lookups only — no I/O, no publishing.
+    """
+    spot = parse_spot(payload)
+    if spot is None:
+        metrics.SPOTS.inc(INVALID)
+        return
+    result, needed = spot_matcher.match(spot, clock.time())
+    metrics.SPOTS.inc(result)
+    if needed:
+        needed_spots.put(needed)
+        wake.set()
+
+
+def fetch_cty(path: str) -> CtyDatabase:
+    """Download ClubLog's cty.xml (gzipped) to path and load it.
+
+    The download replaces the file only once it has parsed.
+    """
+    tmp = f"{path}.tmp"
+    with _get("cty", "cty.php", {"api": CLUBLOG_API_KEY}, stream=True) as resp:
+        resp.raise_for_status()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(tmp, "wb") as f:
+            for chunk in _chunks(resp, "cty"):
+                f.write(chunk)
+    with metrics.DECODE_SECONDS.time("cty"):
+        database = CtyDatabase.from_file(tmp)
+    os.replace(tmp, path)
+    return database
 
 
 # ---------------------------------------------------------------------------
@@ -161,11 +687,285 @@ def fetch_activity() -> dict:
 # ---------------------------------------------------------------------------
 
 
+# Last payload published per retained topic — unchanged payloads are skipped,
+# and the whole set is replayed after a reconnect or a Home Assistant restart
+_retained: dict[str, str] = {}
+
+# Home Assistant publishes "online" here when it (re)starts
+HA_STATUS_TOPIC = f"{HA_DISCOVERY_PREFIX}/status"
+
+# Endpoint names to fetch now ("" or "all" for every endpoint)
+REFRESH_TOPIC = f"{HA_ENTITY_BASE}/refresh/set"
+
+# Refreshes asked for on paho's network thread, admitted by the polling loop
+refresh_requests: queue.SimpleQueue[str] = queue.SimpleQueue()
+
+# Bounded outbox between the polling loop and paho, set up by connect_mqtt()
+# (None when a stub client is used, which is then published to directly)
+outbox: MqttOutbox | None = None
+
+
+def _on_connect(client, _userdata, _flags, _reason_code, _properties) -> None:
+    """Replay the cached payloads (the broker may have restarted empty)."""
+    client.subscribe(HA_STATUS_TOPIC)
+    client.subscribe(REFRESH_TOPIC)
+    if spot_matcher:
+        client.subscribe(SPOT_TOPIC)
+    replay(client, "connect")
+    if outbox:
+        outbox.connected()
+
+
+def _on_message(client, _userdata, message) -> None:
+    """Replay cached payloads on Home Assistant's birth; check spots."""
+    if message.topic == HA_STATUS_TOPIC:
+        if message.payload == b"online":
+            replay(client, "birth")
+    elif message.topic == REFRESH_TOPIC:
+        on_refresh(message.payload)
+    elif spot_matcher and mqtt.topic_matches_sub(SPOT_TOPIC, message.topic):
+        on_spot(message.payload)
+
+
+def on_refresh(payload: bytes) -> None:
+    """Queue the endpoints named on the refresh topic and wake the polling loop.
+
+    Accepts names separated by commas or spaces, or a JSON list; "" or
+    "all" means every endpoint.
+    """
+    text = payload.decode("utf-8", "replace").strip()
+    try:
+        names = json.loads(text) if text.startswith("[") else text.replace(",", " ").split()
+    except ValueError:
+        names = None
+    if not isinstance(names, list):
+        log.warning("Ignoring refresh command %r", text[:100])
+        metrics.REFRESHES.inc("invalid")
+        return
+    names = [str(name).strip().lower() for name in names if str(name).strip()]
+    if not names or names == ["all"]:
+        names = list(REFRESHABLE)
+    for name in names:
+        if name in REFRESHABLE:
+            refresh_requests.put(name)
+        else:
+            log.warning("Ignoring refresh of unknown endpoint %r", name)
+            metrics.REFRESHES.inc("invalid")
+    wake.set()
+
+
+def _admit_refreshes(next_fetch: dict[str, float], backoff_until: float) -> bool:
+    """Make admitted refreshes due now; return True if any was admitted."""
+    now = clock.monotonic()
+    admitted = False
+    while True:
+        try:
+            endpoint = refresh_requests.get_nowait()
+        except queue.Empty:
+            return admitted
+        if backoff_until > now:
+            outcome = REFRESH_BACKOFF
+        else:
+            outcome = refresh_gate.request(endpoint, now)
+        metrics.REFRESHES.inc(outcome)
+        log.info("Refresh of %s: %s", endpoint, outcome)
+        if outcome == REFRESH_ACCEPTED:
+            next_fetch[endpoint] = now
+            admitted = True
+
+
+def replay(client: mqtt.Client, reason: str) -> None:
+    """Republish every cached discovery, state and attribute payload.
+
+    Sensors come back within a drain of the outbox instead of at each
+    endpoint's next fetch (up to a week for most wanted); ClubLog is not
+    contacted.
+    """
+    cached = _retained.copy()  # Atomic; the polling loop may be publishing
+    for topic, payload in cached.items():
+        if outbox:
+            outbox.put(topic, payload)
+        else:
+            client.publish(topic, payload, retain=True)
+    if cached:
+        metrics.MQTT_REPLAYS.inc(reason)
+        log.info("Replayed %d cached MQTT payloads (%s)", len(cached), reason)
+
+
+def _publish(
+    client: mqtt.Client, topic: str, payload: str, kind: str, *, ordered: bool = False
+) -> None:
+    """Publish a retained message unless the broker already holds this payload.
+
+    ordered=True keeps the message in sequence in the outbox instead of
+    letting a later payload for the topic replace it.
+    """
+    if _retained.get(topic) == payload:
+        metrics.MQTT_SUPPRESSED.inc(kind)
+        return
+    if outbox:
+        outbox.put(topic, payload, coalesce=not ordered)
+    else:
+        client.publish(topic, payload, retain=True)
+    _retained[topic] = payload
+    metrics.MQTT_PUBLISHES.inc(kind)
+
+
+def _forget_retained(topic: str) -> None:
+    """Forget a payload the outbox dropped, so the next publish is sent."""
+    _retained.pop(topic, None)
+
+
+# Device-based discovery: component configs by sensor id, all sent in one
+# retained payload on DEVICE_TOPIC, and per-entity config topics already
+# migrated to it
+DEVICE_TOPIC = f"{HA_DISCOVERY_PREFIX}/device/{HA_ENTITY_BASE}/config"
+_components: dict[str, dict] = {}
+_migrated: set[str] = set()
+
+
+class _StateGroup:
+    """Sensor states and attributes collected for one JSON document."""
+
+    def __init__(self, name: str) -> None:
+        self.topic = f"{HA_ENTITY_BASE}/{name}/state"
+        self.document: dict = {}
+
+
+# Group collecting states in grouped-publish mode (MQTT_GROUPED_STATE)
+_group: _StateGroup | None = None
+
+
+@contextmanager
+def state_group(client: mqtt.Client, name: str) -> Iterator[None]:
+    """Publish the sensors published inside as one JSON document.
+
+    In grouped mode each sensor's discovery config points at the shared
+    `<base>/<name>/state` topic with a value_template (and, with attributes,
+    a json_attributes_template) picking out its own field, so a fetch costs
+    one state message instead of one per sensor plus one per attributes
+    topic. The document is only published if the block completes, so a
+    half-built one never reaches Home Assistant. Without grouped mode this
+    does nothing.
+    """
+    global _group  # noqa: PLW0603
+    if not MQTT_GROUPED_STATE:
+        yield
+        return
+    _group = _StateGroup(name)
+    try:
+        yield
+        group = _group
+    finally:
+        _group = None
+    _publish(client, group.topic, json.dumps(group.document), "state")
+
+
+def _publish_entity(
+    client: mqtt.Client,
+    component: str,
+    sensor_id: str,
+    config_payload: dict,
+    state,
+    attributes: dict | None,
+) -> None:
+    """Publish an entity's discovery config, state and attributes."""
+    if _group:
+        config_payload["state_topic"] = _group.topic
+        config_payload["value_template"] = f"{{{{ value_json.{sensor_id}.state }}}}"
+        entry = _group.document[sensor_id] = {"state": state}
+        if attributes is not None:
+            config_payload["json_attributes_topic"] = _group.topic
+            config_payload["json_attributes_template"] = (
+                f"{{{{ value_json.{sensor_id}.attributes | tojson }}}}"
+            )
+            entry["attributes"] = attributes
+        _publish_config(client, component, sensor_id, config_payload)
+        return
+
+    state_topic = config_payload["state_topic"]
+    if attributes is not None:
+        attr_topic = f"{HA_ENTITY_BASE}/{sensor_id}/attributes"
+        config_payload["json_attributes_topic"] = attr_topic
+        _publish(client, attr_topic, json.dumps(attributes), "attributes")
+    _publish_config(client, component, sensor_id, config_payload)
+    _publish(client, state_topic, str(state), "state")
+
+
+def _publish_config(
+    client: mqtt.Client, component: str, sensor_id: str, config_payload: dict
+) -> None:
+    """Publish an entity discovery config, or collect it in device mode."""
+    if MQTT_DISCOVERY_MODE == "device":
+        config_payload.pop("device", None)
+        _components[sensor_id] = {"platform": component, **config_payload}
+        return
+    if DEVICE_TOPIC not in _retained:
+        # Back from device mode: drop the device config before the per-entity
+        # ones, or Home Assistant sees every unique_id twice
+        _publish(client, DEVICE_TOPIC, "", "config")
+    _publish(
+        client,
+        f"{HA_DISCOVERY_PREFIX}/{component}/{HA_ENTITY_BASE}/{sensor_id}/config",
+        json.dumps(config_payload),
+        "config",
+    )
+
+
+def publish_device_config(client: mqtt.Client) -> None:
+    """Publish one device discovery config listing every component.
+
+    Sent (if changed) after each polling pass in device mode, instead of a
+    config per entity each carrying its own copy of the device block. Per-
+    entity configs from an earlier run are migrated the way Home Assistant
+    documents it — migrate_discovery to the old topic, the device config,
+    then clearing the old topic — so entities keep their registry entries.
+    """
+    if MQTT_DISCOVERY_MODE != "device" or not _components:
+        return
+    legacy = [
+        f"{HA_DISCOVERY_PREFIX}/{component['platform']}/{HA_ENTITY_BASE}/{sensor_id}/config"
+        for sensor_id, component in _components.items()
+    ]
+    pending = [topic for topic in legacy if topic not in _migrated]
+    # Ordered: the outbox must not let "" overtake migrate_discovery
+    for topic in pending:
+        _publish(
+            client, topic, json.dumps({"migrate_discovery": True}), "config", ordered=True
+        )
+    _publish(
+        client,
+        DEVICE_TOPIC,
+        json.dumps({
+            "device": DEVICE_CONFIG,
+            "origin": ORIGIN_CONFIG,
+            "components": _components,
+        }),
+        "config",
+        ordered=bool(pending),
+    )
+    for topic in pending:
+        _publish(client, topic, "", "config", ordered=True)
+    _migrated.update(pending)
+
+
 def connect_mqtt() -> mqtt.Client:
     """Connect to Home Assistant MQTT broker."""
+    global outbox  # noqa: PLW0603
     client = mqtt.Client(
         mqtt.CallbackAPIVersion.VERSION2, client_id="clublog-ha-bridge"
     )
+    client.on_connect = _on_connect
+    client.on_message = _on_message
+    outbox = MqttOutbox(
+        client,
+        maxsize=MQTT_OUTBOX_SIZE,
+        max_inflight=MQTT_MAX_INFLIGHT,
+        rate=MQTT_DRAIN_RATE,
+        qos=MQTT_QOS,
+        on_drop=_forget_retained,
+    )
+    outbox.start()
     if HA_MQTT_USER:
         client.username_pw_set(HA_MQTT_USER, HA_MQTT_PASS)
     client.connect(HA_MQTT_BROKER, HA_MQTT_PORT, keepalive=60)
@@ -187,14 +987,9 @@ def publish_sensor(
 ):
     """Publish a sensor via MQTT discovery with device grouping."""
     unique_id = f"{HA_ENTITY_BASE}_{sensor_id}"
-    config_topic = (
-        f"{HA_DISCOVERY_PREFIX}/sensor/{HA_ENTITY_BASE}/{sensor_id}/config"
-    )
-    state_topic = f"{HA_ENTITY_BASE}/{sensor_id}/state"
-
     config_payload = {
         "name": name,
-        "state_topic": state_topic,
+        "state_topic": f"{HA_ENTITY_BASE}/{sensor_id}/state",
         "unique_id": unique_id,
         "object_id": unique_id,
         "device": DEVICE_CONFIG,
@@ -207,13 +1002,7 @@ def publish_sensor(
         config_payload["state_class"] = state_class
     if entity_category:
         config_payload["entity_category"] = entity_category
-    if attributes is not None:
-        attr_topic = f"{HA_ENTITY_BASE}/{sensor_id}/attributes"
-        config_payload["json_attributes_topic"] = attr_topic
-        client.publish(attr_topic, json.dumps(attributes), retain=True)
-
-    client.publish(config_topic, json.dumps(config_payload), retain=True)
-    client.publish(state_topic, str(value), retain=True)
+    _publish_entity(client, "sensor", sensor_id, config_payload, value, attributes)
 
 
 def publish_binary_sensor(
@@ -228,14 +1017,9 @@ def publish_binary_sensor(
 ):
     """Publish a binary sensor via MQTT discovery."""
     unique_id = f"{HA_ENTITY_BASE}_{sensor_id}"
-    config_topic = (
-        f"{HA_DISCOVERY_PREFIX}/binary_sensor/{HA_ENTITY_BASE}/{sensor_id}/config"
-    )
-    state_topic = f"{HA_ENTITY_BASE}/{sensor_id}/state"
-
     config_payload = {
         "name": name,
-        "state_topic": state_topic,
+        "state_topic": f"{HA_ENTITY_BASE}/{sensor_id}/state",
         "unique_id": unique_id,
         "object_id": unique_id,
         "payload_on": "ON",
@@ -246,13 +1030,46 @@ def publish_binary_sensor(
         config_payload["device_class"] = device_class
     if entity_category:
         config_payload["entity_category"] = entity_category
-    if attributes is not None:
-        attr_topic = f"{HA_ENTITY_BASE}/{sensor_id}/attributes"
-        config_payload["json_attributes_topic"] = attr_topic
-        client.publish(attr_topic, json.dumps(attributes), retain=True)
+    _publish_entity(
+        client, "binary_sensor", sensor_id, config_payload,
+        "ON" if is_on else "OFF", attributes,
+    )
 
-    client.publish(config_topic, json.dumps(config_payload), retain=True)
-    client.publish(state_topic, "ON" if is_on else "OFF", retain=True)
+
+def publish_event(
+    client: mqtt.Client,
+    event_id: str,
+    name: str,
+    event_type: str,
+    attributes: dict,
+    *,
+    icon: str | None = None,
+):
+    """Fire an event entity via MQTT discovery.
+
+    Events are not state: the payload is published unretained and kept out
+    of the replay cache, so a reconnect or Home Assistant restart does not
+    fire it again.
+    """
+    unique_id = f"{HA_ENTITY_BASE}_{event_id}"
+    topic = f"{HA_ENTITY_BASE}/{event_id}/event"
+    config_payload = {
+        "name": name,
+        "state_topic": topic,
+        "event_types": [event_type],
+        "unique_id": unique_id,
+        "object_id": unique_id,
+        "device": DEVICE_CONFIG,
+    }
+    if icon:
+        config_payload["icon"] = icon
+    _publish_config(client, "event", event_id, config_payload)
+    payload = json.dumps({"event_type": event_type, **attributes})
+    if outbox:
+        outbox.put(topic, payload, retain=False)
+    else:
+        client.publish(topic, payload)
+    metrics.MQTT_PUBLISHES.inc("event")
 
 
 # ---------------------------------------------------------------------------
@@ -290,6 +1107,25 @@ def main():
     client = connect_mqtt()
     log.info("Connected to MQTT broker at %s:%d", HA_MQTT_BROKER, HA_MQTT_PORT)
 
+    if METRICS_PORT:
+        metrics.serve(metrics.REGISTRY, METRICS_BIND, METRICS_PORT)
+        log.info("Serving metrics on %s:%d/metrics", METRICS_BIND, METRICS_PORT)
+
+    if activity_history:
+        activity_history.start()
+
+    if query_api and QUERY_API_PORT:
+        serve(query_api, QUERY_API_BIND, QUERY_API_PORT)
+        log.info("Serving the query API on %s:%d/v1/", QUERY_API_BIND, QUERY_API_PORT)
+    if query_api and QUERY_API_SOCKET:
+        serve_unix(query_api, QUERY_API_SOCKET)
+        log.info("Serving the query API on unix:%s", QUERY_API_SOCKET)
+
+    if local_log and LOGGER_UDP_PORT:
+        listener = LoggerListener(local_log, LOGGER_UDP_BIND, LOGGER_UDP_PORT)
+        listener.start()
+        log.info("Listening for logged QSOs on UDP %s:%d", *listener.address)
+
     intervals = {
         "matrix": MATRIX_INTERVAL,
         "most_wanted": MOST_WANTED_INTERVAL,
@@ -298,9 +1134,11 @@ def main():
         "livestreams": LIVESTREAMS_INTERVAL,
         "activity": ACTIVITY_INTERVAL,
     }
+    if local_log or spot_matcher:
+        intervals["cty"] = CTY_INTERVAL
 
     # Per-endpoint next-fetch timestamps — staggered to avoid startup burst
-    now = time.monotonic()
+    now = clock.monotonic()
     next_fetch: dict[str, float] = {}
     for i, endpoint in enumerate(intervals):
         next_fetch[endpoint] = now + (i * 5)  # 5s offset per endpoint
@@ -313,22 +1151,40 @@ def main():
         "expeditions": _process_expeditions,
         "livestreams": _process_livestreams,
         "activity": _process_activity,
+        "cty": _process_cty,
     }
 
     # Per-endpoint error tracking
     consecutive_errors: dict[str, int] = {}
     last_success: dict[str, float] = {}
 
+    # UTC hour the best-band-now sensor was last evaluated for
+    last_utc_hour = clock.gmtime().tm_hour
+
+    # Optional profiling of the next PROFILE_CYCLES fetch cycles
+    profiler = (
+        CycleProfiler(PROFILE_DIR, PROFILE_CYCLES, PROFILE_MODE, top=PROFILE_TOP)
+        if PROFILE_CYCLES > 0
+        else None
+    )
+    if profiler:
+        log.info(
+            "Profiling (%s) the next %d fetch cycles into %s",
+            PROFILE_MODE, PROFILE_CYCLES, PROFILE_DIR,
+        )
+
     # 403 circuit breaker — cease all requests for BACKOFF_403 seconds on 403
     backoff_403 = 3600  # 1 hour
     backoff_until = 0.0  # monotonic timestamp; 0 = not in backoff
 
     while RUNNING:
-        now_mono = time.monotonic()
-        now_wall = time.time()
+        now_mono = clock.monotonic()
+        now_wall = clock.time()
 
         # Check 403 backoff — skip endpoint fetches but still publish status
         in_backoff = backoff_until > now_mono
+        metrics.BREAKER_OPEN.set(1 if in_backoff else 0)
+        metrics.BREAKER_REMAINING.set(max(0.0, backoff_until - now_mono))
         if in_backoff:
             remaining = int(backoff_until - now_mono)
             if remaining % 300 == 0 and remaining > 0:
@@ -342,10 +1198,16 @@ def main():
                 if now_mono < next_time:
                     continue
 
+                metrics.SCHEDULER_LAG_SECONDS.observe(
+                    clock.monotonic() - next_time, endpoint
+                )
+                refresh_gate.fetched(endpoint, clock.monotonic())
                 try:
-                    fetchers[endpoint](client)
+                    with profiler.endpoint(endpoint) if profiler else nullcontext():
+                        fetchers[endpoint](client)
                     consecutive_errors[endpoint] = 0
                     last_success[endpoint] = now_wall
+                    metrics.LAST_SUCCESS.set(now_wall, endpoint)
                     log.info("Fetched %s successfully", endpoint)
                 except requests.exceptions.HTTPError as err:
                     if err.response is not None and err.response.status_code == 403:
@@ -356,26 +1218,49 @@ def main():
                             backoff_403 // 60,
                         )
                         backoff_until = now_mono + backoff_403
+                        metrics.BREAKER_TRIPS.inc()
+                        metrics.FETCH_FAILURES.inc(endpoint)
                         # Push all endpoints past the backoff window
                         for i_ep, ep in enumerate(next_fetch):
                             next_fetch[ep] = backoff_until + (i_ep * 5)
+                        refresh_gate.clear()
                         break
                     consecutive_errors[endpoint] = (
                         consecutive_errors.get(endpoint, 0) + 1
                     )
+                    metrics.FETCH_FAILURES.inc(endpoint)
                     log.exception("Error fetching %s", endpoint)
                 except Exception:
                     consecutive_errors[endpoint] = (
                         consecutive_errors.get(endpoint, 0) + 1
                     )
+                    metrics.FETCH_FAILURES.inc(endpoint)
                     log.exception("Error fetching %s", endpoint)
                 finally:
                     # Schedule next fetch with jitter (only if not in 403 backoff)
                     if backoff_until <= now_mono:
-                        next_fetch[endpoint] = now_mono + _jittered(
-                            intervals[endpoint]
+                        interval = (
+                            matrix_refresh.interval
+                            if endpoint == "matrix"
+                            else intervals[endpoint]
+                        )
+                        next_fetch[endpoint] = next_due(
+                            next_time, now_mono, interval, JITTER_FACTOR, rng
                         )
 
+        # --- Matrix pulled forward by an upload seen in watch ---
+        refresh_at = matrix_refresh.take_refresh()
+        if refresh_at is not None:
+            next_fetch["matrix"] = min(next_fetch["matrix"], max(refresh_at, backoff_until))
+
+        if profiler:
+            profiler.end_cycle()
+            if not profiler.active:
+                profiler = None
+
+        # --- Logged QSOs (provisional until the next matrix fetch), needed spots ---
+        _publish_local_updates(client)
+
         # --- API Status Binary Sensor ---
         stale_threshold = 7200  # 2 hours
         api_ok = (
@@ -395,37 +1280,62 @@ def main():
             error_attrs["backoff_remaining_min"] = int(
                 (backoff_until - now_mono) / 60
             )
-        publish_binary_sensor(
-            client,
-            "api_status",
-            "API Status",
-            api_ok,
-            device_class="connectivity",
-            entity_category="diagnostic",
-            attributes=error_attrs or None,
-        )
-
-        # --- Diagnostics Sensor ---
-        total_errors = sum(consecutive_errors.values())
-        publish_sensor(
-            client,
-            "api_consecutive_errors",
-            "API Errors",
-            total_errors,
-            unit="errors",
-            icon="mdi:alert-circle",
-            state_class="measurement",
-            entity_category="diagnostic",
-            attributes={
-                f"{ep}_errors": count
-                for ep, count in consecutive_errors.items()
-                if count > 0
-            }
-            or None,
-        )
+        with state_group(client, "status"):
+            publish_binary_sensor(
+                client,
+                "api_status",
+                "API Status",
+                api_ok,
+                device_class="connectivity",
+                entity_category="diagnostic",
+                attributes=error_attrs or None,
+            )
 
-        time.sleep(30)
+            # --- Diagnostics Sensor ---
+            total_errors = sum(consecutive_errors.values())
+            publish_sensor(
+                client,
+                "api_consecutive_errors",
+                "API Errors",
+                total_errors,
+                unit="errors",
+                icon="mdi:alert-circle",
+                state_class="measurement",
+                entity_category="diagnostic",
+                attributes={
+                    f"{ep}_errors": count
+                    for ep, count in consecutive_errors.items()
+                    if count > 0
+                }
+                or None,
+            )
 
+        # --- Best band re-evaluated locally at each UTC hour ---
+        utc_hour = clock.gmtime().tm_hour
+        if utc_hour != last_utc_hour:
+            last_utc_hour = utc_hour
+            _publish_best_band(client, utc_hour)
+
+        # --- Full-history activity finished in the background ---
+        if activity_history and activity_history.updated.is_set():
+            activity_history.updated.clear()
+            _publish_activity(client, activity_history.recent)
+
+        publish_device_config(client)
+
+        # Sleep until the next pass, publishing broadcast QSOs as they arrive
+        # and cutting the sleep short for an on-demand refresh
+        deadline = clock.monotonic() + POLL_TICK
+        while RUNNING and (remaining := deadline - clock.monotonic()) > 0:
+            if clock.wait(wake, remaining):
+                wake.clear()
+                _publish_local_updates(client)
+                publish_device_config(client)
+                if _admit_refreshes(next_fetch, backoff_until):
+                    break
+
+    if outbox:
+        outbox.stop()
     client.loop_stop()
     client.disconnect()
     log.info("ClubLog HA Bridge stopped")
@@ -438,107 +1348,292 @@ def main():
 
 def _process_matrix(client: mqtt.Client) -> None:
     """Fetch and publish DXCC matrix data."""
-    matrix = fetch_dxcc_matrix()
-    w, c, v = compute_dxcc_stats(matrix)
-    publish_sensor(
-        client, "dxcc_worked_total", "DXCC Worked", w,
-        unit="entities", icon="mdi:earth", state_class="total",
-    )
+    global dxcc_matrix  # noqa: PLW0603
+    matrix = dxcc_matrix = fetch_dxcc_matrix()
+    with metrics.PROCESS_SECONDS.time("matrix"):
+        if _record_snapshot("matrix", matrix_state, matrix):
+            _publish_dxcc_trend(client)
+        if local_log:
+            local_log.reconcile(matrix)
+            matrix = local_log.overlay.merged()
+        _publish_matrix(client, matrix)
+    matrix_refresh.matrix_fetched(clock.monotonic())
+
+
+def _publish_dxcc_trend(client: mqtt.Client) -> None:
+    """Publish DXCC growth over the last 30 days from the snapshot history."""
+    try:
+        trend = dxcc_trend(snapshots, clock.time())
+    except sqlite3.Error as e:
+        log.warning("Failed to read the snapshot history: %s", e)
+        return
+    if trend is None:
+        return
     publish_sensor(
-        client, "dxcc_confirmed_total", "DXCC Confirmed", c,
-        unit="entities", icon="mdi:earth-plus", state_class="total",
+        client, "dxcc_worked_30d", "DXCC Worked (30 Days)", trend["worked_30d"],
+        unit="entities", icon="mdi:chart-line", state_class="measurement",
+        attributes={"confirmed_30d": trend["confirmed_30d"], "monthly": trend["monthly"]},
     )
+
+
+def _publish_matrix(client: mqtt.Client, matrix: dict) -> None:
+    """Publish DXCC totals computed from the matrix."""
+    if spot_matcher:
+        spot_matcher.load(matrix)
+    if query_api:
+        query_api.update_matrix(matrix)
+    w, c, v = compute_dxcc_stats(matrix)
+    with state_group(client, "matrix"):
+        publish_sensor(
+            client, "dxcc_worked_total", "DXCC Worked", w,
+            unit="entities", icon="mdi:earth", state_class="total",
+        )
+        publish_sensor(
+            client, "dxcc_confirmed_total", "DXCC Confirmed", c,
+            unit="entities", icon="mdi:earth-plus", state_class="total",
+        )
+        publish_sensor(
+            client, "dxcc_verified_total", "DXCC Verified", v,
+            unit="entities", icon="mdi:earth-arrow-right", state_class="total",
+        )
+        if local_log:
+            cells = list(local_log.overlay.cells.values())
+            publish_sensor(
+                client, "dxcc_provisional", "DXCC Provisional Slots", len(cells),
+                unit="slots", icon="mdi:timer-sand", state_class="measurement",
+                attributes={
+                    "slots": [
+                        _slot_attributes(cell) for cell in cells[-PROVISIONAL_ATTRIBUTE_LIMIT:]
+                    ],
+                },
+            )
+    log.info("DXCC matrix: %d worked, %d confirmed, %d verified", w, c, v)
+
+
+def _publish_local_updates(client: mqtt.Client) -> None:
+    """Publish what logged QSOs and needed spots changed since the last call."""
+    if local_log:
+        _publish_local_qsos(client)
+    if spot_matcher:
+        _publish_needed_spots(client)
+
+
+def _publish_local_qsos(client: mqtt.Client) -> None:
+    """Apply logged QSOs to the overlay and publish what they changed."""
+    filled, changed = local_log.poll()
+    if not changed or dxcc_matrix is None:
+        return
+    _publish_matrix(client, local_log.overlay.merged())
+    if filled:
+        publish_event(
+            client, "new_slot", "New DXCC Slot", "new_slot",
+            {"slots": [_slot_attributes(cell) for cell in filled]},
+            icon="mdi:star-plus",
+        )
+
+
+def _publish_needed_spots(client: mqtt.Client) -> None:
+    """Fire one event for the needed spots queued, and list the recent ones.
+
+    One event per call rather than per spot: the outbox keeps one pending
+    message per topic, so back-to-back events would replace each other.
+    """
+    found = []
+    while not needed_spots.empty():
+        found.append(needed_spots.get_nowait())
+    if found:
+        publish_event(
+            client, "needed_spot", "Needed Spot", "needed_spot",
+            {"spots": [_spot_attributes(spot) for spot in found]},
+            icon="mdi:binoculars",
+        )
+    if not spot_matcher.ready:
+        return
+    recent = spot_matcher.recent(clock.time())
     publish_sensor(
-        client, "dxcc_verified_total", "DXCC Verified", v,
-        unit="entities", icon="mdi:earth-arrow-right", state_class="total",
+        client, "needed_spots", "Needed Spots", len(recent),
+        unit="spots", icon="mdi:binoculars", state_class="measurement",
+        attributes={
+            "spots": [
+                _spot_attributes(spot) for spot in recent[:NEEDED_SPOTS_ATTRIBUTE_LIMIT]
+            ],
+        },
     )
-    log.info("DXCC matrix: %d worked, %d confirmed, %d verified", w, c, v)
+
+
+def _spot_attributes(spot: NeededSpot) -> dict:
+    """Describe a needed spot for sensor and event attributes."""
+    cty = spot_matcher.cty
+    return {**spot.to_dict(), "entity": cty.name(spot.dxcc) if cty else None}
+
+
+def _slot_attributes(cell: ProvisionalCell) -> dict:
+    """Describe a provisional cell for sensor and event attributes."""
+    return {
+        "call": cell.call,
+        "dxcc": cell.dxcc,
+        "entity": local_log.cty.name(int(cell.dxcc)) if local_log.cty else None,
+        "band": cell.band,
+        "logged_at": cell.logged_at,
+    }
+
+
+def _process_cty(_client: mqtt.Client) -> None:
+    """Load cty.xml for logged QSOs and spots, downloading it when due."""
+    path = CTY_FILE or os.path.join(DATA_DIR, "cty.xml")
+    database = None
+    if not CTY_FILE:
+        try:
+            age = clock.time() - os.path.getmtime(path)
+        except OSError:
+            age = None
+        if age is None or age >= CTY_INTERVAL:
+            database = fetch_cty(path)
+            log.info("Downloaded cty.xml (%s)", database.date)
+    if database is None:
+        with metrics.DECODE_SECONDS.time("cty"):
+            database = CtyDatabase.from_file(path)
+        log.info("Loaded cty.xml (%s) with %d prefixes", database.date, len(database))
+    if local_log:
+        local_log.cty = database
+    if spot_matcher:
+        spot_matcher.set_cty(database)
 
 
 def _process_most_wanted(client: mqtt.Client) -> None:
     """Fetch and publish most wanted data."""
     wanted = fetch_most_wanted()
-    top_10 = dict(list(wanted.items())[:10]) if wanted else {}
-    publish_sensor(
-        client, "most_wanted_count", "Most Wanted Entities", len(wanted),
-        unit="entities", icon="mdi:star", state_class="measurement",
-        attributes={"top_10": top_10},
-    )
+    _record_snapshot("most_wanted", lambda w: most_wanted_state(w.full()), wanted)
+    with metrics.PROCESS_SECONDS.time("most_wanted"), state_group(client, "most_wanted"):
+        publish_sensor(
+            client, "most_wanted_count", "Most Wanted Entities", len(wanted),
+            unit="entities", icon="mdi:star", state_class="measurement",
+            attributes={"top_10": wanted.top(10)},
+        )
+        if query_api:
+            query_api.update_most_wanted(wanted)
 
 
 def _process_watch(client: mqtt.Client) -> None:
     """Fetch and publish watch/monitor data."""
     watch = fetch_watch()
-    clublog_info = watch.get("clublog_info", {})
-    publish_sensor(
-        client, "watch_total_qsos", "Total QSOs",
-        clublog_info.get("total_qsos", 0),
-        unit="QSOs", icon="mdi:radio-tower", state_class="total",
-    )
-    publish_sensor(
-        client, "watch_is_expedition", "Is Expedition",
-        "Yes" if watch.get("is_expedition") else "No",
-        icon="mdi:airplane-takeoff",
-    )
-    publish_sensor(
-        client, "watch_has_oqrs", "Has OQRS",
-        "Yes" if watch.get("has_oqrs") else "No",
-        icon="mdi:email-check",
-    )
-    publish_sensor(
-        client, "watch_last_upload", "Last Upload",
-        clublog_info.get("last_clublog_upload", "Unknown"),
-        icon="mdi:cloud-upload",
-    )
+    if watch is None:
+        log.warning("Empty watch response — keeping previous values")
+        return
+    _record_snapshot("watch", watch_state, watch)
+    with metrics.PROCESS_SECONDS.time("watch"):
+        _publish_watch(client, watch)
+    if matrix_refresh.watch_fetched(watch.last_upload, watch.total_qsos, clock.monotonic()):
+        log.info("New upload seen (%s) — refreshing the DXCC matrix", watch.last_upload)
+
+
+def _publish_watch(client: mqtt.Client, watch: Watch) -> None:
+    """Publish watch/monitor sensors."""
+    with state_group(client, "watch"):
+        publish_sensor(
+            client, "watch_total_qsos", "Total QSOs",
+            watch.total_qsos if watch.total_qsos is not None else 0,
+            unit="QSOs", icon="mdi:radio-tower", state_class="total",
+        )
+        publish_sensor(
+            client, "watch_is_expedition", "Is Expedition",
+            "Yes" if watch.is_expedition else "No",
+            icon="mdi:airplane-takeoff",
+        )
+        publish_sensor(
+            client, "watch_has_oqrs", "Has OQRS",
+            "Yes" if watch.has_oqrs else "No",
+            icon="mdi:email-check",
+        )
+        publish_sensor(
+            client, "watch_last_upload", "Last Upload",
+            watch.last_upload or "Unknown",
+            icon="mdi:cloud-upload",
+        )
 
 
 def _process_expeditions(client: mqtt.Client) -> None:
     """Fetch and publish expedition data."""
     expeditions = fetch_expeditions()
-    exp_attrs = (
-        [{"call": e[0], "date": e[1], "qso_count": e[2]} for e in expeditions[:20]]
-        if expeditions
-        else []
-    )
-    publish_sensor(
-        client, "active_expeditions", "Active Expeditions", len(expeditions),
-        unit="expeditions", icon="mdi:airplane", state_class="measurement",
-        attributes={"expeditions": exp_attrs},
-    )
+    _record_snapshot("expeditions", expeditions_state, expeditions)
+    with metrics.PROCESS_SECONDS.time("expeditions"):
+        exp_attrs = [
+            {"call": e.call, "date": e.date, "qso_count": e.qso_count}
+            for e in expeditions[:20]
+        ]
+        with state_group(client, "expeditions"):
+            publish_sensor(
+                client, "active_expeditions", "Active Expeditions", len(expeditions),
+                unit="expeditions", icon="mdi:airplane", state_class="measurement",
+                attributes={"expeditions": exp_attrs},
+            )
+        if query_api:
+            query_api.update_expeditions(expeditions)
 
 
 def _process_livestreams(client: mqtt.Client) -> None:
     """Fetch and publish livestream data."""
     livestreams = fetch_livestreams()
-    ls_attrs = (
-        [{"call": s[0], "dxcc": s[1], "url": s[3]} for s in livestreams[:20]]
-        if livestreams
-        else []
-    )
-    publish_sensor(
-        client, "active_livestreams", "Active Livestreams", len(livestreams),
-        unit="streams", icon="mdi:broadcast", state_class="measurement",
-        attributes={"livestreams": ls_attrs},
-    )
+    with metrics.PROCESS_SECONDS.time("livestreams"):
+        ls_attrs = [
+            {"call": s.call, "dxcc": s.dxcc, "url": s.url} for s in livestreams[:20]
+        ]
+        with state_group(client, "livestreams"):
+            publish_sensor(
+                client, "active_livestreams", "Active Livestreams", len(livestreams),
+                unit="streams", icon="mdi:broadcast", state_class="measurement",
+                attributes={"livestreams": ls_attrs},
+            )
+        if query_api:
+            query_api.update_livestreams(livestreams)
 
 
 def _process_activity(client: mqtt.Client) -> None:
     """Fetch and publish band activity data."""
     activity = fetch_activity()
+    with metrics.PROCESS_SECONDS.time("activity"):
+        _publish_activity(client, activity)
+
+
+def _publish_activity(client: mqtt.Client, activity: dict) -> None:
+    """Publish band activity, merged with full history when enabled."""
+    global activity_grid  # noqa: PLW0603
+    activity_grid = BandActivityGrid.from_activity(activity or {})
     band_totals = (
         {
-            f"band_{band}": sum(hours) if isinstance(hours, list) else hours
+            f"band_{band}": hours if isinstance(hours, int) else sum(hours)
             for band, hours in activity.items()
         }
         if activity
         else {}
     )
-    publish_sensor(
-        client, "band_activity", "Band Activity",
-        len(activity) if activity else 0,
-        unit="bands", icon="mdi:sine-wave", state_class="measurement",
-        attributes=band_totals,
-    )
+    all_time = activity_history.merged(activity) if activity_history else None
+    if all_time:
+        band_totals["all_time"] = all_time
+        band_totals["all_time_fetched"] = activity_history.history.fetched_at
+    if activity_grid:
+        band_totals.update(activity_attributes(activity_grid))
+    with state_group(client, "activity"):
+        publish_sensor(
+            client, "band_activity", "Band Activity",
+            len(activity) if activity else 0,
+            unit="bands", icon="mdi:sine-wave", state_class="measurement",
+            attributes=band_totals,
+        )
+    _publish_best_band(client, clock.gmtime().tm_hour)
+
+
+def _publish_best_band(client: mqtt.Client, utc_hour: int) -> None:
+    """Publish the busiest band for this UTC hour from the cached grid."""
+    if not activity_grid:
+        return
+    with state_group(client, "best_band"):
+        publish_sensor(
+            client, "best_band_now", "Best Band Now",
+            activity_grid.best_band(utc_hour) or "None",
+            icon="mdi:trophy",
+            attributes=best_band_attributes(activity_grid, utc_hour),
+        )
 
 
 if __name__ == "__main__":
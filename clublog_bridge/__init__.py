@@ -0,0 +1,5 @@
+"""Support modules for the ClubLog HA Bridge Docker mode.
+
+Modules here must not import config.py (it validates the environment and
+exits at import time) so they stay importable from tests and tools.
+"""
@@ -0,0 +1,106 @@
+"""Full-history band activity cache and merge logic.
+
+activity_json.php only answers reliably with lastyear=1; the full history
+takes long enough to 504 inside the normal 30 s timeout. Both modes can
+optionally fetch the full history in the background (long timeout,
+exponential retries), cache it on disk, and merge it with the cheap daily
+lastyear=1 refreshes:
+
+    all_time = full + max(0, recent - baseline)
+
+where baseline is the lastyear=1 response seen alongside the full fetch.
+Growth in the rolling last-year counts since the full fetch is added on
+top; counts that age out of the last-year window are never subtracted. The
+next full fetch replaces the estimate with authoritative numbers.
+
+This module is shared verbatim between the Docker bridge (clublog_bridge/)
+and the HACS integration (custom_components/clublog/) — keep both copies
+identical.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any
+
+
+def retry_delays(base: float, attempts: int) -> list[float]:
+    """Exponential retry schedule: base, 2*base, 4*base, ... (attempts entries)."""
+    return [base * (2**i) for i in range(attempts)]
+
+
+def _combine(full: Any, baseline: Any, recent: Any) -> Any:
+    """Combine one band's counts; lists are per-hour, ints are totals."""
+    values = (full, baseline, recent)
+    if all(v is None or isinstance(v, int) for v in values):
+        f, b, r = (v or 0 for v in values)
+        return f + max(0, r - b)
+    if any(isinstance(v, int) for v in values):
+        # Mixed shapes — fall back to totals
+        f, b, r = (v if isinstance(v, int) else sum(v or ()) for v in values)
+        return f + max(0, r - b)
+    width = max(len(v) for v in values if v is not None)
+    f, b, r = (list(v or ()) + [0] * (width - len(v or ())) for v in values)
+    return [f[h] + max(0, r[h] - b[h]) for h in range(width)]
+
+
+@dataclass
+class ActivityHistory:
+    """Cached full-history activity plus the last-year baseline beside it."""
+
+    fetched_at: float  # wall-clock time of the full-history fetch
+    full: dict[str, Any]
+    baseline: dict[str, Any] | None = None
+
+    def due_at(self, interval: float) -> float:
+        """Wall-clock time at which the full history should be refetched."""
+        return self.fetched_at + interval
+
+    def adopt_baseline(self, recent: dict[str, Any]) -> bool:
+        """Record the first last-year response after a full fetch as baseline.
+
+        Returns True if the baseline was set (the cache should be saved).
+        """
+        if self.baseline is not None or not recent:
+            return False
+        self.baseline = {band: _plain(hours) for band, hours in recent.items()}
+        return True
+
+    def merged(self, recent: dict[str, Any]) -> dict[str, Any]:
+        """Return the all-time estimate {band: [hourly counts] or total}."""
+        baseline = self.baseline if self.baseline is not None else recent
+        return {
+            band: _combine(self.full.get(band), baseline.get(band), recent.get(band))
+            for band in sorted(self.full.keys() | recent.keys())
+        }
+
+    def to_dict(self) -> dict[str, Any]:
+        """Serialize for the on-disk cache (JSON-compatible)."""
+        return {
+            "fetched_at": self.fetched_at,
+            "full": {band: _plain(hours) for band, hours in self.full.items()},
+            "baseline": (
+                {band: _plain(hours) for band, hours in self.baseline.items()}
+                if self.baseline is not None
+                else None
+            ),
+        }
+
+    @classmethod
+    def from_dict(cls, data: Any) -> ActivityHistory | None:
+        """Load a cache written by to_dict(); None if missing or malformed."""
+        if not isinstance(data, dict):
+            return None
+        fetched_at = data.get("fetched_at")
+        full = data.get("full")
+        baseline = data.get("baseline")
+        if not isinstance(fetched_at, (int, float)) or not isinstance(full, dict):
+            return None
+        if baseline is not None and not isinstance(baseline, dict):
+            return None
+        return cls(float(fetched_at), full, baseline)
+
+
+def _plain(hours: Any) -> Any:
+    """Convert array("I") hourly counts to a JSON-friendly list."""
+    return hours if isinstance(hours, int) else list(hours)
@@ -0,0 +1,170 @@
+"""Band-activity analytics over a bands x 24 hourly count grid.
+
+activity_json.php returns {band: [24 hourly QSO counts]}. BandActivityGrid
+loads that once per fetch into a single flat array (row per band, column
+per UTC hour) and precomputes everything the sensors need — per-band peak
+hour, best contiguous operating window, normalized hourly distribution and
+a band ranking for every hour of the day — so re-evaluating the "best band
+right now" each hour is a table lookup rather than another ClubLog fetch.
+
+This module is shared verbatim between the Docker bridge (clublog_bridge/)
+and the HACS integration (custom_components/clublog/) — keep both copies
+identical.
+"""
+
+from __future__ import annotations
+
+from array import array
+from collections.abc import Mapping
+from typing import Any
+
+HOURS = 24
+
+# Length of the "best operating window" reported per band
+BEST_WINDOW_HOURS = 4
+
+# Bands listed in the best-band ranking attribute
+RANKING_SIZE = 5
+
+
+class BandActivityGrid:
+    """Hourly QSO counts for each band, with precomputed analytics."""
+
+    __slots__ = (
+        "bands",
+        "counts",
+        "totals",
+        "peak_hours",
+        "best_windows",
+        "distributions",
+        "_rankings",
+    )
+
+    def __init__(self, bands: list[str], counts: array) -> None:
+        """Initialize from band names and a flat row-major bands x 24 array."""
+        self.bands = bands
+        self.counts = counts
+        self.totals = [sum(self.row(i)) for i in range(len(bands))]
+        self.peak_hours = [self._peak_hour(i) for i in range(len(bands))]
+        self.best_windows = [
+            self._best_window(i, BEST_WINDOW_HOURS) for i in range(len(bands))
+        ]
+        self.distributions = [self._distribution(i) for i in range(len(bands))]
+        self._rankings = [self._rank(hour) for hour in range(HOURS)]
+
+    @classmethod
+    def from_activity(cls, activity: Mapping[str, Any]) -> BandActivityGrid:
+        """Build a grid from an activity response.
+
+        Bands whose value is not a list of 24 non-negative counts (scalars,
+        null, objects, short or malformed lists) are skipped.
+        """
+        bands: list[str] = []
+        counts = array("I")
+        for band, hours in activity.items():
+            if not isinstance(hours, (list, array)) or len(hours) != HOURS:
+                continue
+            try:
+                row = array("I", (int(count) for count in hours))
+            except (TypeError, ValueError, OverflowError):
+                continue
+            bands.append(band)
+            counts.extend(row)
+        return cls(bands, counts)
+
+    def __bool__(self) -> bool:
+        """Return True if any band has hourly data."""
+        return bool(self.bands)
+
+    def row(self, index: int) -> array:
+        """Return the 24 hourly counts for the band at index."""
+        return self.counts[index * HOURS:(index + 1) * HOURS]
+
+    def distribution(self, index: int) -> list[float]:
+        """Return the band's hourly counts normalized to sum to 1."""
+        return self.distributions[index]
+
+    def ranking(self, hour: int) -> list[tuple[str, int]]:
+        """Return (band, QSOs) for bands active at this UTC hour, busiest first."""
+        return self._rankings[hour % HOURS]
+
+    def best_band(self, hour: int) -> str | None:
+        """Return the busiest band at this UTC hour, or None if all are quiet."""
+        ranking = self.ranking(hour)
+        return ranking[0][0] if ranking else None
+
+    def _peak_hour(self, index: int) -> int | None:
+        """Return the UTC hour with the most QSOs (earliest on ties).
+
+        A band with no QSOs at all has no peak (None).
+        """
+        if not self.totals[index]:
+            return None
+        row = self.row(index)
+        return max(range(HOURS), key=lambda hour: (row[hour], -hour))
+
+    def _distribution(self, index: int) -> list[float]:
+        """Normalize the band's hourly counts to sum to 1 (all 0.0 if quiet)."""
+        total = self.totals[index]
+        if not total:
+            return [0.0] * HOURS
+        return [count / total for count in self.row(index)]
+
+    def _best_window(self, index: int, width: int) -> tuple[int, float]:
+        """Return (start hour, share of total) of the busiest window.
+
+        Windows wrap around midnight UTC.
+        """
+        row = self.row(index)
+        total = self.totals[index]
+        window = sum(row[:width])
+        best_start, best_sum = 0, window
+        for start in range(1, HOURS):
+            window += row[(start + width - 1) % HOURS] - row[start - 1]
+            if window > best_sum:
+                best_start, best_sum = start, window
+        return best_start, (best_sum / total if total else 0.0)
+
+    def _rank(self, hour: int) -> list[tuple[str, int]]:
+        """Rank bands by QSOs at this hour; ties go to the busier band overall."""
+        order = sorted(
+            (i for i in range(len(self.bands)) if self.counts[i * HOURS + hour]),
+            key=lambda i: (-self.counts[i * HOURS + hour], -self.totals[i]),
+        )
+        return [(self.bands[i], self.counts[i * HOURS + hour]) for i in order]
+
+
+def activity_attributes(grid: BandActivityGrid) -> dict[str, Any]:
+    """Per-band peak hour, best operating window and hourly distribution."""
+    windows = {}
+    for i, band in enumerate(grid.bands):
+        start, share = grid.best_windows[i]
+        windows[band] = {
+            "start_hour": start,
+            "end_hour": (start + BEST_WINDOW_HOURS) % HOURS,
+            "share": round(share, 3),
+        }
+    return {
+        "peak_hour": dict(zip(grid.bands, grid.peak_hours, strict=True)),
+        "best_window": windows,
+        "distribution": {
+            band: [round(share, 3) for share in grid.distributions[i]]
+            for i, band in enumerate(grid.bands)
+        },
+    }
+
+
+def best_band_attributes(grid: BandActivityGrid, hour: int) -> dict[str, Any]:
+    """Ranking attributes for the best-band-now sensor at this UTC hour."""
+    index = {band: i for i, band in enumerate(grid.bands)}
+    return {
+        "utc_hour": hour % HOURS,
+        "ranking": [
+            {
+                "band": band,
+                "qsos": qsos,
+                "share": round(qsos / grid.totals[index[band]], 3),
+            }
+            for band, qsos in grid.ranking(hour)[:RANKING_SIZE]
+        ],
+    }
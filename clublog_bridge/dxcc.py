@@ -0,0 +1,315 @@
+"""Callsign to DXCC resolution and the provisional matrix overlay.
+
+ClubLog's cty.xml (https://clublog.org/cty.php?api=KEY, gzipped) lists
+every DXCC entity, the prefixes that map to them and thousands of
+per-callsign exceptions and invalid operations, each with an optional
+validity period. CtyDatabase loads it with a streaming parser and resolves
+a callsign at a given time the way ClubLog does: an exact exception first,
+then invalid operations, then the longest matching prefix of the part of
+a portable call that carries the location.
+
+ProvisionalMatrix keeps cells worked locally (from a logger) over the last
+authoritative json_dxccchart.php matrix until a later fetch shows them or
+they age out. ClubLog caches the matrix for an hour, so without it totals
+lag real QSOs by one to two hours.
+
+This module is shared verbatim between the Docker bridge (clublog_bridge/)
+and the HACS integration (custom_components/clublog/) — keep both copies
+identical.
+"""
+
+from __future__ import annotations
+
+import gzip
+import sys
+import time
+import xml.etree.ElementTree as ET
+from dataclasses import dataclass
+from datetime import UTC, datetime
+from typing import IO, Any
+
+# ClubLog matrix status of a worked (not confirmed) cell
+STATUS_WORKED = 2
+
+# ADIF band enumeration: (name, lower MHz, upper MHz)
+BANDS: tuple[tuple[str, float, float], ...] = (
+    ("2190m", 0.1357, 0.1378),
+    ("630m", 0.472, 0.479),
+    ("560m", 0.501, 0.504),
+    ("160m", 1.8, 2.0),
+    ("80m", 3.5, 4.0),
+    ("60m", 5.06, 5.45),
+    ("40m", 7.0, 7.3),
+    ("30m", 10.1, 10.15),
+    ("20m", 14.0, 14.35),
+    ("17m", 18.068, 18.168),
+    ("15m", 21.0, 21.45),
+    ("12m", 24.89, 24.99),
+    ("10m", 28.0, 29.7),
+    ("8m", 40.0, 45.0),
+    ("6m", 50.0, 54.0),
+    ("5m", 54.000001, 69.9),
+    ("4m", 70.0, 71.0),
+    ("2m", 144.0, 148.0),
+    ("1.25m", 222.0, 225.0),
+    ("70cm", 420.0, 450.0),
+    ("33cm", 902.0, 928.0),
+    ("23cm", 1240.0, 1300.0),
+    ("13cm", 2300.0, 2450.0),
+)
+
+# Portable suffixes that say nothing about the location
+_MODIFIERS = frozenset({"P", "M", "A", "QRP", "QRPP", "LH", "LGT", "B", "J", "T"})
+# Maritime and aeronautical mobile count for no DXCC entity
+_NO_ENTITY = frozenset({"MM", "AM"})
+
+
+def band_for(band: str | None = None, freq_mhz: float | None = None) -> str | None:
+    """Return the matrix band key ("20", "70cm") from an ADIF BAND or FREQ.
+
+    The matrix names metre bands by number alone; centimetre bands keep
+    their unit.
+    """
+    if band:
+        name = band.strip().lower()
+        if name.endswith("cm") or name.endswith("mm"):
+            return sys.intern(name)
+        if name.endswith("m"):
+            return sys.intern(name[:-1])
+    if freq_mhz is not None:
+        for name, low, high in BANDS:
+            if low <= freq_mhz <= high:
+                return band_for(name)
+    return None
+
+
+def _when(value: str | None) -> float | None:
+    """Parse a cty.xml timestamp to epoch seconds (None when absent)."""
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(value.strip())
+    except ValueError:
+        return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=UTC)
+    return parsed.timestamp()
+
+
+# One cty.xml record: (valid from, valid until, ADIF entity number or None
+# for an invalid operation); None bounds are open
+_Record = tuple[float | None, float | None, int | None]
+
+
+def _valid(record: _Record, when: float) -> bool:
+    """Return True if record applies at epoch `when`."""
+    start, end, _ = record
+    return (start is None or start <= when) and (end is None or when <= end)
+
+
+def _find(records: list[_Record] | None, when: float) -> _Record | None:
+    """Return the first record valid at `when`."""
+    for record in records or ():
+        if _valid(record, when):
+            return record
+    return None
+
+
+class CtyDatabase:
+    """Prefixes, exceptions and invalid operations from ClubLog's cty.xml."""
+
+    def __init__(self) -> None:
+        """Initialize empty; use load() or from_file()."""
+        self.date: str | None = None
+        self.names: dict[int, str] = {}
+        self._prefixes: dict[str, list[_Record]] = {}
+        self._exceptions: dict[str, list[_Record]] = {}
+        self._invalid: dict[str, list[_Record]] = {}
+        self._longest = 0
+
+    def __len__(self) -> int:
+        """Return the number of prefixes known."""
+        return len(self._prefixes)
+
+    @classmethod
+    def from_file(cls, path: str) -> CtyDatabase:
+        """Load cty.xml, plain or gzipped."""
+        with open(path, "rb") as f:
+            gzipped = f.read(2) == b"\x1f\x8b"
+        opener = gzip.open if gzipped else open
+        database = cls()
+        with opener(path, "rb") as f:
+            database.load(f)
+        return database
+
+    def load(self, stream: IO[bytes]) -> None:
+        """Parse cty.xml element by element, dropping each once read."""
+        tables = {
+            "prefix": self._prefixes,
+            "exception": self._exceptions,
+            "invalid": self._invalid,
+        }
+        for event, element in ET.iterparse(stream, events=("start", "end")):
+            tag = element.tag.rpartition("}")[2]
+            if event == "start":
+                if tag == "clublog":
+                    self.date = element.get("date")
+                continue
+            if tag == "entity":
+                adif = _int(_text(element, "adif"))
+                if adif is not None:
+                    self.names[adif] = _text(element, "name") or str(adif)
+            elif tag in tables:
+                call = (_text(element, "call") or "").upper()
+                if call:
+                    adif = None if tag == "invalid" else _int(_text(element, "adif"))
+                    start = _when(_text(element, "start"))
+                    end = _when(_text(element, "end"))
+                    tables[tag].setdefault(sys.intern(call), []).append((start, end, adif))
+            else:
+                continue
+            element.clear()
+        self._longest = max(map(len, self._prefixes), default=0)
+
+    def resolve(self, call: str, when: float | None = None) -> int | None:
+        """Return the DXCC entity of a callsign at epoch `when` (None = now).
+
+        None means unknown, an invalid operation, or maritime/aeronautical
+        mobile.
+        """
+        call = call.strip().upper()
+        if not call:
+            return None
+        if when is None:
+            when = time.time()
+        record = _find(self._exceptions.get(call), when)
+        if record:
+            return record[2]
+        if _find(self._invalid.get(call), when):
+            return None
+        base = _location_part(call)
+        if base is None:
+            return None
+        for length in range(min(len(base), self._longest), 0, -1):
+            record = _find(self._prefixes.get(base[:length]), when)
+            if record:
+                return record[2]
+        return None
+
+    def name(self, adif: int | None) -> str | None:
+        """Return an entity's name."""
+        return None if adif is None else self.names.get(adif)
+
+
+def _location_part(call: str) -> str | None:
+    """Return the part of a call whose prefix gives the location."""
+    parts = [part for part in call.split("/") if part]
+    if not parts:
+        return None
+    if any(part in _NO_ENTITY for part in parts[1:]):
+        return None
+    parts = [
+        part for i, part in enumerate(parts)
+        if i == 0 or (part not in _MODIFIERS and not part.isdigit())
+    ]
+    if len(parts) == 1:
+        return parts[0]
+    # K1ABC/VP9 and VP2E/K1ABC: the shorter part is the location
+    return min(parts[:2], key=len)
+
+
+def _text(element: ET.Element, tag: str) -> str | None:
+    """Return a child element's text, namespace or not."""
+    for child in element:
+        if child.tag.rpartition("}")[2] == tag:
+            return child.text
+    return None
+
+
+def _int(value: str | None) -> int | None:
+    try:
+        return int(value) if value is not None else None
+    except ValueError:
+        return None
+
+
+@dataclass
+class ProvisionalCell:
+    """A locally logged QSO filling a cell ClubLog has not shown yet."""
+
+    dxcc: str
+    band: str
+    call: str
+    logged_at: float  # epoch seconds of the QSO
+
+
+class ProvisionalMatrix:
+    """Locally worked cells overlaid on the last authoritative matrix."""
+
+    def __init__(self, ttl: float) -> None:
+        """Initialize; cells older than `ttl` seconds are dropped unseen."""
+        self.ttl = ttl
+        self.matrix: dict[str, dict[str, int]] = {}
+        self.cells: dict[tuple[str, str], ProvisionalCell] = {}
+
+    def __len__(self) -> int:
+        """Return the number of provisional cells."""
+        return len(self.cells)
+
+    def add(
+        self, dxcc: int | str, band: str, call: str, logged_at: float
+    ) -> ProvisionalCell | None:
+        """Record a locally logged QSO; return the cell if it is a new one."""
+        key = (str(dxcc), band)
+        if band in self.matrix.get(key[0], ()) or key in self.cells:
+            return None
+        cell = self.cells[key] = ProvisionalCell(key[0], band, call, logged_at)
+        return cell
+
+    def reconcile(self, matrix: dict[str, dict[str, int]], now: float) -> int:
+        """Adopt a fresh authoritative matrix; return the cells it confirmed.
+
+        Cells the matrix now shows are dropped, and so are cells logged more
+        than `ttl` ago (never uploaded, or deleted on ClubLog).
+        """
+        self.matrix = matrix
+        shown = [key for key in self.cells if key[1] in matrix.get(key[0], ())]
+        for key in shown:
+            del self.cells[key]
+        self.expire(now)
+        return len(shown)
+
+    def expire(self, now: float) -> int:
+        """Drop cells logged more than `ttl` ago; return how many."""
+        old = [key for key, cell in self.cells.items() if now - cell.logged_at > self.ttl]
+        for key in old:
+            del self.cells[key]
+        return len(old)
+
+    def merged(self) -> dict[str, dict[str, int]]:
+        """Return the matrix with provisional cells added as worked."""
+        if not self.cells:
+            return self.matrix
+        merged = dict(self.matrix)
+        for dxcc, band in self.cells:
+            merged[dxcc] = {**merged.get(dxcc, {}), band: STATUS_WORKED}
+        return merged
+
+    def to_list(self) -> list[dict[str, Any]]:
+        """Serialize the provisional cells (JSON-compatible)."""
+        return [
+            {"dxcc": c.dxcc, "band": c.band, "call": c.call, "logged_at": c.logged_at}
+            for c in self.cells.values()
+        ]
+
+    def load_list(self, data: Any) -> None:
+        """Restore cells written by to_list(), skipping malformed entries."""
+        for item in data if isinstance(data, list) else ():
+            try:
+                cell = ProvisionalCell(
+                    str(item["dxcc"]), str(item["band"]), str(item["call"]),
+                    float(item["logged_at"]),
+                )
+            except (KeyError, TypeError, ValueError):
+                continue
+            self.cells[(cell.dxcc, cell.band)] = cell
@@ -0,0 +1,332 @@
+"""Local stand-in for the ClubLog API, for offline, load and fault testing.
+
+Serves the six endpoints the bridge uses from JSON fixtures (by default
+clublog_bridge/fixtures/) and can inject faults per endpoint: fixed or
+jittered latency, forced or random error statuses (403/500/504...), and
+slow-drip bodies. Responses carry an ETag and honour If-None-Match with a
+304. Every request is accounted per client (the `call` parameter when
+present, else the remote address) and per endpoint.
+
+Point either mode at it with CLUBLOG_API_BASE (Docker) or the API base URL
+option (HACS):
+
+    python -m clublog_bridge.fake_clublog --port 8080 --latency 0.2
+
+Control endpoints: GET /_stats (accounting as JSON), POST /_faults
+({endpoint: {field: value}}, "*" for all endpoints), POST /_reset.
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import random
+import threading
+import time
+from collections import defaultdict, deque
+from dataclasses import asdict, dataclass, fields
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any
+from urllib.parse import parse_qs, urlsplit
+
+FIXTURES_DIR = Path(__file__).resolve().parent / "fixtures"
+
+# URL path -> fixture file stem
+ENDPOINTS = {
+    "/json_dxccchart.php": "json_dxccchart",
+    "/watch.php": "watch",
+    "/mostwanted.php": "mostwanted",
+    "/expeditions.php": "expeditions",
+    "/livestreams.php": "livestreams",
+    "/activity_json.php": "activity_json",
+}
+
+ALL = "*"
+
+# Server-side durations kept per endpoint (oldest dropped first)
+DURATION_SAMPLES = 100
+
+
+@dataclass
+class Fault:
+    """Fault injection settings for one endpoint (or ALL)."""
+
+    latency: float = 0.0  # Seconds before the response starts
+    jitter: float = 0.0  # Uniform extra latency, 0..jitter seconds
+    status: int | None = None  # Always answer with this status
+    error_rate: float = 0.0  # Probability of answering error_status instead
+    error_status: int = 500
+    drip_bytes: int = 0  # Send the body in chunks of this size (0 = at once)
+    drip_delay: float = 0.0  # Seconds between drip chunks
+
+    def update(self, values: dict[str, Any]) -> None:
+        """Set known fields from a dict; unknown keys raise ValueError."""
+        known = {f.name for f in fields(self)}
+        for key, value in values.items():
+            if key not in known:
+                raise ValueError(f"unknown fault field {key!r}")
+            setattr(self, key, value)
+
+
+def load_fixtures(directory: Path = FIXTURES_DIR) -> dict[str, bytes]:
+    """Read every endpoint fixture from directory as raw bytes."""
+    return {
+        path: (directory / f"{stem}.json").read_bytes()
+        for path, stem in ENDPOINTS.items()
+    }
+
+
+class FakeClubLog:
+    """A threaded HTTP server impersonating ClubLog."""
+
+    def __init__(
+        self,
+        fixtures: dict[str, bytes] | None = None,
+        *,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        seed: int | None = None,
+    ) -> None:
+        """Initialize; call start() (or use as a context manager) to serve."""
+        self.fixtures = fixtures if fixtures is not None else load_fixtures()
+        self.faults: dict[str, Fault] = {ALL: Fault()}
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread: threading.Thread | None = None
+        self.reset_stats()
+
+    # -- lifecycle ---------------------------------------------------------
+
+    @property
+    def base_url(self) -> str:
+        """Return http://host:port for CLUBLOG_API_BASE."""
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> str:
+        """Serve from a daemon thread and return the base URL."""
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, name="fake-clublog", daemon=True
+        )
+        self._thread.start()
+        return self.base_url
+
+    def stop(self) -> None:
+        """Stop serving and close the socket."""
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> FakeClubLog:
+        """Start serving."""
+        self.start()
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        """Stop serving."""
+        self.stop()
+
+    # -- faults and accounting ---------------------------------------------
+
+    def set_fault(self, endpoint: str = ALL, **values: Any) -> Fault:
+        """Replace the fault settings for an endpoint path (or ALL)."""
+        fault = Fault()
+        fault.update(values)
+        with self._lock:
+            self.faults[endpoint] = fault
+        return fault
+
+    def clear_faults(self) -> None:
+        """Remove all injected faults."""
+        with self._lock:
+            self.faults = {ALL: Fault()}
+
+    def reset_stats(self) -> None:
+        """Forget all request accounting."""
+        with self._lock:
+            self._requests: dict[str, dict[str, int]] = defaultdict(
+                lambda: defaultdict(int)
+            )
+            self._statuses: dict[str, dict[int, int]] = defaultdict(
+                lambda: defaultdict(int)
+            )
+            self._bytes: dict[str, int] = defaultdict(int)
+            self._durations: dict[str, deque[float]] = defaultdict(
+                lambda: deque(maxlen=DURATION_SAMPLES)
+            )
+            self._started = time.monotonic()
+
+    def record(
+        self, client: str, endpoint: str, status: int, size: int, duration: float
+    ) -> None:
+        """Account one finished request."""
+        with self._lock:
+            self._requests[client][endpoint] += 1
+            self._statuses[endpoint][status] += 1
+            self._bytes[endpoint] += size
+            self._durations[endpoint].append(duration)
+
+    def requests(self, endpoint: str | None = None, client: str | None = None) -> int:
+        """Count requests, optionally for one endpoint and/or client."""
+        with self._lock:
+            return sum(
+                count
+                for who, per_endpoint in self._requests.items()
+                if client is None or who == client
+                for path, count in per_endpoint.items()
+                if endpoint is None or path == endpoint
+            )
+
+    def stats(self) -> dict[str, Any]:
+        """Return accounting as a JSON-serializable dict."""
+        with self._lock:
+            return {
+                "elapsed": time.monotonic() - self._started,
+                "clients": {c: dict(e) for c, e in self._requests.items()},
+                "statuses": {
+                    e: {str(code): n for code, n in s.items()}
+                    for e, s in self._statuses.items()
+                },
+                "bytes": dict(self._bytes),
+                "durations": {e: list(d) for e, d in self._durations.items()},
+            }
+
+    # -- request handling --------------------------------------------------
+
+    def _fault_for(self, endpoint: str) -> Fault:
+        """Return the endpoint's fault, falling back to ALL."""
+        with self._lock:
+            return self.faults.get(endpoint) or self.faults[ALL]
+
+    def _handler_class(self) -> type[BaseHTTPRequestHandler]:
+        """Build a request handler bound to this server instance."""
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True  # Headers and body are separate writes
+
+            def log_message(self, *_args: object) -> None:
+                return None
+
+            def do_GET(self) -> None:  # noqa: N802 - http.server naming
+                url = urlsplit(self.path)
+                if url.path == "/_stats":
+                    self._send(200, json.dumps(fake.stats()).encode())
+                    return
+                fake._serve(self, url.path, parse_qs(url.query))
+
+            def do_POST(self) -> None:  # noqa: N802 - http.server naming
+                length = int(self.headers.get("Content-Length") or 0)
+                body = self.rfile.read(length) if length else b"{}"
+                path = urlsplit(self.path).path
+                try:
+                    if path == "/_faults":
+                        for endpoint, values in json.loads(body).items():
+                            fake.set_fault(endpoint, **values)
+                    elif path == "/_reset":
+                        fake.clear_faults()
+                        fake.reset_stats()
+                    else:
+                        self._send(404, b"{}")
+                        return
+                except (ValueError, TypeError) as err:
+                    self._send(400, json.dumps({"error": str(err)}).encode())
+                    return
+                self._send(200, b"{}")
+
+            def _send(self, status: int, body: bytes) -> None:
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        return Handler
+
+    def _serve(
+        self,
+        handler: BaseHTTPRequestHandler,
+        path: str,
+        query: dict[str, list[str]],
+    ) -> None:
+        """Answer one API request, applying any injected fault."""
+        start = time.monotonic()
+        client = (query.get("call") or [handler.client_address[0]])[0]
+        body = self.fixtures.get(path)
+        fault = self._fault_for(path)
+
+        delay = fault.latency + (self._rng.uniform(0, fault.jitter) if fault.jitter else 0)
+        if delay:
+            time.sleep(delay)
+
+        if body is None:
+            status, body = 404, b'{"error": "unknown endpoint"}'
+        elif fault.status is not None:
+            status, body = fault.status, b""
+        elif fault.error_rate and self._rng.random() < fault.error_rate:
+            status, body = fault.error_status, b""
+        else:
+            status = 200
+        etag = f'"{hashlib.sha1(body).hexdigest()}"' if status == 200 else None
+        if etag and handler.headers.get("If-None-Match") == etag:
+            status, body = 304, b""
+
+        sent = 0
+        try:
+            handler.send_response(status)
+            handler.send_header("Content-Type", "application/json")
+            handler.send_header("Content-Length", str(len(body)))
+            if etag:
+                handler.send_header("ETag", etag)
+            handler.end_headers()
+            if fault.drip_bytes and body:
+                for offset in range(0, len(body), fault.drip_bytes):
+                    handler.wfile.write(body[offset:offset + fault.drip_bytes])
+                    handler.wfile.flush()
+                    sent = min(len(body), offset + fault.drip_bytes)
+                    time.sleep(fault.drip_delay)
+            else:
+                handler.wfile.write(body)
+                sent = len(body)
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # Client gave up (e.g. timed out during a drip)
+        finally:
+            self.record(client, path, status, sent, time.monotonic() - start)
+
+
+def main() -> None:
+    """Run the stand-in from the command line."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--fixtures", type=Path, default=FIXTURES_DIR)
+    parser.add_argument("--seed", type=int)
+    for field in fields(Fault):
+        kind = float if field.name not in ("status", "error_status", "drip_bytes") else int
+        parser.add_argument(f"--{field.name.replace('_', '-')}", type=kind)
+    args = parser.parse_args()
+
+    fake = FakeClubLog(
+        load_fixtures(args.fixtures), host=args.host, port=args.port, seed=args.seed
+    )
+    overrides = {
+        f.name: getattr(args, f.name)
+        for f in fields(Fault)
+        if getattr(args, f.name) is not None
+    }
+    fault = fake.set_fault(ALL, **overrides)
+    print(f"Fake ClubLog on {fake.base_url} ({asdict(fault)})")
+    try:
+        fake._server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        fake._server.server_close()
+
+
+if __name__ == "__main__":
+    main()
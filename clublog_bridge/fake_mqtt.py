@@ -0,0 +1,268 @@
+"""Minimal in-process MQTT 3.1.1 broker stand-in for soak and integration tests.
+
+Speaks just enough MQTT for paho-mqtt: CONNECT, PUBLISH (QoS 0/1/2),
+SUBSCRIBE/UNSUBSCRIBE with + and # wildcards, retained messages, PINGREQ
+and DISCONNECT. Messages are routed to matching subscribers; retained
+payloads are kept per topic and delivered on subscribe. Only counts and
+the retained store are kept, so memory stays flat however long it runs.
+
+Not a real broker: no persistence, no authentication (credentials are
+accepted and ignored), no will messages, no QoS upgrades on delivery.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import socket
+import socketserver
+import struct
+import threading
+import time
+from collections import defaultdict
+
+CONNECT = 0x10
+CONNACK = 0x20
+PUBLISH = 0x30
+PUBACK = 0x40
+PUBREC = 0x50
+PUBREL = 0x60
+PUBCOMP = 0x70
+SUBSCRIBE = 0x80
+SUBACK = 0x90
+UNSUBSCRIBE = 0xA0
+UNSUBACK = 0xB0
+PINGREQ = 0xC0
+PINGRESP = 0xD0
+DISCONNECT = 0xE0
+
+
+def topic_matches(pattern: str, topic: str) -> bool:
+    """Return True if topic matches a subscription filter with + and #."""
+    parts = pattern.split("/")
+    levels = topic.split("/")
+    for i, part in enumerate(parts):
+        if part == "#":
+            return True
+        if i >= len(levels) or (part != "+" and part != levels[i]):
+            return False
+    return len(parts) == len(levels)
+
+
+def _encode_length(length: int) -> bytes:
+    """Encode an MQTT variable-length remaining length."""
+    out = bytearray()
+    while True:
+        byte, length = length % 128, length // 128
+        out.append(byte | (0x80 if length else 0))
+        if not length:
+            return bytes(out)
+
+
+def _string(value: str) -> bytes:
+    """Encode a length-prefixed UTF-8 string."""
+    data = value.encode()
+    return struct.pack("!H", len(data)) + data
+
+
+def publish_packet(topic: str, payload: bytes, *, retain: bool = False) -> bytes:
+    """Build a QoS 0 PUBLISH packet."""
+    body = _string(topic) + payload
+    return bytes([PUBLISH | int(retain)]) + _encode_length(len(body)) + body
+
+
+class _Session(socketserver.BaseRequestHandler):
+    """One connected client."""
+
+    server: _Server
+
+    def setup(self) -> None:
+        self.request.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.subscriptions: set[str] = set()
+        self.client_id = ""
+        self._send_lock = threading.Lock()
+
+    def send(self, data: bytes) -> None:
+        """Write a packet; a vanished client is dropped silently."""
+        with self._send_lock, contextlib.suppress(OSError):
+            self.request.sendall(data)
+
+    def _read(self, count: int) -> bytes:
+        data = b""
+        while len(data) < count:
+            chunk = self.request.recv(count - len(data))
+            if not chunk:
+                raise ConnectionError
+            data += chunk
+        return data
+
+    def _packet(self) -> tuple[int, bytes]:
+        header = self._read(1)[0]
+        length, shift = 0, 0
+        while True:
+            byte = self._read(1)[0]
+            length |= (byte & 0x7F) << shift
+            shift += 7
+            if not byte & 0x80:
+                break
+        return header, self._read(length) if length else b""
+
+    def handle(self) -> None:
+        try:
+            while True:
+                header, body = self._packet()
+                kind = header & 0xF0
+                if kind == CONNECT:
+                    self._on_connect(body)
+                elif kind == PUBLISH:
+                    self._on_publish(header, body)
+                elif kind == PUBREL:
+                    self.send(bytes([PUBCOMP, 2]) + body[:2])
+                elif kind == SUBSCRIBE:
+                    self._on_subscribe(body)
+                elif kind == UNSUBSCRIBE:
+                    self._on_unsubscribe(body)
+                elif kind == PINGREQ:
+                    self.send(bytes([PINGRESP, 0]))
+                elif kind == DISCONNECT:
+                    return
+        except (ConnectionError, OSError, IndexError, struct.error):
+            return
+        finally:
+            self.server.broker._sessions.discard(self)
+
+    def _on_connect(self, body: bytes) -> None:
+        (name_len,) = struct.unpack_from("!H", body, 0)
+        pos = 2 + name_len + 4  # protocol name, level, flags, keepalive
+        (id_len,) = struct.unpack_from("!H", body, pos)
+        self.client_id = body[pos + 2:pos + 2 + id_len].decode()
+        self.server.broker._sessions.add(self)
+        self.server.broker.connections += 1
+        self.send(bytes([CONNACK, 2, 0, 0]))
+
+    def _on_publish(self, header: int, body: bytes) -> None:
+        broker = self.server.broker
+        qos = (header >> 1) & 3
+        (topic_len,) = struct.unpack_from("!H", body, 0)
+        topic = body[2:2 + topic_len].decode()
+        pos = 2 + topic_len
+        packet_id = body[pos:pos + 2] if qos else b""
+        payload = body[pos + len(packet_id):]
+        if broker.ack_delay and qos:
+            time.sleep(broker.ack_delay)
+        if qos == 1:
+            self.send(bytes([PUBACK, 2]) + packet_id)
+        elif qos == 2:
+            self.send(bytes([PUBREC, 2]) + packet_id)
+        broker._route(topic, payload, retain=bool(header & 1))
+
+    def _on_subscribe(self, body: bytes) -> None:
+        broker = self.server.broker
+        packet_id, pos, granted, filters = body[:2], 2, bytearray(), []
+        while pos < len(body):
+            (length,) = struct.unpack_from("!H", body, pos)
+            filters.append(body[pos + 2:pos + 2 + length].decode())
+            pos += 2 + length + 1
+            granted.append(0)
+        self.subscriptions.update(filters)
+        self.send(bytes([SUBACK]) + _encode_length(2 + len(granted)) + packet_id + granted)
+        for topic, payload in broker.retained_items():
+            if any(topic_matches(f, topic) for f in filters):
+                self.send(publish_packet(topic, payload, retain=True))
+
+    def _on_unsubscribe(self, body: bytes) -> None:
+        pos = 2
+        while pos < len(body):
+            (length,) = struct.unpack_from("!H", body, pos)
+            self.subscriptions.discard(body[pos + 2:pos + 2 + length].decode())
+            pos += 2 + length
+        self.send(bytes([UNSUBACK, 2]) + body[:2])
+
+
+class _Server(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+    broker: FakeMqttBroker
+
+
+class FakeMqttBroker:
+    """A threaded MQTT broker stand-in with publish accounting."""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0) -> None:
+        """Initialize; call start() (or use as a context manager) to serve."""
+        self.ack_delay = 0.0  # Seconds before acknowledging QoS 1/2 publishes
+        self.connections = 0
+        self.retained: dict[str, bytes] = {}
+        self.publishes: dict[str, int] = defaultdict(int)
+        self.bytes = 0
+        self._sessions: set[_Session] = set()
+        self._lock = threading.Lock()
+        self._server = _Server((host, port), _Session)
+        self._server.broker = self
+
+    @property
+    def address(self) -> tuple[str, int]:
+        """Return (host, port) for the bridge's HA_MQTT_BROKER/HA_MQTT_PORT."""
+        host, port = self._server.server_address[:2]
+        return host, port
+
+    def start(self) -> tuple[str, int]:
+        """Serve from a daemon thread and return (host, port)."""
+        threading.Thread(
+            target=self._server.serve_forever, name="fake-mqtt", daemon=True
+        ).start()
+        return self.address
+
+    def stop(self) -> None:
+        """Disconnect every client and stop serving."""
+        self.disconnect_all()
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> FakeMqttBroker:
+        """Start serving."""
+        self.start()
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        """Stop serving."""
+        self.stop()
+
+    def disconnect_all(self) -> None:
+        """Drop every client connection (simulates a broker restart)."""
+        for session in list(self._sessions):
+            with contextlib.suppress(OSError):
+                session.request.shutdown(socket.SHUT_RDWR)
+
+    def publish(self, topic: str, payload: bytes | str, *, retain: bool = False) -> None:
+        """Publish as another client would (e.g. Home Assistant's birth message)."""
+        if isinstance(payload, str):
+            payload = payload.encode()
+        self._route(topic, payload, retain=retain)
+
+    def retained_items(self) -> list[tuple[str, bytes]]:
+        """Return a snapshot of the retained store."""
+        with self._lock:
+            return list(self.retained.items())
+
+    def published(self, topic: str | None = None) -> int:
+        """Count publishes received, optionally for one topic filter."""
+        with self._lock:
+            return sum(
+                count for name, count in self.publishes.items()
+                if topic is None or topic_matches(topic, name)
+            )
+
+    def _route(self, topic: str, payload: bytes, *, retain: bool) -> None:
+        """Account, retain and forward a publish to matching subscribers."""
+        with self._lock:
+            self.publishes[topic] += 1
+            self.bytes += len(payload)
+            if retain:
+                if payload:
+                    self.retained[topic] = payload
+                else:
+                    self.retained.pop(topic, None)
+        packet = publish_packet(topic, payload)
+        for session in list(self._sessions):
+            if any(topic_matches(f, topic) for f in session.subscriptions):
+                session.send(packet)
@@ -0,0 +1,149 @@
+"""Per-endpoint fetch timing history with percentile summaries.
+
+Each fetch is split into phases — time to response headers, bytes
+received, decode time and processing time (stats, grids) — and recorded
+as a FetchSample in a bounded ring buffer per endpoint. Summaries report
+p50/p95 over whatever the buffer currently holds.
+
+This module is shared verbatim between the Docker bridge (clublog_bridge/)
+and the HACS integration (custom_components/clublog/) — keep both copies
+identical.
+"""
+
+from __future__ import annotations
+
+import time
+from collections import deque
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from typing import Any
+
+# Samples kept per endpoint
+HISTORY_SIZE = 50
+
+
+@dataclass(slots=True)
+class FetchSample:
+    """Timing of one fetch. Durations are in seconds."""
+
+    started: float  # Unix time the fetch began
+    wall: float  # Whole fetch, request through processing
+    request: float  # Until response headers arrived
+    size: int  # Response body bytes
+    decode: float  # Time spent decoding the body
+    processing: float  # Time spent deriving data from the decoded body
+    ok: bool
+
+
+def percentile(values: list[float], pct: float) -> float | None:
+    """Return the pct percentile (0-100) by linear interpolation."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * pct / 100
+    low = int(rank)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+class FetchTimer:
+    """Accumulates the phases of one fetch as it runs."""
+
+    __slots__ = ("_clock", "_start", "started", "request", "size", "decode", "processing")
+
+    def __init__(
+        self,
+        clock: Callable[[], float] = time.perf_counter,
+        wall: Callable[[], float] = time.time,
+    ) -> None:
+        """Start timing now; clock times the phases, wall stamps the start."""
+        self._clock = clock
+        self._start = clock()
+        self.started = wall()
+        self.request = 0.0
+        self.size = 0
+        self.decode = 0.0
+        self.processing = 0.0
+
+    def response(self) -> None:
+        """Mark the arrival of response headers."""
+        self.request = self._clock() - self._start
+
+    def received(self, size: int) -> None:
+        """Count body bytes received."""
+        self.size += size
+
+    @contextmanager
+    def decoding(self) -> Iterator[None]:
+        """Add the time spent inside the with-block to decode time."""
+        start = self._clock()
+        try:
+            yield
+        finally:
+            self.decode += self._clock() - start
+
+    @contextmanager
+    def processing_step(self) -> Iterator[None]:
+        """Add the time spent inside the with-block to processing time."""
+        start = self._clock()
+        try:
+            yield
+        finally:
+            self.processing += self._clock() - start
+
+    def sample(self, ok: bool) -> FetchSample:
+        """Finish timing and return the sample."""
+        return FetchSample(
+            started=self.started,
+            wall=self._clock() - self._start,
+            request=self.request,
+            size=self.size,
+            decode=self.decode,
+            processing=self.processing,
+            ok=ok,
+        )
+
+
+class FetchHistory:
+    """Ring buffers of FetchSamples, one per endpoint."""
+
+    __slots__ = ("_samples", "size")
+
+    def __init__(self, size: int = HISTORY_SIZE) -> None:
+        """Initialize empty buffers holding up to size samples each."""
+        self.size = size
+        self._samples: dict[str, deque[FetchSample]] = {}
+
+    def record(self, endpoint: str, sample: FetchSample) -> None:
+        """Append a sample, evicting the oldest once the buffer is full."""
+        buffer = self._samples.get(endpoint)
+        if buffer is None:
+            buffer = self._samples[endpoint] = deque(maxlen=self.size)
+        buffer.append(sample)
+
+    def samples(self, endpoint: str) -> list[FetchSample]:
+        """Return the buffered samples for an endpoint, oldest first."""
+        return list(self._samples.get(endpoint, ()))
+
+    def summary(self, endpoint: str) -> dict[str, Any] | None:
+        """Return p50/p95 of each phase over successful samples."""
+        samples = [s for s in self._samples.get(endpoint, ()) if s.ok]
+        if not samples:
+            return None
+        result: dict[str, Any] = {"samples": len(samples)}
+        for phase in ("wall", "request", "decode", "processing"):
+            values = [getattr(s, phase) for s in samples]
+            result[f"{phase}_p50_ms"] = round(percentile(values, 50) * 1000, 1)
+            result[f"{phase}_p95_ms"] = round(percentile(values, 95) * 1000, 1)
+        sizes = [s.size for s in samples]
+        result["size_p50_bytes"] = round(percentile(sizes, 50))
+        result["size_p95_bytes"] = round(percentile(sizes, 95))
+        return result
+
+    def as_dict(self) -> dict[str, list[dict[str, Any]]]:
+        """Return the raw history per endpoint (for diagnostics downloads)."""
+        return {
+            endpoint: [asdict(sample) for sample in buffer]
+            for endpoint, buffer in self._samples.items()
+        }
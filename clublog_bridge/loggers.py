@@ -0,0 +1,121 @@
+"""Logged-QSO broadcasts from WSJT-X and N1MM Logger+, and the overlay hook.
+
+Both loggers announce every QSO they log over UDP on the LAN:
+
+- WSJT-X (and JTDX, MSHV) send QDataStream-encoded datagrams starting
+  with a magic number. Message type 12, LoggedADIF, carries the QSO as an
+  ADIF record; it accompanies the older QSOLogged (type 5) for the same
+  QSO, so only LoggedADIF is decoded.
+- N1MM Logger+ sends one small XML document per event; <contactinfo> is a
+  new QSO and <contactreplace> an edited one.
+
+decode_datagram() turns either into ADIF-style records (upper-case field
+names) and overlay_record() applies one to a ProvisionalMatrix, so the
+ADIF log tailer and the UDP listeners share a single path.
+
+This module is shared verbatim between the Docker bridge (clublog_bridge/)
+and the HACS integration (custom_components/clublog/) — keep both copies
+identical.
+"""
+
+from __future__ import annotations
+
+import struct
+import xml.etree.ElementTree as ET
+
+from .adif import AdifParser, frequency, qso_time
+from .dxcc import CtyDatabase, ProvisionalCell, ProvisionalMatrix, band_for
+
+WSJTX_MAGIC = 0xADBCCBDA
+WSJTX_LOGGED_ADIF = 12
+N1MM_CONTACT_TAGS = frozenset({"contactinfo", "contactreplace"})
+
+# Outcomes of overlay_record(), also used as metric labels
+NEW_SLOT = "new_slot"
+KNOWN = "known"
+STALE = "stale"
+UNRESOLVED = "unresolved"
+
+
+def _qstring(data: bytes, pos: int) -> tuple[bytes | None, int]:
+    """Read a QDataStream QByteArray (length-prefixed; 0xffffffff = null)."""
+    (length,) = struct.unpack_from(">I", data, pos)
+    pos += 4
+    if length == 0xFFFFFFFF:
+        return None, pos
+    if pos + length > len(data):
+        raise ValueError("truncated string")
+    return data[pos:pos + length], pos + length
+
+
+def decode_wsjtx(data: bytes) -> list[dict[str, str]]:
+    """Return the QSO in a WSJT-X LoggedADIF datagram (else nothing)."""
+    try:
+        magic, _schema, kind = struct.unpack_from(">III", data, 0)
+        if magic != WSJTX_MAGIC or kind != WSJTX_LOGGED_ADIF:
+            return []
+        _client_id, pos = _qstring(data, 12)
+        adif, _ = _qstring(data, pos)
+    except (struct.error, ValueError):
+        return []
+    return AdifParser().feed(adif) if adif else []
+
+
+def decode_n1mm(data: bytes) -> list[dict[str, str]]:
+    """Return the QSO in an N1MM Logger+ contact datagram (else nothing)."""
+    try:
+        root = ET.fromstring(data)
+    except ET.ParseError:
+        return []
+    if root.tag.lower() not in N1MM_CONTACT_TAGS:
+        return []
+    fields = {child.tag.lower(): (child.text or "").strip() for child in root}
+    record = {"CALL": fields.get("call", "")}
+    # Frequencies are in tens of hertz
+    for name in ("txfreq", "rxfreq"):
+        try:
+            record["FREQ"] = str(int(fields[name]) / 100_000)
+            break
+        except (KeyError, ValueError):
+            continue
+    date, _, clock = fields.get("timestamp", "").partition(" ")
+    record["QSO_DATE"] = date.replace("-", "")
+    record["TIME_ON"] = clock.replace(":", "")
+    if fields.get("mode"):
+        record["MODE"] = fields["mode"]
+    return [record]
+
+
+def decode_datagram(data: bytes) -> tuple[str, list[dict[str, str]]]:
+    """Return (source, records) for a logger datagram of either kind."""
+    if data[:4] == struct.pack(">I", WSJTX_MAGIC):
+        return "wsjtx", decode_wsjtx(data)
+    if data.lstrip()[:1] == b"<":
+        return "n1mm", decode_n1mm(data)
+    return "unknown", []
+
+
+def overlay_record(
+    overlay: ProvisionalMatrix,
+    record: dict[str, str],
+    cty: CtyDatabase | None,
+    now: float,
+) -> tuple[str, ProvisionalCell | None]:
+    """Apply a logged QSO to the overlay; return (outcome, new cell or None).
+
+    The DXCC entity comes from the record's DXCC field, else cty.xml; QSOs
+    older than the overlay's ttl are long since on ClubLog and ignored.
+    """
+    call = record.get("CALL", "")
+    band = band_for(record.get("BAND"), frequency(record))
+    logged_at = qso_time(record) or now
+    dxcc = record.get("DXCC", "").strip()
+    if call and band and (not dxcc.isdigit() or dxcc == "0"):
+        resolved = cty.resolve(call, logged_at) if cty else None
+        dxcc = "" if resolved is None else str(resolved)
+    if not call or not band or not dxcc:
+        return UNRESOLVED, None
+    if now - logged_at > overlay.ttl:
+        return STALE, None
+    cell = overlay.add(dxcc, band, call.upper(), logged_at)
+    return (NEW_SLOT, cell) if cell else (KNOWN, None)
@@ -0,0 +1,387 @@
+"""Prometheus/OpenMetrics instrumentation for the Docker bridge.
+
+A deliberately small, dependency-free metrics registry. Recording a sample
+is a lock plus a few integer/float updates; text exposition is only built
+when something scrapes the endpoint, so an unscraped bridge pays next to
+nothing. The HTTP endpoint is opt-in (METRICS_PORT).
+
+Label values are passed positionally in the order the metric declared its
+label names: REQUEST_SECONDS.observe(0.42, "matrix").
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from bisect import bisect_left
+from collections.abc import Iterable, Iterator
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+_LOGGER = logging.getLogger(__name__)
+
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 600.0)
+SIZE_BUCKETS = (1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+LAG_BUCKETS = (0.5, 1.0, 5.0, 15.0, 30.0, 60.0, 300.0, 3600.0)
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+OPENMETRICS_CONTENT_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+
+
+def _escape(value: str) -> str:
+    """Escape a label value for the text exposition format."""
+    return value.replace("\\", r"\\").replace("\n", r"\n").replace('"', r"\"")
+
+
+def _format(value: float) -> str:
+    """Format a sample value (integers without a trailing .0)."""
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric:
+    """Base class: a named family of samples keyed by label values."""
+
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labels: tuple[str, ...] = ()):
+        """Initialize an empty metric family."""
+        self.name = name
+        self.documentation = documentation
+        self.labels = labels
+        self._values: dict[tuple[str, ...], object] = {}
+        self._lock = threading.Lock()
+
+    def _label_str(self, values: tuple[str, ...], extra: str = "") -> str:
+        """Render {name="value",...} for a sample."""
+        pairs = [f'{n}="{_escape(v)}"' for n, v in zip(self.labels, values, strict=True)]
+        if extra:
+            pairs.append(extra)
+        return "{" + ",".join(pairs) + "}" if pairs else ""
+
+    def _snapshot(self) -> list[tuple[tuple[str, ...], object]]:
+        """Copy the current samples under the lock."""
+        with self._lock:
+            return [
+                (key, list(value) if isinstance(value, list) else value)
+                for key, value in sorted(self._values.items())
+            ]
+
+    def render(self, openmetrics: bool = False) -> list[str]:
+        """Return exposition lines for this family."""
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    """A monotonically increasing count. `name` excludes the _total suffix."""
+
+    kind = "counter"
+
+    def inc(self, *labels: str, amount: float = 1) -> None:
+        """Add amount to the counter for these label values."""
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def value(self, *labels: str) -> float:
+        """Return the current count for these label values."""
+        return self._values.get(labels, 0)
+
+    def render(self, openmetrics: bool = False) -> list[str]:
+        """Return exposition lines for this family."""
+        family = self.name if openmetrics else f"{self.name}_total"
+        lines = [
+            f"# HELP {family} {self.documentation}",
+            f"# TYPE {family} counter",
+        ]
+        lines.extend(
+            f"{self.name}_total{self._label_str(key)} {_format(value)}"
+            for key, value in self._snapshot()
+        )
+        return lines
+
+
+class Gauge(_Metric):
+    """A value that can go up and down."""
+
+    kind = "gauge"
+
+    def set(self, value: float, *labels: str) -> None:
+        """Set the gauge for these label values."""
+        with self._lock:
+            self._values[labels] = value
+
+    def value(self, *labels: str) -> float | None:
+        """Return the current value for these label values."""
+        return self._values.get(labels)
+
+    def render(self, openmetrics: bool = False) -> list[str]:  # noqa: ARG002
+        """Return exposition lines for this family."""
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} gauge",
+        ]
+        lines.extend(
+            f"{self.name}{self._label_str(key)} {_format(value)}"
+            for key, value in self._snapshot()
+        )
+        return lines
+
+
+class Histogram(_Metric):
+    """Bucketed observations. Buckets are stored non-cumulative per label set.
+
+    The per-label value is a list: [bucket counts..., +Inf count, sum].
+    """
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labels: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = LATENCY_BUCKETS,
+    ):
+        """Initialize an empty histogram with upper bucket bounds."""
+        super().__init__(name, documentation, labels)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, *labels: str) -> None:
+        """Record one observation for these label values."""
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            row = self._values.get(labels)
+            if row is None:
+                row = self._values[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+            row[index] += 1
+            row[-1] += value
+
+    @contextmanager
+    def time(self, *labels: str) -> Iterator[None]:
+        """Observe the wall time spent inside the with-block."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, *labels)
+
+    def count(self, *labels: str) -> int:
+        """Return the number of observations for these label values."""
+        row = self._values.get(labels)
+        return sum(row[:-1]) if row else 0
+
+    def render(self, openmetrics: bool = False) -> list[str]:  # noqa: ARG002
+        """Return exposition lines for this family."""
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} histogram",
+        ]
+        for key, row in self._snapshot():
+            cumulative = 0
+            for bound, count in zip((*self.buckets, float("inf")), row[:-1], strict=True):
+                cumulative += count
+                le = f'le="{_format(bound)}"'
+                lines.append(
+                    f"{self.name}_bucket{self._label_str(key, le)} {cumulative}"
+                )
+            lines.append(f"{self.name}_count{self._label_str(key)} {cumulative}")
+            lines.append(f"{self.name}_sum{self._label_str(key)} {_format(row[-1])}")
+        return lines
+
+
+class Registry:
+    """A set of metric families rendered together on scrape."""
+
+    def __init__(self) -> None:
+        """Initialize an empty registry."""
+        self._metrics: list[_Metric] = []
+
+    def register(self, metric: _Metric) -> _Metric:
+        """Add a metric family and return it."""
+        self._metrics.append(metric)
+        return metric
+
+    def counter(self, name: str, documentation: str, labels: tuple[str, ...] = ()) -> Counter:
+        """Create and register a Counter."""
+        return self.register(Counter(name, documentation, labels))
+
+    def gauge(self, name: str, documentation: str, labels: tuple[str, ...] = ()) -> Gauge:
+        """Create and register a Gauge."""
+        return self.register(Gauge(name, documentation, labels))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labels: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = LATENCY_BUCKETS,
+    ) -> Histogram:
+        """Create and register a Histogram."""
+        return self.register(Histogram(name, documentation, labels, buckets))
+
+    def render(self, openmetrics: bool = False) -> str:
+        """Render every family in the text exposition format."""
+        lines: list[str] = []
+        for metric in self._metrics:
+            lines.extend(metric.render(openmetrics))
+        if openmetrics:
+            lines.append("# EOF")
+        return "\n".join(lines) + "\n"
+
+
+def counted(chunks: Iterable[bytes], histogram: Histogram, *labels: str) -> Iterator[bytes]:
+    """Pass chunks through, observing the total byte count when exhausted."""
+    total = 0
+    for chunk in chunks:
+        total += len(chunk)
+        yield chunk
+    histogram.observe(total, *labels)
+
+
+def serve(registry: Registry, host: str, port: int) -> ThreadingHTTPServer:
+    """Serve GET /metrics from a daemon thread and return the server."""
+
+    class _Handler(BaseHTTPRequestHandler):
+        def do_GET(self) -> None:  # noqa: N802 - http.server naming
+            if self.path.split("?", 1)[0] not in ("/metrics", "/"):
+                self.send_error(404)
+                return
+            openmetrics = "application/openmetrics-text" in self.headers.get("Accept", "")
+            body = registry.render(openmetrics).encode()
+            self.send_response(200)
+            self.send_header(
+                "Content-Type",
+                OPENMETRICS_CONTENT_TYPE if openmetrics else PROMETHEUS_CONTENT_TYPE,
+            )
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format: str, *args: object) -> None:  # noqa: A002
+            _LOGGER.debug("metrics: " + format, *args)
+
+    server = ThreadingHTTPServer((host, port), _Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="metrics", daemon=True).start()
+    return server
+
+
+# ---------------------------------------------------------------------------
+# Bridge metrics
+# ---------------------------------------------------------------------------
+
+REGISTRY = Registry()
+
+REQUEST_SECONDS = REGISTRY.histogram(
+    "clublog_request_duration_seconds",
+    "ClubLog request latency (to response headers for streamed endpoints).",
+    ("endpoint",),
+)
+RESPONSES = REGISTRY.counter(
+    "clublog_responses",
+    "ClubLog responses by HTTP status code ('error' for transport failures).",
+    ("endpoint", "code"),
+)
+RESPONSE_BYTES = REGISTRY.histogram(
+    "clublog_response_size_bytes",
+    "ClubLog response body size.",
+    ("endpoint",),
+    SIZE_BUCKETS,
+)
+DECODE_SECONDS = REGISTRY.histogram(
+    "clublog_decode_duration_seconds",
+    "Response decode time (includes body transfer for streamed endpoints).",
+    ("endpoint",),
+)
+PROCESS_SECONDS = REGISTRY.histogram(
+    "clublog_processing_duration_seconds",
+    "Time spent computing and publishing sensors from a decoded response.",
+    ("endpoint",),
+)
+FETCH_FAILURES = REGISTRY.counter(
+    "clublog_fetch_failures",
+    "Endpoint updates that raised an error.",
+    ("endpoint",),
+)
+LAST_SUCCESS = REGISTRY.gauge(
+    "clublog_last_success_timestamp_seconds",
+    "Unix time of the last successful update per endpoint.",
+    ("endpoint",),
+)
+SCHEDULER_LAG_SECONDS = REGISTRY.histogram(
+    "clublog_scheduler_lag_seconds",
+    "Actual minus planned fetch start time.",
+    ("endpoint",),
+    LAG_BUCKETS,
+)
+BREAKER_OPEN = REGISTRY.gauge(
+    "clublog_circuit_breaker_open",
+    "1 while the HTTP 403 circuit breaker is pausing all requests.",
+)
+BREAKER_REMAINING = REGISTRY.gauge(
+    "clublog_circuit_breaker_remaining_seconds",
+    "Seconds until the 403 circuit breaker closes.",
+)
+BREAKER_TRIPS = REGISTRY.counter(
+    "clublog_circuit_breaker_trips",
+    "Times the 403 circuit breaker has opened.",
+)
+MQTT_PUBLISHES = REGISTRY.counter(
+    "clublog_mqtt_publishes",
+    "MQTT messages published, by topic kind.",
+    ("kind",),
+)
+MQTT_SUPPRESSED = REGISTRY.counter(
+    "clublog_mqtt_publishes_suppressed",
+    "Retained MQTT publishes skipped because the payload was unchanged.",
+    ("kind",),
+)
+MQTT_REPLAYS = REGISTRY.counter(
+    "clublog_mqtt_replays",
+    "Times the cached MQTT payloads were republished, by trigger.",
+    ("reason",),
+)
+MQTT_OUTBOX_DEPTH = REGISTRY.gauge(
+    "clublog_mqtt_outbox_depth",
+    "Topics waiting in the MQTT outbox.",
+)
+MQTT_OUTBOX_INFLIGHT = REGISTRY.gauge(
+    "clublog_mqtt_outbox_inflight",
+    "MQTT messages handed to the client and not yet written or acknowledged.",
+)
+MQTT_OUTBOX_COALESCED = REGISTRY.counter(
+    "clublog_mqtt_outbox_coalesced",
+    "Pending MQTT messages replaced by a newer payload for the same topic.",
+)
+MQTT_OUTBOX_DROPPED = REGISTRY.counter(
+    "clublog_mqtt_outbox_dropped",
+    "Pending MQTT messages dropped because the outbox was full.",
+)
+LOCAL_QSOS = REGISTRY.counter(
+    "clublog_local_qsos",
+    "QSOs read from a local logger, by source and outcome.",
+    ("source", "result"),
+)
+PROVISIONAL_CELLS = REGISTRY.gauge(
+    "clublog_provisional_cells",
+    "Locally logged DXCC matrix cells not yet shown by ClubLog.",
+)
+QUERY_REQUESTS = REGISTRY.counter(
+    "clublog_query_requests",
+    "Local query API requests, by response status.",
+    ("code",),
+)
+SPOTS = REGISTRY.counter(
+    "clublog_spots",
+    "Spots received on the spot topic, by outcome.",
+    ("result",),
+)
+REFRESHES = REGISTRY.counter(
+    "clublog_refreshes",
+    "On-demand endpoint refreshes requested on the command topic, by outcome.",
+    ("result",),
+)
@@ -0,0 +1,264 @@
+"""Bounded, coalescing MQTT outbox for the Docker bridge.
+
+The polling loop hands retained publishes to an MqttOutbox instead of
+calling paho's publish() directly. Pending messages are kept per topic:
+a newer payload for a topic already waiting replaces it in place
+(coalesced), because only the latest retained value matters. Publishes
+that must reach the broker in sequence (a discovery migration) are put
+with coalesce=False: each waits as an entry of its own, in order, and a
+later payload for the same topic queues behind it. The number of waiting
+messages is bounded; past the bound the oldest is dropped and
+reported to `on_drop`, so a caller that skips unchanged payloads knows the
+broker never got that one.
+
+A drain thread sends while the client is connected, keeping at most
+`max_inflight` messages between publish() and paho's on_publish — for
+QoS 0 that is until the packet is written, for QoS 1/2 until the broker
+acknowledges it. Sends are paced by a token bucket, so an ordinary fetch
+goes out at once but a backlog built up while the broker was down drains
+at `rate` messages a second after the reconnect instead of flooding it.
+Nothing is handed to paho while disconnected, so paho's own queue stays
+empty and the outbox bound is the whole memory bound.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from collections import Counter, OrderedDict
+from collections.abc import Callable
+
+import paho.mqtt.client as mqtt
+
+from . import metrics
+
+_LOGGER = logging.getLogger(__name__)
+
+DEFAULT_MAXSIZE = 1000
+DEFAULT_MAX_INFLIGHT = 20
+DEFAULT_RATE = 50.0  # Messages per second once the burst allowance is spent
+
+_Key = str | tuple[str, int]
+
+
+class MqttOutbox:
+    """Queue publishes per topic and drain them to a paho client."""
+
+    def __init__(
+        self,
+        client: mqtt.Client,
+        *,
+        maxsize: int = DEFAULT_MAXSIZE,
+        max_inflight: int = DEFAULT_MAX_INFLIGHT,
+        rate: float = DEFAULT_RATE,
+        qos: int = 0,
+        monotonic: Callable[[], float] = time.monotonic,
+        on_drop: Callable[[str], None] | None = None,
+    ) -> None:
+        """Initialize; call start() to begin draining.
+
+        The client's on_publish and on_disconnect callbacks are taken over;
+        on_connect stays with the caller, who must call connected().
+        """
+        self.client = client
+        self.maxsize = maxsize
+        self.max_inflight = max_inflight
+        self.rate = rate
+        self.qos = qos
+        self._monotonic = monotonic
+        self._on_drop = on_drop
+        # Keyed by topic, or (topic, sequence) for uncoalesced entries
+        self._pending: OrderedDict[_Key, tuple[str, str, bool]] = OrderedDict()
+        self._ordered: Counter[str] = Counter()  # Uncoalesced entries per topic
+        self._sequence = 0
+        self._inflight: set[int] = set()
+        # Acknowledged before publish() returned its mid to us
+        self._early: set[int] = set()
+        self._cond = threading.Condition()
+        self._connected = False
+        self._running = False
+        self._sending = False  # A message is between _next() and _sent()
+        self._thread: threading.Thread | None = None
+        self._tokens = float(max_inflight)
+        self._refilled = monotonic()
+        self.sent = 0
+        self.coalesced = 0
+        self.dropped = 0
+        client.on_publish = self._on_publish
+        client.on_disconnect = self._on_disconnect
+
+    @property
+    def depth(self) -> int:
+        """Return the number of messages waiting to be sent."""
+        return len(self._pending)
+
+    @property
+    def inflight(self) -> int:
+        """Return the number of messages handed to paho but not yet done."""
+        return len(self._inflight)
+
+    def put(
+        self, topic: str, payload: str, *, retain: bool = True, coalesce: bool = True
+    ) -> None:
+        """Queue a publish, replacing any payload still waiting for the topic.
+
+        With coalesce=False the publish is kept as its own entry, sent after
+        everything queued before it and never replaced.
+        """
+        key: _Key = topic
+        dropped = None
+        with self._cond:
+            if not coalesce:
+                self._sequence += 1
+                key = (topic, self._sequence)
+            if key in self._pending:
+                self.coalesced += 1
+                metrics.MQTT_OUTBOX_COALESCED.inc()
+                if self._ordered[topic]:  # Stay behind the ordered entries
+                    self._pending.move_to_end(key)
+            elif len(self._pending) >= self.maxsize:
+                dropped = self._pop()[0]
+                self.dropped += 1
+                metrics.MQTT_OUTBOX_DROPPED.inc()
+                _LOGGER.warning("MQTT outbox full — dropped pending %s", dropped)
+            if not coalesce:
+                self._ordered[topic] += 1
+            self._pending[key] = (topic, payload, retain)
+            metrics.MQTT_OUTBOX_DEPTH.set(len(self._pending))
+            self._cond.notify()
+        if dropped is not None and self._on_drop:
+            self._on_drop(dropped)
+
+    def connected(self) -> None:
+        """Start sending (call from the client's on_connect)."""
+        with self._cond:
+            self._connected = True
+            self._inflight.clear()
+            self._early.clear()
+            self._cond.notify()
+
+    def start(self) -> None:
+        """Start the drain thread."""
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name="mqtt-outbox", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """Send what is pending (up to timeout seconds) and stop draining."""
+        self.flush(timeout)
+        with self._cond:
+            self._running = False
+            self._cond.notify()
+        if self._thread:
+            self._thread.join(timeout)
+
+    def flush(self, timeout: float) -> bool:
+        """Wait until nothing is pending or in flight; False on timeout."""
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            while self._pending or self._inflight or self._sending:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or not self._connected:
+                    return False
+                self._cond.wait(remaining)
+        return True
+
+    def _on_publish(self, _client, _userdata, mid, _reason_code, _properties) -> None:
+        with self._cond:
+            if mid in self._inflight:
+                self._inflight.discard(mid)
+            else:
+                self._early.add(mid)
+            metrics.MQTT_OUTBOX_INFLIGHT.set(len(self._inflight))
+            self._cond.notify_all()
+
+    def _on_disconnect(self, _client, _userdata, _flags, _reason_code, _properties) -> None:
+        with self._cond:
+            self._connected = False
+            # paho resends its own unacknowledged messages after reconnecting
+            self._inflight.clear()
+            metrics.MQTT_OUTBOX_INFLIGHT.set(0)
+            self._cond.notify_all()
+
+    def _take_token(self) -> float:
+        """Spend a send token; return seconds to wait if none is available."""
+        now = self._monotonic()
+        burst = float(self.max_inflight)
+        self._tokens = min(burst, self._tokens + (now - self._refilled) * self.rate)
+        self._refilled = now
+        if self._tokens >= 1:
+            self._tokens -= 1
+            return 0.0
+        return (1 - self._tokens) / self.rate
+
+    def _run(self) -> None:
+        """Drain pending messages while connected, within the limits."""
+        while True:
+            with self._cond:
+                message = self._next()
+            if message is None:
+                return
+            topic, payload, retain, key = message
+            # Outside the lock: paho may call on_publish from its network
+            # thread while holding its own locks, which publish() also takes
+            info = self.client.publish(topic, payload, qos=self.qos, retain=retain)
+            with self._cond:
+                self._sent(key, topic, payload, retain, info)
+
+    def _next(self) -> tuple[str, str, bool, _Key] | None:
+        """Wait until a message may be sent and take it (lock held)."""
+        while self._running:
+            if (
+                not self._connected
+                or not self._pending
+                or len(self._inflight) >= self.max_inflight
+            ):
+                self._cond.wait()
+                continue
+            wait = self._take_token()
+            if wait:
+                self._cond.wait(wait)
+                continue
+            message = self._pop()
+            metrics.MQTT_OUTBOX_DEPTH.set(len(self._pending))
+            self._sending = True
+            return message
+        return None
+
+    def _pop(self) -> tuple[str, str, bool, _Key]:
+        """Take the oldest pending message (lock held)."""
+        key, (topic, payload, retain) = self._pending.popitem(last=False)
+        if key != topic:
+            self._ordered[topic] -= 1
+            if not self._ordered[topic]:
+                del self._ordered[topic]
+        return topic, payload, retain, key
+
+    def _sent(
+        self,
+        key: _Key,
+        topic: str,
+        payload: str,
+        retain: bool,
+        info: mqtt.MQTTMessageInfo,
+    ) -> None:
+        """Track a message handed to paho (lock held)."""
+        self._sending = False
+        if info.rc != mqtt.MQTT_ERR_SUCCESS:
+            # Lost the connection between checks — keep it unless superseded
+            if key not in self._pending:
+                self._pending[key] = (topic, payload, retain)
+                self._pending.move_to_end(key, last=False)
+                if key != topic:
+                    self._ordered[topic] += 1
+            self._connected = False
+            metrics.MQTT_OUTBOX_DEPTH.set(len(self._pending))
+            return
+        self.sent += 1
+        if info.mid in self._early:
+            self._early.discard(info.mid)
+        else:
+            self._inflight.add(info.mid)
+        metrics.MQTT_OUTBOX_INFLIGHT.set(len(self._inflight))
+        self._cond.notify_all()
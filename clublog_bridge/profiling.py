@@ -0,0 +1,182 @@
+"""Opt-in cProfile/tracemalloc profiling of polling cycles.
+
+CycleProfiler wraps each endpoint fetch of the next N polling cycles (a
+cycle counts only if it fetched something) in its own cProfile.Profile
+and/or a tracemalloc before/after snapshot pair. At the end of each cycle
+it writes one .pstats file and one allocation snapshot per endpoint to
+the output directory, keeps only the newest files, and logs the top-N
+hottest functions and largest allocation sites per endpoint.
+
+Call sites hold None instead of a profiler when profiling is off, so a
+disabled profiler costs nothing beyond a None check.
+
+Under asyncio the profile of an endpoint also includes whatever else the
+event loop ran while that fetch was awaiting the network.
+
+This module is shared verbatim between the Docker bridge (clublog_bridge/)
+and the HACS integration (custom_components/clublog/) — keep both copies
+identical.
+"""
+
+from __future__ import annotations
+
+import cProfile
+import io
+import logging
+import os
+import pstats
+import time
+import tracemalloc
+from collections.abc import Iterator
+from contextlib import AbstractContextManager, contextmanager, nullcontext
+
+_LOGGER = logging.getLogger(__name__)
+
+MODE_CPU = "cpu"
+MODE_MEMORY = "memory"
+MODE_BOTH = "both"
+MODES = (MODE_CPU, MODE_MEMORY, MODE_BOTH)
+
+# Files of each kind kept in the output directory
+DEFAULT_KEEP = 20
+
+# Functions / allocation sites listed per endpoint in the log summary
+DEFAULT_TOP = 15
+
+# Stack depth recorded by tracemalloc
+TRACE_FRAMES = 5
+
+PSTATS_SUFFIX = ".pstats"
+SNAPSHOT_SUFFIX = ".tracemalloc"
+
+
+class CycleProfiler:
+    """Profile every endpoint fetch for a fixed number of polling cycles."""
+
+    def __init__(
+        self,
+        directory: str,
+        cycles: int,
+        mode: str = MODE_CPU,
+        *,
+        top: int = DEFAULT_TOP,
+        keep: int = DEFAULT_KEEP,
+    ) -> None:
+        """Initialize; nothing is traced until the first endpoint runs."""
+        if mode not in MODES:
+            raise ValueError(f"profiling mode must be one of {MODES}, got {mode!r}")
+        self.directory = directory
+        self.remaining = cycles
+        self.cpu = mode in (MODE_CPU, MODE_BOTH)
+        self.memory = mode in (MODE_MEMORY, MODE_BOTH)
+        self.top = top
+        self.keep = keep
+        self.cycle = 0
+        self._stamp = ""
+        self._started_tracing = False
+        self._profiles: dict[str, cProfile.Profile] = {}
+        self._allocations: dict[str, tuple[tracemalloc.Snapshot, tracemalloc.Snapshot]] = {}
+
+    @property
+    def active(self) -> bool:
+        """Return True while cycles remain to be profiled."""
+        return self.remaining > 0
+
+    def endpoint(self, name: str) -> AbstractContextManager[None]:
+        """Return a context manager profiling one endpoint fetch."""
+        if not self.active:
+            return nullcontext()
+        return self._profile(name)
+
+    @contextmanager
+    def _profile(self, name: str) -> Iterator[None]:
+        """Profile the with-block under this endpoint's name."""
+        if self.memory and not tracemalloc.is_tracing():
+            tracemalloc.start(TRACE_FRAMES)
+            self._started_tracing = True
+        before = tracemalloc.take_snapshot() if self.memory else None
+        profile = self._profiles.setdefault(name, cProfile.Profile()) if self.cpu else None
+        if profile is not None:
+            try:
+                profile.enable()
+            except ValueError:
+                # Another profiler (e.g. HA's profiler integration) owns the hook
+                _LOGGER.warning("cProfile unavailable: another profiler is active")
+                del self._profiles[name]
+                profile = None
+        try:
+            yield
+        finally:
+            if profile is not None:
+                profile.disable()
+            if before is not None:
+                self._allocations[name] = (before, tracemalloc.take_snapshot())
+
+    def end_cycle(self) -> None:
+        """Write and summarize this cycle's profiles (no-op if nothing ran).
+
+        Does blocking file I/O — run it in an executor under asyncio.
+        """
+        if not self._profiles and not self._allocations:
+            return
+        self.cycle += 1
+        self.remaining -= 1
+        self._stamp = time.strftime("%Y%m%dT%H%M%SZ", time.gmtime())
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            for name, profile in self._profiles.items():
+                self._write_cpu(name, profile)
+            for name, (before, after) in self._allocations.items():
+                self._write_memory(name, before, after)
+            self._rotate(PSTATS_SUFFIX)
+            self._rotate(SNAPSHOT_SUFFIX)
+        except OSError:
+            _LOGGER.exception("Failed to write profiles to %s", self.directory)
+        finally:
+            self._profiles.clear()
+            self._allocations.clear()
+        if not self.active:
+            if self._started_tracing:
+                tracemalloc.stop()
+                self._started_tracing = False
+            _LOGGER.info("Profiling finished; output in %s", self.directory)
+
+    def _path(self, name: str, suffix: str) -> str:
+        """Return the output path for an endpoint in the current cycle.
+
+        Names start with a UTC timestamp so they sort oldest first across
+        restarts.
+        """
+        return os.path.join(
+            self.directory, f"{self._stamp}-cycle{self.cycle:03d}-{name}{suffix}"
+        )
+
+    def _write_cpu(self, name: str, profile: cProfile.Profile) -> None:
+        """Dump a .pstats file and log the hottest functions."""
+        profile.dump_stats(self._path(name, PSTATS_SUFFIX))
+        out = io.StringIO()
+        stats = pstats.Stats(profile, stream=out)
+        stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(self.top)
+        _LOGGER.info(
+            "Profile cycle %d, %s — top %d by cumulative time:\n%s",
+            self.cycle, name, self.top, out.getvalue().strip(),
+        )
+
+    def _write_memory(
+        self, name: str, before: tracemalloc.Snapshot, after: tracemalloc.Snapshot
+    ) -> None:
+        """Dump the post-fetch snapshot and log the largest allocators."""
+        after.dump(self._path(name, SNAPSHOT_SUFFIX))
+        diff = after.compare_to(before, "lineno")[: self.top]
+        _LOGGER.info(
+            "Profile cycle %d, %s — top %d allocation sites:\n%s",
+            self.cycle, name, self.top, "\n".join(str(stat) for stat in diff),
+        )
+
+    def _rotate(self, suffix: str) -> None:
+        """Delete all but the newest `keep` files with this suffix."""
+        files = sorted(
+            entry for entry in os.listdir(self.directory) if entry.endswith(suffix)
+        )
+        for entry in files[: max(0, len(files) - self.keep)]:
+            os.remove(os.path.join(self.directory, entry))
@@ -0,0 +1,199 @@
+"""Read-only local HTTP API over the bridge's cached ClubLog data.
+
+Loggers, dashboards and spot bridges on the LAN can ask the bridge instead
+of polling clublog.org themselves and spending the account's request
+budget. Nothing here makes an outbound request: every answer comes from
+the data the polling loop last fetched.
+
+    GET /v1/status                      dataset versions and update times
+    GET /v1/matrix                      the DXCC matrix (with provisional cells)
+    GET /v1/matrix/<dxcc>               one entity: status per band, rank
+    GET /v1/matrix/<dxcc>/<band>        one cell: status, needed, rank
+    GET /v1/most_wanted                 [{rank, dxcc}, ...]
+    GET /v1/most_wanted/<dxcc>          rank and whether it is needed
+    GET /v1/expeditions                 active expeditions
+    GET /v1/livestreams                 active livestreams
+
+Each dataset carries a version bumped by every update, and responses an
+ETag made of the versions they depend on; a request whose If-None-Match
+still matches gets 304 without a body being built. Whole-dataset bodies
+are serialized once per update. Point lookups go through a LookupIndex.
+
+The polling loop calls the update_*() methods; request threads only read
+attributes that are replaced whole, so no lock is needed.
+
+Docker mode only.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import json
+import logging
+import os
+import socketserver
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any
+
+from . import metrics
+from .lookup import LookupIndex
+from .models import Expedition, LazyMostWanted, LazyRows, Livestream
+
+_LOGGER = logging.getLogger(__name__)
+
+JSON_CONTENT_TYPE = "application/json"
+DATASETS = ("matrix", "most_wanted", "expeditions", "livestreams")
+# Path segments a dataset accepts: /matrix/<dxcc>/<band>, /most_wanted/<dxcc>
+LOOKUP_DEPTH = {"matrix": 3, "most_wanted": 2, "expeditions": 1, "livestreams": 1}
+
+
+def _json(value: Any) -> bytes:
+    return json.dumps(value, separators=(",", ":")).encode()
+
+
+class QueryApi:
+    """Versioned, indexed snapshots of the cached data, and request routing."""
+
+    def __init__(self) -> None:
+        """Initialize with nothing fetched yet."""
+        # Distinguishes ETags across restarts, when versions start over
+        self._boot = format(int(time.time()), "x")
+        self.index = LookupIndex()
+        self.versions: dict[str, int] = dict.fromkeys(DATASETS, 0)
+        self.updated: dict[str, float] = {}
+        self._bodies: dict[str, bytes] = {}
+
+    def _store(self, name: str, body: bytes) -> None:
+        """Publish a dataset's new serialized body and bump its version."""
+        self._bodies = {**self._bodies, name: body}
+        self.versions = {**self.versions, name: self.versions[name] + 1}
+        self.updated = {**self.updated, name: time.time()}
+
+    def update_matrix(self, matrix: dict[str, dict[str, int]]) -> None:
+        """Adopt a (merged) DXCC matrix."""
+        self.index = self.index.with_matrix(matrix)
+        self._store("matrix", _json(matrix))
+
+    def update_most_wanted(self, most_wanted: LazyMostWanted) -> None:
+        """Adopt a most wanted list."""
+        full = most_wanted.full()
+        self.index = self.index.with_most_wanted(full)
+        self._store("most_wanted", _json([
+            {"rank": rank, "dxcc": dxcc}
+            for rank, dxcc in zip(full.ranks, full.dxcc, strict=True)
+        ]))
+
+    def update_expeditions(self, expeditions: LazyRows[Expedition]) -> None:
+        """Adopt the active expeditions."""
+        self._store("expeditions", _json([
+            {"call": e.call, "date": e.date, "qso_count": e.qso_count}
+            for e in expeditions
+        ]))
+
+    def update_livestreams(self, livestreams: LazyRows[Livestream]) -> None:
+        """Adopt the active livestreams."""
+        self._store("livestreams", _json([
+            {"call": s.call, "dxcc": s.dxcc, "date": s.date, "url": s.url}
+            for s in livestreams
+        ]))
+
+    def etag(self, *datasets: str) -> str:
+        """Return the ETag of a response built from these datasets."""
+        versions = self.versions
+        return '"{}-{}"'.format(self._boot, ".".join(str(versions[name]) for name in datasets))
+
+    def handle(self, path: str, if_none_match: str | None) -> tuple[int, str | None, bytes]:
+        """Answer a GET for path; return (status, ETag, body)."""
+        parts = [part for part in path.split("?", 1)[0].split("/") if part]
+        if parts[:1] != ["v1"]:
+            return 404, None, _json({"error": "not found"})
+        parts = parts[1:]
+        if parts == ["status"]:
+            body = {
+                name: {"version": self.versions[name], "updated": self.updated.get(name)}
+                for name in DATASETS
+            }
+            return 200, None, _json(body)
+        if not parts or parts[0] not in DATASETS or len(parts) > LOOKUP_DEPTH[parts[0]]:
+            return 404, None, _json({"error": "not found"})
+        dataset = parts[0]
+        # Lookups combine the matrix with the most wanted ranks
+        depends = (dataset,) if len(parts) == 1 else ("matrix", "most_wanted")
+        required = depends if dataset == "most_wanted" else (dataset,)
+        if any(not self.versions[name] for name in required):
+            return 503, None, _json({"error": f"{dataset} not fetched yet"})
+        etag = self.etag(*depends)
+        if if_none_match and etag in (tag.strip() for tag in if_none_match.split(",")):
+            return 304, etag, b""
+        if len(parts) == 1:
+            return 200, etag, self._bodies[dataset]
+        try:
+            if dataset == "most_wanted":
+                body = self.index.wanted(parts[1])
+            elif len(parts) == 2:
+                body = self.index.entity(parts[1])
+            else:
+                body = self.index.slot(parts[1], parts[2])
+        except ValueError as err:
+            return 400, None, _json({"error": str(err)})
+        return 200, etag, _json(body)
+
+
+def _handler(api: QueryApi) -> type[BaseHTTPRequestHandler]:
+    """Return a request handler class bound to api."""
+
+    class _Handler(BaseHTTPRequestHandler):
+        def do_GET(self) -> None:  # noqa: N802 - http.server naming
+            self._answer(head=False)
+
+        def do_HEAD(self) -> None:  # noqa: N802 - http.server naming
+            self._answer(head=True)
+
+        def _answer(self, *, head: bool) -> None:
+            status, etag, body = api.handle(self.path, self.headers.get("If-None-Match"))
+            metrics.QUERY_REQUESTS.inc(str(status))
+            self.send_response(status)
+            if etag:
+                self.send_header("ETag", etag)
+                self.send_header("Cache-Control", "no-cache")
+            if status != 304:
+                self.send_header("Content-Type", JSON_CONTENT_TYPE)
+                self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            if body and not head:
+                self.wfile.write(body)
+
+        def log_message(self, format: str, *args: object) -> None:  # noqa: A002
+            _LOGGER.debug("query api: " + format, *args)
+
+    return _Handler
+
+
+class _UnixServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def get_request(self) -> tuple[Any, Any]:
+        # http.server expects a (host, port) client address
+        request, _ = super().get_request()
+        return request, ("local", 0)
+
+
+def serve(api: QueryApi, host: str, port: int) -> ThreadingHTTPServer:
+    """Serve the API over TCP from a daemon thread and return the server."""
+    server = ThreadingHTTPServer((host, port), _handler(api))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="query-api", daemon=True).start()
+    return server
+
+
+def serve_unix(api: QueryApi, path: str) -> socketserver.BaseServer:
+    """Serve the API on a Unix socket from a daemon thread and return the server."""
+    with contextlib.suppress(FileNotFoundError):
+        os.unlink(path)  # Left behind by an earlier run
+    server = _UnixServer(path, _handler(api))
+    threading.Thread(
+        target=server.serve_forever, name="query-api-unix", daemon=True
+    ).start()
+    return server
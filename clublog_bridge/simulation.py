@@ -0,0 +1,305 @@
+"""Simulated-clock harness: run weeks of Docker polling in seconds.
+
+Loads the real bridge (clublog-ha-bridge.py), swaps its clock for a
+SimulatedClock and its RNG for a seeded one, points it at a local
+fake_clublog stand-in and runs the unmodified main() loop until the
+requested number of simulated days has passed. Every `POLL_TICK` sleep
+advances simulated time instantly, so only the real HTTP round trips,
+decoding and MQTT payload building cost wall time.
+
+The report holds the simulated time of every request per endpoint, from
+which request counts and fetch-interval drift are derived, and the
+number of live allocated blocks after a full collection at each simulated
+day boundary for memory stability (tracemalloc byte counts too when
+tracing, which roughly quintuples the run time).
+Actions can be scheduled at simulated times (e.g. inject a 403 on day 2)
+with Simulation.at() or repeated with Simulation.every(). MQTT publishes go
+to a recording stub, or through the bridge's real paho client to a
+FakeMqttBroker when one is passed in.
+
+    python -m clublog_bridge.simulation --days 30
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import heapq
+import importlib.util
+import itertools
+import logging
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from array import array
+from collections import defaultdict
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+from .fake_clublog import FakeClubLog
+from .fake_mqtt import FakeMqttBroker
+from .scheduling import SimulatedClock
+
+BRIDGE_PATH = Path(__file__).resolve().parent.parent / "clublog-ha-bridge.py"
+
+DAY = 86400
+
+# config.py exits without these; the simulation never leaves localhost
+_REQUIRED_ENV = {
+    "CLUBLOG_API_KEY": "simulation",
+    "CLUBLOG_EMAIL": "simulation@example.com",
+    "CLUBLOG_APP_PASSWORD": "simulation",
+    "MY_CALLSIGN": "N0CALL",
+    "HA_MQTT_BROKER": "localhost",
+}
+
+
+def load_bridge() -> Any:
+    """Import a fresh copy of clublog-ha-bridge.py (hyphenated name)."""
+    for key, value in _REQUIRED_ENV.items():
+        os.environ.setdefault(key, value)
+    os.environ.setdefault("DATA_DIR", tempfile.gettempdir())
+    spec = importlib.util.spec_from_file_location("clublog_ha_bridge", BRIDGE_PATH)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+class RecordingMqttClient:
+    """paho client stand-in that counts publishes per topic."""
+
+    def __init__(self) -> None:
+        """Initialize with no publishes."""
+        self.publishes: dict[str, int] = defaultdict(int)
+
+    def publish(self, topic: str, payload: str, retain: bool = False) -> None:  # noqa: ARG002
+        """Count the publish."""
+        self.publishes[topic] += 1
+
+    def loop_stop(self) -> None:
+        """Nothing to stop."""
+
+    def disconnect(self) -> None:
+        """Nothing to disconnect."""
+
+
+@dataclass
+class SimulationReport:
+    """What happened during a simulated run."""
+
+    days: float
+    wall_seconds: float
+    intervals: dict[str, int]
+    # Simulated monotonic time of every request, per endpoint
+    requests: dict[str, array] = field(default_factory=dict)
+    # (simulated day, allocated blocks) sampled at each day boundary
+    memory: list[tuple[int, int]] = field(default_factory=list)
+    # (simulated day, tracemalloc traced bytes), only when tracing
+    traced: list[tuple[int, int]] = field(default_factory=list)
+    publishes: int = 0
+
+    def count(self, endpoint: str) -> int:
+        """Return the number of requests made to an endpoint."""
+        return len(self.requests.get(endpoint, ()))
+
+    def drift(self, endpoint: str) -> float:
+        """Return the mean fetch period relative to the interval, minus 1.
+
+        0.0 means fetches happened exactly every interval on average;
+        0.02 means each fetch came 2% later than configured.
+        """
+        times = self.requests.get(endpoint, [])
+        if len(times) < 2:
+            return 0.0
+        period = (times[-1] - times[0]) / (len(times) - 1)
+        return period / self.intervals[endpoint] - 1
+
+    def memory_growth(self, warmup_days: int = 1) -> int:
+        """Return allocated blocks at the end minus after the warmup days."""
+        return _growth(self.memory, warmup_days)
+
+    def traced_growth(self, warmup_days: int = 1) -> int:
+        """Return traced bytes at the end minus after the warmup days."""
+        return _growth(self.traced, warmup_days)
+
+
+def _growth(samples: list[tuple[int, int]], warmup_days: int) -> int:
+    """Return the last sample minus the first one after warmup."""
+    values = [value for day, value in samples if day >= warmup_days]
+    return values[-1] - values[0] if len(values) > 1 else 0
+
+
+class _StoppingClock(SimulatedClock):
+    """SimulatedClock that runs due actions and stops the bridge at the end."""
+
+    def __init__(self, simulation: Simulation) -> None:
+        super().__init__()
+        self.simulation = simulation
+
+    def sleep(self, seconds: float) -> None:
+        super().sleep(seconds)
+        self.simulation._tick()
+
+
+class Simulation:
+    """Drive the bridge's real main loop on a simulated clock."""
+
+    def __init__(
+        self,
+        days: float = 30,
+        *,
+        seed: int = 1,
+        fake: FakeClubLog | None = None,
+        broker: FakeMqttBroker | None = None,
+        trace_memory: bool = False,
+        setup: Callable[[Any], None] | None = None,
+    ) -> None:
+        """Initialize; `fake` defaults to a stand-in serving the fixtures.
+
+        setup, if given, is called with the freshly loaded bridge module
+        before main() starts (to patch or wrap bridge functions).
+        """
+        self.days = days
+        self.seed = seed
+        self.fake = fake
+        self.broker = broker
+        self.trace_memory = trace_memory
+        self.setup = setup
+        self.clock = _StoppingClock(self)
+        # Heap of (due, sequence, period, action); period 0 = run once
+        self._actions: list[tuple[float, int, float, Callable[[], None]]] = []
+        self._sequence = itertools.count()
+        # Unboxed doubles, so recording does not show up as memory growth
+        self._requests: dict[str, array] = defaultdict(lambda: array("d"))
+        self._memory: list[tuple[int, int]] = []
+        self._traced: list[tuple[int, int]] = []
+        self._next_day = 1
+        self._bridge: Any = None
+
+    @property
+    def bridge(self) -> Any:
+        """Return the loaded bridge module (None before run())."""
+        return self._bridge
+
+    def at(self, seconds: float, action: Callable[[], None]) -> None:
+        """Run action once simulated time reaches `seconds`."""
+        heapq.heappush(self._actions, (seconds, next(self._sequence), 0.0, action))
+
+    def every(
+        self, seconds: float, action: Callable[[], None], *, start: float | None = None
+    ) -> None:
+        """Run action every `seconds` of simulated time, first at `start`."""
+        first = seconds if start is None else start
+        heapq.heappush(self._actions, (first, next(self._sequence), seconds, action))
+
+    def run(self) -> SimulationReport:
+        """Run the simulation to completion and return its report."""
+        own_fake = self.fake is None
+        fake = self.fake or FakeClubLog(seed=self.seed)
+        if own_fake:
+            fake.start()
+        bridge = self._bridge = load_bridge()
+        bridge.clock = self.clock
+        bridge.rng = random.Random(self.seed)
+        bridge.CLUBLOG_API_BASE = fake.base_url
+        # Proxy lookup rescans os.environ on every request — most of the
+        # client-side cost here, and never relevant for a localhost stand-in
+        bridge.http_session.trust_env = False
+        client = RecordingMqttClient()
+        if self.broker:
+            bridge.HA_MQTT_BROKER, bridge.HA_MQTT_PORT = self.broker.address
+        else:
+            bridge.connect_mqtt = lambda: client
+        get = bridge._get
+
+        def recording_get(endpoint: str, *args: Any, **kwargs: Any) -> Any:
+            self._requests[endpoint].append(self.clock.monotonic())
+            return get(endpoint, *args, **kwargs)
+
+        bridge._get = recording_get
+        if self.setup:
+            self.setup(bridge)
+
+        root = logging.getLogger()
+        level = root.level
+        root.setLevel(logging.WARNING)  # one INFO line per fetch otherwise
+        started_tracing = self.trace_memory and not tracemalloc.is_tracing()
+        if started_tracing:
+            tracemalloc.start()
+        start = time.perf_counter()
+        try:
+            bridge.main()
+        finally:
+            wall = time.perf_counter() - start
+            if started_tracing:
+                tracemalloc.stop()
+            root.setLevel(level)
+            if own_fake:
+                fake.stop()
+
+        return SimulationReport(
+            days=self.days,
+            wall_seconds=wall,
+            intervals={
+                "matrix": bridge.MATRIX_INTERVAL,
+                "most_wanted": bridge.MOST_WANTED_INTERVAL,
+                "watch": bridge.WATCH_INTERVAL,
+                "expeditions": bridge.EXPEDITIONS_INTERVAL,
+                "livestreams": bridge.LIVESTREAMS_INTERVAL,
+                "activity": bridge.ACTIVITY_INTERVAL,
+            },
+            requests=dict(self._requests),
+            memory=self._memory,
+            traced=self._traced,
+            publishes=(
+                self.broker.published() if self.broker else sum(client.publishes.values())
+            ),
+        )
+
+    def _tick(self) -> None:
+        """Called after every simulated sleep."""
+        now = self.clock.monotonic()
+        while self._actions and self._actions[0][0] <= now:
+            due, sequence, period, action = heapq.heappop(self._actions)
+            if period:
+                heapq.heappush(self._actions, (due + period, sequence, period, action))
+            action()
+        if now >= self._next_day * DAY:
+            gc.collect()
+            self._memory.append((self._next_day, sys.getallocatedblocks()))
+            if tracemalloc.is_tracing():
+                self._traced.append((self._next_day, tracemalloc.get_traced_memory()[0]))
+            self._next_day += 1
+        if now >= self.days * DAY:
+            self._bridge.RUNNING = False
+
+
+def main() -> None:
+    """Run a simulation from the command line and print its report."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--days", type=float, default=30)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--trace", action="store_true", help="also sample tracemalloc")
+    args = parser.parse_args()
+
+    report = Simulation(args.days, seed=args.seed, trace_memory=args.trace).run()
+    print(f"{report.days:g} simulated days in {report.wall_seconds:.1f} s wall time")
+    print(f"{'endpoint':<14}{'interval s':>11}{'requests':>10}{'drift %':>9}")
+    for endpoint, interval in report.intervals.items():
+        print(
+            f"{endpoint:<14}{interval:>11}{report.count(endpoint):>10}"
+            f"{report.drift(endpoint) * 100:>9.2f}"
+        )
+    print(f"MQTT publishes: {report.publishes}")
+    print(f"Allocated blocks growth after day 1: {report.memory_growth()}")
+    if report.traced:
+        print(f"Traced memory growth after day 1: {report.traced_growth() / 1024:.1f} KiB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,372 @@
+"""Delta-encoded history of fetched ClubLog data, kept in SQLite.
+
+The polling loop only ever holds the latest response of each endpoint, so
+nothing can show how DXCC totals grew month by month, how fast an
+expedition is logging or how the most wanted ranks move. SnapshotStore
+keeps that history compactly:
+
+- Each fetch is flattened into {key: int} (matrix_state(),
+  most_wanted_state(), expeditions_state(), watch_state()) and stored as
+  the keys that changed since the previous snapshot of the endpoint (NULL
+  for a removed key). A fetch that changed nothing writes nothing.
+- Every `keyframe_interval` snapshots the whole state is written instead,
+  so rebuilding a state never replays more than that many deltas.
+- Snapshots older than `retention` seconds are compacted away once a day:
+  the state at the retention boundary is rewritten as a keyframe and
+  everything before it deleted.
+- Totals and per-band counts are keys of their own ("worked",
+  "band/20/confirmed"), so a trend over months is one indexed range query
+  on a single key — series() and value_at() — instead of a replay of the
+  matrix. dxcc_trend() builds the DXCC trend sensor from a handful of
+  them, and hourly_progress() buckets them into the hourly rows of Home
+  Assistant long-term statistics.
+
+All methods may be called from any thread; they serialize on one
+connection.
+
+This module is shared verbatim between the Docker bridge (clublog_bridge/)
+and the HACS integration (custom_components/clublog/) — keep both copies
+identical.
+"""
+
+from __future__ import annotations
+
+import calendar
+import sqlite3
+import threading
+import time
+from collections.abc import Iterable
+from typing import Any
+
+from .models import Expedition, MostWanted, Watch
+
+KEYFRAME_INTERVAL = 100  # Snapshots between full copies of an endpoint's state
+COMPACT_INTERVAL = 86400  # Seconds between retention compactions
+TREND_WINDOW = 30 * 86400  # DXCC growth reported over the last 30 days
+TREND_MONTHS = 12  # Month-end totals listed
+STATISTIC_PERIOD = 3600  # Long-term statistics rows are hourly
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS snapshots (
+    id INTEGER PRIMARY KEY,
+    endpoint TEXT NOT NULL,
+    ts REAL NOT NULL,
+    full INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS snapshots_endpoint_ts ON snapshots (endpoint, ts);
+CREATE TABLE IF NOT EXISTS deltas (
+    snapshot INTEGER NOT NULL REFERENCES snapshots (id),
+    key TEXT NOT NULL,
+    value INTEGER
+);
+CREATE INDEX IF NOT EXISTS deltas_key ON deltas (key, snapshot);
+CREATE INDEX IF NOT EXISTS deltas_snapshot ON deltas (snapshot);
+"""
+
+
+def matrix_state(matrix: dict[str, dict[str, int]]) -> dict[str, int]:
+    """Flatten a DXCC matrix into cells, totals and per-band counts."""
+    state: dict[str, int] = {}
+    confirmed = verified = 0
+    bands: dict[str, list[int]] = {}
+    for dxcc, cells in matrix.items():
+        entity_confirmed = entity_verified = False
+        for band, status in cells.items():
+            state[f"cell/{dxcc}/{band}"] = status
+            counts = bands.setdefault(band, [0, 0])
+            counts[0] += 1
+            if status in (1, 3):
+                counts[1] += 1
+                entity_confirmed = True
+            entity_verified = entity_verified or status == 3
+        confirmed += entity_confirmed
+        verified += entity_verified
+    state["worked"] = sum(1 for cells in matrix.values() if cells)
+    state["confirmed"] = confirmed
+    state["verified"] = verified
+    for band, (worked_on, confirmed_on) in bands.items():
+        state[f"band/{band}/worked"] = worked_on
+        state[f"band/{band}/confirmed"] = confirmed_on
+    return state
+
+
+def progress_keys(state: dict[str, int]) -> list[str]:
+    """Return the DXCC progress keys of a matrix state: totals, then per band."""
+    bands = sorted(k for k in state if k.startswith("band/"))
+    return [k for k in ("worked", "confirmed") if k in state] + bands
+
+
+def most_wanted_state(most_wanted: MostWanted) -> dict[str, int]:
+    """Flatten the most wanted list into {"rank/<dxcc>": rank}."""
+    state: dict[str, int] = {}
+    for rank, dxcc in zip(most_wanted.ranks, most_wanted.dxcc, strict=True):
+        state.setdefault(f"rank/{dxcc}", rank)
+    return state
+
+
+def expeditions_state(expeditions: Iterable[Expedition]) -> dict[str, int]:
+    """Flatten active expeditions into {"qsos/<call>": QSO count}."""
+    return {f"qsos/{e.call}": e.qso_count for e in expeditions}
+
+
+def watch_state(watch: Watch | None) -> dict[str, int]:
+    """Flatten the watch summary into the account's QSO count."""
+    if watch is None or watch.total_qsos is None:
+        return {}
+    return {"qsos": watch.total_qsos}
+
+
+class SnapshotStore:
+    """Delta-encoded snapshots per endpoint with retention and range queries."""
+
+    def __init__(
+        self,
+        path: str,
+        retention: float,
+        *,
+        keyframe_interval: int = KEYFRAME_INTERVAL,
+    ) -> None:
+        """Open (or create) the store at path; ":memory:" for a throwaway one."""
+        self.retention = retention
+        self.keyframe_interval = keyframe_interval
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA auto_vacuum = INCREMENTAL")
+        self._db.execute("PRAGMA journal_mode = WAL")
+        self._db.executescript(_SCHEMA)
+        self._last: dict[str, dict[str, int]] = {}
+        self._since_keyframe: dict[str, int] = {}
+        self._compacted: float | None = None
+
+    def close(self) -> None:
+        """Close the database."""
+        with self._lock:
+            self._db.close()
+
+    def record(self, endpoint: str, state: dict[str, int], ts: float) -> int:
+        """Store a fetch's state as a delta; return the number of keys written."""
+        with self._lock:
+            previous = self._latest(endpoint)
+            rows: list[tuple[str, int | None]] = [
+                (k, v) for k, v in state.items() if previous.get(k) != v
+            ]
+            rows += [(k, None) for k in previous.keys() - state.keys()]
+            if rows:
+                if self._since_keyframe[endpoint] >= self.keyframe_interval:
+                    self._write(endpoint, ts, True, list(state.items()))
+                else:
+                    self._write(endpoint, ts, False, rows)
+            self._last[endpoint] = dict(state)
+            compact = self._compacted is None or ts - self._compacted >= COMPACT_INTERVAL
+        if compact:
+            self.compact(ts)
+        return len(rows)
+
+    def state(self, endpoint: str, ts: float | None = None) -> dict[str, int]:
+        """Return an endpoint's state as of ts (None = latest)."""
+        with self._lock:
+            if ts is None:
+                return dict(self._latest(endpoint))
+            return self._state_at(endpoint, ts)
+
+    def value_at(self, endpoint: str, key: str, ts: float) -> int | None:
+        """Return one key's value as of ts (None if unset)."""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT d.value FROM deltas d JOIN snapshots s ON s.id = d.snapshot "
+                "WHERE d.key = ? AND s.endpoint = ? AND s.ts <= ? "
+                "ORDER BY s.id DESC LIMIT 1",
+                (key, endpoint, ts),
+            ).fetchone()
+        return row[0] if row else None
+
+    def series(
+        self, endpoint: str, key: str, start: float, end: float
+    ) -> list[tuple[float, int | None]]:
+        """Return [(ts, value)] for one key: its value at start, then each change."""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT s.ts, d.value FROM deltas d JOIN snapshots s ON s.id = d.snapshot "
+                "WHERE d.key = ? AND s.endpoint = ? AND s.ts > ? AND s.ts <= ? "
+                "ORDER BY s.id",
+                (key, endpoint, start, end),
+            ).fetchall()
+        points: list[tuple[float, int | None]] = [(start, self.value_at(endpoint, key, start))]
+        for ts, value in rows:
+            if value != points[-1][1]:  # Keyframes repeat unchanged values
+                points.append((ts, value))
+        return points
+
+    def snapshots(self, endpoint: str, start: float, end: float) -> list[float]:
+        """Return the times of an endpoint's stored snapshots in (start, end]."""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT ts FROM snapshots WHERE endpoint = ? AND ts > ? AND ts <= ? ORDER BY id",
+                (endpoint, start, end),
+            ).fetchall()
+        return [ts for (ts,) in rows]
+
+    def compact(self, now: float) -> int:
+        """Fold snapshots older than the retention window into a keyframe.
+
+        Return the number of snapshots removed.
+        """
+        cutoff = now - self.retention
+        removed = 0
+        with self._lock:
+            self._compacted = now
+            endpoints = [e for (e,) in self._db.execute("SELECT DISTINCT endpoint FROM snapshots")]
+            for endpoint in endpoints:
+                row = self._db.execute(
+                    "SELECT id, full FROM snapshots WHERE endpoint = ? AND ts <= ? "
+                    "ORDER BY id DESC LIMIT 1",
+                    (endpoint, cutoff),
+                ).fetchone()
+                if row is None:
+                    continue
+                boundary, full = row
+                older = self._db.execute(
+                    "SELECT COUNT(*) FROM snapshots WHERE endpoint = ? AND id < ?",
+                    (endpoint, boundary),
+                ).fetchone()[0]
+                if not older and full:
+                    continue
+                state = self._state_at_id(endpoint, boundary)
+                with self._db:
+                    self._db.execute(
+                        "DELETE FROM deltas WHERE snapshot IN "
+                        "(SELECT id FROM snapshots WHERE endpoint = ? AND id <= ?)",
+                        (endpoint, boundary),
+                    )
+                    self._db.execute(
+                        "DELETE FROM snapshots WHERE endpoint = ? AND id < ?",
+                        (endpoint, boundary),
+                    )
+                    self._db.execute("UPDATE snapshots SET full = 1 WHERE id = ?", (boundary,))
+                    self._db.executemany(
+                        "INSERT INTO deltas VALUES (?, ?, ?)",
+                        [(boundary, k, v) for k, v in state.items()],
+                    )
+                self._last.pop(endpoint, None)  # Keyframe count rebuilt on next use
+                removed += older
+            if removed:
+                self._db.execute("PRAGMA incremental_vacuum")
+        return removed
+
+    def _write(
+        self, endpoint: str, ts: float, full: bool, rows: list[tuple[str, int | None]]
+    ) -> None:
+        with self._db:
+            snapshot = self._db.execute(
+                "INSERT INTO snapshots (endpoint, ts, full) VALUES (?, ?, ?)",
+                (endpoint, ts, int(full)),
+            ).lastrowid
+            self._db.executemany(
+                "INSERT INTO deltas VALUES (?, ?, ?)", [(snapshot, k, v) for k, v in rows]
+            )
+        self._since_keyframe[endpoint] = 0 if full else self._since_keyframe[endpoint] + 1
+
+    def _latest(self, endpoint: str) -> dict[str, int]:
+        """Return the cached latest state, rebuilding it after a restart."""
+        state = self._last.get(endpoint)
+        if state is None:
+            latest, keyframe = self._db.execute(
+                "SELECT MAX(id), MAX(CASE WHEN full THEN id END) FROM snapshots "
+                "WHERE endpoint = ?",
+                (endpoint,),
+            ).fetchone()
+            state = self._state_at_id(endpoint, latest) if latest is not None else {}
+            self._since_keyframe[endpoint] = self._db.execute(
+                "SELECT COUNT(*) FROM snapshots WHERE endpoint = ? AND id > ?",
+                (endpoint, keyframe if keyframe is not None else -1),
+            ).fetchone()[0]
+            self._last[endpoint] = state
+        return state
+
+    def _state_at(self, endpoint: str, ts: float) -> dict[str, int]:
+        row = self._db.execute(
+            "SELECT MAX(id) FROM snapshots WHERE endpoint = ? AND ts <= ?", (endpoint, ts)
+        ).fetchone()
+        return self._state_at_id(endpoint, row[0]) if row[0] is not None else {}
+
+    def _state_at_id(self, endpoint: str, snapshot: int) -> dict[str, int]:
+        """Replay from the last keyframe at or before snapshot."""
+        row = self._db.execute(
+            "SELECT MAX(id) FROM snapshots WHERE endpoint = ? AND full = 1 AND id <= ?",
+            (endpoint, snapshot),
+        ).fetchone()
+        first = row[0] if row[0] is not None else 0
+        state: dict[str, int] = {}
+        for key, value in self._db.execute(
+            "SELECT d.key, d.value FROM deltas d JOIN snapshots s ON s.id = d.snapshot "
+            "WHERE s.endpoint = ? AND s.id >= ? AND s.id <= ? ORDER BY s.id",
+            (endpoint, first, snapshot),
+        ):
+            if value is None:
+                state.pop(key, None)
+            else:
+                state[key] = value
+        return state
+
+
+def _month_ends(now: float, months: int) -> list[tuple[str, float]]:
+    """Return ("YYYY-MM", end) for the last `months` UTC months, oldest first.
+
+    The current month ends now.
+    """
+    year, month = time.gmtime(now)[:2]
+    ends = [(f"{year:04d}-{month:02d}", now)]
+    for _ in range(months - 1):
+        start = calendar.timegm((year, month, 1, 0, 0, 0))
+        year, month = (year - 1, 12) if month == 1 else (year, month - 1)
+        ends.append((f"{year:04d}-{month:02d}", start - 0.001))
+    return ends[::-1]
+
+
+def dxcc_trend(
+    store: SnapshotStore, now: float, months: int = TREND_MONTHS
+) -> dict[str, Any] | None:
+    """Summarize DXCC growth from the matrix history (None before any).
+
+    worked_30d and confirmed_30d count entities added over TREND_WINDOW,
+    or since the history began if it is younger; monthly lists the totals
+    at each month's end.
+    """
+    worked = store.value_at("matrix", "worked", now)
+    if worked is None:
+        return None
+    trend: dict[str, Any] = {}
+    for key in ("worked", "confirmed"):
+        points = store.series("matrix", key, now - TREND_WINDOW, now)
+        values = [value for _, value in points if value is not None]
+        trend[f"{key}_30d"] = values[-1] - values[0] if values else 0
+    trend["monthly"] = [
+        {
+            "month": label,
+            "worked": store.value_at("matrix", "worked", end),
+            "confirmed": store.value_at("matrix", "confirmed", end),
+        }
+        for label, end in _month_ends(now, months)
+        if store.value_at("matrix", "worked", end) is not None
+    ]
+    return trend
+
+
+def hourly_progress(
+    store: SnapshotStore, start: float, end: float
+) -> dict[str, list[tuple[float, int]]]:
+    """Return {key: [(hour, value)]} for the DXCC progress keys in [start, end].
+
+    Each row is the key's last value within an hour it changed in (or the
+    value at start, in start's hour), so a range imports as one batch of
+    hourly rows. Keys are those of the latest matrix.
+    """
+    progress: dict[str, list[tuple[float, int]]] = {}
+    for key in progress_keys(store.state("matrix")):
+        rows: dict[float, int] = {}
+        for ts, value in store.series("matrix", key, start, end):
+            if value is not None:
+                rows[ts - ts % STATISTIC_PERIOD] = value
+        if rows:
+            progress[key] = list(rows.items())
+    return progress
@@ -0,0 +1,275 @@
+"""Memory-growth soak test of the Docker polling loop.
+
+Runs the bridge's real main() for a large number of simulated polling
+cycles (one cycle = one POLL_TICK pass of the scheduler) on a simulated
+clock, against the fake_clublog HTTP stand-in and, through the bridge's
+real paho client, the fake_mqtt broker stand-in — so paho's own queues
+are part of what is measured.
+
+After a warmup (caches, metric label sets and bounded buffers fill),
+live allocated blocks and process RSS are sampled at regular intervals;
+every leaked object is at least one block, so a per-fetch leak shows up
+as steady block growth. tracemalloc traces only the final stretch of the
+run (it slows the loop roughly thirtyfold) to measure retained bytes —
+the traced heap minus anything allocated by the stand-ins or this
+harness — and to report the allocation sites that grew most. The run
+fails if blocks or RSS grew past their thresholds before tracing began,
+or retained bytes grew past theirs while tracing.
+
+    python -m clublog_bridge.soak --cycles 1000000
+
+A million cycles is about 347 simulated days and ~120k HTTP requests;
+expect it to take five to ten minutes.
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import os
+import resource
+import sys
+import tracemalloc
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from typing import Any
+
+from .fake_clublog import FakeClubLog
+from .fake_mqtt import FakeMqttBroker
+from .simulation import DAY, Simulation
+
+POLL_TICK = 30  # Seconds per cycle — POLL_TICK in clublog-ha-bridge.py
+
+DEFAULT_CYCLES = 1_000_000
+DEFAULT_BLOCK_THRESHOLD = 10_000  # Allocated block growth before tracing
+DEFAULT_THRESHOLD = 256 * 1024  # Retained heap growth while tracing, bytes
+DEFAULT_RSS_THRESHOLD = 64 * 1024 * 1024  # Process RSS growth before tracing
+DEFAULT_SAMPLES = 20
+WARMUP_CYCLES = 7 * DAY // POLL_TICK  # One simulated week
+TRACE_CYCLES = 7 * DAY // POLL_TICK  # Traced stretch at the end of the run
+TRACE_FRAMES = 10
+
+# Allocations made by the stand-ins and this harness are not the bridge's.
+# The stand-ins run in their own threads, so anything with them anywhere on
+# the stack is theirs; the harness is the bridge's caller, so only its own
+# lines are excluded.
+_EXCLUDE = [
+    tracemalloc.Filter(False, tracemalloc.__file__, all_frames=True),
+    tracemalloc.Filter(False, "*/clublog_bridge/fake_clublog.py", all_frames=True),
+    tracemalloc.Filter(False, "*/clublog_bridge/fake_mqtt.py", all_frames=True),
+    tracemalloc.Filter(False, "*/http/server.py", all_frames=True),
+    tracemalloc.Filter(False, "*/socketserver.py", all_frames=True),
+    tracemalloc.Filter(False, "*/clublog_bridge/simulation.py"),
+    tracemalloc.Filter(False, "*/clublog_bridge/soak.py"),
+]
+
+
+def rss_bytes() -> int:
+    """Return the current resident set size (peak RSS where unavailable)."""
+    try:
+        with open("/proc/self/statm", encoding="ascii") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+
+
+def _retained(snapshot: tracemalloc.Snapshot) -> int:
+    """Return traced bytes in a filtered snapshot."""
+    return sum(stat.size for stat in snapshot.statistics("filename"))
+
+
+@dataclass
+class SoakSample:
+    """Memory at one point of the run."""
+
+    cycle: int
+    blocks: int  # sys.getallocatedblocks() after a full collection
+    rss: int
+    retained: int | None = None  # Traced bytes, stand-ins excluded
+
+
+@dataclass
+class SoakReport:
+    """Outcome of a soak run."""
+
+    cycles: int
+    wall_seconds: float
+    block_threshold: int
+    threshold: int
+    rss_threshold: int
+    samples: list[SoakSample] = field(default_factory=list)
+    top: list[str] = field(default_factory=list)
+    requests: int = 0
+    publishes: int = 0
+
+    @property
+    def untraced(self) -> list[SoakSample]:
+        """Return the samples taken before tracemalloc (and its overhead) started."""
+        return [s for s in self.samples if s.retained is None]
+
+    @property
+    def block_growth(self) -> int:
+        """Return allocated block growth from the end of warmup until tracing."""
+        return _growth([s.blocks for s in self.untraced])
+
+    @property
+    def growth(self) -> int:
+        """Return retained-heap growth over the traced stretch."""
+        return _growth([s.retained for s in self.samples if s.retained is not None])
+
+    @property
+    def rss_growth(self) -> int:
+        """Return RSS growth from the end of warmup until tracing."""
+        return _growth([s.rss for s in self.untraced])
+
+    @property
+    def passed(self) -> bool:
+        """Return True if no threshold was exceeded."""
+        return (
+            self.block_growth <= self.block_threshold
+            and self.growth <= self.threshold
+            and self.rss_growth <= self.rss_threshold
+        )
+
+
+def _growth(values: list[int]) -> int:
+    """Return the last value minus the first."""
+    return values[-1] - values[0] if len(values) > 1 else 0
+
+
+def soak(
+    cycles: int = DEFAULT_CYCLES,
+    *,
+    warmup: int = WARMUP_CYCLES,
+    trace: int = TRACE_CYCLES,
+    samples: int = DEFAULT_SAMPLES,
+    block_threshold: int = DEFAULT_BLOCK_THRESHOLD,
+    threshold: int = DEFAULT_THRESHOLD,
+    rss_threshold: int = DEFAULT_RSS_THRESHOLD,
+    top: int = 10,
+    seed: int = 1,
+    setup: Callable[[Any], None] | None = None,
+) -> SoakReport:
+    """Run the polling loop for `cycles` cycles and report memory growth.
+
+    setup, if given, is called with the loaded bridge module before the
+    loop starts (e.g. to wrap a function with a deliberate leak).
+    """
+    warmup = min(warmup, cycles // 2)
+    trace = min(trace, cycles - warmup)
+    report = SoakReport(cycles, 0.0, block_threshold, threshold, rss_threshold)
+    baseline: list[tracemalloc.Snapshot] = []
+
+    def snapshot() -> tracemalloc.Snapshot:
+        return tracemalloc.take_snapshot().filter_traces(_EXCLUDE)
+
+    def sample(cycle: int | None = None) -> tracemalloc.Snapshot | None:
+        gc.collect()
+        current = snapshot() if tracemalloc.is_tracing() else None
+        report.samples.append(SoakSample(
+            round(simulation.clock.monotonic() / POLL_TICK) if cycle is None else cycle,
+            sys.getallocatedblocks(),
+            rss_bytes(),
+            _retained(current) if current else None,
+        ))
+        return current
+
+    def start_tracing() -> None:
+        sample()
+        tracemalloc.start(TRACE_FRAMES)
+        baseline.append(sample())
+
+    with FakeClubLog(seed=seed) as http, FakeMqttBroker() as broker:
+        simulation = Simulation(
+            cycles * POLL_TICK / DAY, seed=seed, fake=http, broker=broker, setup=setup
+        )
+        period = max(1, (cycles - warmup) // samples) * POLL_TICK
+        simulation.every(period, sample, start=warmup * POLL_TICK)
+        if trace:
+            simulation.at((cycles - trace) * POLL_TICK, start_tracing)
+        try:
+            result = simulation.run()
+            if report.samples and report.samples[-1].cycle >= cycles:
+                report.samples.pop()
+            final = sample(cycles)
+            if final and baseline:
+                report.top = [
+                    _format(stat)
+                    for stat in final.compare_to(baseline[0], "traceback")[:top]
+                    if stat.size_diff > 0
+                ]
+        finally:
+            tracemalloc.stop()
+
+    report.wall_seconds = result.wall_seconds
+    report.requests = sum(len(times) for times in result.requests.values())
+    report.publishes = result.publishes
+    return report
+
+
+def _format(stat: tracemalloc.StatisticDiff) -> str:
+    """Format one allocation site, innermost frames first."""
+    frames = "\n".join(
+        f"    {frame.filename}:{frame.lineno}" for frame in list(stat.traceback)[::-1][:4]
+    )
+    return (
+        f"{stat.size_diff / 1024:+.1f} KiB, {stat.count_diff:+d} blocks "
+        f"(now {stat.size / 1024:.1f} KiB)\n{frames}"
+    )
+
+
+def main() -> None:
+    """Run a soak from the command line; exit 1 if memory grew too much."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--cycles", type=int, default=DEFAULT_CYCLES)
+    parser.add_argument("--warmup", type=int, default=WARMUP_CYCLES)
+    parser.add_argument(
+        "--trace", type=int, default=TRACE_CYCLES, help="cycles traced at the end"
+    )
+    parser.add_argument("--samples", type=int, default=DEFAULT_SAMPLES)
+    parser.add_argument("--block-threshold", type=int, default=DEFAULT_BLOCK_THRESHOLD)
+    parser.add_argument("--threshold-kib", type=int, default=DEFAULT_THRESHOLD // 1024)
+    parser.add_argument(
+        "--rss-threshold-mib", type=int, default=DEFAULT_RSS_THRESHOLD // 1024 // 1024
+    )
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    report = soak(
+        args.cycles,
+        warmup=args.warmup,
+        trace=args.trace,
+        samples=args.samples,
+        block_threshold=args.block_threshold,
+        threshold=args.threshold_kib * 1024,
+        rss_threshold=args.rss_threshold_mib * 1024 * 1024,
+        top=args.top,
+        seed=args.seed,
+    )
+    print(
+        f"{report.cycles} cycles ({report.cycles * POLL_TICK / DAY:.0f} simulated days), "
+        f"{report.requests} requests, {report.publishes} MQTT publishes "
+        f"in {report.wall_seconds:.0f} s"
+    )
+    print(f"{'cycle':>10}{'blocks':>10}{'RSS MiB':>10}{'retained KiB':>14}")
+    for s in report.samples:
+        retained = "" if s.retained is None else f"{s.retained / 1024:.1f}"
+        print(f"{s.cycle:>10}{s.blocks:>10}{s.rss / 1024 / 1024:>10.1f}{retained:>14}")
+    print(
+        f"Growth: {report.block_growth:+d} blocks (limit {report.block_threshold}), "
+        f"{report.growth / 1024:+.1f} KiB retained while tracing "
+        f"(limit {report.threshold / 1024:.0f}), "
+        f"{report.rss_growth / 1024 / 1024:+.1f} MiB RSS "
+        f"(limit {report.rss_threshold / 1024 / 1024:.0f})"
+    )
+    if report.top:
+        print("Largest growing allocation sites:")
+        print("\n".join(report.top))
+    print("PASS" if report.passed else "FAIL")
+    sys.exit(0 if report.passed else 1)
+
+
+if __name__ == "__main__":
+    main()
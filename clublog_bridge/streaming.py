@@ -0,0 +1,189 @@
+"""Incremental JSON decoding for large ClubLog responses.
+
+The activity and DXCC matrix endpoints return a single JSON object whose
+members are small ({band: [24 hourly counts]} and {dxcc_id: {band: status}}),
+but the object itself can run to megabytes for a busy callsign. Instead of
+buffering the whole body and decoding it in one go, ObjectStreamDecoder is
+fed chunks as they arrive and hands back each top-level member as soon as it
+is complete, so peak memory is bounded by the largest member plus one chunk.
+
+This module is shared verbatim between the Docker bridge (clublog_bridge/)
+and the HACS integration (custom_components/clublog/) — keep both copies
+identical.
+"""
+
+from __future__ import annotations
+
+import codecs
+import contextlib
+import json
+import re
+import sys
+from array import array
+from collections.abc import Iterable, Iterator
+from typing import Any
+
+# Chunk size used when reading streamed responses
+STREAM_CHUNK_SIZE = 16384
+
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+
+# Decoder states
+_START = 0
+_KEY_OR_END = 1
+_KEY = 2
+_COLON = 3
+_VALUE = 4
+_COMMA_OR_END = 5
+_DONE = 6
+_FALLBACK = 7
+
+
+class ObjectStreamDecoder:
+    """Decode the members of a top-level JSON object incrementally.
+
+    Call feed() with each chunk of the body and consume the (key, value)
+    pairs it returns, then call close() once the body is exhausted. Bodies
+    that are not an object (ClubLog returns null or [] when there is no data)
+    are buffered and decoded on close(); they are tiny by definition.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the decoder."""
+        self._utf8 = codecs.getincrementaldecoder("utf-8")()
+        self._decoder = json.JSONDecoder()
+        self._buf = ""
+        self._state = _START
+        self._key = ""
+
+    def feed(self, chunk: bytes) -> list[tuple[str, Any]]:
+        """Feed a chunk of the body and return the members it completes."""
+        self._buf += self._utf8.decode(chunk)
+        return self._drain(final=False)
+
+    def close(self) -> list[tuple[str, Any]]:
+        """Flush the remaining input and check the body was complete."""
+        self._buf += self._utf8.decode(b"", final=True)
+        members = self._drain(final=True)
+        if self._state == _START and not self._buf.strip():
+            self._state = _DONE  # empty body: no data
+        if self._state == _FALLBACK:
+            value = json.loads(self._buf) if self._buf.strip() else None
+            self._buf = ""
+            if isinstance(value, dict):
+                members.extend(value.items())
+            elif value:
+                raise ValueError(
+                    f"Expected a JSON object, got {type(value).__name__}"
+                )
+            self._state = _DONE
+        if self._state != _DONE:
+            raise ValueError("Truncated JSON object in response body")
+        return members
+
+    def _drain(self, *, final: bool) -> list[tuple[str, Any]]:
+        """Consume as many complete tokens from the buffer as possible."""
+        members: list[tuple[str, Any]] = []
+        buf = self._buf
+        pos = 0
+        try:
+            while True:
+                pos = _WHITESPACE.match(buf, pos).end()
+                if pos >= len(buf) or self._state in (_DONE, _FALLBACK):
+                    break
+                char = buf[pos]
+
+                if self._state == _START:
+                    if char == "{":
+                        self._state = _KEY_OR_END
+                        pos += 1
+                    else:
+                        self._state = _FALLBACK
+                elif self._state in (_KEY_OR_END, _KEY):
+                    if char == "}" and self._state == _KEY_OR_END:
+                        self._state = _DONE
+                        pos += 1
+                        continue
+                    if char != '"':
+                        raise ValueError(f"Expected object key at offset {pos}")
+                    try:
+                        key, end = self._decoder.raw_decode(buf, pos)
+                    except json.JSONDecodeError:
+                        break  # key split across chunks
+                    self._key = sys.intern(key)
+                    self._state = _COLON
+                    pos = end
+                elif self._state == _COLON:
+                    if char != ":":
+                        raise ValueError(f"Expected ':' at offset {pos}")
+                    self._state = _VALUE
+                    pos += 1
+                elif self._state == _VALUE:
+                    try:
+                        value, end = self._decoder.raw_decode(buf, pos)
+                    except json.JSONDecodeError:
+                        if final:
+                            raise
+                        break  # value split across chunks
+                    if end >= len(buf) and not final:
+                        # A bare number at the end of the buffer may continue
+                        # in the next chunk; wait for the delimiter after it.
+                        break
+                    self._state = _COMMA_OR_END
+                    pos = end
+                    members.append((self._key, value))
+                elif self._state == _COMMA_OR_END:
+                    if char == ",":
+                        self._state = _KEY
+                    elif char == "}":
+                        self._state = _DONE
+                    else:
+                        raise ValueError(f"Expected ',' or '}}' at offset {pos}")
+                    pos += 1
+        finally:
+            self._buf = buf[pos:]
+
+        if self._state == _DONE and self._buf.strip():
+            raise ValueError("Unexpected data after JSON object")
+        return members
+
+
+def iter_members(chunks: Iterable[bytes]) -> Iterator[tuple[str, Any]]:
+    """Yield the top-level (key, value) members of a chunked JSON body."""
+    decoder = ObjectStreamDecoder()
+    for chunk in chunks:
+        yield from decoder.feed(chunk)
+    yield from decoder.close()
+
+
+def fold_activity(
+    members: Iterable[tuple[str, Any]], into: dict[str, Any] | None = None
+) -> dict[str, Any]:
+    """Fold activity members into compact per-band arrays.
+
+    Hourly count lists become array("I") (4 bytes per hour instead of a
+    pointer per element); scalar band values and lists that don't fit an
+    unsigned int array are kept as-is.
+    """
+    activity = {} if into is None else into
+    for band, hours in members:
+        if isinstance(hours, list):
+            with contextlib.suppress(TypeError, OverflowError):
+                hours = array("I", hours)
+        activity[band] = hours
+    return activity
+
+
+def fold_matrix(
+    members: Iterable[tuple[str, Any]], into: dict[str, dict[str, int]] | None = None
+) -> dict[str, dict[str, int]]:
+    """Fold DXCC matrix members into {dxcc_id: {band: status}}.
+
+    Band names repeat across every entity, so they are interned once rather
+    than stored as a fresh string per cell.
+    """
+    matrix = {} if into is None else into
+    for dxcc_id, bands in members:
+        if isinstance(bands, dict):
+            matrix[dxcc_id] = {sys.intern(band): status for band, status in bands.items()}
+    return matrix
@@ -41,20 +41,127 @@ if not HA_MQTT_BROKER:
     print("ERROR: HA_MQTT_BROKER is required")
     sys.exit(1)
 
+# MQTT outbox: pending topics kept while the broker is unreachable, messages
+# in flight at once, and messages per second when draining a backlog
+MQTT_QOS = str_to_int(os.environ.get("MQTT_QOS", "0"), 0)
+MQTT_OUTBOX_SIZE = str_to_int(os.environ.get("MQTT_OUTBOX_SIZE", "1000"), 1000)
+MQTT_MAX_INFLIGHT = str_to_int(os.environ.get("MQTT_MAX_INFLIGHT", "20"), 20)
+MQTT_DRAIN_RATE = str_to_int(os.environ.get("MQTT_DRAIN_RATE", "50"), 50)
+
+if MQTT_QOS not in (0, 1, 2):
+    print("ERROR: MQTT_QOS must be 0, 1 or 2")
+    sys.exit(1)
+
+# ClubLog API base URL (point at a local stand-in for load/fault testing)
+CLUBLOG_API_BASE = os.environ.get("CLUBLOG_API_BASE", "https://clublog.org").rstrip("/")
+
 # Polling intervals (seconds)
 MATRIX_INTERVAL = str_to_int(os.environ.get("MATRIX_INTERVAL", "3600"), 3600)
+# Longest matrix interval after repeated fetches with no new upload in watch
+MATRIX_MAX_INTERVAL = str_to_int(os.environ.get("MATRIX_MAX_INTERVAL", "21600"), 21600)
 WATCH_INTERVAL = str_to_int(os.environ.get("WATCH_INTERVAL", "600"), 600)
 MOST_WANTED_INTERVAL = str_to_int(os.environ.get("MOST_WANTED_INTERVAL", "604800"), 604800)
 ACTIVITY_INTERVAL = str_to_int(os.environ.get("ACTIVITY_INTERVAL", "86400"), 86400)
 EXPEDITIONS_INTERVAL = str_to_int(os.environ.get("EXPEDITIONS_INTERVAL", "3600"), 3600)
 LIVESTREAMS_INTERVAL = str_to_int(os.environ.get("LIVESTREAMS_INTERVAL", "600"), 600)
 
+# On-demand refreshes (MQTT command topic <HA_ENTITY_BASE>/refresh/set):
+# none sooner than REFRESH_MIN_INTERVAL after the endpoint's last fetch, and
+# only while fewer than REQUEST_BUDGET ClubLog requests (scheduled ones
+# included) went out in the last hour
+REFRESH_MIN_INTERVAL = str_to_int(os.environ.get("REFRESH_MIN_INTERVAL", "300"), 300)
+REQUEST_BUDGET = str_to_int(os.environ.get("REQUEST_BUDGET", "30"), 30)
+
+if REFRESH_MIN_INTERVAL < 0 or REQUEST_BUDGET < 0:
+    print("ERROR: REFRESH_MIN_INTERVAL and REQUEST_BUDGET must not be negative")
+    sys.exit(1)
+
 # Jitter
 JITTER_FACTOR = 0.1
 
+# Full-history band activity (optional background fetch, cached on disk)
+ACTIVITY_FULL_HISTORY = str_to_bool(os.environ.get("ACTIVITY_FULL_HISTORY", "False"))
+ACTIVITY_FULL_HISTORY_INTERVAL = str_to_int(
+    os.environ.get("ACTIVITY_FULL_HISTORY_INTERVAL", "2592000"), 2592000
+)
+ACTIVITY_FULL_HISTORY_TIMEOUT = str_to_int(
+    os.environ.get("ACTIVITY_FULL_HISTORY_TIMEOUT", "600"), 600
+)
+FULL_HISTORY_RETRY_BASE = 300  # 5 min, doubled per attempt
+FULL_HISTORY_RETRY_ATTEMPTS = 5
+
+# Persistent data (caches) — mount a volume here
+DATA_DIR = os.environ.get("DATA_DIR", "/data")
+
+# Local ADIF log tailed for provisional DXCC updates ("" = disabled), the
+# cty.xml used to resolve logged calls ("" = download to DATA_DIR weekly),
+# and how long a provisional cell waits for ClubLog's matrix to show it
+ADIF_LOG_FILE = os.environ.get("ADIF_LOG_FILE", "").strip()
+CTY_FILE = os.environ.get("CTY_FILE", "").strip()
+ADIF_PROVISIONAL_TTL = str_to_int(os.environ.get("ADIF_PROVISIONAL_TTL", "86400"), 86400)
+# UDP port for WSJT-X / N1MM Logger+ logged-QSO broadcasts (0 = disabled)
+LOGGER_UDP_PORT = str_to_int(os.environ.get("LOGGER_UDP_PORT", "0"), 0)
+LOGGER_UDP_BIND = os.environ.get("LOGGER_UDP_BIND", "0.0.0.0")
+
+if not 0 <= LOGGER_UDP_PORT <= 65535:
+    print("ERROR: LOGGER_UDP_PORT must be between 0 and 65535")
+    sys.exit(1)
+
+# MQTT topic (wildcards allowed) of DX spots or decoded callsigns to check
+# against the DXCC matrix ("" = disabled), and how long a needed station is
+# not reported again
+SPOT_TOPIC = os.environ.get("SPOT_TOPIC", "")
+SPOT_DEDUP_WINDOW = str_to_int(os.environ.get("SPOT_DEDUP_WINDOW", "900"), 900)
+
+if SPOT_DEDUP_WINDOW < 0:
+    print("ERROR: SPOT_DEDUP_WINDOW must not be negative")
+    sys.exit(1)
+
+# Delta-encoded history of each fetch in DATA_DIR/history.db, for the DXCC
+# trend sensor; snapshots older than SNAPSHOT_RETENTION_DAYS are compacted
+SNAPSHOT_HISTORY = str_to_bool(os.environ.get("SNAPSHOT_HISTORY", "False"))
+SNAPSHOT_RETENTION_DAYS = str_to_int(os.environ.get("SNAPSHOT_RETENTION_DAYS", "730"), 730)
+
+if SNAPSHOT_RETENTION_DAYS < 1:
+    print("ERROR: SNAPSHOT_RETENTION_DAYS must be at least 1")
+    sys.exit(1)
+
+# Prometheus/OpenMetrics endpoint (0 = disabled)
+METRICS_PORT = str_to_int(os.environ.get("METRICS_PORT", "0"), 0)
+METRICS_BIND = os.environ.get("METRICS_BIND", "0.0.0.0")
+
+# Read-only local query API over the cached data, on TCP (0 = disabled)
+# and/or a Unix socket ("" = disabled)
+QUERY_API_PORT = str_to_int(os.environ.get("QUERY_API_PORT", "0"), 0)
+QUERY_API_BIND = os.environ.get("QUERY_API_BIND", "0.0.0.0")
+QUERY_API_SOCKET = os.environ.get("QUERY_API_SOCKET", "")
+
+if not 0 <= QUERY_API_PORT <= 65535:
+    print("ERROR: QUERY_API_PORT must be between 0 and 65535")
+    sys.exit(1)
+
+# Profiling: cProfile/tracemalloc the next N fetch cycles (0 = disabled)
+PROFILE_CYCLES = str_to_int(os.environ.get("PROFILE_CYCLES", "0"), 0)
+PROFILE_MODE = os.environ.get("PROFILE_MODE", "cpu").strip().lower()  # cpu|memory|both
+PROFILE_DIR = os.environ.get("PROFILE_DIR", os.path.join(DATA_DIR, "profiles"))
+PROFILE_TOP = str_to_int(os.environ.get("PROFILE_TOP", "15"), 15)
+
+if PROFILE_MODE not in ("cpu", "memory", "both"):
+    print("ERROR: PROFILE_MODE must be cpu, memory or both")
+    sys.exit(1)
+
 # Home Assistant Discovery
 HA_DISCOVERY_PREFIX = os.environ.get("HA_DISCOVERY_PREFIX", "homeassistant")
 HA_ENTITY_BASE = os.environ.get("HA_ENTITY_BASE", "clublog")
+# One JSON state document per endpoint instead of a topic per sensor
+MQTT_GROUPED_STATE = str_to_bool(os.environ.get("MQTT_GROUPED_STATE", "False"))
+# entity: one discovery config per entity (any HA version)
+# device: one config per device on <prefix>/device/<base>/config (HA 2024.11+)
+MQTT_DISCOVERY_MODE = os.environ.get("MQTT_DISCOVERY_MODE", "entity").strip().lower()
+
+if MQTT_DISCOVERY_MODE not in ("entity", "device"):
+    print("ERROR: MQTT_DISCOVERY_MODE must be entity or device")
+    sys.exit(1)
 
 # Debugging
 DEBUG_MODE = str_to_bool(os.environ.get("DEBUG_MODE", "False"))
@@ -0,0 +1,188 @@
+"""Incremental ADIF (.adi) parsing and log file tailing.
+
+Loggers such as WSJT-X append one record per QSO to a plain ADIF file
+that grows without bound. AdifParser consumes bytes as they arrive and
+returns complete records; a partial record at the end of the data is kept
+for the next feed. AdifTailer reads only what was appended since the last
+poll, remembering the byte offset of the last complete record (and the
+file's identity, to notice rotation or truncation), so a multi-hundred-MB
+log is never read twice — and not at all on first start, which begins at
+the end of the file.
+
+Field lengths are taken as byte counts, which is what loggers writing
+ASCII or UTF-8 produce in practice.
+
+This module is shared verbatim between the Docker bridge (clublog_bridge/)
+and the HACS integration (custom_components/clublog/) — keep both copies
+identical.
+"""
+
+from __future__ import annotations
+
+import calendar
+import os
+import time
+from typing import Any
+
+READ_SIZE = 64 * 1024
+# A field claiming more than this is corrupt, not a long comment
+MAX_FIELD = 64 * 1024
+
+
+class AdifParser:
+    """Turn a stream of ADIF bytes into records, one feed at a time."""
+
+    def __init__(self, *, header: bool = True) -> None:
+        """Initialize; header=False when starting past the file header.
+
+        An ADIF file has a header unless it starts with "<"; fields up to
+        <EOH> describe the file, not a QSO.
+        """
+        self._buffer = bytearray()
+        self._start = header  # At the beginning of the file
+        self.consumed = 0  # Bytes up to the end of the last complete record
+
+    @property
+    def pending(self) -> int:
+        """Return the number of bytes held for an incomplete record."""
+        return len(self._buffer)
+
+    def feed(self, data: bytes) -> list[dict[str, str]]:
+        """Add bytes and return the records they complete."""
+        buffer = self._buffer
+        buffer += data
+        if self._start and buffer:
+            self._start = False
+            if not buffer.lstrip().startswith(b"<"):
+                end = buffer.upper().find(b"<EOH>")
+                if end < 0:
+                    self._start = True  # Header not complete yet
+                    return []
+                self._advance(end + 5)
+        records: list[dict[str, str]] = []
+        fields: dict[str, str] = {}
+        pos = boundary = 0
+        while True:
+            lt = buffer.find(b"<", pos)
+            if lt < 0:
+                break
+            gt = buffer.find(b">", lt)
+            if gt < 0:
+                break
+            name, _, spec = bytes(buffer[lt + 1:gt]).partition(b":")
+            name = name.strip().upper()
+            pos = gt + 1
+            if spec:
+                try:
+                    length = int(spec.partition(b":")[0])
+                except ValueError:
+                    continue
+                if not 0 <= length <= MAX_FIELD:
+                    continue
+                if pos + length > len(buffer):
+                    pos = lt
+                    break
+                fields[name.decode("ascii", "replace")] = (
+                    bytes(buffer[pos:pos + length]).decode("utf-8", "replace").strip()
+                )
+                pos += length
+            elif name == b"EOR":
+                records.append(fields)
+                fields = {}
+                boundary = pos
+            elif name == b"EOH":
+                fields = {}
+                boundary = pos
+        self._advance(boundary)
+        return records
+
+    def _advance(self, count: int) -> None:
+        """Drop the first `count` buffered bytes, parsed for good."""
+        del self._buffer[:count]
+        self.consumed += count
+
+
+def qso_time(record: dict[str, str]) -> float | None:
+    """Return a record's QSO_DATE/TIME_ON as epoch seconds (UTC)."""
+    date = record.get("QSO_DATE", "")
+    clock = (record.get("TIME_ON", "") + "000000")[:6]
+    try:
+        parsed = time.strptime(date + clock, "%Y%m%d%H%M%S")
+    except ValueError:
+        return None
+    return float(calendar.timegm(parsed))
+
+
+def frequency(record: dict[str, str]) -> float | None:
+    """Return a record's FREQ in MHz."""
+    try:
+        return float(record["FREQ"])
+    except (KeyError, ValueError):
+        return None
+
+
+class AdifTailer:
+    """Read records appended to an ADIF log since the last poll."""
+
+    def __init__(self, path: str, state: dict[str, Any] | None = None) -> None:
+        """Initialize; state is a previous to_dict() to resume from."""
+        self.path = path
+        self.offset: int | None = None  # None = start at the current end
+        self.identity: tuple[int, int] | None = None
+        if state and state.get("path") == path:
+            try:
+                self.offset = int(state["offset"])
+                identity = state.get("identity")
+                self.identity = (int(identity[0]), int(identity[1])) if identity else None
+            except (KeyError, TypeError, ValueError, IndexError):
+                self.offset = None
+        self._parser: AdifParser | None = None
+
+    def to_dict(self) -> dict[str, Any]:
+        """Serialize the resume position (JSON-compatible)."""
+        return {
+            "path": self.path,
+            "offset": self.offset,
+            "identity": list(self.identity) if self.identity else None,
+        }
+
+    def poll(self, limit: int | None = None) -> list[dict[str, str]]:
+        """Return records appended since the last poll (may be empty).
+
+        limit caps the bytes read per call so a large append is spread over
+        several polls. A missing file yields nothing until it appears.
+        """
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return []
+        identity = (stat.st_dev, stat.st_ino)
+        if self.offset is None:
+            # First start: history is already on ClubLog
+            self._reset(identity, stat.st_size)
+        elif identity != self.identity or stat.st_size < self.offset:
+            # Rotated or truncated: the new file is read from the start
+            self._reset(identity, 0)
+        elif self._parser is None:
+            self._parser = AdifParser(header=self.offset == 0)
+        if stat.st_size <= self.offset + self._parser.pending:
+            return []
+        records: list[dict[str, str]] = []
+        budget = limit if limit is not None else stat.st_size
+        with open(self.path, "rb") as f:
+            f.seek(self.offset + self._parser.pending)
+            while budget > 0:
+                data = f.read(min(READ_SIZE, budget))
+                if not data:
+                    break
+                budget -= len(data)
+                consumed = self._parser.consumed
+                records += self._parser.feed(data)
+                self.offset += self._parser.consumed - consumed
+        return records
+
+    def _reset(self, identity: tuple[int, int], offset: int) -> None:
+        """Start reading a file at `offset`."""
+        self.identity = identity
+        self.offset = offset
+        self._parser = AdifParser(header=offset == 0)
@@ -2,7 +2,6 @@
 
 from __future__ import annotations
 
-import time
 from typing import Any
 
 from homeassistant.components.binary_sensor import (
@@ -70,7 +69,7 @@ class ClubLogApiStatusSensor(CoordinatorEntity[ClubLogCoordinator], BinarySensor
         fetches = self.coordinator.data.last_successful_fetch
         if not fetches:
             return False
-        now = time.time()
+        now = self.coordinator.clock.time()
         return any(now - ts < _STALE_THRESHOLD for ts in fetches.values())
 
     @property
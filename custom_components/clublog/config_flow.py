@@ -7,14 +7,30 @@ import re
 from typing import Any
 
 import voluptuous as vol
-from homeassistant.config_entries import ConfigFlow, ConfigFlowResult
+from homeassistant.config_entries import (
+    ConfigEntry,
+    ConfigFlow,
+    ConfigFlowResult,
+    OptionsFlow,
+)
+from homeassistant.core import callback
 
 from .const import (
+    CLUBLOG_API_BASE,
+    CONF_ACTIVITY_FULL_HISTORY,
+    CONF_API_BASE,
     CONF_API_KEY,
     CONF_APP_PASSWORD,
     CONF_CALLSIGN,
     CONF_EMAIL,
+    CONF_LOGGER_UDP_PORT,
+    CONF_PROFILE_CYCLES,
+    CONF_PROFILE_MODE,
+    CONF_SNAPSHOT_HISTORY,
+    CONF_SPOT_TOPIC,
     DOMAIN,
+    MAX_PROFILE_CYCLES,
+    PROFILE_MODES,
 )
 
 _LOGGER = logging.getLogger(__name__)
@@ -27,6 +43,14 @@ class ClubLogConfigFlow(ConfigFlow, domain=DOMAIN):
 
     VERSION = 1
 
+    @staticmethod
+    @callback
+    def async_get_options_flow(
+        config_entry: ConfigEntry,  # noqa: ARG004
+    ) -> ClubLogOptionsFlow:
+        """Return the options flow handler."""
+        return ClubLogOptionsFlow()
+
     async def async_step_user(
         self, user_input: dict[str, Any] | None = None
     ) -> ConfigFlowResult:
@@ -66,3 +90,50 @@ class ClubLogConfigFlow(ConfigFlow, domain=DOMAIN):
             errors=errors,
         )
 
+
+class ClubLogOptionsFlow(OptionsFlow):
+    """Handle ClubLog options."""
+
+    async def async_step_init(
+        self, user_input: dict[str, Any] | None = None
+    ) -> ConfigFlowResult:
+        """Manage the options."""
+        if user_input is not None:
+            return self.async_create_entry(data=user_input)
+
+        options = self.config_entry.options
+        return self.async_show_form(
+            step_id="init",
+            data_schema=vol.Schema(
+                {
+                    vol.Optional(
+                        CONF_ACTIVITY_FULL_HISTORY,
+                        default=options.get(CONF_ACTIVITY_FULL_HISTORY, False),
+                    ): bool,
+                    vol.Optional(
+                        CONF_PROFILE_CYCLES,
+                        default=options.get(CONF_PROFILE_CYCLES, 0),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=0, max=MAX_PROFILE_CYCLES)),
+                    vol.Optional(
+                        CONF_PROFILE_MODE,
+                        default=options.get(CONF_PROFILE_MODE, PROFILE_MODES[0]),
+                    ): vol.In(PROFILE_MODES),
+                    vol.Optional(
+                        CONF_LOGGER_UDP_PORT,
+                        default=options.get(CONF_LOGGER_UDP_PORT, 0),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=0, max=65535)),
+                    vol.Optional(
+                        CONF_SPOT_TOPIC,
+                        default=options.get(CONF_SPOT_TOPIC, ""),
+                    ): str,
+                    vol.Optional(
+                        CONF_SNAPSHOT_HISTORY,
+                        default=options.get(CONF_SNAPSHOT_HISTORY, False),
+                    ): bool,
+                    vol.Optional(
+                        CONF_API_BASE,
+                        default=options.get(CONF_API_BASE, CLUBLOG_API_BASE),
+                    ): vol.Url(),
+                }
+            ),
+        )
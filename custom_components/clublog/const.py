@@ -20,6 +20,7 @@ CLUBLOG_ACTIVITY_ENDPOINT = "/activity_json.php"
 CLUBLOG_EXPEDITIONS_ENDPOINT = "/expeditions.php"
 CLUBLOG_LIVESTREAMS_ENDPOINT = "/livestreams.php"
 CLUBLOG_DXCC_ENDPOINT = "/dxcc"
+CLUBLOG_CTY_ENDPOINT = "/cty.php"
 
 # Configuration keys
 CONF_API_KEY = "api_key"
@@ -27,6 +28,15 @@ CONF_EMAIL = "email"
 CONF_APP_PASSWORD = "app_password"
 CONF_CALLSIGN = "callsign"
 
+# Options
+CONF_ACTIVITY_FULL_HISTORY = "activity_full_history"
+CONF_API_BASE = "api_base"
+CONF_PROFILE_CYCLES = "profile_cycles"
+CONF_PROFILE_MODE = "profile_mode"
+CONF_LOGGER_UDP_PORT = "logger_udp_port"
+CONF_SPOT_TOPIC = "spot_topic"
+CONF_SNAPSHOT_HISTORY = "snapshot_history"
+
 # Polling intervals (seconds)
 CONF_MATRIX_INTERVAL = "matrix_interval"
 CONF_WATCH_INTERVAL = "watch_interval"
@@ -37,12 +47,54 @@ CONF_LIVESTREAMS_INTERVAL = "livestreams_interval"
 
 # Defaults
 DEFAULT_MATRIX_INTERVAL = 3600  # 60 min (API cache is 60 min)
+DEFAULT_MATRIX_MAX_INTERVAL = 21600  # 6 h — backed off while no uploads are seen
 DEFAULT_WATCH_INTERVAL = 600  # 10 min
 DEFAULT_MOST_WANTED_INTERVAL = 604800  # Weekly (per G7VJR)
 DEFAULT_ACTIVITY_INTERVAL = 86400  # Daily (per G7VJR — updated few times/year)
 DEFAULT_EXPEDITIONS_INTERVAL = 3600  # 60 min
 DEFAULT_LIVESTREAMS_INTERVAL = 600  # 10 min
 
+# Full-history band activity (optional background fetch)
+FULL_HISTORY_INTERVAL = 2592000  # 30 days
+FULL_HISTORY_TIMEOUT = 600  # 10 min — full history 504s inside 30 s
+FULL_HISTORY_RETRY_BASE = 300  # 5 min, doubled per attempt
+FULL_HISTORY_RETRY_ATTEMPTS = 5
+
+# Logged QSOs from WSJT-X / N1MM over UDP (opt-in via options)
+LOGGER_UDP_BIND = "0.0.0.0"
+PROVISIONAL_TTL = 86400  # Provisional cells wait a day for the matrix to show them
+CTY_INTERVAL = 604800  # cty.xml refreshed weekly
+CTY_FILE = "clublog_cty.xml"  # Under the HA config directory
+CTY_LOAD_TIMEOUT = 30  # needed_for_call waits this long for a first cty.xml
+EVENT_NEW_SLOT = f"{DOMAIN}_new_slot"
+
+# Needed-spot alerts from an MQTT spot topic (opt-in via options)
+SPOT_DEDUP_WINDOW = 900  # A needed station is reported once per 15 min
+EVENT_NEEDED_SPOT = f"{DOMAIN}_needed_spot"
+
+# Delta-encoded history of each fetch (opt-in via options), for trends
+SNAPSHOT_FILE = "clublog_history_{}.db"  # Per entry, under the HA config directory
+SNAPSHOT_RETENTION = 730 * 86400  # 2 years
+
+# Response services answering lookups from the in-memory indexes
+SERVICE_LOOKUP_SLOT = "lookup_slot"
+SERVICE_LOOKUP_RANK = "lookup_rank"
+SERVICE_NEEDED_FOR_CALL = "needed_for_call"
+
+# On-demand refresh service, limited so automations cannot trip a 403
+SERVICE_REFRESH = "refresh"
+REFRESH_MIN_INTERVAL = 300  # 5 min since the endpoint's last fetch
+REQUEST_BUDGET = 30  # ClubLog requests per window, scheduled ones included
+REQUEST_BUDGET_WINDOW = 3600  # 1 hour
+
+# Profiling (opt-in via options; output under the HA config directory)
+PROFILE_DIR = "clublog_profiles"
+PROFILE_MODES = ["cpu", "memory", "both"]
+MAX_PROFILE_CYCLES = 100
+
+# Persistent storage
+STORAGE_VERSION = 1
+
 # DXCC matrix mode values
 DXCC_MODE_ALL = 0
 DXCC_MODE_CW = 1
@@ -2,42 +2,124 @@
 
 from __future__ import annotations
 
+import asyncio
+import contextlib
 import logging
+import os
 import random
-import time
+import sqlite3
+import xml.etree.ElementTree as ET
+from collections.abc import Callable
+from contextlib import nullcontext
 from dataclasses import dataclass, field
 from datetime import timedelta
 from typing import Any
 
-from aiohttp import ClientResponseError
+from aiohttp import ClientError, ClientResponseError, ClientTimeout
+from homeassistant.components import mqtt
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.helpers.storage import Store
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
 
+from .activity_history import ActivityHistory, retry_delays
+from .band_analytics import BandActivityGrid
 from .const import (
     CLUBLOG_ACTIVITY_ENDPOINT,
     CLUBLOG_API_BASE,
+    CLUBLOG_CTY_ENDPOINT,
     CLUBLOG_EXPEDITIONS_ENDPOINT,
     CLUBLOG_LIVESTREAMS_ENDPOINT,
     CLUBLOG_MATRIX_ENDPOINT,
     CLUBLOG_MOST_WANTED_ENDPOINT,
     CLUBLOG_WATCH_ENDPOINT,
+    CONF_ACTIVITY_FULL_HISTORY,
+    CONF_API_BASE,
     CONF_API_KEY,
     CONF_APP_PASSWORD,
     CONF_CALLSIGN,
     CONF_EMAIL,
+    CONF_LOGGER_UDP_PORT,
+    CONF_PROFILE_CYCLES,
+    CONF_PROFILE_MODE,
+    CONF_SNAPSHOT_HISTORY,
+    CONF_SPOT_TOPIC,
+    CTY_FILE,
+    CTY_INTERVAL,
+    CTY_LOAD_TIMEOUT,
     DEFAULT_ACTIVITY_INTERVAL,
     DEFAULT_EXPEDITIONS_INTERVAL,
     DEFAULT_LIVESTREAMS_INTERVAL,
     DEFAULT_MATRIX_INTERVAL,
+    DEFAULT_MATRIX_MAX_INTERVAL,
     DEFAULT_MOST_WANTED_INTERVAL,
     DEFAULT_WATCH_INTERVAL,
     DOMAIN,
+    EVENT_NEEDED_SPOT,
+    EVENT_NEW_SLOT,
+    FULL_HISTORY_INTERVAL,
+    FULL_HISTORY_RETRY_ATTEMPTS,
+    FULL_HISTORY_RETRY_BASE,
+    FULL_HISTORY_TIMEOUT,
     JITTER_FACTOR,
+    LOGGER_UDP_BIND,
     MIN_COORDINATOR_INTERVAL,
+    PROFILE_DIR,
+    PROVISIONAL_TTL,
+    REFRESH_MIN_INTERVAL,
+    REQUEST_BUDGET,
+    REQUEST_BUDGET_WINDOW,
+    SNAPSHOT_FILE,
+    SNAPSHOT_RETENTION,
+    SPOT_DEDUP_WINDOW,
+    STORAGE_VERSION,
     USER_AGENT,
 )
+from .dxcc import CtyDatabase, ProvisionalCell, ProvisionalMatrix
+from .fetch_timing import FetchHistory, FetchTimer
+from .loggers import decode_datagram, overlay_record
+from .lookup import LookupIndex
+from .models import (
+    Expedition,
+    LazyMostWanted,
+    LazyRows,
+    Livestream,
+    Watch,
+    decode_watch,
+    lazy_expeditions,
+    lazy_livestreams,
+)
+from .profiling import CycleProfiler
+from .scheduling import (
+    REFRESH_ACCEPTED,
+    REFRESH_BACKOFF,
+    REFRESH_COALESCED,
+    Clock,
+    MatrixRefresh,
+    RefreshGate,
+    RequestBudget,
+    jittered,
+    next_due,
+)
+from .snapshots import (
+    STATISTIC_PERIOD,
+    SnapshotStore,
+    dxcc_trend,
+    expeditions_state,
+    hourly_progress,
+    matrix_state,
+    most_wanted_state,
+    watch_state,
+)
+from .spots import NeededSpot, SpotMatcher, parse_spot
+from .statistics import async_import_progress
+from .streaming import (
+    STREAM_CHUNK_SIZE,
+    ObjectStreamDecoder,
+    fold_activity,
+    fold_matrix,
+)
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -48,6 +130,10 @@ ENDPOINT_MOST_WANTED = "most_wanted"
 ENDPOINT_EXPEDITIONS = "expeditions"
 ENDPOINT_LIVESTREAMS = "livestreams"
 ENDPOINT_ACTIVITY = "activity"
+# Background full-history fetch — timed, but not part of the polling cycle
+ENDPOINT_ACTIVITY_FULL = "activity_full"
+# cty.xml download — weekly, outside the polling cycle
+ENDPOINT_CTY = "cty"
 
 # Map endpoint names to their configured intervals
 ENDPOINT_INTERVALS = {
@@ -60,44 +146,60 @@ ENDPOINT_INTERVALS = {
 }
 
 
-def _jittered_interval(base: float) -> float:
-    """Apply jitter to an interval: base ± JITTER_FACTOR * base."""
-    jitter = base * JITTER_FACTOR
-    return base + random.uniform(-jitter, jitter)
-
-
 @dataclass
 class ClubLogData:
     """Data class for ClubLog coordinator."""
 
-    # DXCC matrix: {dxcc_id: {band: status}}
+    # DXCC matrix: {dxcc_id: {band: status}}, with provisional cells as worked
     dxcc_matrix: dict[str, dict[str, int]] = field(default_factory=dict)
 
-    # Watch data
-    watch: dict[str, Any] = field(default_factory=dict)
+    # Cells logged locally that the last matrix fetch did not show yet
+    dxcc_provisional: list[ProvisionalCell] = field(default_factory=list)
+
+    # Needed spots reported within the dedup window, newest first
+    needed_spots: list[NeededSpot] = field(default_factory=list)
+
+    # Hash indexes over the matrix and most wanted, rebuilt on each fetch
+    lookup: LookupIndex = field(default_factory=LookupIndex)
 
-    # Most wanted list: {rank: adif_id}
-    most_wanted: dict[str, Any] = field(default_factory=dict)
+    # Watch data (None until fetched or if the response was empty)
+    watch: Watch | None = None
 
-    # Active expeditions: [[call, date, count], ...]
-    expeditions: list[list[Any]] = field(default_factory=list)
+    # Most wanted list, ordered by rank (top 10 decoded, rest on demand)
+    most_wanted: LazyMostWanted = field(default_factory=lambda: LazyMostWanted(b""))
 
-    # Livestreams: [[call, dxcc, date, url], ...]
-    livestreams: list[list[Any]] = field(default_factory=list)
+    # Active expeditions (first 20 decoded, rest on demand)
+    expeditions: LazyRows[Expedition] = field(default_factory=lazy_expeditions)
 
-    # Activity: {band: [hourly_counts]}
+    # Livestreams (first 20 decoded, rest on demand)
+    livestreams: LazyRows[Livestream] = field(default_factory=lazy_livestreams)
+
+    # Activity: {band: array("I") of hourly counts}
     activity: dict[str, Any] = field(default_factory=dict)
 
+    # Bands x 24 grid built from activity once per fetch (peak hours, rankings)
+    activity_grid: BandActivityGrid | None = None
+
+    # All-time activity (full history merged with lastyear=1), if enabled
+    activity_all_time: dict[str, Any] = field(default_factory=dict)
+    activity_all_time_fetched: float | None = None
+
     # Computed DXCC stats
     dxcc_worked_total: int = 0
     dxcc_confirmed_total: int = 0
     dxcc_verified_total: int = 0
 
+    # DXCC growth from the snapshot history (None when disabled or empty)
+    dxcc_trend: dict[str, Any] | None = None
+
     # Health tracking
     last_successful_fetch: dict[str, float] = field(default_factory=dict)
     consecutive_errors: dict[str, int] = field(default_factory=dict)
     last_error: dict[str, str] = field(default_factory=dict)
 
+    # Per-endpoint timing ring buffers (latency, size, decode, processing)
+    fetch_timing: FetchHistory = field(default_factory=FetchHistory)
+
 
 class ClubLogCoordinator(DataUpdateCoordinator[ClubLogData]):
     """Coordinator for ClubLog API polling.
@@ -107,8 +209,19 @@ class ClubLogCoordinator(DataUpdateCoordinator[ClubLogData]):
     Only endpoints whose interval has elapsed are fetched each cycle.
     """
 
-    def __init__(self, hass: HomeAssistant, entry: ConfigEntry) -> None:
-        """Initialize the coordinator."""
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        entry: ConfigEntry,
+        *,
+        clock: Clock | None = None,
+        rng: random.Random | None = None,
+    ) -> None:
+        """Initialize the coordinator.
+
+        clock and rng default to the system clock and an unseeded RNG; the
+        simulation harness passes a SimulatedClock and a seeded RNG.
+        """
         super().__init__(
             hass,
             _LOGGER,
@@ -120,14 +233,22 @@ class ClubLogCoordinator(DataUpdateCoordinator[ClubLogData]):
         self._api_key = entry.data[CONF_API_KEY]
         self._email = entry.data[CONF_EMAIL]
         self._app_password = entry.data[CONF_APP_PASSWORD]
+        self._api_base = entry.options.get(CONF_API_BASE, CLUBLOG_API_BASE).rstrip("/")
+        self.clock = clock or Clock()
+        self._rng = rng or random.Random()
 
         # Per-endpoint next-fetch timestamps — all due immediately on first cycle.
         # Sequential async fetches within one cycle already avoid API burst.
-        now = time.monotonic()
+        now = self.clock.monotonic()
         self._next_fetch: dict[str, float] = {}
         for endpoint in ENDPOINT_INTERVALS:
             self._next_fetch[endpoint] = now
 
+        # Matrix refreshed soon after an upload shows up in watch, backed off otherwise
+        self._matrix_refresh = MatrixRefresh(
+            DEFAULT_MATRIX_INTERVAL, DEFAULT_MATRIX_MAX_INTERVAL
+        )
+
         # Persistent data across partial updates
         self._data = ClubLogData()
 
@@ -135,9 +256,55 @@ class ClubLogCoordinator(DataUpdateCoordinator[ClubLogData]):
         self._backoff_until: float = 0.0  # monotonic timestamp; 0 = not in backoff
         self._backoff_duration: float = 3600.0  # 1 hour
 
+        # One request in flight per endpoint; on-demand refreshes limited
+        self._inflight: dict[str, asyncio.Task[bool | None]] = {}
+        self._refresh_gate = RefreshGate(
+            RequestBudget(REQUEST_BUDGET, REQUEST_BUDGET_WINDOW), REFRESH_MIN_INTERVAL
+        )
+
+        # Optional full-history activity, fetched in the background
+        self._full_history_enabled = entry.options.get(
+            CONF_ACTIVITY_FULL_HISTORY, False
+        )
+        self._history_store: Store[dict[str, Any]] = Store(
+            hass, STORAGE_VERSION, f"{DOMAIN}.{entry.entry_id}.activity_history"
+        )
+        self._history: ActivityHistory | None = None
+
+        # Optional logged-QSO listener; cells stay provisional until the matrix shows them
+        self._logger_port: int = entry.options.get(CONF_LOGGER_UDP_PORT, 0)
+        self._provisional = ProvisionalMatrix(PROVISIONAL_TTL)
+        self._provisional_store: Store[list[dict[str, Any]]] = Store(
+            hass, STORAGE_VERSION, f"{DOMAIN}.{entry.entry_id}.provisional"
+        )
+        self._cty: CtyDatabase | None = None
+        # (source, records) received before cty.xml loaded, applied once it has
+        self._unresolved: list[tuple[str, list[dict[str, str]]]] = []
+        self._cty_loaded = asyncio.Event()
+        self._cty_task: asyncio.Task[None] | None = None
+
+        # Optional needed-spot matching on an MQTT spot topic
+        self._spot_topic: str = entry.options.get(CONF_SPOT_TOPIC, "")
+        self._spots = SpotMatcher(SPOT_DEDUP_WINDOW) if self._spot_topic else None
+
+        # Optional delta-encoded history of each fetch, opened at setup
+        self._snapshot_history: bool = entry.options.get(CONF_SNAPSHOT_HISTORY, False)
+        self._snapshots: SnapshotStore | None = None
+        # Start of the hour long-term statistics were last imported from
+        self._statistics_imported = 0.0
+
+        # Optional profiling of the next N fetch cycles (None when off)
+        self._profiler: CycleProfiler | None = None
+        if cycles := entry.options.get(CONF_PROFILE_CYCLES, 0):
+            self._profiler = CycleProfiler(
+                hass.config.path(PROFILE_DIR),
+                cycles,
+                entry.options.get(CONF_PROFILE_MODE, "cpu"),
+            )
+
     async def _async_update_data(self) -> ClubLogData:
         """Fetch data from ClubLog API endpoints that are due."""
-        now = time.monotonic()
+        now = self.clock.monotonic()
 
         # 403 circuit breaker — skip all fetches during backoff
         if self._backoff_until > now:
@@ -148,9 +315,6 @@ class ClubLogCoordinator(DataUpdateCoordinator[ClubLogData]):
             )
             return self._data
 
-        session = async_get_clientsession(self.hass)
-        headers = {"User-Agent": USER_AGENT}
-
         any_success = False
         any_attempted = False
 
@@ -160,51 +324,23 @@ class ClubLogCoordinator(DataUpdateCoordinator[ClubLogData]):
                 continue
 
             any_attempted = True
-            interval = ENDPOINT_INTERVALS[endpoint]
+            ok = await self._start_fetch(endpoint)
+            if ok is None:
+                break  # 403: every endpoint was pushed past the backoff
+            any_success = any_success or ok
 
-            try:
-                await self._fetch_endpoint(session, headers, endpoint)
-                self._data.last_successful_fetch[endpoint] = time.time()
-                self._data.consecutive_errors[endpoint] = 0
-                self._data.last_error.pop(endpoint, None)
-                any_success = True
-                _LOGGER.debug("Fetched %s successfully", endpoint)
-            except ClientResponseError as err:
-                if err.status == 403:
-                    _LOGGER.error(
-                        "HTTP 403 from %s — ceasing ALL requests for %d minutes. "
-                        "Check credentials and rate limits.",
-                        endpoint,
-                        int(self._backoff_duration / 60),
-                    )
-                    self._backoff_until = now + self._backoff_duration
-                    # Push all endpoints past the backoff window
-                    for i, ep in enumerate(self._next_fetch):
-                        self._next_fetch[ep] = self._backoff_until + (i * 5)
-                    self._data.last_error[endpoint] = "HTTP 403 — requests paused"
-                    break
-                prev_errors = self._data.consecutive_errors.get(endpoint, 0)
-                self._data.consecutive_errors[endpoint] = prev_errors + 1
-                self._data.last_error[endpoint] = str(err)
-                _LOGGER.warning(
-                    "Error fetching %s (attempt %d): %s",
-                    endpoint,
-                    prev_errors + 1,
-                    err,
-                )
-            except Exception as err:
-                prev_errors = self._data.consecutive_errors.get(endpoint, 0)
-                self._data.consecutive_errors[endpoint] = prev_errors + 1
-                self._data.last_error[endpoint] = str(err)
-                _LOGGER.warning(
-                    "Error fetching %s (attempt %d): %s",
-                    endpoint,
-                    prev_errors + 1,
-                    err,
-                )
+            # Schedule next fetch with jitter regardless of success/failure,
+            # anchored to when it was due so tick delays do not add up
+            self._next_fetch[endpoint] = next_due(
+                next_time, now, self._interval(endpoint), JITTER_FACTOR, self._rng
+            )
 
-            # Schedule next fetch with jitter regardless of success/failure
-            self._next_fetch[endpoint] = now + _jittered_interval(interval)
+        self._apply_matrix_refresh()
+
+        if self._profiler:
+            await self.hass.async_add_executor_job(self._profiler.end_cycle)
+            if not self._profiler.active:
+                self._profiler = None
 
         # Only raise UpdateFailed if we attempted fetches and ALL failed
         if any_attempted and not any_success:
@@ -217,10 +353,119 @@ class ClubLogCoordinator(DataUpdateCoordinator[ClubLogData]):
 
         return self._data
 
+    def _apply_matrix_refresh(self) -> None:
+        """Pull the matrix fetch forward if watch showed an upload."""
+        refresh_at = self._matrix_refresh.take_refresh()
+        if refresh_at is not None:
+            self._next_fetch[ENDPOINT_MATRIX] = min(
+                self._next_fetch[ENDPOINT_MATRIX], max(refresh_at, self._backoff_until)
+            )
+
+    def _interval(self, endpoint: str) -> float:
+        """Return an endpoint's current polling interval."""
+        if endpoint == ENDPOINT_MATRIX:
+            return self._matrix_refresh.interval
+        return ENDPOINT_INTERVALS[endpoint]
+
+    def _start_fetch(self, endpoint: str) -> asyncio.Task[bool | None]:
+        """Fetch an endpoint, sharing one request among concurrent callers."""
+        task = self._inflight.get(endpoint)
+        if task is None:
+            task = self.hass.async_create_task(self._async_fetch_recorded(endpoint))
+            self._inflight[endpoint] = task
+            task.add_done_callback(lambda _: self._inflight.pop(endpoint, None))
+        return task
+
+    async def _async_fetch_recorded(self, endpoint: str) -> bool | None:
+        """Fetch one endpoint and record the outcome in health tracking.
+
+        Return True on success, False on failure and None on HTTP 403,
+        after opening the circuit breaker.
+        """
+        now = self.clock.monotonic()
+        self._refresh_gate.fetched(endpoint, now)
+        session = async_get_clientsession(self.hass)
+        headers = {"User-Agent": USER_AGENT}
+        try:
+            with self._profiler.endpoint(endpoint) if self._profiler else nullcontext():
+                await self._fetch_endpoint(session, headers, endpoint)
+        except ClientResponseError as err:
+            if err.status == 403:
+                _LOGGER.error(
+                    "HTTP 403 from %s — ceasing ALL requests for %d minutes. "
+                    "Check credentials and rate limits.",
+                    endpoint,
+                    int(self._backoff_duration / 60),
+                )
+                self._backoff_until = now + self._backoff_duration
+                # Push all endpoints past the backoff window
+                for i, ep in enumerate(self._next_fetch):
+                    self._next_fetch[ep] = self._backoff_until + (i * 5)
+                self._refresh_gate.clear()
+                self._data.last_error[endpoint] = "HTTP 403 — requests paused"
+                return None
+            self._record_error(endpoint, err)
+            return False
+        except Exception as err:
+            self._record_error(endpoint, err)
+            return False
+        self._data.last_successful_fetch[endpoint] = self.clock.time()
+        self._data.consecutive_errors[endpoint] = 0
+        self._data.last_error.pop(endpoint, None)
+        _LOGGER.debug("Fetched %s successfully", endpoint)
+        return True
+
+    def _record_error(self, endpoint: str, err: Exception) -> None:
+        """Count a failed fetch."""
+        prev_errors = self._data.consecutive_errors.get(endpoint, 0)
+        self._data.consecutive_errors[endpoint] = prev_errors + 1
+        self._data.last_error[endpoint] = str(err)
+        _LOGGER.warning(
+            "Error fetching %s (attempt %d): %s",
+            endpoint,
+            prev_errors + 1,
+            err,
+        )
+
+    async def async_refresh_endpoints(self, endpoints: list[str]) -> dict[str, str]:
+        """Fetch endpoints now, on demand; return a REFRESH_* outcome for each.
+
+        A refresh shares any request already in flight for its endpoint,
+        and is refused during the 403 backoff, within REFRESH_MIN_INTERVAL
+        of the endpoint's last fetch, or once the request budget is spent.
+        """
+        now = self.clock.monotonic()
+        if self._backoff_until > now:
+            return dict.fromkeys(endpoints, REFRESH_BACKOFF)
+        outcomes: dict[str, str] = {}
+        tasks: list[asyncio.Task[bool | None]] = []
+        for endpoint in endpoints:
+            if endpoint in self._inflight:
+                outcomes[endpoint] = REFRESH_COALESCED
+                tasks.append(self._inflight[endpoint])
+                continue
+            outcomes[endpoint] = self._refresh_gate.request(endpoint, now)
+            if outcomes[endpoint] == REFRESH_ACCEPTED:
+                tasks.append(self._start_fetch(endpoint))
+        if not tasks:
+            return outcomes
+        results = await asyncio.gather(*tasks)
+        if None not in results:  # After a 403 everything waits out the backoff
+            now = self.clock.monotonic()
+            for endpoint, outcome in outcomes.items():
+                if outcome == REFRESH_ACCEPTED:
+                    self._next_fetch[endpoint] = now + jittered(
+                        self._interval(endpoint), JITTER_FACTOR, self._rng
+                    )
+            self._apply_matrix_refresh()
+        _LOGGER.debug("On-demand refresh: %s", outcomes)
+        self.async_set_updated_data(self._data)
+        return outcomes
+
     async def _fetch_endpoint(
         self, session: Any, headers: dict[str, str], endpoint: str
     ) -> None:
-        """Dispatch fetch to the appropriate endpoint handler."""
+        """Dispatch fetch to the appropriate endpoint handler, timing it."""
         handlers = {
             ENDPOINT_MATRIX: self._fetch_matrix,
             ENDPOINT_WATCH: self._fetch_watch,
@@ -229,9 +474,17 @@ class ClubLogCoordinator(DataUpdateCoordinator[ClubLogData]):
             ENDPOINT_LIVESTREAMS: self._fetch_livestreams,
             ENDPOINT_ACTIVITY: self._fetch_activity,
         }
-        await handlers[endpoint](session, headers)
+        timer = FetchTimer(wall=self.clock.time)
+        ok = False
+        try:
+            await handlers[endpoint](session, headers, timer)
+            ok = True
+        finally:
+            self._data.fetch_timing.record(endpoint, timer.sample(ok))
 
-    async def _fetch_matrix(self, session: Any, headers: dict[str, str]) -> None:
+    async def _fetch_matrix(
+        self, session: Any, headers: dict[str, str], timer: FetchTimer
+    ) -> None:
         """Fetch DXCC matrix and compute stats."""
         params = {
             "call": self._callsign,
@@ -242,14 +495,105 @@ class ClubLogCoordinator(DataUpdateCoordinator[ClubLogData]):
             "date": "0",
             "sat": "0",
         }
-        url = f"{CLUBLOG_API_BASE}{CLUBLOG_MATRIX_ENDPOINT}"
+        url = f"{self._api_base}{CLUBLOG_MATRIX_ENDPOINT}"
+        matrix: dict[str, dict[str, int]] = {}
         async with session.get(url, params=params, headers=headers) as resp:
+            timer.response()
             resp.raise_for_status()
-            matrix = await resp.json(content_type=None)
+            decoder = ObjectStreamDecoder()
+            async for chunk in resp.content.iter_chunked(STREAM_CHUNK_SIZE):
+                timer.received(len(chunk))
+                with timer.decoding():
+                    fold_matrix(decoder.feed(chunk), matrix)
+            with timer.decoding():
+                fold_matrix(decoder.close(), matrix)
+
+        await self._async_record(ENDPOINT_MATRIX, matrix_state, matrix)
+        with timer.processing_step():
+            if self._logger_port:
+                confirmed = self._provisional.reconcile(matrix, self.clock.time())
+                if confirmed:
+                    _LOGGER.debug("Matrix fetch showed %d provisional cells", confirmed)
+                self._provisional_store.async_delay_save(self._provisional.to_list, 10)
+                matrix = self._provisional.merged()
+            self._set_matrix(matrix)
+        self._matrix_refresh.matrix_fetched(self.clock.monotonic())
+
+    # ------------------------------------------------------------------
+    # Snapshot history (trends)
+    # ------------------------------------------------------------------
+
+    async def async_start_snapshots(self) -> None:
+        """Open the snapshot history if enabled in options."""
+        if not self._snapshot_history:
+            return
+        path = self.hass.config.path(SNAPSHOT_FILE.format(self.entry.entry_id))
+        try:
+            store = await self.hass.async_add_executor_job(
+                SnapshotStore, path, SNAPSHOT_RETENTION
+            )
+        except sqlite3.Error as err:
+            _LOGGER.error("Cannot open the snapshot history %s: %s", path, err)
+            return
+        self._snapshots = store
+        self._data.dxcc_trend = await self.hass.async_add_executor_job(
+            dxcc_trend, store, self.clock.time()
+        )
+        self.entry.async_on_unload(lambda: self.hass.async_add_executor_job(store.close))
+        await self._async_import_statistics()  # Backfill the whole history
 
+    async def _async_record(
+        self, endpoint: str, state_fn: Callable[[Any], dict[str, int]], value: Any
+    ) -> None:
+        """Record a fetch in the snapshot history, if enabled."""
+        if not self._snapshots:
+            return
+        try:
+            trend = await self.hass.async_add_executor_job(
+                self._record, endpoint, state_fn, value
+            )
+        except sqlite3.Error as err:
+            _LOGGER.warning("Failed to record %s in the snapshot history: %s", endpoint, err)
+            return
+        if endpoint == ENDPOINT_MATRIX:
+            self._data.dxcc_trend = trend
+            await self._async_import_statistics()
+
+    async def _async_import_statistics(self) -> None:
+        """Write DXCC progress since the last import to long-term statistics."""
+        if "recorder" not in self.hass.config.components:
+            return
+        now = self.clock.time()
+        try:
+            progress = await self.hass.async_add_executor_job(
+                hourly_progress, self._snapshots, self._statistics_imported, now
+            )
+        except sqlite3.Error as err:
+            _LOGGER.warning("Failed to read the snapshot history: %s", err)
+            return
+        async_import_progress(self.hass, self._callsign, progress)
+        self._statistics_imported = now - now % STATISTIC_PERIOD
+
+    def _record(
+        self, endpoint: str, state_fn: Callable[[Any], dict[str, int]], value: Any
+    ) -> dict[str, Any] | None:
+        """Store one snapshot (executor); return the DXCC trend after a matrix."""
+        now = self.clock.time()
+        self._snapshots.record(endpoint, state_fn(value), now)
+        return dxcc_trend(self._snapshots, now) if endpoint == ENDPOINT_MATRIX else None
+
+    def _set_matrix(self, matrix: dict[str, dict[str, int]]) -> None:
+        """Adopt a matrix (provisional cells merged in) and its stats."""
         self._data.dxcc_matrix = matrix
+        self._data.dxcc_provisional = list(self._provisional.cells.values())
+        self._data.lookup = self._data.lookup.with_matrix(matrix)
+        self._compute_dxcc_stats(matrix)
+        if self._spots:
+            self._spots.load(matrix)
+            self._data.needed_spots = self._spots.recent(self.clock.time())
 
-        # Compute stats from matrix
+    def _compute_dxcc_stats(self, matrix: dict[str, dict[str, int]]) -> None:
+        """Compute worked/confirmed/verified totals from the matrix."""
         # ClubLog status values: 1=confirmed, 2=worked (not confirmed), 3=verified (LoTW)
         worked = set()
         confirmed = set()
@@ -266,43 +610,421 @@ class ClubLogCoordinator(DataUpdateCoordinator[ClubLogData]):
         self._data.dxcc_confirmed_total = len(confirmed)
         self._data.dxcc_verified_total = len(verified)
 
-    async def _fetch_watch(self, session: Any, headers: dict[str, str]) -> None:
-        """Fetch watch/monitor data."""
-        params = {"call": self._callsign, "api": self._api_key}
-        url = f"{CLUBLOG_API_BASE}{CLUBLOG_WATCH_ENDPOINT}"
+    async def _read_body(
+        self,
+        session: Any,
+        url: str,
+        params: dict[str, str],
+        headers: dict[str, str],
+        timer: FetchTimer,
+    ) -> bytes:
+        """GET url and return the whole body, timing headers and size."""
         async with session.get(url, params=params, headers=headers) as resp:
+            timer.response()
             resp.raise_for_status()
-            self._data.watch = await resp.json(content_type=None) or {}
+            body = await resp.read()
+        timer.received(len(body))
+        return body
 
-    async def _fetch_most_wanted(self, session: Any, headers: dict[str, str]) -> None:
+    async def _fetch_watch(
+        self, session: Any, headers: dict[str, str], timer: FetchTimer
+    ) -> None:
+        """Fetch watch/monitor data."""
+        params = {"call": self._callsign, "api": self._api_key}
+        url = f"{self._api_base}{CLUBLOG_WATCH_ENDPOINT}"
+        body = await self._read_body(session, url, params, headers, timer)
+        with timer.decoding():
+            self._data.watch = decode_watch(body)
+        watch = self._data.watch
+        await self._async_record(ENDPOINT_WATCH, watch_state, watch)
+        if watch and self._matrix_refresh.watch_fetched(
+            watch.last_upload, watch.total_qsos, self.clock.monotonic()
+        ):
+            _LOGGER.debug("New upload seen (%s) — refreshing the DXCC matrix", watch.last_upload)
+
+    async def _fetch_most_wanted(
+        self, session: Any, headers: dict[str, str], timer: FetchTimer
+    ) -> None:
         """Fetch most wanted list (no auth required)."""
-        url = f"{CLUBLOG_API_BASE}{CLUBLOG_MOST_WANTED_ENDPOINT}"
-        async with session.get(url, params={"api": "1"}, headers=headers) as resp:
-            resp.raise_for_status()
-            self._data.most_wanted = await resp.json(content_type=None) or {}
+        url = f"{self._api_base}{CLUBLOG_MOST_WANTED_ENDPOINT}"
+        body = await self._read_body(session, url, {"api": "1"}, headers, timer)
+        with timer.decoding():
+            self._data.most_wanted = LazyMostWanted(body)
+        with timer.processing_step():
+            # The lookup index ranks every entity, so it needs the full list
+            self._data.lookup = self._data.lookup.with_most_wanted(
+                self._data.most_wanted.full()
+            )
+        await self._async_record(
+            ENDPOINT_MOST_WANTED,
+            lambda wanted: most_wanted_state(wanted.full()),
+            self._data.most_wanted,
+        )
 
-    async def _fetch_expeditions(self, session: Any, headers: dict[str, str]) -> None:
+    async def _fetch_expeditions(
+        self, session: Any, headers: dict[str, str], timer: FetchTimer
+    ) -> None:
         """Fetch active expeditions (no auth required)."""
-        url = f"{CLUBLOG_API_BASE}{CLUBLOG_EXPEDITIONS_ENDPOINT}"
-        async with session.get(url, params={"api": "1"}, headers=headers) as resp:
-            resp.raise_for_status()
-            self._data.expeditions = await resp.json(content_type=None) or []
+        url = f"{self._api_base}{CLUBLOG_EXPEDITIONS_ENDPOINT}"
+        body = await self._read_body(session, url, {"api": "1"}, headers, timer)
+        with timer.decoding():
+            self._data.expeditions = lazy_expeditions(body)
+        await self._async_record(ENDPOINT_EXPEDITIONS, expeditions_state, self._data.expeditions)
 
-    async def _fetch_livestreams(self, session: Any, headers: dict[str, str]) -> None:
+    async def _fetch_livestreams(
+        self, session: Any, headers: dict[str, str], timer: FetchTimer
+    ) -> None:
         """Fetch active livestreams (no auth required)."""
-        url = f"{CLUBLOG_API_BASE}{CLUBLOG_LIVESTREAMS_ENDPOINT}"
-        async with session.get(url, params={"api": "1"}, headers=headers) as resp:
-            resp.raise_for_status()
-            self._data.livestreams = await resp.json(content_type=None) or []
+        url = f"{self._api_base}{CLUBLOG_LIVESTREAMS_ENDPOINT}"
+        body = await self._read_body(session, url, {"api": "1"}, headers, timer)
+        with timer.decoding():
+            self._data.livestreams = lazy_livestreams(body)
 
-    async def _fetch_activity(self, session: Any, headers: dict[str, str]) -> None:
+    async def _fetch_activity(
+        self, session: Any, headers: dict[str, str], timer: FetchTimer
+    ) -> None:
         """Fetch band activity data (lastyear=1 required to avoid timeout)."""
-        params = {
-            "call": self._callsign,
-            "api": self._api_key,
-            "lastyear": "1",
-        }
-        url = f"{CLUBLOG_API_BASE}{CLUBLOG_ACTIVITY_ENDPOINT}"
-        async with session.get(url, params=params, headers=headers) as resp:
+        self._data.activity = await self._fetch_activity_data(
+            session, headers, timer, lastyear=True
+        )
+        with timer.processing_step():
+            self._data.activity_grid = BandActivityGrid.from_activity(
+                self._data.activity
+            )
+        await self._async_apply_activity_history()
+
+    async def _fetch_activity_data(
+        self,
+        session: Any,
+        headers: dict[str, str],
+        timer: FetchTimer,
+        *,
+        lastyear: bool,
+        timeout: ClientTimeout | None = None,
+    ) -> dict[str, Any]:
+        """Fetch activity, decoded as it streams in and folded per band.
+
+        The body is never buffered as a whole. The full history
+        (lastyear=False) is only requested by the background job.
+        """
+        params = {"call": self._callsign, "api": self._api_key}
+        if lastyear:
+            params["lastyear"] = "1"
+        url = f"{self._api_base}{CLUBLOG_ACTIVITY_ENDPOINT}"
+        activity: dict[str, Any] = {}
+        async with session.get(
+            url, params=params, headers=headers, timeout=timeout
+        ) as resp:
+            timer.response()
+            resp.raise_for_status()
+            decoder = ObjectStreamDecoder()
+            async for chunk in resp.content.iter_chunked(STREAM_CHUNK_SIZE):
+                timer.received(len(chunk))
+                with timer.decoding():
+                    fold_activity(decoder.feed(chunk), activity)
+            with timer.decoding():
+                fold_activity(decoder.close(), activity)
+        return activity
+
+    # ------------------------------------------------------------------
+    # Full-history activity (background)
+    # ------------------------------------------------------------------
+
+    def async_start_activity_history(self) -> None:
+        """Start the background full-history job if enabled in options."""
+        if not self._full_history_enabled:
+            return
+        self.entry.async_create_background_task(
+            self.hass,
+            self._async_activity_history_loop(),
+            f"{DOMAIN} full-history activity",
+        )
+
+    async def _async_apply_activity_history(self) -> None:
+        """Merge cached full history with the latest lastyear=1 data."""
+        if self._history is None:
+            return
+        if self._history.adopt_baseline(self._data.activity):
+            await self._history_store.async_save(self._history.to_dict())
+        self._data.activity_all_time = self._history.merged(self._data.activity)
+        self._data.activity_all_time_fetched = self._history.fetched_at
+
+    async def _async_activity_history_loop(self) -> None:
+        """Refetch the full history whenever the cached copy is due.
+
+        Runs independently of the polling cycle so the long request never
+        delays the regular endpoints.
+        """
+        self._history = ActivityHistory.from_dict(
+            await self._history_store.async_load()
+        )
+        if self._history is not None:
+            await self._async_apply_activity_history()
+            self.async_update_listeners()
+        next_attempt = (
+            self._history.due_at(FULL_HISTORY_INTERVAL) if self._history else 0.0
+        )
+        while True:
+            await asyncio.sleep(max(0.0, next_attempt - self.clock.time()))
+            full = await self._async_fetch_full_history()
+            if full is None:
+                # Budget exhausted — try again after a regular activity interval
+                next_attempt = self.clock.time() + ENDPOINT_INTERVALS[ENDPOINT_ACTIVITY]
+                continue
+            self._history = ActivityHistory(self.clock.time(), full)
+            self._history.adopt_baseline(self._data.activity)
+            await self._history_store.async_save(self._history.to_dict())
+            await self._async_apply_activity_history()
+            self.async_update_listeners()
+            next_attempt = self._history.due_at(FULL_HISTORY_INTERVAL)
+            _LOGGER.info("Full-history activity fetched (%d bands)", len(full))
+
+    async def _async_fetch_full_history(self) -> dict[str, Any] | None:
+        """Fetch the full history with a long timeout and exponential retries."""
+        session = async_get_clientsession(self.hass)
+        headers = {"User-Agent": USER_AGENT}
+        timeout = ClientTimeout(total=FULL_HISTORY_TIMEOUT)
+        delays = retry_delays(FULL_HISTORY_RETRY_BASE, FULL_HISTORY_RETRY_ATTEMPTS)
+        for attempt, delay in enumerate(delays, start=1):
+            # Respect the 403 circuit breaker shared with the polling cycle
+            remaining = self._backoff_until - self.clock.monotonic()
+            if remaining > 0:
+                await asyncio.sleep(remaining)
+            self._refresh_gate.fetched(ENDPOINT_ACTIVITY_FULL, self.clock.monotonic())
+            timer = FetchTimer(wall=self.clock.time)
+            ok = False
+            try:
+                full = await self._fetch_activity_data(
+                    session, headers, timer, lastyear=False, timeout=timeout
+                )
+                ok = True
+                return full
+            except ClientResponseError as err:
+                if err.status == 403:
+                    _LOGGER.error(
+                        "HTTP 403 fetching full-history activity — "
+                        "ceasing ALL requests for %d minutes",
+                        int(self._backoff_duration / 60),
+                    )
+                    self._backoff_until = self.clock.monotonic() + self._backoff_duration
+                    return None
+                _LOGGER.warning(
+                    "Full-history activity attempt %d/%d failed: %s",
+                    attempt, len(delays), err,
+                )
+            except (ClientError, TimeoutError, ValueError) as err:
+                _LOGGER.warning(
+                    "Full-history activity attempt %d/%d failed: %s",
+                    attempt, len(delays), err,
+                )
+            finally:
+                self._data.fetch_timing.record(
+                    ENDPOINT_ACTIVITY_FULL, timer.sample(ok)
+                )
+            if attempt < len(delays):
+                await asyncio.sleep(delay)
+        _LOGGER.error("Full-history activity retry budget exhausted")
+        return None
+
+    # ------------------------------------------------------------------
+    # Logged QSOs over UDP (WSJT-X / N1MM Logger+)
+    # ------------------------------------------------------------------
+
+    async def async_start_logger_listener(self) -> None:
+        """Listen for logged-QSO datagrams if a port is set in options."""
+        if not self._logger_port:
+            return
+        self._provisional.load_list(await self._provisional_store.async_load())
+        if self._provisional.cells:
+            self._provisional.matrix = self._data.dxcc_matrix
+            self._set_matrix(self._provisional.merged())
+        try:
+            transport, _ = await self.hass.loop.create_datagram_endpoint(
+                lambda: _LoggerProtocol(self._async_handle_datagram),
+                local_addr=(LOGGER_UDP_BIND, self._logger_port),
+            )
+        except OSError as err:
+            _LOGGER.error("Cannot listen on UDP port %d: %s", self._logger_port, err)
+            return
+        self.entry.async_on_unload(transport.close)
+        _LOGGER.info("Listening for logged QSOs on UDP port %d", self._logger_port)
+
+    @callback
+    def _async_handle_datagram(self, data: bytes) -> None:
+        """Apply a logged QSO to the overlay, or hold it until cty.xml loads."""
+        source, records = decode_datagram(data)
+        if self._cty is None:
+            if records:
+                self._unresolved.append((source, records))
+            return
+        self._async_apply_logged(source, records)
+
+    @callback
+    def _async_apply_logged(self, source: str, records: list[dict[str, str]]) -> None:
+        """Apply logged QSOs to the overlay and push new slots at once."""
+        now = self.clock.time()
+        filled = []
+        for record in records:
+            outcome, cell = overlay_record(self._provisional, record, self._cty, now)
+            _LOGGER.debug("Logged QSO from %s: %s (%s)", source, record.get("CALL"), outcome)
+            if cell:
+                filled.append(cell)
+        if not filled:
+            return
+        self._set_matrix(self._provisional.merged())
+        self._provisional_store.async_delay_save(self._provisional.to_list, 10)
+        for cell in filled:
+            self.hass.bus.async_fire(
+                EVENT_NEW_SLOT,
+                {
+                    "call": cell.call,
+                    "dxcc": cell.dxcc,
+                    "entity": self._cty.name(int(cell.dxcc)) if self._cty else None,
+                    "band": cell.band,
+                    "logged_at": cell.logged_at,
+                    "source": source,
+                },
+            )
+        self.async_update_listeners()
+
+    # ------------------------------------------------------------------
+    # Needed spots from an MQTT spot topic
+    # ------------------------------------------------------------------
+
+    async def async_start_spot_matcher(self) -> None:
+        """Subscribe to the spot topic if one is set in options."""
+        if not self._spots:
+            return
+        if not await mqtt.async_wait_for_mqtt_client(self.hass):
+            _LOGGER.error("MQTT is not available — not matching spots on %s", self._spot_topic)
+            return
+        self.entry.async_on_unload(
+            await mqtt.async_subscribe(
+                self.hass, self._spot_topic, self._async_handle_spot, encoding=None
+            )
+        )
+        _LOGGER.info("Matching spots on MQTT topic %s", self._spot_topic)
+
+    @callback
+    def _async_handle_spot(self, msg: mqtt.ReceiveMessage) -> None:
+        """Check one spot; fire an event if it is needed.
+
+        Runs for every message on the topic, so it does lookups only.
+        """
+        spot = parse_spot(msg.payload)
+        if spot is None:
+            return
+        now = self.clock.time()
+        _, needed = self._spots.match(spot, now)
+        if needed is None:
+            return
+        self.hass.bus.async_fire(
+            EVENT_NEEDED_SPOT,
+            {**needed.to_dict(), "entity": self._cty.name(needed.dxcc) if self._cty else None},
+        )
+        self._data.needed_spots = self._spots.recent(now)
+        self.async_update_listeners()
+
+    # ------------------------------------------------------------------
+    # cty.xml (callsign to DXCC entity, for logged QSOs and spots)
+    # ------------------------------------------------------------------
+
+    def async_start_cty(self, *, on_demand: bool = False) -> None:
+        """Keep cty.xml loaded if logged QSOs or spots need resolving.
+
+        on_demand starts it regardless, for the first needed_for_call.
+        """
+        if self._cty_task or not (on_demand or self._logger_port or self._spots):
+            return
+        self._cty_task = self.entry.async_create_background_task(
+            self.hass, self._async_cty_loop(), f"{DOMAIN} cty.xml"
+        )
+
+    async def async_get_cty(self) -> CtyDatabase | None:
+        """Return cty.xml, loading it on first use (None if unavailable)."""
+        if self._cty is None:
+            self.async_start_cty(on_demand=True)
+            with contextlib.suppress(TimeoutError):
+                await asyncio.wait_for(self._cty_loaded.wait(), CTY_LOAD_TIMEOUT)
+        return self._cty
+
+    def _set_cty(self, cty: CtyDatabase) -> None:
+        """Resolve calls with a newly loaded cty.xml."""
+        self._cty = cty
+        self._cty_loaded.set()
+        if self._spots:
+            self._spots.set_cty(cty)
+        unresolved, self._unresolved = self._unresolved, []
+        for source, records in unresolved:
+            self._async_apply_logged(source, records)
+
+    async def _async_cty_loop(self) -> None:
+        """Load cty.xml for resolving logged calls, downloading it weekly."""
+        path = self.hass.config.path(CTY_FILE)
+        while True:
+            age = await self.hass.async_add_executor_job(_file_age, path, self.clock.time())
+            if age is None or age >= CTY_INTERVAL:
+                try:
+                    self._set_cty(await self._async_download_cty(path))
+                    age = 0.0
+                except (ClientError, TimeoutError, OSError, ET.ParseError) as err:
+                    _LOGGER.warning("Failed to download cty.xml: %s", err)
+            if self._cty is None and age is not None:
+                try:
+                    self._set_cty(
+                        await self.hass.async_add_executor_job(CtyDatabase.from_file, path)
+                    )
+                except (OSError, ET.ParseError) as err:
+                    _LOGGER.warning("Failed to load cty.xml: %s", err)
+            if self._cty:
+                _LOGGER.debug("cty.xml (%s): %d prefixes", self._cty.date, len(self._cty))
+            # A failed download is retried after a matrix interval
+            due = CTY_INTERVAL - age if age is not None and age < CTY_INTERVAL else 0.0
+            await asyncio.sleep(due or ENDPOINT_INTERVALS[ENDPOINT_MATRIX])
+
+    async def _async_download_cty(self, path: str) -> CtyDatabase:
+        """Download and parse cty.xml, replacing the cached copy only if valid."""
+        remaining = self._backoff_until - self.clock.monotonic()
+        if remaining > 0:
+            await asyncio.sleep(remaining)
+        self._refresh_gate.fetched(ENDPOINT_CTY, self.clock.monotonic())
+        session = async_get_clientsession(self.hass)
+        url = f"{self._api_base}{CLUBLOG_CTY_ENDPOINT}"
+        async with session.get(
+            url, params={"api": self._api_key}, headers={"User-Agent": USER_AGENT}
+        ) as resp:
             resp.raise_for_status()
-            self._data.activity = await resp.json(content_type=None) or {}
+            body = await resp.read()
+        return await self.hass.async_add_executor_job(_store_cty, path, body)
+
+
+class _LoggerProtocol(asyncio.DatagramProtocol):
+    """Hand each received datagram to the coordinator."""
+
+    def __init__(self, handler: Any) -> None:
+        self._handler = handler
+
+    def datagram_received(self, data: bytes, _addr: Any) -> None:
+        self._handler(data)
+
+
+def _file_age(path: str, now: float) -> float | None:
+    """Return seconds since path was written (None if missing)."""
+    try:
+        return now - os.path.getmtime(path)
+    except OSError:
+        return None
+
+
+def _store_cty(path: str, data: bytes) -> CtyDatabase:
+    """Parse a downloaded cty.xml, then move it over the cached copy."""
+    tmp = f"{path}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(data)
+    try:
+        database = CtyDatabase.from_file(tmp)
+    except ET.ParseError:
+        os.remove(tmp)
+        raise
+    os.replace(tmp, path)
+    return database
@@ -0,0 +1,42 @@
+"""Diagnostics support for ClubLog HA Bridge."""
+
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from .const import CONF_API_KEY, CONF_APP_PASSWORD, CONF_EMAIL, DOMAIN
+from .coordinator import ENDPOINT_ACTIVITY_FULL, ENDPOINT_INTERVALS, ClubLogCoordinator
+
+TO_REDACT = {CONF_API_KEY, CONF_APP_PASSWORD, CONF_EMAIL}
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict[str, Any]:
+    """Return diagnostics for a config entry, including fetch timing history."""
+    coordinator: ClubLogCoordinator = hass.data[DOMAIN][entry.entry_id]
+    data = coordinator.data
+    timing = data.fetch_timing
+    return {
+        "entry": {
+            "data": async_redact_data(dict(entry.data), TO_REDACT),
+            "options": dict(entry.options),
+        },
+        "health": {
+            "last_successful_fetch": data.last_successful_fetch,
+            "consecutive_errors": data.consecutive_errors,
+            "last_error": data.last_error,
+        },
+        "fetch_timing": {
+            "history_size": timing.size,
+            "summary": {
+                endpoint: timing.summary(endpoint)
+                for endpoint in (*ENDPOINT_INTERVALS, ENDPOINT_ACTIVITY_FULL)
+            },
+            "history": timing.as_dict(),
+        },
+    }
@@ -0,0 +1,133 @@
+"""Constant-time DXCC slot, entity and most-wanted rank lookups.
+
+The matrix ({entity: {band: status}}) already answers "which status has
+this slot?" in one dictionary lookup, but "what rank is this entity?"
+means scanning the most wanted list. LookupIndex is built once per fetch,
+inverting most wanted into {entity: rank}, so every question asked of it
+afterwards (from the local query API, a service call or an automation) is
+a couple of dictionary lookups.
+
+An index is never changed after construction; a fetch builds a new one
+with with_matrix() or with_most_wanted(), sharing the untouched half, so
+it can be read from other threads while the next one is built.
+
+This module is shared verbatim between the Docker bridge (clublog_bridge/)
+and the HACS integration (custom_components/clublog/) — keep both copies
+identical.
+"""
+
+from __future__ import annotations
+
+from typing import Any
+
+from .dxcc import CtyDatabase, band_for
+from .models import MostWanted
+
+# ClubLog matrix status values
+STATUS_NAMES = {1: "confirmed", 2: "worked", 3: "verified"}
+_CONFIRMED = frozenset({1, 3})
+
+
+def entity_key(dxcc: int | str) -> str:
+    """Return the matrix key for a DXCC entity number (ValueError if invalid)."""
+    number = int(str(dxcc).strip())
+    if number <= 0:
+        raise ValueError(f"invalid DXCC entity: {dxcc!r}")
+    return str(number)
+
+
+def band_key(band: str) -> str:
+    """Return the matrix key for a band given as "20", "20m" or "70cm"."""
+    name = str(band).strip().lower()
+    if not name:
+        raise ValueError("empty band")
+    return band_for(name) or name
+
+
+class LookupIndex:
+    """Hash indexes over the DXCC matrix and the most wanted list."""
+
+    __slots__ = ("matrix", "ranks", "most_wanted_size")
+
+    def __init__(
+        self,
+        matrix: dict[str, dict[str, int]] | None = None,
+        ranks: dict[str, int] | None = None,
+        most_wanted_size: int = 0,
+    ) -> None:
+        """Initialize; use with_matrix() and with_most_wanted() to fill."""
+        self.matrix = matrix if matrix is not None else {}
+        self.ranks = ranks if ranks is not None else {}
+        self.most_wanted_size = most_wanted_size
+
+    def with_matrix(self, matrix: dict[str, dict[str, int]]) -> LookupIndex:
+        """Return an index over a new matrix and the current ranks."""
+        return LookupIndex(matrix, self.ranks, self.most_wanted_size)
+
+    def with_most_wanted(self, most_wanted: MostWanted) -> LookupIndex:
+        """Return an index over the current matrix and a new most wanted list."""
+        ranks: dict[str, int] = {}
+        for rank, dxcc in zip(most_wanted.ranks, most_wanted.dxcc, strict=True):
+            ranks.setdefault(dxcc, rank)
+        return LookupIndex(self.matrix, ranks, len(most_wanted))
+
+    def rank(self, dxcc: int | str) -> int | None:
+        """Return an entity's most wanted rank (None if not ranked)."""
+        return self.ranks.get(entity_key(dxcc))
+
+    def slot(self, dxcc: int | str, band: str) -> dict[str, Any]:
+        """Describe one matrix cell: its status and whether it is needed."""
+        key = entity_key(dxcc)
+        band = band_key(band)
+        bands = self.matrix.get(key)
+        status = bands.get(band) if bands else None
+        return {
+            "dxcc": int(key),
+            "band": band,
+            "status": STATUS_NAMES.get(status) if status is not None else None,
+            "worked": status is not None,
+            "confirmed": status in _CONFIRMED,
+            "needed": status is None,
+            "new_entity": not bands,
+            "rank": self.ranks.get(key),
+        }
+
+    def entity(self, dxcc: int | str) -> dict[str, Any]:
+        """Describe an entity: status per band, worked/confirmed and rank."""
+        key = entity_key(dxcc)
+        bands = self.matrix.get(key) or {}
+        return {
+            "dxcc": int(key),
+            "worked": bool(bands),
+            "confirmed": any(status in _CONFIRMED for status in bands.values()),
+            "needed": not bands,
+            "bands": {band: STATUS_NAMES.get(status) for band, status in bands.items()},
+            "rank": self.ranks.get(key),
+        }
+
+    def wanted(self, dxcc: int | str) -> dict[str, Any]:
+        """Describe an entity's most wanted rank and whether it is needed."""
+        key = entity_key(dxcc)
+        return {
+            "dxcc": int(key),
+            "rank": self.ranks.get(key),
+            "of": self.most_wanted_size,
+            "needed": not self.matrix.get(key),
+        }
+
+    def call(
+        self,
+        call: str,
+        cty: CtyDatabase,
+        band: str | None = None,
+        when: float | None = None,
+    ) -> dict[str, Any] | None:
+        """Describe what working a callsign would give (None if unresolved).
+
+        With a band, the slot; without, the entity.
+        """
+        dxcc = cty.resolve(call, when)
+        if dxcc is None:
+            return None
+        found = self.slot(dxcc, band) if band else self.entity(dxcc)
+        return {"call": call.strip().upper(), "entity": cty.name(dxcc), **found}
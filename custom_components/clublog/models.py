@@ -0,0 +1,528 @@
+"""Typed models for ClubLog API responses.
+
+ClubLog returns positional rows ([call, date, count], ...) and nested
+dicts. Responses are decoded straight into __slots__ dataclasses here, so
+consumers use named fields instead of e[0]/s[3], each row costs a fixed
+slot layout instead of a list plus pointers, and malformed rows are
+rejected once at the boundary rather than blowing up inside a sensor.
+
+Decoding uses orjson when it is installed (Home Assistant always ships it)
+and falls back to the stdlib json module otherwise.
+
+The list responses are usually consumed only as a count plus a short
+prefix (top 10 most wanted, first 20 expeditions/livestreams). The Lazy*
+wrappers walk the body one top-level element at a time, build models for
+that prefix only and keep just the body bytes; the full list is decoded
+from them on demand.
+
+The DXCC matrix and band activity keep their dict shapes — they are
+already folded into compact structures by streaming.py.
+
+This module is shared verbatim between the Docker bridge (clublog_bridge/)
+and the HACS integration (custom_components/clublog/) — keep both copies
+identical.
+"""
+
+from __future__ import annotations
+
+import heapq
+import logging
+import re
+from collections.abc import Callable, Iterator
+from dataclasses import dataclass
+from json import JSONDecoder
+from typing import Any, Generic, TypeVar
+
+try:
+    from orjson import loads as json_loads
+except ImportError:  # pragma: no cover - orjson is optional in Docker mode
+    from json import loads as json_loads
+
+_LOGGER = logging.getLogger(__name__)
+
+# Rows the sensors/MQTT attributes list for expeditions and livestreams
+LIST_PREFIX = 20
+
+# Most wanted entries exposed as the top_10 attribute
+MOST_WANTED_PREFIX = 10
+
+_T = TypeVar("_T")
+
+# Element-wise decoding for the Lazy* wrappers (raw_decode does not skip
+# leading whitespace, so the scanner does)
+_DECODER = JSONDecoder()
+_WS = re.compile(r"[ \t\n\r]*")
+_END = object()
+
+
+@dataclass(slots=True)
+class Expedition:
+    """An active DXpedition from expeditions.php."""
+
+    call: str
+    date: str
+    qso_count: int
+
+
+@dataclass(slots=True)
+class Livestream:
+    """An active livestream from livestreams.php."""
+
+    call: str
+    dxcc: str
+    date: str
+    url: str
+
+
+@dataclass(slots=True)
+class MostWanted:
+    """Most wanted list from mostwanted.php as parallel rank-ordered tuples.
+
+    Two tuples of shared small ints/strs cost ~16 bytes per rank, against a
+    dict entry plus a rank string per rank for the raw {rank: adif} object.
+    """
+
+    ranks: tuple[int, ...] = ()
+    dxcc: tuple[str, ...] = ()
+
+    def __len__(self) -> int:
+        """Return the number of ranked entities."""
+        return len(self.ranks)
+
+    def top(self, count: int) -> dict[str, str]:
+        """Return the first `count` entries as {rank: adif} (API shape)."""
+        return {
+            str(rank): dxcc
+            for rank, dxcc in zip(self.ranks[:count], self.dxcc[:count], strict=True)
+        }
+
+
+@dataclass(slots=True)
+class Watch:
+    """Callsign summary from watch.php."""
+
+    clublog_user: bool
+    is_expedition: bool
+    has_oqrs: bool
+    total_qsos: int | None
+    last_upload: str | None
+    first_qso: str | None
+    last_qso: str | None
+
+
+def _reject(endpoint: str, rejected: int, total: int) -> None:
+    """Log rows dropped at the decode boundary."""
+    if rejected:
+        _LOGGER.warning(
+            "Rejected %d of %d malformed %s rows", rejected, total, endpoint
+        )
+
+
+def _str(value: Any) -> str:
+    """Coerce an id-like value (str or int) to str; reject anything else."""
+    if isinstance(value, str):
+        return value
+    if isinstance(value, int) and not isinstance(value, bool):
+        return str(value)
+    raise TypeError(f"expected str or int, got {type(value).__name__}")
+
+
+def _int(value: Any) -> int:
+    """Coerce a count (int or numeric str) to int; reject anything else."""
+    if isinstance(value, bool):
+        raise TypeError("expected int, got bool")
+    return int(value)
+
+
+def _opt_str(value: Any) -> str | None:
+    """Return value if it is a str, else None."""
+    return value if isinstance(value, str) else None
+
+
+def parse_expeditions(rows: Any, limit: int | None = None) -> list[Expedition]:
+    """Build Expedition models from decoded [[call, date, count], ...] rows.
+
+    With a limit, stop once that many valid rows have been built.
+    """
+    if not rows:
+        return []
+    if not isinstance(rows, list):
+        raise ValueError(f"expeditions: expected a list, got {type(rows).__name__}")
+    result: list[Expedition] = []
+    seen = 0
+    for row in rows:
+        if len(result) == limit:
+            break
+        seen += 1
+        # Fast path: well-formed rows need no coercion
+        if (
+            type(row) is list
+            and len(row) >= 3
+            and type(row[0]) is str
+            and type(row[1]) is str
+            and type(row[2]) is int
+        ):
+            result.append(Expedition(row[0], row[1], row[2]))
+            continue
+        try:
+            result.append(Expedition(_str(row[0]), _str(row[1]), _int(row[2])))
+        except (TypeError, ValueError, IndexError, KeyError):
+            continue
+    _reject("expeditions", seen - len(result), seen)
+    return result
+
+
+def parse_livestreams(rows: Any, limit: int | None = None) -> list[Livestream]:
+    """Build Livestream models from decoded [[call, dxcc, date, url], ...] rows.
+
+    With a limit, stop once that many valid rows have been built.
+    """
+    if not rows:
+        return []
+    if not isinstance(rows, list):
+        raise ValueError(f"livestreams: expected a list, got {type(rows).__name__}")
+    result: list[Livestream] = []
+    seen = 0
+    for row in rows:
+        if len(result) == limit:
+            break
+        seen += 1
+        if (
+            type(row) is list
+            and len(row) >= 4
+            and type(row[0]) is str
+            and type(row[1]) is str
+            and type(row[2]) is str
+            and type(row[3]) is str
+        ):
+            result.append(Livestream(row[0], row[1], row[2], row[3]))
+            continue
+        try:
+            result.append(
+                Livestream(_str(row[0]), _str(row[1]), _str(row[2]), _str(row[3]))
+            )
+        except (TypeError, ValueError, IndexError, KeyError):
+            continue
+    _reject("livestreams", seen - len(result), seen)
+    return result
+
+
+def parse_most_wanted(ranks: Any, limit: int | None = None) -> MostWanted:
+    """Build a rank-ordered MostWanted from a decoded {rank: adif} dict.
+
+    With a limit, keep only the best `limit` ranks.
+    """
+    if not ranks:
+        return MostWanted()
+    if not isinstance(ranks, dict):
+        raise ValueError(f"mostwanted: expected an object, got {type(ranks).__name__}")
+    if limit is not None:
+        # Fast path: ranks are normally the contiguous keys "1".."N", so the
+        # top entries can be looked up directly without touching the rest
+        head = [ranks.get(str(rank)) for rank in range(1, min(limit, len(ranks)) + 1)]
+        if all(type(dxcc) is str for dxcc in head):
+            return MostWanted(tuple(range(1, len(head) + 1)), tuple(head))
+    pairs = []
+    for rank, dxcc in ranks.items():
+        try:
+            pairs.append((_int(rank), _str(dxcc)))
+        except (TypeError, ValueError):
+            continue
+    _reject("mostwanted", len(ranks) - len(pairs), len(ranks))
+    pairs.sort()
+    if limit is not None:
+        del pairs[limit:]
+    return MostWanted(
+        tuple(rank for rank, _ in pairs), tuple(dxcc for _, dxcc in pairs)
+    )
+
+
+def parse_watch(watch: Any) -> Watch | None:
+    """Build a Watch model from a decoded watch.php object (None if empty)."""
+    if not watch:
+        return None
+    if not isinstance(watch, dict):
+        raise ValueError(f"watch: expected an object, got {type(watch).__name__}")
+    info = watch.get("clublog_info")
+    if not isinstance(info, dict):
+        info = {}
+    total_qsos = info.get("total_qsos")
+    try:
+        total_qsos = None if total_qsos is None else _int(total_qsos)
+    except (TypeError, ValueError):
+        _reject("watch total_qsos", 1, 1)
+        total_qsos = None
+    return Watch(
+        clublog_user=bool(watch.get("clublog_user")),
+        is_expedition=bool(watch.get("is_expedition")),
+        has_oqrs=bool(watch.get("has_oqrs")),
+        total_qsos=total_qsos,
+        last_upload=_opt_str(info.get("last_clublog_upload")),
+        first_qso=_opt_str(info.get("first_qso")),
+        last_qso=_opt_str(info.get("last_qso")),
+    )
+
+
+def decode_expeditions(body: bytes) -> list[Expedition]:
+    """Decode an expeditions.php body."""
+    return parse_expeditions(json_loads(body) if body.strip() else None)
+
+
+def decode_livestreams(body: bytes) -> list[Livestream]:
+    """Decode a livestreams.php body."""
+    return parse_livestreams(json_loads(body) if body.strip() else None)
+
+
+def decode_most_wanted(body: bytes) -> MostWanted:
+    """Decode a mostwanted.php body."""
+    return parse_most_wanted(json_loads(body) if body.strip() else None)
+
+
+def decode_watch(body: bytes) -> Watch | None:
+    """Decode a watch.php body."""
+    return parse_watch(json_loads(body) if body.strip() else None)
+
+
+def _loads(body: bytes) -> Any:
+    """Decode a response body; a blank body decodes to None."""
+    return json_loads(body) if body.strip() else None
+
+
+def _members(body: bytes) -> tuple[type | None, Iterator[Any]]:
+    """Return the top-level JSON type of body and an iterator over its members.
+
+    Arrays yield their elements and objects their (key, value) pairs, each
+    decoded only when the iterator reaches it, so no more than one member is
+    alive at a time. A blank, null or otherwise falsy body has type None and
+    no members; a truthy scalar has its own type and no members.
+    """
+    text = body.decode() if isinstance(body, bytes) else body
+    pos = _WS.match(text).end()
+    if pos == len(text):
+        return None, iter(())
+    opener = text[pos]
+    if opener == "[":
+        members = _array_members(text, pos)
+    elif opener == "{":
+        members = _object_members(text, pos)
+    else:
+        value = _DECODER.decode(text)
+        return (type(value) if value else None), iter(())
+    # Validate the first member eagerly so an empty container reads as None
+    first = next(members, _END)
+    if first is _END:
+        return None, iter(())
+    return (list if opener == "[" else dict), _chain(first, members)
+
+
+def _chain(first: Any, rest: Iterator[Any]) -> Iterator[Any]:
+    """Yield first, then the rest of the members."""
+    yield first
+    yield from rest
+
+
+def _separator(text: str, pos: int, close: str) -> tuple[int, bool]:
+    """Skip to the next member after a ',' or past the closing bracket."""
+    try:
+        pos = _WS.match(text, pos).end()
+        char = text[pos]
+    except IndexError:
+        raise ValueError("truncated JSON body") from None
+    if char == ",":
+        return _WS.match(text, pos + 1).end(), True
+    if char == close:
+        if _WS.match(text, pos + 1).end() != len(text):
+            raise ValueError("extra data after the JSON body")
+        return pos + 1, False
+    raise ValueError(f"expected ',' or {close!r} at offset {pos}")
+
+
+def _array_members(text: str, pos: int) -> Iterator[Any]:
+    """Decode the elements of the array opening at pos, one at a time."""
+    pos = _WS.match(text, pos + 1).end()
+    if text[pos:pos + 1] == "]":
+        _separator(text, pos, "]")
+        return
+    more = True
+    while more:
+        value, pos = _DECODER.raw_decode(text, pos)
+        yield value
+        pos, more = _separator(text, pos, "]")
+
+
+def _object_members(text: str, pos: int) -> Iterator[tuple[str, Any]]:
+    """Decode the (key, value) pairs of the object opening at pos, one at a time."""
+    pos = _WS.match(text, pos + 1).end()
+    if text[pos:pos + 1] == "}":
+        _separator(text, pos, "}")
+        return
+    more = True
+    while more:
+        key, pos = _DECODER.raw_decode(text, pos)
+        if not isinstance(key, str):
+            raise ValueError(f"expected an object key at offset {pos}")
+        pos = _WS.match(text, pos).end()
+        if text[pos:pos + 1] != ":":
+            raise ValueError(f"expected ':' at offset {pos}")
+        value, pos = _DECODER.raw_decode(text, _WS.match(text, pos + 1).end())
+        yield key, value
+        pos, more = _separator(text, pos, "}")
+
+
+class LazyRows(Generic[_T]):  # noqa: UP046 - tests still run on 3.11
+    """A list response whose models are built only as far as they are read.
+
+    Construction walks the body one row at a time to validate it, count
+    the rows and build models for the first `prefix` valid rows; only those
+    models and the body bytes are kept. len(), truthiness and
+    slices/indexes inside the prefix are served from that. Anything past
+    the prefix (or iteration) decodes the whole body once, caches the
+    models and drops the body.
+
+    len() is the number of rows ClubLog returned; malformed rows are only
+    excluded from the models themselves.
+    """
+
+    __slots__ = ("_body", "_parse", "_count", "_head", "_rows")
+
+    def __init__(
+        self,
+        body: bytes,
+        parse: Callable[[Any, int | None], list[_T]],
+        prefix: int = LIST_PREFIX,
+    ) -> None:
+        """Validate body and materialize its first `prefix` rows."""
+        kind, members = _members(body)
+        if kind is not None and kind is not list:
+            raise ValueError(f"expected a list, got {kind.__name__}")
+        head: list[_T] = []
+        pending: list[Any] = []
+        count = 0
+        for row in members:
+            count += 1
+            if len(head) < prefix:
+                # Build in batches sized to the models still missing, so a
+                # malformed row pulls in exactly one more
+                pending.append(row)
+                if len(pending) == prefix - len(head):
+                    head += parse(pending, None)
+                    pending = []
+        if pending:
+            head += parse(pending, None)
+        self._parse = parse
+        self._head = head
+        self._count = count
+        # A response no longer than the prefix is already fully built
+        self._rows = head if count <= prefix else None
+        self._body = body if self._rows is None else None
+
+    def __len__(self) -> int:
+        """Return the number of rows in the response."""
+        return self._count
+
+    def __bool__(self) -> bool:
+        """Return True if the response has any rows."""
+        return self._count > 0
+
+    def __getitem__(self, index: int | slice) -> Any:
+        """Index or slice the rows, decoding past the prefix only if needed."""
+        head = self._head
+        if isinstance(index, slice):
+            stop = index.stop
+            if (
+                index.start in (None, 0)
+                and index.step in (None, 1)
+                and stop is not None
+                and 0 <= stop <= len(head)
+            ):
+                return head[:stop]
+        elif 0 <= index < len(head):
+            return head[index]
+        return self.rows()[index]
+
+    def __iter__(self) -> Iterator[_T]:
+        """Iterate over all rows (materializes the full list)."""
+        return iter(self.rows())
+
+    @property
+    def materialized(self) -> bool:
+        """Return True once the full list has been built."""
+        return self._rows is not None
+
+    def rows(self) -> list[_T]:
+        """Return every row as a model, decoding the body on first use."""
+        if self._rows is None:
+            self._rows = self._parse(_loads(self._body), None)
+            self._body = None
+        return self._rows
+
+
+class LazyMostWanted:
+    """A mostwanted.php response whose ranks are built only as far as read.
+
+    Walks the body one {rank: adif} pair at a time, keeping the best
+    `prefix` ranks and the body bytes; the full rank-ordered MostWanted is
+    decoded from the body on demand.
+    """
+
+    __slots__ = ("_body", "_count", "_head", "_full")
+
+    def __init__(self, body: bytes, prefix: int = MOST_WANTED_PREFIX) -> None:
+        """Validate body and materialize its top `prefix` ranks."""
+        kind, members = _members(body)
+        if kind is not None and kind is not dict:
+            raise ValueError(f"mostwanted: expected an object, got {kind.__name__}")
+        count = 0
+
+        def ranked() -> Iterator[tuple[int, str]]:
+            nonlocal count
+            for rank, dxcc in members:
+                count += 1
+                try:
+                    yield _int(rank), _str(dxcc)
+                except (TypeError, ValueError):
+                    continue
+
+        best = heapq.nsmallest(prefix, ranked())
+        self._head = MostWanted(
+            tuple(rank for rank, _ in best), tuple(dxcc for _, dxcc in best)
+        )
+        self._count = count
+        self._full = self._head if count <= prefix else None
+        self._body = body if self._full is None else None
+
+    def __len__(self) -> int:
+        """Return the number of ranked entities in the response."""
+        return self._count
+
+    def __bool__(self) -> bool:
+        """Return True if the response has any entries."""
+        return self._count > 0
+
+    @property
+    def materialized(self) -> bool:
+        """Return True once the full list has been built."""
+        return self._full is not None
+
+    def top(self, count: int) -> dict[str, str]:
+        """Return the best `count` entries as {rank: adif}."""
+        if count <= len(self._head):
+            return self._head.top(count)
+        return self.full().top(count)
+
+    def full(self) -> MostWanted:
+        """Return the complete rank-ordered list, decoding it on first use."""
+        if self._full is None:
+            self._full = parse_most_wanted(_loads(self._body))
+            self._body = None
+        return self._full
+
+
+def lazy_expeditions(body: bytes = b"") -> LazyRows[Expedition]:
+    """Wrap an expeditions.php body for prefix-only decoding."""
+    return LazyRows(body, parse_expeditions)
+
+
+def lazy_livestreams(body: bytes = b"") -> LazyRows[Livestream]:
+    """Wrap a livestreams.php body for prefix-only decoding."""
+    return LazyRows(body, parse_livestreams)
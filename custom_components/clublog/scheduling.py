@@ -0,0 +1,269 @@
+"""Injectable clock and random source for the polling schedulers.
+
+Both modes read time and randomness only through a Clock and a
+random.Random held by the scheduler (the Docker main loop or the HACS
+coordinator), so jitter, per-endpoint intervals, the 403 backoff and the
+API-status staleness check can be driven by a SimulatedClock and a seeded
+RNG — weeks of polling run in seconds.
+
+next_due() anchors each endpoint's next fetch to when it was due rather
+than when the polling tick happened to run it, so waiting for the tick
+does not accumulate as drift over thousands of fetches.
+
+MatrixRefresh links the matrix to the watch endpoint: a new upload seen
+in watch (last upload time or QSO count changed) pulls the next matrix
+fetch forward, while a run of matrix fetches with no upload in between
+backs the matrix interval off.
+
+RefreshGate admits on-demand refreshes (the HACS clublog.refresh service,
+the Docker refresh command topic). Every request, scheduled or not, is
+recorded in a sliding-window RequestBudget; a refresh is refused if the
+endpoint was fetched less than a minimum interval ago or the budget has
+nothing left, and coalesced with one already pending for the endpoint.
+Automations calling it in a loop therefore cannot push the account into
+ClubLog's 403 rate limiting.
+
+This module is shared verbatim between the Docker bridge (clublog_bridge/)
+and the HACS integration (custom_components/clublog/) — keep both copies
+identical.
+"""
+
+from __future__ import annotations
+
+import random
+import threading
+import time
+from collections import deque
+
+# 2026-01-01T00:00:00Z — default wall-clock start of a SimulatedClock
+SIMULATION_EPOCH = 1_767_225_600.0
+
+# ClubLog serves a matrix from its own cache for up to an hour after it was
+# computed, so a refresh sooner than this after the last fetch is wasted
+MATRIX_CACHE_WINDOW = 3600
+# Delay between seeing an upload in watch and refreshing the matrix
+UPLOAD_SETTLE = 120
+MATRIX_BACKOFF = 2.0
+
+# On-demand refresh outcomes
+REFRESH_ACCEPTED = "accepted"
+REFRESH_COALESCED = "coalesced"  # Shares a refresh already pending
+REFRESH_TOO_SOON = "too_soon"  # Fetched less than the minimum interval ago
+REFRESH_BUDGET = "budget"  # Request budget used up
+REFRESH_BACKOFF = "backoff"  # 403 circuit breaker open
+
+
+class Clock:
+    """The real system clock."""
+
+    def monotonic(self) -> float:
+        """Return seconds from a monotonic clock."""
+        return time.monotonic()
+
+    def time(self) -> float:
+        """Return wall-clock seconds since the epoch."""
+        return time.time()
+
+    def gmtime(self) -> time.struct_time:
+        """Return the current UTC time as a struct_time."""
+        return time.gmtime(self.time())
+
+    def sleep(self, seconds: float) -> None:
+        """Block for the given number of seconds."""
+        time.sleep(seconds)
+
+    def wait(self, event: threading.Event, seconds: float) -> bool:
+        """Block until event is set or seconds pass; return True if set."""
+        return event.wait(seconds)
+
+
+class SimulatedClock(Clock):
+    """A clock that only moves when slept on or advanced — never blocks."""
+
+    def __init__(self, start: float = SIMULATION_EPOCH) -> None:
+        """Initialize at wall-clock `start`; monotonic time starts at 0."""
+        self._start = start
+        self.elapsed = 0.0
+
+    def monotonic(self) -> float:
+        """Return simulated seconds since the clock was created."""
+        return self.elapsed
+
+    def time(self) -> float:
+        """Return the simulated wall-clock time."""
+        return self._start + self.elapsed
+
+    def sleep(self, seconds: float) -> None:
+        """Advance simulated time instead of blocking."""
+        self.advance(seconds)
+
+    def wait(self, event: threading.Event, seconds: float) -> bool:
+        """Return at once if event is set, else sleep the full time."""
+        if event.is_set():
+            return True
+        self.sleep(seconds)
+        return False
+
+    def advance(self, seconds: float) -> None:
+        """Move simulated time forward (negative values are ignored)."""
+        self.elapsed += max(0.0, seconds)
+
+
+def jittered(interval: float, factor: float, rng: random.Random) -> float:
+    """Apply jitter to an interval: interval ± factor * interval."""
+    jitter = interval * factor
+    return interval + rng.uniform(-jitter, jitter)
+
+
+def next_due(
+    due: float, now: float, interval: float, factor: float, rng: random.Random
+) -> float:
+    """Return the next fetch time for an endpoint that was due at `due`.
+
+    Scheduled from `due`, not `now`, so the delay until the polling tick
+    picks the fetch up does not push every later fetch back. If that time
+    has already passed (startup stagger, 403 backoff, a long stall), the
+    endpoint is rescheduled from `now` instead of catching up in a burst.
+    """
+    step = jittered(interval, factor, rng)
+    return due + step if due + step > now else now + step
+
+
+class MatrixRefresh:
+    """Upload-driven matrix refresh with back-off while nothing changes.
+
+    Feed it every watch result and every successful matrix fetch, and after
+    each polling pass move the matrix's next fetch up to take_refresh() if
+    that is sooner. The current matrix interval starts at `interval`, doubles after each
+    matrix fetch with no upload since the previous one (only if watch was
+    actually seen in between — no watch data is no evidence) up to
+    `max_interval`, and drops back to `interval` on an upload.
+    """
+
+    def __init__(
+        self,
+        interval: float,
+        max_interval: float,
+        *,
+        cache_window: float = MATRIX_CACHE_WINDOW,
+        settle: float = UPLOAD_SETTLE,
+    ) -> None:
+        """Initialize with the configured and the backed-off matrix interval."""
+        self.base_interval = interval
+        self.max_interval = max(interval, max_interval)
+        self.interval = interval
+        self.cache_window = cache_window
+        self.settle = settle
+        self.uploads = 0
+        self.refresh_at: float | None = None
+        self._signature: tuple[object, object] | None = None
+        self._last_fetch: float | None = None
+        self._watched = False
+        self._uploaded = False
+
+    def watch_fetched(self, last_upload: object, total_qsos: object, now: float) -> bool:
+        """Record a watch result; return True if it shows a new upload.
+
+        The first result only sets the baseline. After a change the matrix
+        is due once the upload has had time to settle and ClubLog's cached
+        copy from the last matrix fetch has expired.
+        """
+        signature = (last_upload, total_qsos)
+        previous, self._signature = self._signature, signature
+        self._watched = True
+        if previous is None or signature == previous:
+            return False
+        self.uploads += 1
+        self._uploaded = True
+        self.interval = self.base_interval
+        due = now + self.settle
+        if self._last_fetch is not None:
+            due = max(due, self._last_fetch + self.cache_window)
+        self.refresh_at = due
+        return True
+
+    def take_refresh(self) -> float | None:
+        """Return and clear the matrix refresh time requested by an upload."""
+        due, self.refresh_at = self.refresh_at, None
+        return due
+
+    def matrix_fetched(self, now: float) -> float:
+        """Record a successful matrix fetch; return the interval to the next."""
+        if self._last_fetch is not None and self._watched and not self._uploaded:
+            self.interval = min(self.interval * MATRIX_BACKOFF, self.max_interval)
+        elif self._uploaded:
+            self.interval = self.base_interval
+        self._last_fetch = now
+        self._watched = False
+        self._uploaded = False
+        return self.interval
+
+
+class RequestBudget:
+    """Sliding-window count of ClubLog requests across all endpoints.
+
+    Thread-safe: background fetches spend from the same budget.
+    """
+
+    def __init__(self, limit: int, window: float) -> None:
+        """Allow `limit` requests in any `window` seconds."""
+        self.limit = limit
+        self.window = window
+        self._sent: deque[float] = deque()
+        self._lock = threading.Lock()
+
+    def spend(self, now: float) -> None:
+        """Record a request sent at monotonic time `now`."""
+        with self._lock:
+            self._prune(now)
+            self._sent.append(now)
+
+    def remaining(self, now: float) -> int:
+        """Return how many requests the window still allows."""
+        with self._lock:
+            self._prune(now)
+            return max(0, self.limit - len(self._sent))
+
+    def _prune(self, now: float) -> None:
+        sent = self._sent
+        while sent and sent[0] <= now - self.window:
+            sent.popleft()
+
+
+class RefreshGate:
+    """Admission of on-demand refreshes: minimum interval, budget, coalescing.
+
+    Call fetched() for every request sent, whatever triggered it; request()
+    then decides on each refresh asked for. An accepted refresh stays
+    pending, and later requests for it coalesce, until its fetch is
+    recorded or clear() is called.
+    """
+
+    def __init__(self, budget: RequestBudget, min_interval: float) -> None:
+        """Initialize with the shared budget and the per-endpoint minimum interval."""
+        self.budget = budget
+        self.min_interval = min_interval
+        self.pending: set[str] = set()
+        self._last: dict[str, float] = {}
+
+    def request(self, endpoint: str, now: float) -> str:
+        """Decide on a refresh of endpoint; return a REFRESH_* outcome."""
+        if endpoint in self.pending:
+            return REFRESH_COALESCED
+        last = self._last.get(endpoint)
+        if last is not None and now - last < self.min_interval:
+            return REFRESH_TOO_SOON
+        if self.budget.remaining(now) <= len(self.pending):
+            return REFRESH_BUDGET
+        self.pending.add(endpoint)
+        return REFRESH_ACCEPTED
+
+    def fetched(self, endpoint: str, now: float) -> None:
+        """Record a request for endpoint (scheduled or on demand)."""
+        self.pending.discard(endpoint)
+        self._last[endpoint] = now
+        self.budget.spend(now)
+
+    def clear(self) -> None:
+        """Drop pending refreshes (the 403 breaker opened before they ran)."""
+        self.pending.clear()
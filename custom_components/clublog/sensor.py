@@ -7,19 +7,32 @@ from dataclasses import dataclass
 from typing import Any
 
 from homeassistant.components.sensor import (
+    SensorDeviceClass,
     SensorEntity,
     SensorEntityDescription,
     SensorStateClass,
 )
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.const import EntityCategory, UnitOfInformation, UnitOfTime
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.device_registry import DeviceEntryType
 from homeassistant.helpers.entity import DeviceInfo
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.helpers.event import async_track_utc_time_change
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
+from homeassistant.util import dt as dt_util
 
-from .const import ATTRIBUTION, CONF_CALLSIGN, DOMAIN, VERSION
-from .coordinator import ClubLogCoordinator, ClubLogData
+from .band_analytics import activity_attributes, best_band_attributes
+from .const import (
+    ATTRIBUTION,
+    CONF_CALLSIGN,
+    CONF_LOGGER_UDP_PORT,
+    CONF_SNAPSHOT_HISTORY,
+    CONF_SPOT_TOPIC,
+    DOMAIN,
+    VERSION,
+)
+from .coordinator import ENDPOINT_INTERVALS, ClubLogCoordinator, ClubLogData
 
 
 @dataclass(frozen=True, kw_only=True)
@@ -28,6 +41,24 @@ class ClubLogSensorEntityDescription(SensorEntityDescription):
 
     value_fn: Callable[[ClubLogData], Any] = lambda _: None
     attr_fn: Callable[[ClubLogData], dict[str, Any] | None] = lambda _: None
+    # Re-evaluate at the top of every UTC hour from cached data
+    hourly_update: bool = False
+    # Only created when this entry option is set (None = always)
+    option: str | None = None
+
+
+def _band_activity_attrs(data: ClubLogData) -> dict[str, Any] | None:
+    """Per-band QSO totals, plus all-time hourly counts when available."""
+    attrs: dict[str, Any] = {
+        f"band_{band}": hours if isinstance(hours, int) else sum(hours)
+        for band, hours in data.activity.items()
+    }
+    if data.activity_all_time:
+        attrs["all_time"] = data.activity_all_time
+        attrs["all_time_fetched"] = data.activity_all_time_fetched
+    if data.activity_grid:
+        attrs.update(activity_attributes(data.activity_grid))
+    return attrs or None
 
 
 SENSOR_DESCRIPTIONS: tuple[ClubLogSensorEntityDescription, ...] = (
@@ -56,6 +87,48 @@ SENSOR_DESCRIPTIONS: tuple[ClubLogSensorEntityDescription, ...] = (
         icon="mdi:earth-arrow-right",
         value_fn=lambda data: data.dxcc_verified_total,
     ),
+    ClubLogSensorEntityDescription(
+        key="dxcc_worked_30d",
+        translation_key="dxcc_worked_30d",
+        state_class=SensorStateClass.MEASUREMENT,
+        native_unit_of_measurement="entities",
+        icon="mdi:chart-line",
+        option=CONF_SNAPSHOT_HISTORY,
+        value_fn=lambda data: data.dxcc_trend["worked_30d"] if data.dxcc_trend else None,
+        attr_fn=lambda data: {
+            "confirmed_30d": data.dxcc_trend["confirmed_30d"],
+            "monthly": data.dxcc_trend["monthly"],
+        }
+        if data.dxcc_trend
+        else None,
+    ),
+    ClubLogSensorEntityDescription(
+        key="dxcc_provisional",
+        translation_key="dxcc_provisional",
+        state_class=SensorStateClass.MEASUREMENT,
+        native_unit_of_measurement="slots",
+        icon="mdi:timer-sand",
+        option=CONF_LOGGER_UDP_PORT,
+        value_fn=lambda data: len(data.dxcc_provisional),
+        attr_fn=lambda data: {
+            "slots": [
+                {"call": c.call, "dxcc": c.dxcc, "band": c.band, "logged_at": c.logged_at}
+                for c in data.dxcc_provisional[-50:]
+            ]
+        },
+    ),
+    ClubLogSensorEntityDescription(
+        key="needed_spots",
+        translation_key="needed_spots",
+        state_class=SensorStateClass.MEASUREMENT,
+        native_unit_of_measurement="spots",
+        icon="mdi:binoculars",
+        option=CONF_SPOT_TOPIC,
+        value_fn=lambda data: len(data.needed_spots),
+        attr_fn=lambda data: {
+            "spots": [spot.to_dict() for spot in data.needed_spots[:20]]
+        },
+    ),
     # --- Expeditions ---
     ClubLogSensorEntityDescription(
         key="active_expeditions",
@@ -66,7 +139,7 @@ SENSOR_DESCRIPTIONS: tuple[ClubLogSensorEntityDescription, ...] = (
         value_fn=lambda data: len(data.expeditions),
         attr_fn=lambda data: {
             "expeditions": [
-                {"call": e[0], "date": e[1], "qso_count": e[2]}
+                {"call": e.call, "date": e.date, "qso_count": e.qso_count}
                 for e in data.expeditions[:20]
             ]
             if data.expeditions
@@ -82,7 +155,7 @@ SENSOR_DESCRIPTIONS: tuple[ClubLogSensorEntityDescription, ...] = (
         icon="mdi:star",
         value_fn=lambda data: len(data.most_wanted),
         attr_fn=lambda data: {
-            "top_10": dict(list(data.most_wanted.items())[:10])
+            "top_10": data.most_wanted.top(10)
         }
         if data.most_wanted
         else None,
@@ -94,19 +167,13 @@ SENSOR_DESCRIPTIONS: tuple[ClubLogSensorEntityDescription, ...] = (
         state_class=SensorStateClass.TOTAL,
         native_unit_of_measurement="QSOs",
         icon="mdi:radio-tower",
-        value_fn=lambda data: (
-            data.watch.get("clublog_info", {}).get("total_qsos")
-            if data.watch
-            else None
-        ),
+        value_fn=lambda data: data.watch.total_qsos if data.watch else None,
     ),
     ClubLogSensorEntityDescription(
         key="watch_is_expedition",
         translation_key="watch_is_expedition",
         icon="mdi:airplane-takeoff",
-        value_fn=lambda data: (
-            "Yes" if data.watch.get("is_expedition") else "No"
-        )
+        value_fn=lambda data: ("Yes" if data.watch.is_expedition else "No")
         if data.watch
         else None,
     ),
@@ -114,9 +181,7 @@ SENSOR_DESCRIPTIONS: tuple[ClubLogSensorEntityDescription, ...] = (
         key="watch_has_oqrs",
         translation_key="watch_has_oqrs",
         icon="mdi:email-check",
-        value_fn=lambda data: (
-            "Yes" if data.watch.get("has_oqrs") else "No"
-        )
+        value_fn=lambda data: ("Yes" if data.watch.has_oqrs else "No")
         if data.watch
         else None,
     ),
@@ -124,11 +189,7 @@ SENSOR_DESCRIPTIONS: tuple[ClubLogSensorEntityDescription, ...] = (
         key="watch_last_upload",
         translation_key="watch_last_upload",
         icon="mdi:cloud-upload",
-        value_fn=lambda data: (
-            data.watch.get("clublog_info", {}).get("last_clublog_upload")
-            if data.watch
-            else None
-        ),
+        value_fn=lambda data: data.watch.last_upload if data.watch else None,
     ),
     # --- Livestreams ---
     ClubLogSensorEntityDescription(
@@ -140,7 +201,7 @@ SENSOR_DESCRIPTIONS: tuple[ClubLogSensorEntityDescription, ...] = (
         value_fn=lambda data: len(data.livestreams),
         attr_fn=lambda data: {
             "livestreams": [
-                {"call": s[0], "dxcc": s[1], "url": s[3]}
+                {"call": s.call, "dxcc": s.dxcc, "url": s.url}
                 for s in data.livestreams[:20]
             ]
             if data.livestreams
@@ -155,11 +216,20 @@ SENSOR_DESCRIPTIONS: tuple[ClubLogSensorEntityDescription, ...] = (
         native_unit_of_measurement="bands",
         icon="mdi:sine-wave",
         value_fn=lambda data: len(data.activity) if data.activity else 0,
-        attr_fn=lambda data: {
-            f"band_{band}": sum(hours) if isinstance(hours, list) else hours
-            for band, hours in data.activity.items()
-        }
-        if data.activity
+        attr_fn=lambda data: _band_activity_attrs(data),
+    ),
+    ClubLogSensorEntityDescription(
+        key="best_band_now",
+        translation_key="best_band_now",
+        icon="mdi:trophy",
+        hourly_update=True,
+        value_fn=lambda data: data.activity_grid.best_band(dt_util.utcnow().hour)
+        if data.activity_grid
+        else None,
+        attr_fn=lambda data: best_band_attributes(
+            data.activity_grid, dt_util.utcnow().hour
+        )
+        if data.activity_grid
         else None,
     ),
     # --- Diagnostics ---
@@ -181,6 +251,49 @@ SENSOR_DESCRIPTIONS: tuple[ClubLogSensorEntityDescription, ...] = (
 )
 
 
+def _timing_value(data: ClubLogData, endpoint: str, stat: str) -> Any:
+    """Return one p50/p95 statistic from an endpoint's timing history."""
+    summary = data.fetch_timing.summary(endpoint)
+    return summary[stat] if summary else None
+
+
+# Per-endpoint fetch timing — disabled by default, diagnostics only
+TIMING_SENSOR_DESCRIPTIONS: tuple[ClubLogSensorEntityDescription, ...] = tuple(
+    description
+    for endpoint in ENDPOINT_INTERVALS
+    for description in (
+        ClubLogSensorEntityDescription(
+            key=f"{endpoint}_latency",
+            translation_key=f"{endpoint}_latency",
+            device_class=SensorDeviceClass.DURATION,
+            state_class=SensorStateClass.MEASUREMENT,
+            native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+            icon="mdi:timer-outline",
+            entity_category=EntityCategory.DIAGNOSTIC,
+            entity_registry_enabled_default=False,
+            value_fn=lambda data, ep=endpoint: _timing_value(data, ep, "wall_p50_ms"),
+            attr_fn=lambda data, ep=endpoint: data.fetch_timing.summary(ep),
+        ),
+        ClubLogSensorEntityDescription(
+            key=f"{endpoint}_payload_size",
+            translation_key=f"{endpoint}_payload_size",
+            device_class=SensorDeviceClass.DATA_SIZE,
+            state_class=SensorStateClass.MEASUREMENT,
+            native_unit_of_measurement=UnitOfInformation.BYTES,
+            icon="mdi:download-network",
+            entity_category=EntityCategory.DIAGNOSTIC,
+            entity_registry_enabled_default=False,
+            value_fn=lambda data, ep=endpoint: _timing_value(
+                data, ep, "size_p50_bytes"
+            ),
+            attr_fn=lambda data, ep=endpoint: {
+                "size_p95_bytes": _timing_value(data, ep, "size_p95_bytes")
+            },
+        ),
+    )
+)
+
+
 async def async_setup_entry(
     hass: HomeAssistant,
     entry: ConfigEntry,
@@ -190,7 +303,9 @@ async def async_setup_entry(
     coordinator: ClubLogCoordinator = hass.data[DOMAIN][entry.entry_id]
 
     async_add_entities(
-        ClubLogSensor(coordinator, description) for description in SENSOR_DESCRIPTIONS
+        ClubLogSensor(coordinator, description)
+        for description in (*SENSOR_DESCRIPTIONS, *TIMING_SENSOR_DESCRIPTIONS)
+        if description.option is None or entry.options.get(description.option)
     )
 
 
@@ -211,6 +326,21 @@ class ClubLogSensor(CoordinatorEntity[ClubLogCoordinator], SensorEntity):
         self.entity_description = description
         self._attr_unique_id = f"{coordinator.entry.entry_id}_{description.key}"
 
+    async def async_added_to_hass(self) -> None:
+        """Register the hourly re-evaluation for time-dependent sensors."""
+        await super().async_added_to_hass()
+        if self.entity_description.hourly_update:
+            self.async_on_remove(
+                async_track_utc_time_change(
+                    self.hass, self._async_hourly_update, minute=0, second=0
+                )
+            )
+
+    @callback
+    def _async_hourly_update(self, _now: Any) -> None:
+        """Recompute the state from cached data — no ClubLog request."""
+        self.async_write_ha_state()
+
     @property
     def device_info(self) -> DeviceInfo:
         """Return device info to group all sensors under one device."""
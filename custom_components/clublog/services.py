@@ -0,0 +1,141 @@
+"""Services for ClubLog HA Bridge.
+
+clublog.lookup_slot, clublog.lookup_rank and clublog.needed_for_call answer
+from the LookupIndex the coordinator rebuilds on each matrix and most
+wanted fetch, so a call is a few dictionary lookups rather than a template
+walking sensor attributes.
+
+clublog.refresh fetches endpoints now, within the coordinator's minimum
+interval and request budget.
+"""
+
+from __future__ import annotations
+
+from typing import Any
+
+import voluptuous as vol
+from homeassistant.core import (
+    HomeAssistant,
+    ServiceCall,
+    ServiceResponse,
+    SupportsResponse,
+)
+from homeassistant.exceptions import HomeAssistantError, ServiceValidationError
+from homeassistant.helpers import config_validation as cv
+
+from .const import (
+    CONF_CALLSIGN,
+    DOMAIN,
+    SERVICE_LOOKUP_RANK,
+    SERVICE_LOOKUP_SLOT,
+    SERVICE_NEEDED_FOR_CALL,
+    SERVICE_REFRESH,
+)
+from .coordinator import (
+    ENDPOINT_INTERVALS,
+    ENDPOINT_MATRIX,
+    ENDPOINT_MOST_WANTED,
+    ClubLogCoordinator,
+)
+
+ATTR_BAND = "band"
+ATTR_CALL = "call"
+ATTR_DXCC = "dxcc"
+ATTR_ENDPOINTS = "endpoints"
+
+_ACCOUNT = {vol.Optional(CONF_CALLSIGN): cv.string}
+
+LOOKUP_SLOT_SCHEMA = vol.Schema(
+    {vol.Required(ATTR_DXCC): cv.positive_int, vol.Required(ATTR_BAND): cv.string, **_ACCOUNT}
+)
+LOOKUP_RANK_SCHEMA = vol.Schema({vol.Required(ATTR_DXCC): cv.positive_int, **_ACCOUNT})
+NEEDED_FOR_CALL_SCHEMA = vol.Schema(
+    {vol.Required(ATTR_CALL): cv.string, vol.Optional(ATTR_BAND): cv.string, **_ACCOUNT}
+)
+REFRESH_SCHEMA = vol.Schema(
+    {
+        vol.Optional(ATTR_ENDPOINTS, default=list(ENDPOINT_INTERVALS)): vol.All(
+            cv.ensure_list, [vol.In(ENDPOINT_INTERVALS)]
+        ),
+        **_ACCOUNT,
+    }
+)
+
+
+def _coordinator(hass: HomeAssistant, call: ServiceCall, *endpoints: str) -> ClubLogCoordinator:
+    """Return the account's coordinator, once the endpoints have been fetched."""
+    coordinators: dict[str, ClubLogCoordinator] = hass.data.get(DOMAIN, {})
+    callsign = call.data.get(CONF_CALLSIGN, "").strip().upper()
+    if callsign:
+        found = [
+            c for c in coordinators.values()
+            if c.entry.data[CONF_CALLSIGN].upper() == callsign
+        ]
+    else:
+        found = list(coordinators.values())
+    if len(found) != 1:
+        raise ServiceValidationError(
+            f"No ClubLog account for {callsign}" if callsign or not found
+            else "Several ClubLog accounts are set up — pass a callsign"
+        )
+    coordinator = found[0]
+    fetched = coordinator.data.last_successful_fetch
+    for endpoint in endpoints:
+        if endpoint not in fetched:
+            raise HomeAssistantError(f"ClubLog {endpoint} has not been fetched yet")
+    return coordinator
+
+
+def async_setup_services(hass: HomeAssistant) -> None:
+    """Register the lookup and refresh services."""
+
+    async def lookup_slot(call: ServiceCall) -> ServiceResponse:
+        coordinator = _coordinator(hass, call, ENDPOINT_MATRIX)
+        try:
+            return coordinator.data.lookup.slot(call.data[ATTR_DXCC], call.data[ATTR_BAND])
+        except ValueError as err:
+            raise ServiceValidationError(str(err)) from err
+
+    async def lookup_rank(call: ServiceCall) -> ServiceResponse:
+        coordinator = _coordinator(hass, call, ENDPOINT_MOST_WANTED)
+        return coordinator.data.lookup.wanted(call.data[ATTR_DXCC])
+
+    async def needed_for_call(call: ServiceCall) -> ServiceResponse:
+        coordinator = _coordinator(hass, call, ENDPOINT_MATRIX)
+        cty = await coordinator.async_get_cty()
+        if cty is None:
+            raise HomeAssistantError("cty.xml is not available yet")
+        try:
+            found: dict[str, Any] | None = coordinator.data.lookup.call(
+                call.data[ATTR_CALL], cty, call.data.get(ATTR_BAND), coordinator.clock.time()
+            )
+        except ValueError as err:
+            raise ServiceValidationError(str(err)) from err
+        if found is None:
+            raise ServiceValidationError(
+                f"{call.data[ATTR_CALL]} does not resolve to a DXCC entity"
+            )
+        return found
+
+    async def refresh(call: ServiceCall) -> ServiceResponse:
+        coordinator = _coordinator(hass, call)
+        outcomes = await coordinator.async_refresh_endpoints(
+            list(dict.fromkeys(call.data[ATTR_ENDPOINTS]))
+        )
+        return {ATTR_ENDPOINTS: outcomes} if call.return_response else None
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_REFRESH,
+        refresh,
+        schema=REFRESH_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+    for name, handler, schema in (
+        (SERVICE_LOOKUP_SLOT, lookup_slot, LOOKUP_SLOT_SCHEMA),
+        (SERVICE_LOOKUP_RANK, lookup_rank, LOOKUP_RANK_SCHEMA),
+        (SERVICE_NEEDED_FOR_CALL, needed_for_call, NEEDED_FOR_CALL_SCHEMA),
+    ):
+        hass.services.async_register(
+            DOMAIN, name, handler, schema=schema, supports_response=SupportsResponse.ONLY
+        )
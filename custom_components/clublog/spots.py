@@ -0,0 +1,269 @@
+"""Flag needed DX in a stream of spots or decoded callsigns.
+
+Spot sources (a DX cluster gateway, PSK Reporter's MQTT feed, a decoder
+republishing what it hears) put one spot per MQTT message, at rates that
+reach thousands a second. parse_spot() accepts the common shapes:
+
+- JSON objects, with the call under dx/call/callsign/sc (PSK Reporter's
+  sender call), the frequency under freq/frequency/f, and optionally
+  band/b, mode/md, dxcc/sa and spotter/de/rc;
+- DX cluster lines ("DX de W3LPL:  14025.0  VP9XY  CW 599");
+- plain text, a call optionally followed by a frequency.
+
+Frequencies are read as Hz, kHz or MHz by magnitude, since sources differ.
+
+SpotMatcher answers "is this spot needed?" with dictionary lookups only:
+the matrix is flattened into {entity: frozenset(bands worked)} whenever it
+changes, callsigns are resolved through cty.xml once and cached, and a
+needed (call, band) is only reported once per dedup window, so a station
+spotted every few seconds alerts once.
+
+This module is shared verbatim between the Docker bridge (clublog_bridge/)
+and the HACS integration (custom_components/clublog/) — keep both copies
+identical.
+"""
+
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+from typing import Any
+
+from .dxcc import CtyDatabase, band_for
+
+try:
+    from orjson import loads as json_loads
+except ImportError:  # pragma: no cover - orjson is optional in Docker mode
+    from json import loads as json_loads
+
+# Outcomes of SpotMatcher.match(), also used as metric labels
+NEW_ENTITY = "new_entity"  # Entity never worked (an all-time new one)
+NEW_BAND = "new_band"  # Entity worked, but not on this band
+WORKED = "worked"
+DUPLICATE = "duplicate"  # Needed, but already reported in the window
+UNRESOLVED = "unresolved"  # No entity or band for the spot
+INVALID = "invalid"  # Not a spot at all
+
+# Resolved calls kept before the cache starts over
+CALL_CACHE_SIZE = 50_000
+
+_CALL_KEYS = ("dx", "call", "callsign", "dx_call", "sc")
+_FREQ_KEYS = ("freq", "frequency", "f")
+_BAND_KEYS = ("band", "b")
+_MODE_KEYS = ("mode", "md")
+_DXCC_KEYS = ("dxcc", "dx_dxcc", "sa")
+_SPOTTER_KEYS = ("spotter", "de", "rc")
+
+_CLUSTER = re.compile(rb"^DX de ([^:\s]+):?\s+([\d.]+)\s+(\S+)", re.IGNORECASE)
+_CALL = re.compile(r"^[A-Z0-9]+(?:/[A-Z0-9]+)*$")
+
+
+@dataclass(slots=True)
+class Spot:
+    """One spotted station."""
+
+    call: str
+    freq: float | None = None  # MHz
+    band: str | None = None  # Matrix band key ("20", "70cm")
+    mode: str | None = None
+    dxcc: int | None = None  # From the spot itself, when the source knows it
+    spotter: str | None = None
+
+
+@dataclass(slots=True)
+class NeededSpot:
+    """A spot of a needed entity or band."""
+
+    call: str
+    dxcc: int
+    band: str
+    need: str  # NEW_ENTITY or NEW_BAND
+    freq: float | None
+    mode: str | None
+    spotter: str | None
+    seen_at: float
+
+    def to_dict(self) -> dict[str, Any]:
+        """Return the spot as event or attribute data."""
+        return {
+            "call": self.call,
+            "dxcc": self.dxcc,
+            "band": self.band,
+            "need": self.need,
+            "freq": self.freq,
+            "mode": self.mode,
+            "spotter": self.spotter,
+            "seen_at": self.seen_at,
+        }
+
+
+def _mhz(value: Any) -> float | None:
+    """Read a frequency given in Hz, kHz or MHz."""
+    try:
+        freq = float(value)
+    except (TypeError, ValueError):
+        return None
+    if freq >= 1_000_000:
+        return freq / 1_000_000
+    if freq >= 1_000:
+        return freq / 1_000
+    return freq if freq > 0 else None
+
+
+def _first(fields: dict[str, Any], keys: tuple[str, ...]) -> Any:
+    for key in keys:
+        value = fields.get(key)
+        if value not in (None, ""):
+            return value
+    return None
+
+
+def _spot(call: Any, freq: float | None, band: Any = None, **extra: Any) -> Spot | None:
+    """Build a Spot if call looks like a callsign."""
+    call = str(call or "").strip().upper()
+    if not _CALL.match(call) or not any(c.isdigit() for c in call):
+        return None
+    return Spot(call, freq, band_for(str(band) if band else None, freq), **extra)
+
+
+def parse_spot(payload: bytes) -> Spot | None:
+    """Return the spot in an MQTT payload (None if it is not one)."""
+    payload = payload.strip()
+    if payload[:1] == b"{":
+        try:
+            fields = json_loads(payload)
+        except ValueError:
+            return None
+        if not isinstance(fields, dict):
+            return None
+        fields = {str(key).lower(): value for key, value in fields.items()}
+        try:
+            dxcc = int(_first(fields, _DXCC_KEYS) or 0) or None
+        except (TypeError, ValueError):
+            dxcc = None
+        mode = _first(fields, _MODE_KEYS)
+        spotter = _first(fields, _SPOTTER_KEYS)
+        return _spot(
+            _first(fields, _CALL_KEYS),
+            _mhz(_first(fields, _FREQ_KEYS)),
+            _first(fields, _BAND_KEYS),
+            mode=str(mode) if mode else None,
+            dxcc=dxcc,
+            spotter=str(spotter).upper() if spotter else None,
+        )
+    match = _CLUSTER.match(payload)
+    if match:
+        return _spot(
+            match[3].decode("ascii", "replace"),
+            _mhz(match[2]),
+            spotter=match[1].decode("ascii", "replace").upper(),
+        )
+    parts = payload.decode("utf-8", "replace").split()
+    if not parts or len(parts) > 2:
+        return None
+    return _spot(parts[0], _mhz(parts[1]) if len(parts) == 2 else None)
+
+
+class SpotMatcher:
+    """Check spots against the DXCC matrix through precomputed tables.
+
+    load() may be called from one thread while match() runs in another:
+    each table is replaced whole, never changed in place.
+    """
+
+    def __init__(self, window: float, cty: CtyDatabase | None = None) -> None:
+        """Initialize; a needed (call, band) is reported once per `window` s."""
+        self.window = window
+        self.cty = cty
+        self._worked: dict[int, frozenset[str]] | None = None
+        self._calls: dict[str, int | None] = {}
+        self._reported: dict[tuple[str, str], NeededSpot] = {}
+        self._pruned = 0.0
+
+    @property
+    def ready(self) -> bool:
+        """Return True once a matrix has been loaded."""
+        return self._worked is not None
+
+    def load(self, matrix: dict[str, dict[str, int]]) -> None:
+        """Build the lookup tables from a (merged) DXCC matrix."""
+        worked = {}
+        for dxcc, bands in matrix.items():
+            try:
+                worked[int(dxcc)] = frozenset(bands)
+            except ValueError:
+                continue
+        self._worked = worked
+        # Exceptions in cty.xml have validity dates; resolve afresh now and then
+        self._calls = {}
+
+    def set_cty(self, cty: CtyDatabase) -> None:
+        """Resolve calls with a newly loaded cty.xml."""
+        self.cty = cty
+        self._calls = {}
+
+    def resolve(self, spot: Spot, now: float) -> int | None:
+        """Return a spot's DXCC entity, from the spot or cty.xml (cached)."""
+        if spot.dxcc is not None:
+            return spot.dxcc
+        calls = self._calls
+        try:
+            return calls[spot.call]
+        except KeyError:
+            pass
+        dxcc = self.cty.resolve(spot.call, now) if self.cty else None
+        if len(calls) >= CALL_CACHE_SIZE:
+            calls = self._calls = {}
+        calls[spot.call] = dxcc
+        return dxcc
+
+    def need(self, dxcc: int, band: str) -> str | None:
+        """Return NEW_ENTITY or NEW_BAND if the slot is needed, else None."""
+        worked = self._worked
+        if worked is None:
+            return None
+        bands = worked.get(dxcc)
+        if bands is None:
+            return NEW_ENTITY
+        return NEW_BAND if band not in bands else None
+
+    def match(self, spot: Spot, now: float) -> tuple[str, NeededSpot | None]:
+        """Check one spot; return (outcome, the needed spot to report or None)."""
+        if spot.band is None or self._worked is None:
+            return UNRESOLVED, None
+        dxcc = self.resolve(spot, now)
+        if dxcc is None:
+            return UNRESOLVED, None
+        need = self.need(dxcc, spot.band)
+        if need is None:
+            return WORKED, None
+        if now - self._pruned > self.window:
+            self._prune(now)
+        key = (spot.call, spot.band)
+        previous = self._reported.get(key)
+        if previous is not None and now - previous.seen_at < self.window:
+            return DUPLICATE, None
+        needed = self._reported[key] = NeededSpot(
+            spot.call, dxcc, spot.band, need, spot.freq, spot.mode, spot.spotter, now
+        )
+        return need, needed
+
+    def recent(self, now: float) -> list[NeededSpot]:
+        """Return needed spots reported within the window, newest first.
+
+        Slots worked since they were reported are left out.
+        """
+        spots = [
+            spot for spot in list(self._reported.values())
+            if now - spot.seen_at < self.window and self.need(spot.dxcc, spot.band)
+        ]
+        spots.sort(key=lambda spot: spot.seen_at, reverse=True)
+        return spots
+
+    def _prune(self, now: float) -> None:
+        """Forget reports older than the window."""
+        self._pruned = now
+        self._reported = {
+            key: spot for key, spot in self._reported.items()
+            if now - spot.seen_at < self.window
+        }
@@ -0,0 +1,69 @@
+"""Long-term statistics for ClubLog HA Bridge.
+
+DXCC progress from the snapshot history — worked and confirmed entities in
+total and per band — is written to the recorder as external statistics
+(clublog:<callsign>_dxcc_worked, clublog:<callsign>_dxcc_20_confirmed, …),
+one hourly row per hour the count changed. A batch of rows per statistic
+goes to the recorder in one call, so the backfill at startup imports the
+whole history at once instead of replaying state changes, and each matrix
+fetch adds the rows of the hours since the last import.
+
+Counts are stored as sums (state and sum are the count), so statistics
+cards can show growth over any period.
+"""
+
+from __future__ import annotations
+
+import re
+
+from homeassistant.components.recorder.models import StatisticData, StatisticMetaData
+from homeassistant.components.recorder.statistics import async_add_external_statistics
+from homeassistant.core import HomeAssistant
+from homeassistant.util import dt as dt_util
+
+from .const import DOMAIN
+
+_INVALID = re.compile(r"[^a-z0-9]+")
+
+
+def statistic_id(callsign: str, key: str) -> str:
+    """Return the statistic ID of a progress key for an account."""
+    parts = key.split("/")  # "worked" or "band/<band>/<status>"
+    name = "_".join(["dxcc", *parts[1:]]) if parts[0] == "band" else f"dxcc_{key}"
+    return f"{DOMAIN}:{_slug(callsign)}_{_slug(name)}"
+
+
+def _slug(text: str) -> str:
+    return _INVALID.sub("_", text.lower()).strip("_")
+
+
+def statistic_name(callsign: str, key: str) -> str:
+    """Return the display name of a progress key for an account."""
+    parts = key.split("/")
+    if parts[0] == "band":
+        band = f"{parts[1]}m" if parts[1].isdigit() else parts[1]
+        return f"ClubLog {callsign.upper()} DXCC {parts[2].capitalize()} {band}"
+    return f"ClubLog {callsign.upper()} DXCC {key.capitalize()}"
+
+
+def async_import_progress(
+    hass: HomeAssistant, callsign: str, progress: dict[str, list[tuple[float, int]]]
+) -> None:
+    """Queue the hourly rows of each progress key for the recorder."""
+    for key, rows in progress.items():
+        metadata = StatisticMetaData(
+            has_mean=False,
+            has_sum=True,
+            name=statistic_name(callsign, key),
+            source=DOMAIN,
+            statistic_id=statistic_id(callsign, key),
+            unit_of_measurement="entities",
+        )
+        async_add_external_statistics(
+            hass,
+            metadata,
+            [
+                StatisticData(start=dt_util.utc_from_timestamp(hour), state=value, sum=value)
+                for hour, value in rows
+            ],
+        )
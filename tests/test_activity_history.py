@@ -0,0 +1,98 @@
+"""Tests for full-history band activity caching and merging."""
+
+import json
+from array import array
+
+from clublog_bridge.activity_history import ActivityHistory, retry_delays
+
+
+class TestRetryDelays:
+    """Tests for the exponential retry schedule."""
+
+    def test_doubles(self):
+        assert retry_delays(300, 5) == [300, 600, 1200, 2400, 4800]
+
+    def test_zero_attempts(self):
+        assert retry_delays(300, 0) == []
+
+
+class TestMerge:
+    """Tests for merging full history with lastyear=1 refreshes."""
+
+    def test_no_growth_returns_full(self):
+        history = ActivityHistory(0.0, {"20m": [10] * 24}, {"20m": [2] * 24})
+        assert history.merged({"20m": [2] * 24}) == {"20m": [10] * 24}
+
+    def test_growth_added_per_hour(self):
+        recent = [2] * 24
+        recent[5] = 7
+        history = ActivityHistory(0.0, {"20m": [10] * 24}, {"20m": [2] * 24})
+        merged = history.merged({"20m": recent})
+        assert merged["20m"][5] == 15
+        assert merged["20m"][0] == 10
+
+    def test_aged_out_counts_not_subtracted(self):
+        """Counts leaving the rolling last-year window never reduce all-time."""
+        history = ActivityHistory(0.0, {"20m": [10] * 24}, {"20m": [5] * 24})
+        assert history.merged({"20m": [0] * 24}) == {"20m": [10] * 24}
+
+    def test_new_band_since_full_fetch(self):
+        history = ActivityHistory(0.0, {"20m": [1] * 24}, {})
+        merged = history.merged({"6m": [3] * 24})
+        assert merged["6m"] == [3] * 24
+        assert merged["20m"] == [1] * 24
+
+    def test_missing_baseline_uses_recent(self):
+        """Before a baseline exists, recent counts are assumed already in full."""
+        history = ActivityHistory(0.0, {"20m": [10] * 24})
+        assert history.merged({"20m": [4] * 24}) == {"20m": [10] * 24}
+
+    def test_scalar_and_array_values(self):
+        history = ActivityHistory(0.0, {"20m": 100, "40m": array("I", [1] * 24)}, {})
+        merged = history.merged({"20m": 5, "40m": array("I", [0] * 24)})
+        assert merged["20m"] == 105
+        assert merged["40m"] == [1] * 24
+
+    def test_mixed_shapes_fall_back_to_totals(self):
+        history = ActivityHistory(0.0, {"20m": [1] * 24}, {"20m": 0})
+        assert history.merged({"20m": 6}) == {"20m": 30}
+
+
+class TestBaseline:
+    """Tests for adopting the last-year baseline."""
+
+    def test_adopted_once(self):
+        history = ActivityHistory(0.0, {"20m": [1] * 24})
+        assert history.adopt_baseline({"20m": array("I", [2] * 24)}) is True
+        assert history.baseline == {"20m": [2] * 24}
+        assert history.adopt_baseline({"20m": [9] * 24}) is False
+        assert history.baseline == {"20m": [2] * 24}
+
+    def test_empty_recent_not_adopted(self):
+        history = ActivityHistory(0.0, {"20m": [1] * 24})
+        assert history.adopt_baseline({}) is False
+        assert history.baseline is None
+
+
+class TestCache:
+    """Tests for on-disk cache serialization."""
+
+    def test_round_trip_through_json(self, sample_activity):
+        full = {band: array("I", hours) for band, hours in sample_activity.items()}
+        history = ActivityHistory(1700000000.0, full, {"20m": 5})
+        loaded = ActivityHistory.from_dict(json.loads(json.dumps(history.to_dict())))
+        assert loaded.fetched_at == 1700000000.0
+        assert loaded.full == sample_activity
+        assert loaded.baseline == {"20m": 5}
+
+    def test_due_at(self):
+        assert ActivityHistory(1000.0, {}).due_at(2592000) == 2593000.0
+
+    def test_malformed_cache_ignored(self):
+        assert ActivityHistory.from_dict(None) is None
+        assert ActivityHistory.from_dict([]) is None
+        assert ActivityHistory.from_dict({"fetched_at": "x", "full": {}}) is None
+        assert ActivityHistory.from_dict({"fetched_at": 1.0, "full": []}) is None
+        assert ActivityHistory.from_dict(
+            {"fetched_at": 1.0, "full": {}, "baseline": 3}
+        ) is None
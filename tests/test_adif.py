@@ -0,0 +1,191 @@
+"""Tests for incremental ADIF parsing, log tailing and the bridge's local log."""
+
+import io
+import json
+
+import pytest
+
+from clublog_bridge.adif import AdifParser, AdifTailer, qso_time
+from clublog_bridge.dxcc import CtyDatabase
+from clublog_bridge.simulation import load_bridge
+from tests.test_dxcc import CTY_XML
+
+HEADER = b"WSJT-X ADIF Export<adif_ver:5>3.1.0<eoh>\n"
+
+
+def record(call: str, band: str = "20m", date: str = "20260201", time_on: str = "1430") -> bytes:
+    return (
+        f"<call:{len(call)}>{call} <band:{len(band)}>{band} <mode:3>FT8 "
+        f"<qso_date:8>{date} <time_on:{len(time_on)}>{time_on} <eor>\n"
+    ).encode()
+
+
+class TestAdifParser:
+    """Tests for the byte-stream parser."""
+
+    def test_skips_header(self):
+        parser = AdifParser()
+        records = parser.feed(HEADER + record("K1ABC"))
+        assert records == [
+            {"CALL": "K1ABC", "BAND": "20m", "MODE": "FT8", "QSO_DATE": "20260201", "TIME_ON": "1430"}
+        ]
+
+    def test_no_header_when_starting_with_tag(self):
+        assert AdifParser().feed(record("K1ABC"))[0]["CALL"] == "K1ABC"
+
+    def test_split_anywhere(self):
+        data = HEADER + record("K1ABC") + record("VE3XYZ")
+        for split in range(1, len(data)):
+            parser = AdifParser()
+            records = parser.feed(data[:split]) + parser.feed(data[split:])
+            assert [r["CALL"] for r in records] == ["K1ABC", "VE3XYZ"], split
+
+    def test_consumed_stops_at_last_record(self):
+        parser = AdifParser(header=False)
+        first = record("K1ABC").rstrip()
+        parser.feed(first + b"<call:5>VE3")
+        assert parser.consumed == len(first)
+        assert parser.pending == len(b"<call:5>VE3")
+
+    def test_type_indicator_and_utf8(self):
+        data = "<CALL:5>K1ABC<NAME:4:S>Zoë<EOR>".encode()
+        assert AdifParser().feed(data) == [{"CALL": "K1ABC", "NAME": "Zoë"}]
+
+    def test_corrupt_length_skipped(self):
+        data = b"<CALL:x>K1ABC<CALL:5>K1ABC<EOR>"
+        assert AdifParser().feed(data) == [{"CALL": "K1ABC"}]
+
+
+def test_qso_time():
+    assert qso_time({"QSO_DATE": "19700102", "TIME_ON": "0001"}) == 86460
+    assert qso_time({"QSO_DATE": "bad"}) is None
+
+
+class TestAdifTailer:
+    """Tests for offset-resuming tailing."""
+
+    def test_first_start_skips_existing_log(self, tmp_path):
+        log = tmp_path / "wsjtx_log.adi"
+        log.write_bytes(HEADER + record("K1ABC"))
+        tailer = AdifTailer(str(log))
+        assert tailer.poll() == []
+        with log.open("ab") as f:
+            f.write(record("VE3XYZ"))
+        assert [r["CALL"] for r in tailer.poll()] == ["VE3XYZ"]
+        assert tailer.poll() == []
+
+    def test_resumes_from_saved_offset(self, tmp_path):
+        log = tmp_path / "wsjtx_log.adi"
+        log.write_bytes(HEADER)
+        tailer = AdifTailer(str(log))
+        tailer.poll()
+        with log.open("ab") as f:
+            f.write(record("K1ABC") + b"<call:6>VE")
+        assert [r["CALL"] for r in tailer.poll()] == ["K1ABC"]
+        state = json.loads(json.dumps(tailer.to_dict()))
+        with log.open("ab") as f:
+            f.write(b"3XYZ <eor>\n" + record("VP9ABC"))
+        resumed = AdifTailer(str(log), state)
+        assert [r["CALL"] for r in resumed.poll()] == ["VE3XYZ", "VP9ABC"]
+
+    def test_rotation_reads_new_file_from_start(self, tmp_path):
+        log = tmp_path / "wsjtx_log.adi"
+        log.write_bytes(HEADER + record("K1ABC") * 20)
+        tailer = AdifTailer(str(log))
+        tailer.poll()
+        replacement = tmp_path / "new.adi"
+        replacement.write_bytes(HEADER + record("VE3XYZ"))
+        replacement.replace(log)
+        assert [r["CALL"] for r in tailer.poll()] == ["VE3XYZ"]
+
+    def test_limit_spreads_large_appends(self, tmp_path):
+        log = tmp_path / "wsjtx_log.adi"
+        log.write_bytes(HEADER)
+        tailer = AdifTailer(str(log))
+        tailer.poll()
+        with log.open("ab") as f:
+            f.write(b"".join(record(f"K{i}ABC") for i in range(100)))
+        calls = []
+        while batch := tailer.poll(limit=500):
+            calls += [r["CALL"] for r in batch]
+        assert calls == [f"K{i}ABC" for i in range(100)]
+
+    def test_missing_file(self, tmp_path):
+        assert AdifTailer(str(tmp_path / "missing.adi")).poll() == []
+
+
+@pytest.fixture
+def bridge(tmp_path):
+    bridge = load_bridge()
+    bridge.clock.time = lambda: 1769956200.0  # 2026-02-01 14:30 UTC
+    log = tmp_path / "wsjtx_log.adi"
+    log.write_bytes(HEADER)
+    bridge.local_log = bridge.LocalLog(str(log), str(tmp_path / "adif_tail.json"))
+    bridge.local_log.cty = CtyDatabase()
+    bridge.local_log.cty.load(io.BytesIO(CTY_XML))
+    bridge.local_log.poll()
+    bridge.log_path = log
+    return bridge
+
+
+class TestLocalLog:
+    """Tests for the bridge's local log overlay."""
+
+    def append(self, bridge, data: bytes) -> list:
+        with bridge.log_path.open("ab") as f:
+            f.write(data)
+        filled, _ = bridge.local_log.poll()
+        return filled
+
+    def test_dxcc_field_fills_new_slot(self, bridge):
+        bridge.local_log.reconcile({"291": {"20": 1}})
+        assert self.append(bridge, record("K1ABC").replace(b"<eor>", b"<dxcc:3>291<eor>")) == []
+        assert self.append(bridge, record("K1ABC", "40m").replace(b"<eor>", b"<dxcc:3>291<eor>"))
+        assert bridge.local_log.overlay.merged() == {"291": {"20": 1, "40": 2}}
+        assert bridge.metrics.LOCAL_QSOS.value("adif", "new_slot") >= 1
+
+    def test_unresolved(self, bridge):
+        assert self.append(bridge, record("ZZ9ZZ")) == []
+        assert len(bridge.local_log.overlay) == 0
+
+    def test_waits_for_cty(self, bridge):
+        cty, bridge.local_log.cty = bridge.local_log.cty, None
+        bridge.local_log.inbox.put(("wsjtx", {"CALL": "VP9XY", "BAND": "20m"}))
+        assert self.append(bridge, record("K1ABC")) == []
+        bridge.local_log.cty = cty
+        filled = bridge.local_log.poll()[0]
+        assert [(c.call, c.dxcc) for c in filled] == [("K1ABC", "291"), ("VP9XY", "64")]
+
+    def test_stale_qsos_ignored(self, bridge):
+        old = record("K1ABC", date="20250101").replace(b"<eor>", b"<dxcc:3>291<eor>")
+        assert self.append(bridge, old) == []
+
+    def test_state_survives_restart(self, bridge, tmp_path):
+        self.append(bridge, record("K1ABC").replace(b"<eor>", b"<dxcc:3>291<eor>"))
+        restarted = bridge.LocalLog(str(bridge.log_path), str(tmp_path / "adif_tail.json"))
+        restarted.cty = bridge.local_log.cty
+        assert list(restarted.overlay.cells) == [("291", "20")]
+        assert restarted.poll() == ([], False)
+
+
+def test_cty_age_follows_the_bridge_clock(tmp_path):
+    from clublog_bridge.scheduling import SimulatedClock
+
+    bridge = load_bridge()
+    bridge.CTY_FILE = ""
+    bridge.DATA_DIR = str(tmp_path)
+    path = tmp_path / "cty.xml"
+    path.write_bytes(CTY_XML)
+    fetched = []
+
+    def fetch_cty(target):
+        fetched.append(target)
+        return CtyDatabase.from_file(target)
+
+    bridge.fetch_cty = fetch_cty
+    bridge.clock = SimulatedClock(path.stat().st_mtime + 3600)
+    bridge._process_cty(None)
+    assert fetched == []
+    bridge.clock.advance(bridge.CTY_INTERVAL)
+    bridge._process_cty(None)
+    assert fetched == [str(path)]
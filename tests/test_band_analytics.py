@@ -0,0 +1,130 @@
+"""Tests for band-activity analytics (peak hours, windows, rankings)."""
+
+from array import array
+
+import pytest
+
+from clublog_bridge.band_analytics import (
+    BEST_WINDOW_HOURS,
+    HOURS,
+    BandActivityGrid,
+    activity_attributes,
+    best_band_attributes,
+)
+
+
+@pytest.fixture
+def grid(sample_activity):
+    return BandActivityGrid.from_activity(sample_activity)
+
+
+class TestGridConstruction:
+    """Tests for loading activity into the grid."""
+
+    def test_single_flat_array(self, grid, sample_activity):
+        assert grid.bands == list(sample_activity)
+        assert isinstance(grid.counts, array)
+        assert len(grid.counts) == len(sample_activity) * HOURS
+        assert list(grid.row(1)) == sample_activity["40m"]
+
+    def test_totals(self, grid, sample_activity):
+        assert grid.totals == [sum(hours) for hours in sample_activity.values()]
+
+    def test_skips_scalars_and_short_rows(self):
+        grid = BandActivityGrid.from_activity(
+            {"20m": 42, "40m": [1, 2, 3], "15m": [1] * 24}
+        )
+        assert grid.bands == ["15m"]
+
+    @pytest.mark.parametrize(
+        "hours", [None, 4.5, {"0": 1}, "x" * 24, [None] * 24, [-1] * 24]
+    )
+    def test_skips_malformed_bands(self, hours):
+        grid = BandActivityGrid.from_activity({"20m": hours, "15m": [1] * 24})
+        assert grid.bands == ["15m"]
+
+    def test_accepts_arrays(self):
+        grid = BandActivityGrid.from_activity({"20m": array("I", [2] * 24)})
+        assert grid.totals == [48]
+
+    def test_empty_is_falsy(self):
+        grid = BandActivityGrid.from_activity({})
+        assert not grid
+        assert grid.best_band(12) is None
+        assert activity_attributes(grid) == {
+            "peak_hour": {},
+            "best_window": {},
+            "distribution": {},
+        }
+
+
+class TestPeakAndWindows:
+    """Tests for per-band peak hour and best operating window."""
+
+    def test_peak_hour(self, grid):
+        # 20m peaks at 30 (hours 2, 9 and 20 — earliest wins), 40m at hour 5
+        assert grid.peak_hours[:2] == [2, 5]
+
+    def test_quiet_band_has_no_peak(self):
+        grid = BandActivityGrid.from_activity({"6m": [0] * 24})
+        assert grid.peak_hours == [None]
+        assert activity_attributes(grid)["peak_hour"] == {"6m": None}
+
+    def test_distribution_sums_to_one(self, grid):
+        assert sum(grid.distribution(0)) == pytest.approx(1.0)
+        assert BandActivityGrid.from_activity({"6m": [0] * 24}).distribution(0) == [0.0] * 24
+
+    def test_distribution_attribute(self):
+        hours = [0] * 24
+        hours[3], hours[4] = 1, 3
+        attrs = activity_attributes(BandActivityGrid.from_activity({"20m": hours}))
+        assert attrs["distribution"]["20m"][3:5] == [0.25, 0.75]
+        assert sum(attrs["distribution"]["20m"]) == pytest.approx(1.0)
+
+    def test_best_window(self):
+        hours = [0] * 24
+        hours[10:14] = [5, 9, 9, 5]
+        grid = BandActivityGrid.from_activity({"20m": hours})
+        start, share = grid.best_windows[0]
+        assert start == 10
+        assert share == pytest.approx(1.0)
+
+    def test_best_window_wraps_midnight(self):
+        hours = [0] * 24
+        hours[22], hours[23], hours[0], hours[1] = 4, 8, 8, 4
+        grid = BandActivityGrid.from_activity({"160m": hours})
+        assert grid.best_windows[0][0] == 22
+        attrs = activity_attributes(grid)
+        assert attrs["best_window"]["160m"] == {
+            "start_hour": 22,
+            "end_hour": (22 + BEST_WINDOW_HOURS) % 24,
+            "share": 1.0,
+        }
+
+
+class TestRanking:
+    """Tests for the per-hour band ranking."""
+
+    def test_best_band_by_hour(self, grid):
+        assert grid.best_band(0) == "20m"  # 10 vs 5 vs 0
+        assert grid.best_band(5) == "40m"  # 30 vs 0 vs 15
+        assert grid.best_band(8) == "15m"  # 25 vs 10 vs 30
+
+    def test_quiet_bands_excluded(self, grid):
+        assert [band for band, _ in grid.ranking(0)] == ["20m", "40m"]
+
+    def test_ties_prefer_busier_band(self):
+        grid = BandActivityGrid.from_activity(
+            {"40m": [5] + [0] * 23, "20m": [5] + [1] * 23}
+        )
+        assert grid.best_band(0) == "20m"
+
+    def test_hour_wraps(self, grid):
+        assert grid.ranking(24) == grid.ranking(0)
+
+    def test_best_band_attributes(self, grid):
+        attrs = best_band_attributes(grid, 5)
+        assert attrs["utc_hour"] == 5
+        assert attrs["ranking"][0]["band"] == "40m"
+        assert attrs["ranking"][0]["qsos"] == 30
+        assert attrs["ranking"][0]["share"] == round(30 / grid.totals[1], 3)
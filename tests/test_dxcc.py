@@ -0,0 +1,138 @@
+"""Tests for cty.xml resolution, band mapping and the provisional overlay."""
+
+import gzip
+import io
+
+import pytest
+
+from clublog_bridge.dxcc import CtyDatabase, ProvisionalMatrix, band_for
+
+CTY_XML = b"""<?xml version="1.0" encoding="UTF-8"?>
+<clublog date="2026-02-01T00:00:00+00:00" xmlns="https://clublog.org/cty/v1.2">
+<entities>
+<entity><adif>1</adif><name>CANADA</name><prefix>VE</prefix><deleted>FALSE</deleted></entity>
+<entity><adif>291</adif><name>UNITED STATES OF AMERICA</name><prefix>K</prefix></entity>
+<entity><adif>110</adif><name>HAWAII</name><prefix>KH6</prefix></entity>
+<entity><adif>64</adif><name>BERMUDA</name><prefix>VP9</prefix></entity>
+</entities>
+<exceptions>
+<exception record="1"><call>K1XYZ</call><adif>110</adif>
+<start>2020-01-01T00:00:00+00:00</start><end>2020-12-31T23:59:59+00:00</end></exception>
+</exceptions>
+<prefixes>
+<prefix record="1"><call>K</call><adif>291</adif></prefix>
+<prefix record="2"><call>W</call><adif>291</adif></prefix>
+<prefix record="3"><call>KH6</call><adif>110</adif></prefix>
+<prefix record="4"><call>VE</call><adif>1</adif></prefix>
+<prefix record="5"><call>VP9</call><adif>64</adif></prefix>
+</prefixes>
+<invalid_operations>
+<invalid record="1"><call>W1BAD</call></invalid>
+</invalid_operations>
+</clublog>
+"""
+
+Y2020 = 1590000000.0  # 2020-05-20
+Y2026 = 1780000000.0
+
+
+@pytest.fixture
+def cty():
+    database = CtyDatabase()
+    database.load(io.BytesIO(CTY_XML))
+    return database
+
+
+class TestCtyDatabase:
+    """Tests for callsign resolution."""
+
+    def test_loads_entities_and_date(self, cty):
+        assert cty.date == "2026-02-01T00:00:00+00:00"
+        assert cty.name(110) == "HAWAII"
+        assert len(cty) == 5
+
+    def test_longest_prefix(self, cty):
+        assert cty.resolve("K1ABC", Y2026) == 291
+        assert cty.resolve("KH6ABC", Y2026) == 110
+        assert cty.resolve("ve3abc", Y2026) == 1
+
+    def test_exception_within_dates(self, cty):
+        assert cty.resolve("K1XYZ", Y2020) == 110
+        assert cty.resolve("K1XYZ", Y2026) == 291
+
+    def test_invalid_operation(self, cty):
+        assert cty.resolve("W1BAD", Y2026) is None
+
+    def test_portable_calls(self, cty):
+        assert cty.resolve("K1ABC/VP9", Y2026) == 64
+        assert cty.resolve("VP9/K1ABC", Y2026) == 64
+        assert cty.resolve("VE3ABC/P", Y2026) == 1
+        assert cty.resolve("W1ABC/4", Y2026) == 291
+        assert cty.resolve("K1ABC/MM", Y2026) is None
+
+    def test_unknown(self, cty):
+        assert cty.resolve("ZZ9ZZ", Y2026) is None
+        assert cty.resolve("", Y2026) is None
+        assert cty.resolve("/", Y2026) is None
+
+    def test_from_gzipped_file(self, tmp_path):
+        path = tmp_path / "cty.xml"
+        path.write_bytes(gzip.compress(CTY_XML))
+        assert CtyDatabase.from_file(str(path)).resolve("VP9ABC", Y2026) == 64
+
+
+class TestBandFor:
+    """Tests for ADIF band and frequency to matrix band keys."""
+
+    @pytest.mark.parametrize(
+        ("band", "freq", "expected"),
+        [
+            ("20m", None, "20"),
+            ("20M", None, "20"),
+            ("70cm", None, "70cm"),
+            (None, 14.074, "20"),
+            (None, 50.313, "6"),
+            ("", 7.074, "40"),
+            (None, 11.0, None),
+            (None, None, None),
+        ],
+    )
+    def test_mapping(self, band, freq, expected):
+        assert band_for(band, freq) == expected
+
+
+class TestProvisionalMatrix:
+    """Tests for the locally worked overlay."""
+
+    def test_new_cells_only(self):
+        overlay = ProvisionalMatrix(86400)
+        overlay.matrix = {"291": {"20": 1}}
+        assert overlay.add(291, "20", "K1ABC", 0) is None
+        assert overlay.add(291, "40", "K1ABC", 0).band == "40"
+        assert overlay.add("291", "40", "W1ABC", 0) is None
+        assert overlay.add(1, "20", "VE3ABC", 0).dxcc == "1"
+        assert len(overlay) == 2
+
+    def test_merged_marks_worked(self):
+        overlay = ProvisionalMatrix(86400)
+        overlay.matrix = {"291": {"20": 1}}
+        overlay.add(291, "40", "K1ABC", 0)
+        overlay.add(1, "20", "VE3ABC", 0)
+        assert overlay.merged() == {"291": {"20": 1, "40": 2}, "1": {"20": 2}}
+        assert overlay.matrix == {"291": {"20": 1}}
+
+    def test_reconcile_drops_shown_and_expired(self):
+        overlay = ProvisionalMatrix(3600)
+        overlay.add(291, "40", "K1ABC", 1000)
+        overlay.add(1, "20", "VE3ABC", 1000)
+        overlay.add(64, "15", "VP9ABC", 5000)
+        shown = overlay.reconcile({"291": {"40": 2}}, 5000)
+        assert shown == 1
+        assert list(overlay.cells) == [("64", "15")]
+
+    def test_round_trip(self):
+        overlay = ProvisionalMatrix(3600)
+        overlay.add(291, "40", "K1ABC", 1000)
+        restored = ProvisionalMatrix(3600)
+        restored.load_list(overlay.to_list() + [{"dxcc": 1}, "junk"])
+        assert list(restored.cells) == [("291", "40")]
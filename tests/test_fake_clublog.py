@@ -0,0 +1,144 @@
+"""Tests for the local ClubLog API stand-in."""
+
+import json
+import time
+import urllib.error
+import urllib.request
+
+import pytest
+
+from clublog_bridge.fake_clublog import ALL, ENDPOINTS, Fault, FakeClubLog, load_fixtures
+from clublog_bridge.models import decode_watch, lazy_expeditions
+
+
+def _get(url, headers=None):
+    """GET url; return (status, headers, body) without raising on 4xx/5xx."""
+    request = urllib.request.Request(url, headers=headers or {})
+    try:
+        with urllib.request.urlopen(request, timeout=5) as resp:
+            return resp.status, resp.headers, resp.read()
+    except urllib.error.HTTPError as err:
+        return err.code, err.headers, err.read()
+
+
+def _post(url, payload):
+    request = urllib.request.Request(url, data=json.dumps(payload).encode(), method="POST")
+    try:
+        with urllib.request.urlopen(request, timeout=5) as resp:
+            return resp.status
+    except urllib.error.HTTPError as err:
+        return err.code
+
+
+@pytest.fixture
+def fake():
+    with FakeClubLog(seed=1) as server:
+        yield server
+
+
+class TestFixtures:
+    """The bundled fixtures decode with the bridge's own models."""
+
+    def test_every_endpoint_has_a_fixture(self):
+        assert set(load_fixtures()) == set(ENDPOINTS)
+
+    def test_fixtures_decode(self):
+        fixtures = load_fixtures()
+        assert decode_watch(fixtures["/watch.php"]).total_qsos > 0
+        assert len(lazy_expeditions(fixtures["/expeditions.php"])) > 0
+
+
+class TestServing:
+    """Tests for normal responses, ETags and accounting."""
+
+    def test_serves_fixture(self, fake):
+        status, headers, body = _get(f"{fake.base_url}/watch.php?call=K1ABC&api=x")
+        assert status == 200
+        assert body == fake.fixtures["/watch.php"]
+        assert headers["ETag"]
+
+    def test_unknown_path(self, fake):
+        status, _, _ = _get(f"{fake.base_url}/nope.php")
+        assert status == 404
+
+    def test_if_none_match(self, fake):
+        _, headers, _ = _get(f"{fake.base_url}/mostwanted.php")
+        status, _, body = _get(
+            f"{fake.base_url}/mostwanted.php", {"If-None-Match": headers["ETag"]}
+        )
+        assert status == 304
+        assert body == b""
+
+    def test_accounting_per_client(self, fake):
+        _get(f"{fake.base_url}/watch.php?call=K1ABC")
+        _get(f"{fake.base_url}/watch.php?call=K1ABC")
+        _get(f"{fake.base_url}/activity_json.php?call=G4XYZ")
+        _get(f"{fake.base_url}/expeditions.php?api=1")
+        assert fake.requests() == 4
+        assert fake.requests("/watch.php", "K1ABC") == 2
+        assert fake.requests(client="G4XYZ") == 1
+        assert fake.requests(client="127.0.0.1") == 1
+        stats = fake.stats()
+        assert stats["statuses"]["/watch.php"] == {"200": 2}
+        assert stats["bytes"]["/watch.php"] == 2 * len(fake.fixtures["/watch.php"])
+
+
+class TestFaults:
+    """Tests for injected faults."""
+
+    def test_forced_status(self, fake):
+        fake.set_fault("/watch.php", status=403)
+        assert _get(f"{fake.base_url}/watch.php")[0] == 403
+        assert _get(f"{fake.base_url}/mostwanted.php")[0] == 200
+
+    def test_all_endpoints(self, fake):
+        fake.set_fault(ALL, status=504)
+        assert _get(f"{fake.base_url}/mostwanted.php")[0] == 504
+
+    def test_error_rate(self, fake):
+        fake.set_fault(ALL, error_rate=1.0, error_status=500)
+        assert _get(f"{fake.base_url}/livestreams.php")[0] == 500
+
+    def test_latency(self, fake):
+        fake.set_fault("/watch.php", latency=0.2)
+        start = time.monotonic()
+        _get(f"{fake.base_url}/watch.php")
+        assert time.monotonic() - start >= 0.2
+
+    def test_slow_drip_delivers_whole_body(self, fake):
+        fake.set_fault("/activity_json.php", drip_bytes=100, drip_delay=0.01)
+        body = fake.fixtures["/activity_json.php"]
+        start = time.monotonic()
+        status, _, received = _get(f"{fake.base_url}/activity_json.php")
+        assert status == 200
+        assert received == body
+        assert time.monotonic() - start >= 0.01 * (len(body) // 100)
+
+    def test_clear_faults(self, fake):
+        fake.set_fault(ALL, status=500)
+        fake.clear_faults()
+        assert _get(f"{fake.base_url}/watch.php")[0] == 200
+
+    def test_unknown_fault_field(self):
+        with pytest.raises(ValueError):
+            Fault().update({"bogus": 1})
+
+
+class TestControlApi:
+    """Tests for the /_stats, /_faults and /_reset endpoints."""
+
+    def test_stats(self, fake):
+        _get(f"{fake.base_url}/watch.php?call=K1ABC")
+        status, _, body = _get(f"{fake.base_url}/_stats")
+        assert status == 200
+        assert json.loads(body)["clients"] == {"K1ABC": {"/watch.php": 1}}
+
+    def test_faults_and_reset(self, fake):
+        assert _post(f"{fake.base_url}/_faults", {"/watch.php": {"status": 403}}) == 200
+        assert _get(f"{fake.base_url}/watch.php")[0] == 403
+        assert _post(f"{fake.base_url}/_reset", {}) == 200
+        assert _get(f"{fake.base_url}/watch.php")[0] == 200
+        assert fake.requests() == 1
+
+    def test_bad_fault(self, fake):
+        assert _post(f"{fake.base_url}/_faults", {ALL: {"bogus": 1}}) == 400
@@ -0,0 +1,97 @@
+"""Tests for the local MQTT broker stand-in."""
+
+import threading
+
+import paho.mqtt.client as mqtt
+import pytest
+
+from clublog_bridge.fake_mqtt import FakeMqttBroker, topic_matches
+
+
+@pytest.fixture
+def broker():
+    with FakeMqttBroker() as server:
+        yield server
+
+
+def _client(broker, topics=()):
+    """Connect a paho client; return (client, received list, connected event)."""
+    received, connected = [], threading.Event()
+    client = mqtt.Client(mqtt.CallbackAPIVersion.VERSION2)
+
+    def on_connect(client, userdata, flags, reason_code, properties):
+        for topic in topics:
+            client.subscribe(topic)
+        connected.set()
+
+    client.on_connect = on_connect
+    client.on_message = lambda c, u, msg: received.append((msg.topic, msg.payload, msg.retain))
+    client.connect(*broker.address)
+    client.loop_start()
+    assert connected.wait(5)
+    return client, received, connected
+
+
+def _wait_for(predicate, timeout=5.0):
+    event = threading.Event()
+    for _ in range(int(timeout / 0.01)):
+        if predicate():
+            return True
+        event.wait(0.01)
+    return predicate()
+
+
+class TestTopicMatches:
+    """Tests for subscription filter matching."""
+
+    @pytest.mark.parametrize(("pattern", "topic", "expected"), [
+        ("clublog/watch", "clublog/watch", True),
+        ("clublog/+", "clublog/watch", True),
+        ("clublog/+", "clublog/watch/state", False),
+        ("clublog/#", "clublog/watch/state", True),
+        ("#", "homeassistant/status", True),
+        ("clublog/+/state", "clublog/watch/state", True),
+        ("clublog/watch", "clublog", False),
+    ])
+    def test_wildcards(self, pattern, topic, expected):
+        assert topic_matches(pattern, topic) is expected
+
+
+class TestFakeMqttBroker:
+    """Tests for publishing, routing and retention with a real paho client."""
+
+    def test_routes_to_subscribers(self, broker):
+        subscriber, received, _ = _client(broker, ["clublog/#"])
+        publisher, _, _ = _client(broker)
+        publisher.publish("clublog/watch", "42", qos=1).wait_for_publish(5)
+        publisher.publish("other/topic", "x")
+        assert _wait_for(lambda: broker.published() == 2)
+        assert _wait_for(lambda: received)
+        assert received == [("clublog/watch", b"42", False)]
+        assert broker.published("clublog/#") == 1
+        for client in (subscriber, publisher):
+            client.loop_stop()
+            client.disconnect()
+
+    def test_retained_delivered_on_subscribe(self, broker):
+        broker.publish("clublog/status", "online", retain=True)
+        client, received, _ = _client(broker, ["clublog/+"])
+        assert _wait_for(lambda: received)
+        assert received == [("clublog/status", b"online", True)]
+        client.loop_stop()
+        client.disconnect()
+
+    def test_empty_retained_payload_clears(self, broker):
+        broker.publish("clublog/status", "online", retain=True)
+        broker.publish("clublog/status", b"", retain=True)
+        assert broker.retained_items() == []
+
+    def test_client_reconnects_after_disconnect_all(self, broker):
+        client, _, connected = _client(broker)
+        connected.clear()
+        client.reconnect_delay_set(min_delay=0.05, max_delay=0.1)
+        broker.disconnect_all()
+        assert connected.wait(5)
+        assert broker.connections == 2
+        client.loop_stop()
+        client.disconnect()
@@ -0,0 +1,125 @@
+"""Tests for per-endpoint fetch timing history."""
+
+import pytest
+
+from clublog_bridge.fetch_timing import (
+    FetchHistory,
+    FetchSample,
+    FetchTimer,
+    percentile,
+)
+from clublog_bridge.scheduling import SimulatedClock
+
+
+def _sample(wall: float, size: int = 1000, ok: bool = True) -> FetchSample:
+    return FetchSample(
+        started=0.0, wall=wall, request=wall / 2, size=size,
+        decode=wall / 4, processing=0.0, ok=ok,
+    )
+
+
+class _Clock:
+    """Manually advanced perf_counter stand-in."""
+
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestPercentile:
+    """Tests for the percentile helper."""
+
+    def test_empty(self):
+        assert percentile([], 50) is None
+
+    def test_single(self):
+        assert percentile([3.0], 95) == 3.0
+
+    def test_interpolates(self):
+        values = [float(v) for v in range(1, 101)]
+        assert percentile(values, 50) == pytest.approx(50.5)
+        assert percentile(values, 95) == pytest.approx(95.05)
+
+    def test_unsorted_input(self):
+        assert percentile([5, 1, 3], 50) == 3
+
+
+class TestFetchTimer:
+    """Tests for phase accounting during a fetch."""
+
+    def test_phases(self):
+        clock = _Clock()
+        timer = FetchTimer(clock)
+        clock.now += 0.2
+        timer.response()
+        for _ in range(3):
+            timer.received(100)
+            with timer.decoding():
+                clock.now += 0.01
+        with timer.processing_step():
+            clock.now += 0.05
+        sample = timer.sample(ok=True)
+        assert sample.request == pytest.approx(0.2)
+        assert sample.size == 300
+        assert sample.decode == pytest.approx(0.03)
+        assert sample.processing == pytest.approx(0.05)
+        assert sample.wall == pytest.approx(0.28)
+        assert sample.ok
+
+    def test_decode_time_kept_on_error(self):
+        clock = _Clock()
+        timer = FetchTimer(clock)
+        with pytest.raises(ValueError), timer.decoding():
+            clock.now += 0.5
+            raise ValueError
+        assert timer.sample(ok=False).decode == pytest.approx(0.5)
+
+    def test_started_uses_injected_wall_clock(self):
+        clock = SimulatedClock(start=1_700_000_000.0)
+        clock.advance(30)
+        timer = FetchTimer(_Clock(), wall=clock.time)
+        assert timer.sample(ok=True).started == 1_700_000_030.0
+
+
+class TestFetchHistory:
+    """Tests for the per-endpoint ring buffers."""
+
+    def test_ring_buffer_bounded(self):
+        history = FetchHistory(size=5)
+        for i in range(12):
+            history.record("watch", _sample(float(i)))
+        assert [s.wall for s in history.samples("watch")] == [7, 8, 9, 10, 11]
+
+    def test_summary(self):
+        history = FetchHistory()
+        for wall in (0.1, 0.2, 0.3, 0.4, 1.0):
+            history.record("matrix", _sample(wall, size=int(wall * 1000)))
+        summary = history.summary("matrix")
+        assert summary["samples"] == 5
+        assert summary["wall_p50_ms"] == 300.0
+        assert summary["wall_p95_ms"] == 880.0
+        assert summary["request_p50_ms"] == 150.0
+        assert summary["size_p50_bytes"] == 300
+
+    def test_summary_ignores_failures(self):
+        history = FetchHistory()
+        history.record("watch", _sample(30.0, ok=False))
+        assert history.summary("watch") is None
+        history.record("watch", _sample(0.1))
+        assert history.summary("watch")["samples"] == 1
+
+    def test_unknown_endpoint(self):
+        history = FetchHistory()
+        assert history.summary("nope") is None
+        assert history.samples("nope") == []
+
+    def test_as_dict(self):
+        history = FetchHistory()
+        history.record("watch", _sample(0.1))
+        raw = history.as_dict()
+        assert raw["watch"][0]["wall"] == 0.1
+        assert set(raw["watch"][0]) == {
+            "started", "wall", "request", "size", "decode", "processing", "ok",
+        }
@@ -0,0 +1,141 @@
+"""Tests for WSJT-X / N1MM datagram decoding and the bridge's UDP listener."""
+
+import io
+import socket
+import struct
+
+import pytest
+
+from clublog_bridge.dxcc import CtyDatabase, ProvisionalMatrix
+from clublog_bridge.loggers import (
+    KNOWN,
+    NEW_SLOT,
+    STALE,
+    UNRESOLVED,
+    WSJTX_MAGIC,
+    decode_datagram,
+    overlay_record,
+)
+from clublog_bridge.simulation import load_bridge
+from tests.test_dxcc import CTY_XML
+
+NOW = 1769956200.0  # 2026-02-01 14:30 UTC
+
+ADIF = (
+    b"<call:5>VP9XY <band:3>20m <mode:3>FT8 <freq:9>14.075512 "
+    b"<qso_date:8>20260201 <time_on:6>142915 <eor>"
+)
+
+N1MM = b"""<?xml version="1.0" encoding="utf-8"?>
+<contactinfo>
+    <app>N1MM</app>
+    <contestname>DX</contestname>
+    <timestamp>2026-02-01 14:29:15</timestamp>
+    <mycall>K1ABC</mycall>
+    <band>14</band>
+    <rxfreq>1402500</rxfreq>
+    <txfreq>1402500</txfreq>
+    <mode>CW</mode>
+    <call>VE3XYZ</call>
+</contactinfo>"""
+
+
+def qstring(data: bytes | None) -> bytes:
+    if data is None:
+        return struct.pack(">I", 0xFFFFFFFF)
+    return struct.pack(">I", len(data)) + data
+
+
+def wsjtx(kind: int, *fields: bytes | None) -> bytes:
+    return struct.pack(">III", WSJTX_MAGIC, 3, kind) + b"".join(map(qstring, fields))
+
+
+class TestDecodeDatagram:
+    """Tests for recognizing and decoding logger datagrams."""
+
+    def test_wsjtx_logged_adif(self):
+        source, records = decode_datagram(wsjtx(12, b"WSJT-X", ADIF))
+        assert source == "wsjtx"
+        assert records == [{
+            "CALL": "VP9XY", "BAND": "20m", "MODE": "FT8", "FREQ": "14.075512",
+            "QSO_DATE": "20260201", "TIME_ON": "142915",
+        }]
+
+    def test_wsjtx_other_messages_ignored(self):
+        assert decode_datagram(wsjtx(1, b"WSJT-X", b"status")) == ("wsjtx", [])
+        assert decode_datagram(wsjtx(12, b"WSJT-X", None)) == ("wsjtx", [])
+
+    def test_wsjtx_truncated(self):
+        assert decode_datagram(wsjtx(12, b"WSJT-X", ADIF)[:-10]) == ("wsjtx", [])
+        assert decode_datagram(struct.pack(">I", WSJTX_MAGIC)) == ("wsjtx", [])
+
+    def test_n1mm_contact(self):
+        source, records = decode_datagram(N1MM)
+        assert source == "n1mm"
+        assert records == [{
+            "CALL": "VE3XYZ", "FREQ": "14.025", "QSO_DATE": "20260201",
+            "TIME_ON": "142915", "MODE": "CW",
+        }]
+
+    def test_n1mm_other_messages_ignored(self):
+        assert decode_datagram(b"<RadioInfo><Freq>1402500</Freq></RadioInfo>") == ("n1mm", [])
+        assert decode_datagram(b"<contactinfo><call>") == ("n1mm", [])
+
+    def test_unknown(self):
+        assert decode_datagram(b"hello") == ("unknown", [])
+        assert decode_datagram(b"") == ("unknown", [])
+
+
+@pytest.fixture
+def cty():
+    database = CtyDatabase()
+    database.load(io.BytesIO(CTY_XML))
+    return database
+
+
+class TestOverlayRecord:
+    """Tests for applying a logged QSO to the overlay."""
+
+    def test_outcomes(self, cty):
+        overlay = ProvisionalMatrix(86400)
+        overlay.matrix = {"64": {"40": 1}}
+        record = decode_datagram(wsjtx(12, b"WSJT-X", ADIF))[1][0]
+        result, cell = overlay_record(overlay, record, cty, NOW)
+        assert result == NEW_SLOT
+        assert (cell.dxcc, cell.band, cell.call) == ("64", "20", "VP9XY")
+        assert overlay_record(overlay, record, cty, NOW) == (KNOWN, None)
+
+    def test_dxcc_field_needs_no_cty(self):
+        overlay = ProvisionalMatrix(86400)
+        record = {"CALL": "K1ABC", "BAND": "40m", "DXCC": "291"}
+        assert overlay_record(overlay, record, None, NOW)[0] == NEW_SLOT
+
+    def test_unresolved_and_stale(self, cty):
+        overlay = ProvisionalMatrix(3600)
+        assert overlay_record(overlay, {"CALL": "K1ABC"}, cty, NOW)[0] == UNRESOLVED
+        assert overlay_record(overlay, {"CALL": "ZZ9ZZ", "BAND": "20m"}, cty, NOW)[0] == UNRESOLVED
+        old = {"CALL": "K1ABC", "BAND": "20m", "QSO_DATE": "20260101", "TIME_ON": "0000"}
+        assert overlay_record(overlay, old, cty, NOW)[0] == STALE
+
+
+class TestLoggerListener:
+    """Tests for the bridge's UDP listener thread."""
+
+    def test_datagram_queued_and_wakes_loop(self, tmp_path, cty):
+        bridge = load_bridge()
+        bridge.clock.time = lambda: NOW
+        local = bridge.LocalLog(None, str(tmp_path / "adif_tail.json"))
+        local.cty = cty
+        listener = bridge.LoggerListener(local, "127.0.0.1", 0)
+        listener.start()
+        try:
+            with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+                sock.sendto(b"hello", listener.address)
+                sock.sendto(N1MM, listener.address)
+            assert bridge.wake.wait(5)
+            filled, changed = local.poll()
+        finally:
+            listener.close()
+        assert changed
+        assert [(cell.dxcc, cell.band) for cell in filled] == [("1", "20")]
+        assert bridge.metrics.LOCAL_QSOS.value("n1mm", "new_slot") >= 1
@@ -0,0 +1,78 @@
+"""Tests for the matrix and most wanted lookup index."""
+
+import io
+
+import pytest
+
+from clublog_bridge.dxcc import CtyDatabase
+from clublog_bridge.lookup import LookupIndex, band_key, entity_key
+from clublog_bridge.models import MostWanted
+from tests.test_dxcc import CTY_XML
+
+MATRIX = {"1": {"20": 1, "40": 2}, "291": {"80": 3}}
+WANTED = MostWanted((1, 2, 3), ("246", "1", "199"))
+
+
+@pytest.fixture
+def index():
+    return LookupIndex().with_matrix(MATRIX).with_most_wanted(WANTED)
+
+
+def test_keys():
+    assert entity_key(" 291") == "291"
+    assert entity_key(1) == "1"
+    assert band_key("20m") == "20"
+    assert band_key("20") == "20"
+    assert band_key("70CM") == "70cm"
+    for bad in ("abc", "0", "-3"):
+        with pytest.raises(ValueError):
+            entity_key(bad)
+    with pytest.raises(ValueError):
+        band_key(" ")
+
+
+class TestLookupIndex:
+    """Tests for slot, entity and rank answers."""
+
+    def test_slot(self, index):
+        assert index.slot(1, "40m") == {
+            "dxcc": 1, "band": "40", "status": "worked", "worked": True,
+            "confirmed": False, "needed": False, "new_entity": False, "rank": 2,
+        }
+        assert index.slot("291", "80")["confirmed"] is True
+        needed = index.slot(1, "15m")
+        assert needed["needed"] and not needed["new_entity"] and needed["status"] is None
+        assert index.slot(246, "20")["new_entity"] is True
+
+    def test_entity(self, index):
+        assert index.entity(1) == {
+            "dxcc": 1, "worked": True, "confirmed": True, "needed": False,
+            "bands": {"20": "confirmed", "40": "worked"}, "rank": 2,
+        }
+        assert index.entity(199) == {
+            "dxcc": 199, "worked": False, "confirmed": False, "needed": True,
+            "bands": {}, "rank": 3,
+        }
+
+    def test_wanted(self, index):
+        assert index.wanted(246) == {"dxcc": 246, "rank": 1, "of": 3, "needed": True}
+        assert index.rank(291) is None
+
+    def test_updates_share_the_other_half(self, index):
+        updated = index.with_matrix({"246": {"20": 2}})
+        assert updated.rank(246) == 1
+        assert updated.wanted(246)["needed"] is False
+        assert index.wanted(246)["needed"] is True  # Old index untouched
+        assert updated.with_most_wanted(MostWanted()).rank(246) is None
+
+    def test_call(self, index):
+        cty = CtyDatabase()
+        cty.load(io.BytesIO(CTY_XML))
+        assert index.call(" k1abc", cty, "80m") == {
+            "call": "K1ABC", "entity": cty.name(291), "dxcc": 291, "band": "80",
+            "status": "verified", "worked": True, "confirmed": True, "needed": False,
+            "new_entity": False, "rank": None,
+        }
+        found = index.call("VP9XY", cty)
+        assert (found["dxcc"], found["entity"], found["needed"]) == (64, "BERMUDA", True)
+        assert index.call("ZZ9ZZ", cty) is None
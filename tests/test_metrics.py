@@ -0,0 +1,123 @@
+"""Tests for the Docker bridge metrics registry and endpoint."""
+
+import urllib.error
+import urllib.request
+
+import pytest
+
+from clublog_bridge.metrics import (
+    OPENMETRICS_CONTENT_TYPE,
+    PROMETHEUS_CONTENT_TYPE,
+    Registry,
+    counted,
+    serve,
+)
+
+
+@pytest.fixture
+def registry():
+    return Registry()
+
+
+class TestCounter:
+    """Tests for counters."""
+
+    def test_inc_by_labels(self, registry):
+        responses = registry.counter("clublog_responses", "Responses.", ("endpoint", "code"))
+        responses.inc("matrix", "200")
+        responses.inc("matrix", "200")
+        responses.inc("matrix", "304")
+        assert responses.value("matrix", "200") == 2
+        text = registry.render()
+        assert "# TYPE clublog_responses_total counter" in text
+        assert 'clublog_responses_total{endpoint="matrix",code="304"} 1' in text
+
+    def test_openmetrics_family_name(self, registry):
+        registry.counter("clublog_trips", "Trips.").inc()
+        text = registry.render(openmetrics=True)
+        assert "# TYPE clublog_trips counter" in text
+        assert "clublog_trips_total 1" in text
+        assert text.endswith("# EOF\n")
+
+
+class TestGauge:
+    """Tests for gauges."""
+
+    def test_set(self, registry):
+        gauge = registry.gauge("clublog_breaker_open", "Open.")
+        gauge.set(1)
+        gauge.set(0)
+        assert "clublog_breaker_open 0" in registry.render()
+
+    def test_label_escaping(self, registry):
+        registry.gauge("g", "G.", ("name",)).set(2.5, 'a"b\\c')
+        assert 'g{name="a\\"b\\\\c"} 2.5' in registry.render()
+
+
+class TestHistogram:
+    """Tests for histograms."""
+
+    def test_buckets_are_cumulative(self, registry):
+        hist = registry.histogram("lat", "Latency.", ("endpoint",), buckets=(0.1, 1.0))
+        for value in (0.05, 0.1, 0.5, 3.0):
+            hist.observe(value, "watch")
+        text = registry.render()
+        assert 'lat_bucket{endpoint="watch",le="0.1"} 2' in text
+        assert 'lat_bucket{endpoint="watch",le="1"} 3' in text
+        assert 'lat_bucket{endpoint="watch",le="+Inf"} 4' in text
+        assert 'lat_count{endpoint="watch"} 4' in text
+        assert 'lat_sum{endpoint="watch"} 3.65' in text
+        assert hist.count("watch") == 4
+
+    def test_time_context_manager(self, registry):
+        hist = registry.histogram("t", "Timed.")
+        with hist.time():
+            pass
+        assert hist.count() == 1
+
+    def test_time_records_on_error(self, registry):
+        hist = registry.histogram("t", "Timed.")
+        with pytest.raises(RuntimeError), hist.time():
+            raise RuntimeError
+        assert hist.count() == 1
+
+    def test_nothing_rendered_before_observation(self, registry):
+        registry.histogram("idle", "Idle.", ("endpoint",))
+        assert "idle_bucket" not in registry.render()
+
+
+def test_counted_observes_total_size(registry):
+    sizes = registry.histogram("size", "Size.", buckets=(10,))
+    chunks = list(counted([b"abc", b"defg"], sizes))
+    assert chunks == [b"abc", b"defg"]
+    assert 'size_sum 7' in registry.render()
+
+
+class TestEndpoint:
+    """Tests for the HTTP exposition endpoint."""
+
+    @pytest.fixture
+    def url(self, registry):
+        registry.counter("clublog_scrapes", "Scrapes.").inc()
+        server = serve(registry, "127.0.0.1", 0)
+        yield f"http://127.0.0.1:{server.server_address[1]}"
+        server.shutdown()
+        server.server_close()
+
+    def test_prometheus_text(self, url):
+        with urllib.request.urlopen(f"{url}/metrics") as resp:
+            assert resp.headers["Content-Type"] == PROMETHEUS_CONTENT_TYPE
+            assert b"clublog_scrapes_total 1" in resp.read()
+
+    def test_openmetrics_negotiation(self, url):
+        request = urllib.request.Request(
+            f"{url}/metrics", headers={"Accept": "application/openmetrics-text"}
+        )
+        with urllib.request.urlopen(request) as resp:
+            assert resp.headers["Content-Type"] == OPENMETRICS_CONTENT_TYPE
+            assert resp.read().endswith(b"# EOF\n")
+
+    def test_unknown_path(self, url):
+        with pytest.raises(urllib.error.HTTPError) as err:
+            urllib.request.urlopen(f"{url}/nope")
+        assert err.value.code == 404
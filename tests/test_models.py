@@ -0,0 +1,228 @@
+"""Tests for typed ClubLog response models and their decoders."""
+
+import json
+import logging
+
+import pytest
+
+from clublog_bridge import models
+from clublog_bridge.models import (
+    Expedition,
+    LazyMostWanted,
+    Livestream,
+    MostWanted,
+    decode_expeditions,
+    decode_livestreams,
+    decode_most_wanted,
+    decode_watch,
+    lazy_expeditions,
+    lazy_livestreams,
+    parse_expeditions,
+    parse_livestreams,
+    parse_most_wanted,
+    parse_watch,
+)
+
+
+def _body(obj) -> bytes:
+    return json.dumps(obj).encode()
+
+
+class TestExpeditions:
+    """Tests for expeditions.php decoding."""
+
+    def test_decode(self, sample_expeditions):
+        expeditions = decode_expeditions(_body(sample_expeditions))
+        assert expeditions[0] == Expedition("3Y0K", "2026-01-15", 45000)
+        assert len(expeditions) == 3
+
+    def test_slots_no_dict(self, sample_expeditions):
+        expedition = parse_expeditions(sample_expeditions)[0]
+        assert not hasattr(expedition, "__dict__")
+
+    def test_malformed_rows_rejected(self, caplog):
+        rows = [
+            ["3Y0K", "2026-01-15", 45000],
+            ["SHORT", "2026-01-15"],
+            [None, "2026-01-15", 1],
+            ["BADCOUNT", "2026-01-15", "lots"],
+            "not-a-row",
+            ["VP8PJ", "2026-02-01", "12000"],  # numeric string count accepted
+        ]
+        with caplog.at_level(logging.WARNING):
+            expeditions = parse_expeditions(rows)
+        assert [e.call for e in expeditions] == ["3Y0K", "VP8PJ"]
+        assert expeditions[1].qso_count == 12000
+        assert "Rejected 4 of 6" in caplog.text
+
+    @pytest.mark.parametrize("body", [b"", b"null", b"[]"])
+    def test_empty(self, body):
+        assert decode_expeditions(body) == []
+
+    def test_wrong_top_level_type(self):
+        with pytest.raises(ValueError):
+            decode_expeditions(b'{"a": 1}')
+
+
+class TestLivestreams:
+    """Tests for livestreams.php decoding."""
+
+    def test_decode(self, sample_livestreams):
+        streams = decode_livestreams(_body(sample_livestreams))
+        assert streams[1] == Livestream(
+            "VP8PJ", "141", "2026-02-01", "https://clublog.org/livestream/VP8PJ"
+        )
+
+    def test_numeric_dxcc_normalized(self):
+        streams = parse_livestreams([["3Y0K", 199, "2026-01-15", "https://x"]])
+        assert streams[0].dxcc == "199"
+
+    def test_short_row_rejected(self):
+        assert parse_livestreams([["3Y0K", "199", "2026-01-15"]]) == []
+
+
+class TestMostWanted:
+    """Tests for mostwanted.php decoding."""
+
+    def test_decode_rank_ordered(self, sample_most_wanted):
+        shuffled = dict(reversed(list(sample_most_wanted.items())))
+        wanted = decode_most_wanted(_body(shuffled))
+        assert len(wanted) == 340
+        assert wanted.ranks[:3] == (1, 2, 3)
+        assert wanted.dxcc[0] == "101"
+        assert wanted.top(2) == {"1": "101", "2": "102"}
+
+    def test_bad_rank_rejected(self):
+        assert parse_most_wanted({"1": "246", "x": "1"}) == MostWanted((1,), ("246",))
+
+    def test_empty(self):
+        assert len(decode_most_wanted(b"null")) == 0
+        assert not parse_most_wanted({})
+
+    def test_wrong_top_level_type(self):
+        with pytest.raises(ValueError):
+            parse_most_wanted(["246"])
+
+
+class TestWatch:
+    """Tests for watch.php decoding."""
+
+    def test_decode(self, sample_watch):
+        watch = decode_watch(_body(sample_watch))
+        assert watch.clublog_user is True
+        assert watch.has_oqrs is True
+        assert watch.is_expedition is False
+        assert watch.total_qsos == 15234
+        assert watch.last_upload == "2026-02-01 14:30:00"
+
+    def test_missing_info(self):
+        watch = parse_watch({"is_expedition": True})
+        assert watch.is_expedition is True
+        assert watch.total_qsos is None
+        assert watch.last_upload is None
+
+    def test_malformed_info_fields(self):
+        watch = parse_watch(
+            {"clublog_info": {"total_qsos": "n/a", "last_clublog_upload": 5}}
+        )
+        assert watch.total_qsos is None
+        assert watch.last_upload is None
+
+    @pytest.mark.parametrize("body", [b"", b"null", b"{}"])
+    def test_empty(self, body):
+        assert decode_watch(body) is None
+
+
+class TestLazyRows:
+    """Tests for prefix-only decoding of list responses."""
+
+    @pytest.fixture
+    def body(self):
+        return _body([[f"CALL{i}", "2026-01-01", i] for i in range(50)])
+
+    def test_count_and_prefix_without_full_decode(self, body):
+        rows = lazy_expeditions(body)
+        assert len(rows) == 50
+        assert rows
+        assert [e.call for e in rows[:20]] == [f"CALL{i}" for i in range(20)]
+        assert rows[3].qso_count == 3
+        assert not rows.materialized
+
+    def test_past_prefix_materializes(self, body):
+        rows = lazy_expeditions(body)
+        assert rows[30].call == "CALL30"
+        assert rows.materialized
+        assert len(list(rows)) == 50
+        assert rows[:25] == rows.rows()[:25]
+
+    def test_full_decode_only_on_demand(self, body, monkeypatch):
+        calls = []
+        monkeypatch.setattr(models, "json_loads", lambda b: calls.append(b) or json.loads(b))
+        rows = lazy_expeditions(body)
+        wanted = LazyMostWanted(_body({str(i): str(i) for i in range(1, 30)}))
+        assert len(rows) == 50 and len(wanted) == 29
+        assert calls == []
+        assert len(rows.rows()) == 50 and len(wanted.full()) == 29
+        assert len(calls) == 2
+
+    @pytest.mark.parametrize("body", [b"[[1, 2, 3]", b'[["A", "B", 1]] x', b"[1 2]"])
+    def test_malformed_body_raises_at_construction(self, body):
+        with pytest.raises(ValueError):
+            lazy_expeditions(body)
+
+    def test_most_wanted_wrong_top_level_type_raises(self):
+        with pytest.raises(ValueError):
+            LazyMostWanted(b'["1", "2"]')
+
+    def test_prefix_skips_malformed_rows(self):
+        rows = [["BAD"]] + [[f"C{i}", "2026-01-01", i] for i in range(25)]
+        lazy = lazy_expeditions(_body(rows))
+        assert len(lazy) == 26
+        assert len(lazy[:20]) == 20
+        assert lazy[0].call == "C0"
+
+    def test_short_response_is_complete(self, sample_livestreams):
+        rows = lazy_livestreams(_body(sample_livestreams))
+        assert rows.materialized
+        assert rows[1].call == "VP8PJ"
+
+    @pytest.mark.parametrize("body", [b"", b"null", b"[]"])
+    def test_empty(self, body):
+        rows = lazy_expeditions(body)
+        assert len(rows) == 0
+        assert not rows
+        assert rows[:20] == []
+
+    def test_wrong_top_level_type_raises_at_construction(self):
+        with pytest.raises(ValueError):
+            lazy_expeditions(b'{"a": 1}')
+
+    def test_limit_stops_parsing(self):
+        rows = [[f"C{i}", "2026-01-01", i] for i in range(5)]
+        assert len(parse_expeditions(rows, 2)) == 2
+
+
+class TestLazyMostWanted:
+    """Tests for top-N decoding of mostwanted.php."""
+
+    def test_top_10_without_full_decode(self, sample_most_wanted):
+        shuffled = dict(reversed(list(sample_most_wanted.items())))
+        wanted = LazyMostWanted(_body(shuffled))
+        assert len(wanted) == 340
+        assert wanted.top(3) == {"1": "101", "2": "102", "3": "103"}
+        assert not wanted.materialized
+
+    def test_full_on_demand(self, sample_most_wanted):
+        wanted = LazyMostWanted(_body(sample_most_wanted))
+        assert len(wanted.top(50)) == 50
+        assert wanted.materialized
+        assert wanted.full() == decode_most_wanted(_body(sample_most_wanted))
+
+    def test_non_contiguous_ranks(self):
+        wanted = LazyMostWanted(_body({"5": "b", "2": "a", "x": "c"}))
+        assert wanted.top(10) == {"2": "a", "5": "b"}
+
+    def test_empty(self):
+        wanted = LazyMostWanted(b"")
+        assert not wanted
+        assert wanted.top(10) == {}
@@ -0,0 +1,204 @@
+"""Tests for the bounded, coalescing MQTT outbox."""
+
+import threading
+
+import paho.mqtt.client as mqtt
+import pytest
+
+from clublog_bridge.fake_mqtt import FakeMqttBroker
+from clublog_bridge.mqtt_outbox import MqttOutbox
+
+
+class _Info:
+    def __init__(self, mid, rc=mqtt.MQTT_ERR_SUCCESS):
+        self.mid = mid
+        self.rc = rc
+
+
+class FakeClient:
+    """paho client stand-in: records publishes, acknowledges on request."""
+
+    def __init__(self):
+        self.published = []
+        self.fail = False
+        self.sent = threading.Event()
+        self._mid = 0
+
+    def publish(self, topic, payload, qos=0, retain=False):
+        if self.fail:
+            return _Info(0, mqtt.MQTT_ERR_NO_CONN)
+        self._mid += 1
+        self.published.append((topic, payload, qos, retain, self._mid))
+        self.sent.set()
+        return _Info(self._mid)
+
+    def ack(self, mid):
+        self.on_publish(self, None, mid, None, None)
+
+
+def _wait_for(predicate, timeout=5.0):
+    event = threading.Event()
+    for _ in range(int(timeout / 0.01)):
+        if predicate():
+            return True
+        event.wait(0.01)
+    return predicate()
+
+
+@pytest.fixture
+def client():
+    return FakeClient()
+
+
+@pytest.fixture
+def outbox(client):
+    box = MqttOutbox(client, maxsize=3, max_inflight=2, rate=1000)
+    box.start()
+    yield box
+    box.stop(timeout=0)
+
+
+class TestQueueing:
+    """Coalescing and the size bound, while disconnected."""
+
+    def test_nothing_sent_while_disconnected(self, client, outbox):
+        outbox.put("a", "1")
+        assert not client.sent.wait(0.1)
+        assert outbox.depth == 1
+
+    def test_coalesces_by_topic(self, client, outbox):
+        outbox.put("a", "1")
+        outbox.put("b", "1")
+        outbox.put("a", "2")
+        assert outbox.depth == 2
+        assert outbox.coalesced == 1
+        outbox.connected()
+        assert _wait_for(lambda: len(client.published) == 2)
+        assert [(t, p) for t, p, *_ in client.published] == [("a", "2"), ("b", "1")]
+
+    def test_drops_oldest_when_full(self, client, outbox):
+        for topic in "abcd":
+            outbox.put(topic, "x")
+        assert outbox.depth == 3
+        assert outbox.dropped == 1
+        outbox.connected()
+        assert _wait_for(lambda: len(client.published) == 2)
+        client.ack(1)
+        assert _wait_for(lambda: len(client.published) == 3)
+        assert [t for t, *_ in client.published] == ["b", "c", "d"]
+
+    def test_uncoalesced_puts_keep_their_order(self, client):
+        box = MqttOutbox(client, max_inflight=10, rate=1000)
+        box.put("a", "migrate", coalesce=False)
+        box.put("b", "device", coalesce=False)
+        box.put("a", "", coalesce=False)
+        box.put("a", "later")  # Queued behind the ordered entries
+        box.put("a", "latest")
+        assert (box.depth, box.coalesced) == (4, 1)
+        box.start()
+        box.connected()
+        try:
+            assert _wait_for(lambda: len(client.published) == 4)
+        finally:
+            box.stop(timeout=0)
+        assert [(t, p) for t, p, *_ in client.published] == [
+            ("a", "migrate"), ("b", "device"), ("a", ""), ("a", "latest"),
+        ]
+
+    def test_drop_is_reported(self, client):
+        dropped = []
+        box = MqttOutbox(client, maxsize=2, on_drop=dropped.append)
+        for topic in "abc":
+            box.put(topic, "x")
+        assert dropped == ["a"]
+
+
+class TestDraining:
+    """In-flight limit, pacing and connection loss."""
+
+    def test_inflight_limit(self, client, outbox):
+        outbox.connected()
+        for topic in "abc":
+            outbox.put(topic, "x")
+        assert _wait_for(lambda: len(client.published) == 2)
+        assert not _wait_for(lambda: len(client.published) == 3, timeout=0.1)
+        assert outbox.inflight == 2
+        client.ack(2)
+        assert _wait_for(lambda: len(client.published) == 3)
+
+    def test_ack_before_mid_is_known(self, client, outbox):
+        outbox.connected()
+        original = client.publish
+
+        def acking_publish(*args, **kwargs):
+            info = original(*args, **kwargs)
+            client.ack(info.mid)  # QoS 0 written inside publish()
+            return info
+
+        client.publish = acking_publish
+        for topic in "abc":  # more than max_inflight
+            outbox.put(topic, "x")
+        assert _wait_for(lambda: len(client.published) == 3)
+        assert outbox.inflight == 0
+
+    def test_backlog_drains_at_rate(self, client):
+        now = [0.0]
+        box = MqttOutbox(client, max_inflight=5, rate=10, monotonic=lambda: now[0])
+        for i in range(20):
+            box.put(f"t{i}", "x")
+        box._connected = True
+        box._running = True
+        sent = 0
+        with box._cond:
+            while box._pending and not box._take_token():
+                box._pending.popitem(last=False)
+                sent += 1
+        assert sent == 5  # the burst allowance
+        now[0] = 1.0
+        with box._cond:
+            while box._pending and not box._take_token():
+                box._pending.popitem(last=False)
+                sent += 1
+        assert sent == 10  # one second at 10 messages a second, capped at the burst
+
+    def test_failed_publish_is_kept(self, client, outbox):
+        client.fail = True
+        outbox.put("a", "1")
+        outbox.connected()
+        assert _wait_for(lambda: not outbox._connected)
+        assert outbox.depth == 1
+        client.fail = False
+        outbox.connected()
+        assert _wait_for(lambda: client.published)
+
+
+class TestWithBroker:
+    """A real paho client against the broker stand-in."""
+
+    def test_backlog_delivered_after_reconnect(self):
+        with FakeMqttBroker() as broker:
+            client = mqtt.Client(mqtt.CallbackAPIVersion.VERSION2)
+            box = MqttOutbox(client, qos=1)
+            connected = threading.Event()
+
+            def on_connect(*_):
+                box.connected()
+                connected.set()
+
+            client.on_connect = on_connect
+            for i in range(50):
+                box.put("clublog/state", str(i))
+                box.put(f"clublog/{i}", "x")
+            box.start()
+            client.connect(*broker.address)
+            client.loop_start()
+            try:
+                assert connected.wait(5)
+                assert box.flush(10)
+            finally:
+                box.stop()
+                client.loop_stop()
+                client.disconnect()
+            assert broker.retained["clublog/state"] == b"49"
+            assert broker.published() == 51
+            assert box.coalesced == 49
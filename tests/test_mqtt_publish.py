@@ -0,0 +1,298 @@
+"""Tests for the Docker bridge's MQTT discovery and state publishing."""
+
+import json
+import time
+
+import pytest
+
+from clublog_bridge.fake_mqtt import FakeMqttBroker
+from clublog_bridge.models import decode_watch
+from clublog_bridge.simulation import load_bridge
+
+
+class CapturingClient:
+    """paho client stand-in that keeps every publish."""
+
+    def __init__(self):
+        self.messages = []
+
+    def publish(self, topic, payload, retain=False):
+        self.messages.append((topic, payload, retain))
+
+    def topics(self, suffix=""):
+        return [topic for topic, _, _ in self.messages if topic.endswith(suffix)]
+
+
+@pytest.fixture
+def bridge():
+    return load_bridge()
+
+
+@pytest.fixture
+def grouped(bridge):
+    bridge.MQTT_GROUPED_STATE = True
+    return bridge
+
+
+@pytest.fixture
+def watch(sample_watch):
+    return decode_watch(json.dumps(sample_watch).encode())
+
+
+@pytest.fixture
+def device_mode(bridge):
+    bridge.MQTT_DISCOVERY_MODE = "device"
+    return bridge
+
+
+def _configs(client):
+    """Return the last non-empty payload per discovery config topic."""
+    return {
+        topic: json.loads(payload)
+        for topic, payload, _ in client.messages
+        if topic.endswith("/config") and payload
+    }
+
+
+def _render(config, documents):
+    """Evaluate the value/attributes templates the way Home Assistant would."""
+    document = json.loads(documents[config["state_topic"]])
+    entry = document[config["unique_id"].split("_", 1)[1]]
+    state = entry["state"]
+    attributes = entry.get("attributes") if "json_attributes_template" in config else None
+    return state, attributes
+
+
+class TestPerSensorTopics:
+    """Default mode: a state topic (and attributes topic) per sensor."""
+
+    def test_watch_publishes_a_state_per_sensor(self, bridge, watch):
+        client = CapturingClient()
+        bridge._publish_watch(client, watch)
+        assert len(client.topics("/config")) == 5  # with the device config cleared
+        assert len(client.topics("/state")) == 4
+
+    def test_unchanged_values_are_suppressed(self, bridge, watch):
+        client = CapturingClient()
+        bridge._publish_watch(client, watch)
+        client.messages.clear()
+        bridge._publish_watch(client, watch)
+        assert client.messages == []
+
+
+class TestGroupedState:
+    """MQTT_GROUPED_STATE: one JSON document per endpoint."""
+
+    def test_one_state_message_per_endpoint(self, grouped, watch):
+        client = CapturingClient()
+        grouped._publish_watch(client, watch)
+        assert client.topics("/state") == ["clublog/watch/state"]
+        assert client.topics("/attributes") == []
+
+        client.messages.clear()
+        grouped._publish_matrix(client, {"1": {"20m": 1}, "2": {"40m": 3}})
+        assert client.topics("/state") == ["clublog/matrix/state"]
+
+    def test_same_entities_as_per_sensor_mode(self, bridge, watch):
+        per_sensor, grouped = CapturingClient(), CapturingClient()
+        bridge._publish_watch(per_sensor, watch)
+        other = load_bridge()
+        other.MQTT_GROUPED_STATE = True
+        other._publish_watch(grouped, watch)
+
+        before, after = _configs(per_sensor), _configs(grouped)
+        assert before.keys() == after.keys()
+        for topic, config in before.items():
+            assert after[topic]["unique_id"] == config["unique_id"]
+            assert after[topic]["name"] == config["name"]
+
+    def test_templates_select_each_sensor(self, grouped, watch):
+        client = CapturingClient()
+        grouped._publish_watch(client, watch)
+        documents = {topic: payload for topic, payload, _ in client.messages}
+        configs = _configs(client)
+        states = {
+            config["unique_id"]: _render(config, documents)[0]
+            for config in configs.values()
+        }
+        assert states == {
+            "clublog_watch_total_qsos": 15234,
+            "clublog_watch_is_expedition": "No",
+            "clublog_watch_has_oqrs": "Yes",
+            "clublog_watch_last_upload": "2026-02-01 14:30:00",
+        }
+        for config in configs.values():
+            assert config["value_template"].startswith("{{ value_json.")
+
+    def test_attributes_template(self, grouped):
+        client = CapturingClient()
+        grouped.publish_sensor(client, "x", "X", 1)  # outside a group
+        with grouped.state_group(client, "test"):
+            grouped.publish_sensor(client, "a", "A", 3, attributes={"top": [1, 2]})
+            grouped.publish_binary_sensor(client, "b", "B", True)
+        documents = {topic: payload for topic, payload, _ in client.messages}
+        configs = _configs(client)
+        a = configs["homeassistant/sensor/clublog/a/config"]
+        b = configs["homeassistant/binary_sensor/clublog/b/config"]
+        assert a["json_attributes_topic"] == "clublog/test/state"
+        assert _render(a, documents) == (3, {"top": [1, 2]})
+        assert _render(b, documents) == ("ON", None)
+        assert documents["clublog/x/state"] == "1"
+
+    def test_failed_block_publishes_no_document(self, grouped):
+        client = CapturingClient()
+        with pytest.raises(ValueError), grouped.state_group(client, "test"):
+            grouped.publish_sensor(client, "a", "A", 1)
+            raise ValueError
+        assert client.topics("/state") == []
+        assert grouped._group is None
+
+
+class TestDeviceDiscovery:
+    """MQTT_DISCOVERY_MODE=device: one config per device."""
+
+    def test_one_config_for_all_components(self, device_mode, watch):
+        client = CapturingClient()
+        device_mode._publish_watch(client, watch)
+        device_mode._publish_matrix(client, {"1": {"20m": 1}})
+        assert client.topics("/config") == []  # nothing until the pass ends
+        client.messages.clear()
+        device_mode._migrated.update(_entity_topics(device_mode))  # not a first run
+        device_mode.publish_device_config(client)
+
+        assert client.topics("/config") == ["homeassistant/device/clublog/config"]
+        payload = _configs(client)["homeassistant/device/clublog/config"]
+        assert payload["device"]["identifiers"] == ["clublog_N0CALL"]
+        assert payload["origin"]["name"] == "clublog-ha-bridge"
+        assert len(payload["components"]) == 7
+        component = payload["components"]["watch_total_qsos"]
+        assert component["platform"] == "sensor"
+        assert component["unique_id"] == "clublog_watch_total_qsos"
+        assert component["state_topic"] == "clublog/watch_total_qsos/state"
+        assert "device" not in component
+
+    def test_unchanged_config_is_not_resent(self, device_mode, watch):
+        client = CapturingClient()
+        device_mode._publish_watch(client, watch)
+        device_mode.publish_device_config(client)
+        client.messages.clear()
+        device_mode._publish_watch(client, watch)
+        device_mode.publish_device_config(client)
+        assert client.messages == []
+
+    def test_migrates_per_entity_configs(self, device_mode):
+        client = CapturingClient()
+        device_mode.publish_sensor(client, "a", "A", 1)
+        device_mode.publish_device_config(client)
+        old = "homeassistant/sensor/clublog/a/config"
+        configs = [(t, p) for t, p, _ in client.messages if t.endswith("/config")]
+        assert configs == [
+            (old, json.dumps({"migrate_discovery": True})),
+            ("homeassistant/device/clublog/config", configs[1][1]),
+            (old, ""),
+        ]
+
+    def test_migration_keeps_its_order_through_the_outbox(self, device_mode):
+        from clublog_bridge.mqtt_outbox import MqttOutbox
+        from tests.test_mqtt_outbox import FakeClient
+
+        client = FakeClient()
+        device_mode.outbox = MqttOutbox(client, rate=1000)
+        device_mode.publish_sensor(client, "a", "A", 1)
+        device_mode.publish_device_config(client)  # Queued while disconnected
+        device_mode.outbox.start()
+        device_mode.outbox.connected()
+        try:
+            assert _wait_for(lambda: len(client.published) == 4)
+        finally:
+            device_mode.outbox.stop(timeout=0)
+        old = "homeassistant/sensor/clublog/a/config"
+        configs = [(t, p) for t, p, *_ in client.published if t.endswith("/config")]
+        assert configs == [
+            (old, json.dumps({"migrate_discovery": True})),
+            ("homeassistant/device/clublog/config", configs[1][1]),
+            (old, ""),
+        ]
+
+    def test_works_with_grouped_state(self, device_mode, watch):
+        device_mode.MQTT_GROUPED_STATE = True
+        client = CapturingClient()
+        device_mode._publish_watch(client, watch)
+        device_mode.publish_device_config(client)
+        components = _configs(client)["homeassistant/device/clublog/config"]["components"]
+        assert {c["state_topic"] for c in components.values()} == {"clublog/watch/state"}
+
+    def test_entity_mode_clears_device_config_first(self, bridge):
+        client = CapturingClient()
+        bridge.publish_sensor(client, "a", "A", 1)
+        bridge.publish_device_config(client)  # no-op in entity mode
+        assert client.messages[0] == ("homeassistant/device/clublog/config", "", True)
+        assert client.topics("/config") == [
+            "homeassistant/device/clublog/config",
+            "homeassistant/sensor/clublog/a/config",
+        ]
+
+
+def _entity_topics(bridge):
+    return [
+        f"homeassistant/{c['platform']}/clublog/{sensor_id}/config"
+        for sensor_id, c in bridge._components.items()
+    ]
+
+
+class TestReplay:
+    """Cached payloads republished without fetching, through a real broker."""
+
+    @pytest.fixture
+    def connected(self, bridge):
+        with FakeMqttBroker() as broker:
+            bridge.HA_MQTT_BROKER, bridge.HA_MQTT_PORT = broker.address
+            client = bridge.connect_mqtt()
+            assert _wait_for(lambda: broker.connections == 1)
+            client.reconnect_delay_set(min_delay=0.05, max_delay=0.1)
+            yield bridge, client, broker
+            bridge.outbox.stop(timeout=1)
+            client.loop_stop()
+            client.disconnect()
+
+    def test_replayed_after_broker_restart(self, connected, watch):
+        bridge, client, broker = connected
+        bridge._publish_watch(client, watch)
+        assert _wait_for(lambda: len(broker.retained) == 8)
+        with broker._lock:
+            broker.retained.clear()  # restarted without persistence
+        broker.disconnect_all()
+        assert _wait_for(lambda: len(broker.retained) == 8)
+        assert broker.retained["clublog/watch_total_qsos/state"] == b"15234"
+
+    def test_replayed_on_home_assistant_birth(self, connected, watch):
+        bridge, client, broker = connected
+        bridge._publish_watch(client, watch)
+        assert _wait_for(lambda: len(broker.retained) == 8)
+        with broker._lock:
+            broker.retained.clear()
+        broker.publish("homeassistant/status", "offline")
+        broker.publish("homeassistant/status", "online")
+        assert _wait_for(lambda: len(broker.retained) == 8)
+        assert bridge.metrics.MQTT_REPLAYS.value("birth") >= 1
+
+
+def _wait_for(predicate, timeout=5.0):
+    for _ in range(int(timeout / 0.01)):
+        if predicate():
+            return True
+        time.sleep(0.01)
+    return predicate()
+
+
+def test_dropped_payload_is_published_again(bridge):
+    from clublog_bridge.mqtt_outbox import MqttOutbox
+
+    client = CapturingClient()
+    bridge.outbox = MqttOutbox(client, maxsize=1, on_drop=bridge._forget_retained)
+    published = bridge.metrics.MQTT_PUBLISHES.value("state")
+    bridge._publish(client, "clublog/a/state", "1", "state")
+    bridge._publish(client, "clublog/b/state", "2", "state")  # Drops a
+    bridge._publish(client, "clublog/a/state", "1", "state")
+    assert bridge.outbox.dropped == 2
+    assert bridge.metrics.MQTT_PUBLISHES.value("state") - published == 3
@@ -0,0 +1,90 @@
+"""Tests for opt-in cycle profiling."""
+
+import logging
+import os
+import pstats
+import tracemalloc
+
+import pytest
+
+from clublog_bridge.profiling import (
+    PSTATS_SUFFIX,
+    SNAPSHOT_SUFFIX,
+    CycleProfiler,
+)
+
+
+def _work():
+    return [str(i) * 10 for i in range(2000)]
+
+
+def _files(directory, suffix):
+    return sorted(f for f in os.listdir(directory) if f.endswith(suffix))
+
+
+class TestCycleProfiler:
+    """Tests for CycleProfiler."""
+
+    def test_cpu_profiles_per_endpoint(self, tmp_path, caplog):
+        profiler = CycleProfiler(str(tmp_path), cycles=1)
+        with caplog.at_level(logging.INFO):
+            with profiler.endpoint("matrix"):
+                _work()
+            with profiler.endpoint("watch"):
+                _work()
+            profiler.end_cycle()
+        files = _files(tmp_path, PSTATS_SUFFIX)
+        assert [f.split("-")[-1] for f in files] == ["matrix.pstats", "watch.pstats"]
+        stats = pstats.Stats(str(tmp_path / files[0]))
+        assert any(func[2] == "_work" for func in stats.stats)
+        assert "matrix — top 15 by cumulative time" in caplog.text
+        assert not _files(tmp_path, SNAPSHOT_SUFFIX)
+
+    def test_memory_snapshots(self, tmp_path, caplog):
+        profiler = CycleProfiler(str(tmp_path), cycles=1, mode="memory")
+        with caplog.at_level(logging.INFO):
+            with profiler.endpoint("expeditions"):
+                kept = _work()
+            profiler.end_cycle()
+        assert kept
+        files = _files(tmp_path, SNAPSHOT_SUFFIX)
+        assert len(files) == 1
+        assert tracemalloc.Snapshot.load(str(tmp_path / files[0])).traces
+        assert "allocation sites" in caplog.text
+        assert not tracemalloc.is_tracing()
+
+    def test_stops_after_configured_cycles(self, tmp_path):
+        profiler = CycleProfiler(str(tmp_path), cycles=2)
+        for _ in range(3):
+            with profiler.endpoint("watch"):
+                _work()
+            profiler.end_cycle()
+        assert not profiler.active
+        assert len(_files(tmp_path, PSTATS_SUFFIX)) == 2
+
+    def test_empty_cycle_not_counted(self, tmp_path):
+        profiler = CycleProfiler(str(tmp_path), cycles=1)
+        profiler.end_cycle()
+        assert profiler.active
+        assert not os.listdir(tmp_path)
+
+    def test_rotation_keeps_newest(self, tmp_path):
+        profiler = CycleProfiler(str(tmp_path), cycles=5, keep=2)
+        for _ in range(5):
+            with profiler.endpoint("watch"):
+                _work()
+            profiler.end_cycle()
+        files = _files(tmp_path, PSTATS_SUFFIX)
+        assert len(files) == 2
+        assert files[-1].endswith("cycle005-watch.pstats")
+
+    def test_exception_still_profiled(self, tmp_path):
+        profiler = CycleProfiler(str(tmp_path), cycles=1)
+        with pytest.raises(RuntimeError), profiler.endpoint("matrix"):
+            raise RuntimeError
+        profiler.end_cycle()
+        assert len(_files(tmp_path, PSTATS_SUFFIX)) == 1
+
+    def test_invalid_mode(self, tmp_path):
+        with pytest.raises(ValueError):
+            CycleProfiler(str(tmp_path), cycles=1, mode="gpu")
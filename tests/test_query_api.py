@@ -0,0 +1,121 @@
+"""Tests for the Docker bridge's local query API."""
+
+import http.client
+import json
+import socket
+import urllib.error
+import urllib.request
+
+import pytest
+
+from clublog_bridge.models import LazyMostWanted, lazy_expeditions, lazy_livestreams
+from clublog_bridge.query_api import QueryApi, serve, serve_unix
+
+MATRIX = {"1": {"20": 1, "40": 2}, "291": {"80": 3}}
+
+
+@pytest.fixture
+def api(sample_most_wanted, sample_expeditions, sample_livestreams):
+    api = QueryApi()
+    api.update_matrix(MATRIX)
+    api.update_most_wanted(LazyMostWanted(json.dumps(sample_most_wanted).encode()))
+    api.update_expeditions(lazy_expeditions(json.dumps(sample_expeditions).encode()))
+    api.update_livestreams(lazy_livestreams(json.dumps(sample_livestreams).encode()))
+    return api
+
+
+def get(api, path, etag=None):
+    status, tag, body = api.handle(path, etag)
+    return status, tag, json.loads(body) if body else None
+
+
+class TestHandle:
+    """Tests for routing, lookups and ETags."""
+
+    def test_datasets(self, api):
+        assert get(api, "/v1/matrix")[2] == MATRIX
+        wanted = get(api, "/v1/most_wanted")[2]
+        assert len(wanted) == 340 and wanted[0] == {"rank": 1, "dxcc": "101"}
+        assert [e["call"] for e in get(api, "/v1/expeditions")[2]] == ["3Y0K", "VP8PJ", "TX7L"]
+        assert get(api, "/v1/livestreams")[2][1]["dxcc"] == "141"
+
+    def test_lookups(self, api):
+        assert get(api, "/v1/matrix/1/40m")[2]["status"] == "worked"
+        assert get(api, "/v1/matrix/101/20")[2]["rank"] == 1
+        assert get(api, "/v1/matrix/291")[2]["bands"] == {"80": "verified"}
+        assert get(api, "/v1/most_wanted/101?x=1")[2] == {
+            "dxcc": 101, "rank": 1, "of": 340, "needed": True,
+        }
+
+    def test_errors(self, api):
+        assert get(api, "/v1/matrix/abc")[0] == 400
+        assert get(api, "/v1/nothing")[0] == 404
+        assert get(api, "/v1/expeditions/1")[0] == 404
+        assert get(api, "/v1/matrix/1/20/x")[0] == 404
+        assert get(api, "/metrics")[0] == 404
+        assert get(QueryApi(), "/v1/matrix/1")[0] == 503
+
+    def test_etag_and_304(self, api):
+        status, etag, _ = get(api, "/v1/matrix/1/20")
+        assert status == 200
+        assert get(api, "/v1/matrix/1/20", etag)[0] == 304
+        assert get(api, "/v1/matrix/291", f'"other", {etag}')[0] == 304
+        api.update_most_wanted(LazyMostWanted(b'{"1": "291"}'))
+        status, new_etag, body = get(api, "/v1/matrix/291", etag)
+        assert (status, body["rank"]) == (200, 1)
+        assert new_etag != etag
+        # The expeditions ETag does not depend on the matrix
+        _, expeditions_etag, _ = get(api, "/v1/expeditions")
+        api.update_matrix({})
+        assert get(api, "/v1/expeditions", expeditions_etag)[0] == 304
+
+    def test_status(self, api):
+        status = get(api, "/v1/status")[2]
+        assert status["matrix"]["version"] == 1
+        assert status["livestreams"]["updated"] is not None
+
+
+class TestServers:
+    """Tests for the TCP and Unix-socket servers."""
+
+    def test_tcp(self, api):
+        server = serve(api, "127.0.0.1", 0)
+        base = f"http://127.0.0.1:{server.server_address[1]}"
+        try:
+            with urllib.request.urlopen(f"{base}/v1/matrix/1") as resp:
+                etag = resp.headers["ETag"]
+                assert resp.headers["Content-Type"] == "application/json"
+                assert json.load(resp)["bands"] == {"20": "confirmed", "40": "worked"}
+            request = urllib.request.Request(f"{base}/v1/matrix/1", headers={"If-None-Match": etag})
+            with pytest.raises(urllib.error.HTTPError) as err:
+                urllib.request.urlopen(request)
+            assert err.value.code == 304
+        finally:
+            server.shutdown()
+            server.server_close()
+
+    def test_unix_socket(self, api, tmp_path):
+        path = str(tmp_path / "clublog.sock")
+        server = serve_unix(api, path)
+        try:
+            conn = http.client.HTTPConnection("localhost")
+            conn.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            conn.sock.connect(path)
+            conn.request("GET", "/v1/most_wanted/101")
+            resp = conn.getresponse()
+            assert resp.status == 200
+            assert json.loads(resp.read())["rank"] == 1
+            conn.close()
+        finally:
+            server.shutdown()
+            server.server_close()
+
+
+def test_bridge_feeds_matrix_updates():
+    from clublog_bridge.simulation import load_bridge
+    from tests.test_mqtt_publish import CapturingClient
+
+    bridge = load_bridge()
+    bridge.query_api = QueryApi()
+    bridge._publish_matrix(CapturingClient(), MATRIX)
+    assert get(bridge.query_api, "/v1/matrix/291/80")[2]["status"] == "verified"
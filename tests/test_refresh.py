@@ -0,0 +1,97 @@
+"""Tests for the Docker bridge's on-demand refresh command topic."""
+
+import pytest
+
+from clublog_bridge.scheduling import (
+    REFRESH_BACKOFF,
+    REFRESH_TOO_SOON,
+    RefreshGate,
+    RequestBudget,
+    SimulatedClock,
+)
+from clublog_bridge.simulation import load_bridge
+
+
+@pytest.fixture
+def bridge():
+    bridge = load_bridge()
+    bridge.clock = SimulatedClock()
+    bridge.clock.advance(10_000)
+    bridge.refresh_gate = RefreshGate(RequestBudget(30, 3600), 300)
+    return bridge
+
+
+def queued(bridge):
+    names = []
+    while not bridge.refresh_requests.empty():
+        names.append(bridge.refresh_requests.get_nowait())
+    return names
+
+
+class TestOnRefresh:
+    """Tests for parsing refresh commands."""
+
+    @pytest.mark.parametrize(
+        ("payload", "names"),
+        [
+            (b"watch", ["watch"]),
+            (b"watch, matrix", ["watch", "matrix"]),
+            (b'["Most_Wanted"]', ["most_wanted"]),
+            (b"bogus watch", ["watch"]),
+        ],
+    )
+    def test_names(self, bridge, payload, names):
+        bridge.wake.clear()
+        bridge.on_refresh(payload)
+        assert queued(bridge) == names
+        assert bridge.wake.is_set()
+
+    def test_all(self, bridge):
+        for payload in (b"", b"all"):
+            bridge.on_refresh(payload)
+            assert queued(bridge) == list(bridge.REFRESHABLE)
+
+    def test_invalid(self, bridge):
+        before = bridge.metrics.REFRESHES.value("invalid")
+        bridge.on_refresh(b"[not json")
+        assert queued(bridge) == []
+        assert bridge.metrics.REFRESHES.value("invalid") == before + 1
+
+
+class TestAdmitRefreshes:
+    """Tests for admitting queued refreshes into the schedule."""
+
+    def test_admitted_refresh_is_due_now(self, bridge):
+        now = bridge.clock.monotonic()
+        next_fetch = {"watch": now + 500, "matrix": now + 900}
+        bridge.on_refresh(b"watch watch")
+        assert bridge._admit_refreshes(next_fetch, 0.0)
+        assert next_fetch == {"watch": now, "matrix": now + 900}
+        assert bridge.refresh_gate.pending == {"watch"}
+
+    def test_too_soon_after_fetch(self, bridge):
+        bridge.refresh_gate.fetched("matrix", bridge.clock.monotonic())
+        next_fetch = {"matrix": bridge.clock.monotonic() + 3600}
+        before = bridge.metrics.REFRESHES.value(REFRESH_TOO_SOON)
+        bridge.on_refresh(b"matrix")
+        assert not bridge._admit_refreshes(next_fetch, 0.0)
+        assert bridge.metrics.REFRESHES.value(REFRESH_TOO_SOON) == before + 1
+        bridge.clock.advance(300)
+        bridge.on_refresh(b"matrix")
+        assert bridge._admit_refreshes(next_fetch, 0.0)
+
+    def test_refused_during_backoff(self, bridge):
+        before = bridge.metrics.REFRESHES.value(REFRESH_BACKOFF)
+        bridge.on_refresh(b"watch")
+        next_fetch = {"watch": 0.0}
+        assert not bridge._admit_refreshes(next_fetch, bridge.clock.monotonic() + 60)
+        assert bridge.metrics.REFRESHES.value(REFRESH_BACKOFF) == before + 1
+        assert bridge.refresh_gate.pending == set()
+
+
+def test_full_history_fetch_spends_the_budget(bridge, tmp_path):
+    bridge.fetch_activity = lambda **_: {"20m": 5}
+    job = bridge.ActivityHistoryJob(str(tmp_path / "activity_history.json"))
+    now = bridge.clock.monotonic()
+    assert job._fetch_with_retries() == {"20m": 5}
+    assert bridge.refresh_gate.budget.remaining(now) == 29
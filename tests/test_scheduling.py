@@ -0,0 +1,208 @@
+"""Tests for the injectable clock and drift-free scheduling."""
+
+import random
+import threading
+import time
+
+import pytest
+
+from clublog_bridge.scheduling import (
+    REFRESH_ACCEPTED,
+    REFRESH_BUDGET,
+    REFRESH_COALESCED,
+    REFRESH_TOO_SOON,
+    SIMULATION_EPOCH,
+    Clock,
+    MatrixRefresh,
+    RefreshGate,
+    RequestBudget,
+    SimulatedClock,
+    jittered,
+    next_due,
+)
+
+
+class TestClock:
+    """Tests for the system clock wrapper."""
+
+    def test_tracks_system_time(self):
+        clock = Clock()
+        assert abs(clock.time() - time.time()) < 1
+        assert abs(clock.monotonic() - time.monotonic()) < 1
+        assert clock.gmtime().tm_year == time.gmtime().tm_year
+
+
+class TestSimulatedClock:
+    """Tests for SimulatedClock."""
+
+    def test_starts_at_epoch(self):
+        clock = SimulatedClock()
+        assert clock.monotonic() == 0.0
+        assert clock.time() == SIMULATION_EPOCH
+        assert clock.gmtime().tm_year == 2026
+
+    def test_sleep_advances_without_blocking(self):
+        clock = SimulatedClock(start=0.0)
+        start = time.perf_counter()
+        clock.sleep(86400 * 30)
+        assert time.perf_counter() - start < 0.1
+        assert clock.monotonic() == 86400 * 30
+        assert clock.gmtime().tm_mday == 31
+
+    def test_wait_returns_early_only_when_set(self):
+        clock = SimulatedClock(start=0.0)
+        event = threading.Event()
+        assert clock.wait(event, 30) is False
+        assert clock.monotonic() == 30
+        event.set()
+        assert clock.wait(event, 30) is True
+        assert clock.monotonic() == 30
+
+    def test_never_goes_backwards(self):
+        clock = SimulatedClock()
+        clock.advance(10)
+        clock.advance(-5)
+        assert clock.monotonic() == 10
+
+
+class TestJittered:
+    """Tests for jittered()."""
+
+    def test_within_bounds(self):
+        rng = random.Random(1)
+        for _ in range(200):
+            assert 540 <= jittered(600, 0.1, rng) <= 660
+
+    def test_seeded_rng_is_reproducible(self):
+        first = [jittered(600, 0.1, random.Random(7)) for _ in range(3)]
+        second = [jittered(600, 0.1, random.Random(7)) for _ in range(3)]
+        assert first == second
+
+
+class TestNextDue:
+    """Tests for next_due()."""
+
+    def test_anchored_to_due_time(self):
+        rng = random.Random(1)
+        # Picked up 25 s late by a 30 s tick — the delay is not carried over
+        assert next_due(1000, 1025, 600, 0.0, rng) == 1600
+
+    def test_rescheduled_from_now_when_far_behind(self):
+        rng = random.Random(1)
+        # An hour late (e.g. after a 403 backoff): no catch-up burst
+        assert next_due(1000, 4600, 600, 0.0, rng) == 5200
+
+    def test_never_in_the_past(self):
+        rng = random.Random(1)
+        for now in range(1000, 3000, 37):
+            assert next_due(1000, now, 600, 0.1, rng) > now
+
+    @pytest.mark.parametrize("interval", [600, 3600])
+    def test_no_drift_over_many_ticks(self, interval):
+        """Mean period equals the interval despite a 30 s polling tick."""
+        rng = random.Random(3)
+        due, now, fetches = 0.0, 0.0, []
+        while len(fetches) < 500:
+            if now >= due:
+                fetches.append(now)
+                due = next_due(due, now, interval, 0.1, rng)
+            now += 30
+        period = (fetches[-1] - fetches[0]) / (len(fetches) - 1)
+        assert period == pytest.approx(interval, rel=0.01)
+
+
+class TestMatrixRefresh:
+    """Tests for the upload-driven matrix refresh and back-off."""
+
+    def test_first_watch_is_baseline(self):
+        refresh = MatrixRefresh(3600, 21600)
+        assert refresh.watch_fetched("2026-02-01 14:30:00", 100, 0) is False
+        assert refresh.take_refresh() is None
+
+    def test_upload_waits_for_settle_and_cache_window(self):
+        refresh = MatrixRefresh(3600, 21600, cache_window=3600, settle=120)
+        refresh.watch_fetched("2026-02-01 14:30:00", 100, 0)
+        refresh.matrix_fetched(1000)
+        assert refresh.watch_fetched("2026-02-01 15:00:00", 120, 2000) is True
+        assert refresh.take_refresh() == 4600  # cache from the fetch at 1000
+        assert refresh.take_refresh() is None
+        refresh.watch_fetched("2026-02-01 18:00:00", 140, 9000)
+        assert refresh.take_refresh() == 9120
+        assert refresh.uploads == 2
+
+    def test_backs_off_without_uploads(self):
+        refresh = MatrixRefresh(3600, 21600)
+        refresh.watch_fetched("2026-02-01 14:30:00", 100, 0)
+        intervals = []
+        for i in range(6):
+            refresh.watch_fetched("2026-02-01 14:30:00", 100, i * 100)
+            intervals.append(refresh.matrix_fetched(i * 100 + 50))
+        assert intervals == [3600, 7200, 14400, 21600, 21600, 21600]
+
+    def test_upload_resets_interval(self):
+        refresh = MatrixRefresh(3600, 21600)
+        refresh.watch_fetched("a", 1, 0)
+        refresh.matrix_fetched(0)
+        refresh.watch_fetched("a", 1, 1)
+        assert refresh.matrix_fetched(2) == 7200
+        refresh.watch_fetched("b", 2, 3)
+        assert refresh.interval == 3600
+        assert refresh.matrix_fetched(4) == 3600
+
+    def test_no_backoff_without_watch_data(self):
+        refresh = MatrixRefresh(3600, 21600)
+        for i in range(4):
+            assert refresh.matrix_fetched(i) == 3600
+
+
+class TestRequestBudget:
+    """Tests for the sliding-window request budget."""
+
+    def test_window_slides(self):
+        budget = RequestBudget(3, 3600)
+        for now in (0, 10, 20):
+            budget.spend(now)
+        assert budget.remaining(3599) == 0
+        assert budget.remaining(3600) == 1
+        assert budget.remaining(3620) == 3
+
+
+class TestRefreshGate:
+    """Tests for on-demand refresh admission."""
+
+    def test_coalesces_until_fetched(self):
+        gate = RefreshGate(RequestBudget(30, 3600), 300)
+        assert gate.request("watch", 0) == REFRESH_ACCEPTED
+        assert gate.request("watch", 1) == REFRESH_COALESCED
+        gate.fetched("watch", 2)
+        assert gate.pending == set()
+
+    def test_minimum_interval_counts_scheduled_fetches(self):
+        gate = RefreshGate(RequestBudget(30, 3600), 300)
+        gate.fetched("matrix", 1000)  # A scheduled fetch
+        assert gate.request("matrix", 1299) == REFRESH_TOO_SOON
+        assert gate.request("matrix", 1300) == REFRESH_ACCEPTED
+
+    def test_budget_counts_pending_refreshes(self):
+        gate = RefreshGate(RequestBudget(3, 3600), 0)
+        gate.fetched("watch", 0)
+        assert gate.request("matrix", 10) == REFRESH_ACCEPTED
+        assert gate.request("livestreams", 10) == REFRESH_ACCEPTED
+        assert gate.request("expeditions", 10) == REFRESH_BUDGET
+        assert gate.request("expeditions", 3600) == REFRESH_ACCEPTED  # watch aged out
+
+    def test_spam_stays_within_budget(self):
+        gate = RefreshGate(RequestBudget(30, 3600), 300)
+        sent = 0
+        for second in range(0, 7200, 5):
+            for endpoint in ("matrix", "watch", "most_wanted", "expeditions"):
+                if gate.request(endpoint, second) == REFRESH_ACCEPTED:
+                    gate.fetched(endpoint, second)
+                    sent += 1
+        assert sent <= 2 * 30
+
+    def test_clear_drops_pending(self):
+        gate = RefreshGate(RequestBudget(30, 3600), 300)
+        gate.request("watch", 0)
+        gate.clear()
+        assert gate.request("watch", 0) == REFRESH_ACCEPTED
@@ -1,23 +1,53 @@
 """Tests for ClubLog sensor value extraction and attribute logic.
 
 Tests the data extraction patterns used by sensor value_fn and attr_fn
-without requiring Home Assistant. Uses plain dicts/lists matching the
-ClubLogData dataclass structure.
+without requiring Home Assistant. Uses the typed response models stored
+in the ClubLogData dataclass.
 """
 
+import json
+
 import pytest
 
+from clublog_bridge.band_analytics import (
+    BandActivityGrid,
+    activity_attributes,
+    best_band_attributes,
+)
+from clublog_bridge.dxcc import ProvisionalCell
+from clublog_bridge.models import (
+    LazyMostWanted,
+    lazy_expeditions,
+    lazy_livestreams,
+    parse_watch,
+)
+from clublog_bridge.spots import NeededSpot
+
+
+def _body(obj) -> bytes:
+    return json.dumps(obj).encode()
+
 
 class _FakeData:
-    """Lightweight stand-in for ClubLogData (avoids HA import)."""
+    """Lightweight stand-in for ClubLogData (avoids HA import).
+
+    Raw API-shaped fixtures are wrapped/parsed into the same typed models
+    the coordinator stores.
+    """
 
     def __init__(self, **kwargs):
         self.dxcc_matrix = kwargs.get("dxcc_matrix", {})
-        self.watch = kwargs.get("watch", {})
-        self.most_wanted = kwargs.get("most_wanted", {})
-        self.expeditions = kwargs.get("expeditions", [])
-        self.livestreams = kwargs.get("livestreams", [])
+        self.dxcc_provisional = kwargs.get("dxcc_provisional", [])
+        self.dxcc_trend = kwargs.get("dxcc_trend")
+        self.needed_spots = kwargs.get("needed_spots", [])
+        self.watch = parse_watch(kwargs.get("watch", {}))
+        self.most_wanted = LazyMostWanted(_body(kwargs.get("most_wanted", {})))
+        self.expeditions = lazy_expeditions(_body(kwargs.get("expeditions", [])))
+        self.livestreams = lazy_livestreams(_body(kwargs.get("livestreams", [])))
         self.activity = kwargs.get("activity", {})
+        self.activity_grid = kwargs.get("activity_grid")
+        self.activity_all_time = kwargs.get("activity_all_time", {})
+        self.activity_all_time_fetched = kwargs.get("activity_all_time_fetched")
         self.dxcc_worked_total = kwargs.get("dxcc_worked_total", 0)
         self.dxcc_confirmed_total = kwargs.get("dxcc_confirmed_total", 0)
         self.dxcc_verified_total = kwargs.get("dxcc_verified_total", 0)
@@ -29,6 +59,21 @@ class _FakeData:
 # --- Mirror the value_fn and attr_fn lambdas from sensor.py ---
 # This tests the extraction logic independent of HA's SensorEntity machinery.
 
+
+def _band_activity_attrs(data):
+    """Mirror of sensor._band_activity_attrs."""
+    attrs = {
+        f"band_{band}": hours if isinstance(hours, int) else sum(hours)
+        for band, hours in data.activity.items()
+    }
+    if data.activity_all_time:
+        attrs["all_time"] = data.activity_all_time
+        attrs["all_time_fetched"] = data.activity_all_time_fetched
+    if data.activity_grid:
+        attrs.update(activity_attributes(data.activity_grid))
+    return attrs or None
+
+
 SENSORS = {
     "dxcc_worked_total": {
         "value_fn": lambda data: data.dxcc_worked_total,
@@ -43,7 +88,7 @@ SENSORS = {
         "value_fn": lambda data: len(data.expeditions),
         "attr_fn": lambda data: {
             "expeditions": [
-                {"call": e[0], "date": e[1], "qso_count": e[2]}
+                {"call": e.call, "date": e.date, "qso_count": e.qso_count}
                 for e in data.expeditions[:20]
             ]
             if data.expeditions
@@ -53,44 +98,56 @@ SENSORS = {
     "most_wanted_count": {
         "value_fn": lambda data: len(data.most_wanted),
         "attr_fn": lambda data: {
-            "top_10": dict(list(data.most_wanted.items())[:10])
+            "top_10": data.most_wanted.top(10)
         }
         if data.most_wanted
         else None,
     },
+    "dxcc_worked_30d": {
+        "value_fn": lambda data: data.dxcc_trend["worked_30d"] if data.dxcc_trend else None,
+        "attr_fn": lambda data: {
+            "confirmed_30d": data.dxcc_trend["confirmed_30d"],
+            "monthly": data.dxcc_trend["monthly"],
+        }
+        if data.dxcc_trend
+        else None,
+    },
+    "dxcc_provisional": {
+        "value_fn": lambda data: len(data.dxcc_provisional),
+        "attr_fn": lambda data: {
+            "slots": [
+                {"call": c.call, "dxcc": c.dxcc, "band": c.band, "logged_at": c.logged_at}
+                for c in data.dxcc_provisional[-50:]
+            ]
+        },
+    },
+    "needed_spots": {
+        "value_fn": lambda data: len(data.needed_spots),
+        "attr_fn": lambda data: {
+            "spots": [spot.to_dict() for spot in data.needed_spots[:20]]
+        },
+    },
     "watch_total_qsos": {
-        "value_fn": lambda data: (
-            data.watch.get("clublog_info", {}).get("total_qsos")
-            if data.watch
-            else None
-        ),
+        "value_fn": lambda data: data.watch.total_qsos if data.watch else None,
     },
     "watch_is_expedition": {
-        "value_fn": lambda data: (
-            "Yes" if data.watch.get("is_expedition") else "No"
-        )
+        "value_fn": lambda data: ("Yes" if data.watch.is_expedition else "No")
         if data.watch
         else None,
     },
     "watch_has_oqrs": {
-        "value_fn": lambda data: (
-            "Yes" if data.watch.get("has_oqrs") else "No"
-        )
+        "value_fn": lambda data: ("Yes" if data.watch.has_oqrs else "No")
         if data.watch
         else None,
     },
     "watch_last_upload": {
-        "value_fn": lambda data: (
-            data.watch.get("clublog_info", {}).get("last_clublog_upload")
-            if data.watch
-            else None
-        ),
+        "value_fn": lambda data: data.watch.last_upload if data.watch else None,
     },
     "active_livestreams": {
         "value_fn": lambda data: len(data.livestreams),
         "attr_fn": lambda data: {
             "livestreams": [
-                {"call": s[0], "dxcc": s[1], "url": s[3]}
+                {"call": s.call, "dxcc": s.dxcc, "url": s.url}
                 for s in data.livestreams[:20]
             ]
             if data.livestreams
@@ -99,11 +156,15 @@ SENSORS = {
     },
     "band_activity": {
         "value_fn": lambda data: len(data.activity) if data.activity else 0,
-        "attr_fn": lambda data: {
-            f"band_{band}": sum(hours) if isinstance(hours, list) else hours
-            for band, hours in data.activity.items()
-        }
-        if data.activity
+        "attr_fn": lambda data: _band_activity_attrs(data),
+    },
+    "best_band_now": {
+        # sensor.py passes dt_util.utcnow().hour; tests pin hour 5
+        "value_fn": lambda data: data.activity_grid.best_band(5)
+        if data.activity_grid
+        else None,
+        "attr_fn": lambda data: best_band_attributes(data.activity_grid, 5)
+        if data.activity_grid
         else None,
     },
     "api_consecutive_errors": {
@@ -146,6 +207,38 @@ class TestDxccSensors:
         assert _val("dxcc_worked_total", data) == 0
         assert _val("dxcc_confirmed_total", data) == 0
         assert _val("dxcc_verified_total", data) == 0
+        assert _val("dxcc_provisional", data) == 0
+
+    def test_provisional_slots(self):
+        cell = ProvisionalCell("1", "20", "VE3XYZ", 1769956155.0)
+        data = _FakeData(dxcc_provisional=[cell])
+        assert _val("dxcc_provisional", data) == 1
+        assert _attr("dxcc_provisional", data) == {
+            "slots": [{"call": "VE3XYZ", "dxcc": "1", "band": "20", "logged_at": 1769956155.0}]
+        }
+
+
+    def test_worked_30d(self):
+        assert _val("dxcc_worked_30d", _FakeData()) is None
+        monthly = [{"month": "2026-03", "worked": 104, "confirmed": 92}]
+        data = _FakeData(dxcc_trend={"worked_30d": 4, "confirmed_30d": 2, "monthly": monthly})
+        assert _val("dxcc_worked_30d", data) == 4
+        assert _attr("dxcc_worked_30d", data) == {"confirmed_30d": 2, "monthly": monthly}
+
+
+class TestNeededSpotsSensor:
+    """Needed spots within the dedup window."""
+
+    def test_lists_spots(self):
+        spot = NeededSpot("VP9XY", 64, "20", "new_entity", 14.074, "FT8", "K1ABC", 1769956200.0)
+        data = _FakeData(needed_spots=[spot])
+        assert _val("needed_spots", data) == 1
+        assert _attr("needed_spots", data)["spots"][0]["call"] == "VP9XY"
+
+    def test_empty(self):
+        data = _FakeData()
+        assert _val("needed_spots", data) == 0
+        assert _attr("needed_spots", data) == {"spots": []}
 
 
 class TestExpeditionSensor:
@@ -176,6 +269,13 @@ class TestExpeditionSensor:
         data = _FakeData(expeditions=exps)
         attrs = _attr("active_expeditions", data)
         assert len(attrs["expeditions"]) == 20
+        assert _val("active_expeditions", data) == 30
+        assert not data.expeditions.materialized
+
+    def test_top_10_decodes_prefix_only(self, sample_most_wanted):
+        data = _FakeData(most_wanted=sample_most_wanted)
+        _attr("most_wanted_count", data)
+        assert not data.most_wanted.materialized
 
 
 class TestMostWantedSensor:
@@ -284,6 +384,21 @@ class TestBandActivitySensor:
         attrs = _attr("band_activity", data)
         assert attrs is None
 
+    def test_all_time_attrs(self, sample_activity):
+        data = _FakeData(
+            activity=sample_activity,
+            activity_all_time={"20m": [1] * 24},
+            activity_all_time_fetched=1700000000.0,
+        )
+        attrs = _attr("band_activity", data)
+        assert attrs["all_time"] == {"20m": [1] * 24}
+        assert attrs["all_time_fetched"] == 1700000000.0
+        assert attrs["band_20m"] == sum(sample_activity["20m"])
+
+    def test_no_all_time_attrs_by_default(self, sample_activity):
+        data = _FakeData(activity=sample_activity)
+        assert "all_time" not in _attr("band_activity", data)
+
     def test_scalar_band_values(self):
         """Activity with scalar (non-list) values."""
         data = _FakeData(activity={"20m": 42, "40m": 10})
@@ -292,6 +407,29 @@ class TestBandActivitySensor:
         assert attrs["band_40m"] == 10
 
 
+class TestBestBandSensor:
+    """Best band right now sensor."""
+
+    def test_best_band(self, sample_activity):
+        data = _FakeData(activity_grid=BandActivityGrid.from_activity(sample_activity))
+        assert _val("best_band_now", data) == "40m"
+        assert _attr("best_band_now", data)["ranking"][0]["band"] == "40m"
+
+    def test_no_grid(self):
+        data = _FakeData()
+        assert _val("best_band_now", data) is None
+        assert _attr("best_band_now", data) is None
+
+    def test_band_activity_includes_peaks(self, sample_activity):
+        data = _FakeData(
+            activity=sample_activity,
+            activity_grid=BandActivityGrid.from_activity(sample_activity),
+        )
+        attrs = _attr("band_activity", data)
+        assert attrs["peak_hour"]["40m"] == 5
+        assert "20m" in attrs["best_window"]
+
+
 class TestApiErrorsSensor:
     """API errors diagnostic sensor."""
 
@@ -319,8 +457,8 @@ class TestApiErrorsSensor:
 class TestSensorCompleteness:
     """Verify sensor suite completeness."""
 
-    def test_12_sensors_defined(self):
-        assert len(SENSORS) == 12
+    def test_16_sensors_defined(self):
+        assert len(SENSORS) == 16
 
     def test_all_have_value_fn(self):
         for key, desc in SENSORS.items():
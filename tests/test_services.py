@@ -0,0 +1,17 @@
+"""Tests for the HACS service descriptions (without Home Assistant)."""
+
+import json
+from pathlib import Path
+
+import yaml
+
+COMPONENT = Path(__file__).parent.parent / "custom_components" / "clublog"
+
+
+def test_services_described_in_strings():
+    services = yaml.safe_load((COMPONENT / "services.yaml").read_text())
+    strings = json.loads((COMPONENT / "strings.json").read_text())["services"]
+    assert set(services) == set(strings) == {"lookup_slot", "lookup_rank", "needed_for_call", "refresh"}
+    for name, service in services.items():
+        assert set(service["fields"]) == set(strings[name]["fields"])
+        assert "callsign" in service["fields"]
@@ -0,0 +1,35 @@
+"""Check that modules shared between Docker and HACS modes stay identical.
+
+Pure-logic modules are kept as verbatim copies in clublog_bridge/ (Docker)
+and custom_components/clublog/ (HACS) because the two modes are shipped
+separately. Tests exercise the clublog_bridge copy; this guards the other.
+"""
+
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+
+SHARED_MODULES = [
+    "activity_history.py",
+    "adif.py",
+    "band_analytics.py",
+    "dxcc.py",
+    "fetch_timing.py",
+    "loggers.py",
+    "lookup.py",
+    "models.py",
+    "profiling.py",
+    "scheduling.py",
+    "snapshots.py",
+    "spots.py",
+    "streaming.py",
+]
+
+
+@pytest.mark.parametrize("module", SHARED_MODULES)
+def test_shared_module_copies_identical(module):
+    docker_copy = (ROOT / "clublog_bridge" / module).read_text()
+    hacs_copy = (ROOT / "custom_components" / "clublog" / module).read_text()
+    assert docker_copy == hacs_copy, f"{module} differs between Docker and HACS copies"
@@ -0,0 +1,117 @@
+"""Simulated-clock runs of the Docker polling loop against the stand-in."""
+
+from itertools import pairwise
+
+import json
+
+import pytest
+
+from clublog_bridge.fake_clublog import FakeClubLog
+from clublog_bridge.scheduling import SIMULATION_EPOCH
+from clublog_bridge.simulation import DAY, Simulation
+
+DAYS = 30
+JITTER_FACTOR = 0.1
+POLL_TICK = 30
+STAGGER = 5  # startup offset per endpoint, in polling order
+# Fixed-interval endpoints; the matrix backs off while watch shows no upload
+MATRIX_MAX_INTERVAL = 21600
+FIXED = ("most_wanted", "watch", "expeditions", "livestreams", "activity")
+
+
+@pytest.fixture(scope="module")
+def month():
+    """Thirty simulated days of polling (takes a few seconds of wall time)."""
+    return Simulation(DAYS, seed=1).run()
+
+
+class TestMonthOfPolling:
+    """Request counts, drift and memory over 30 simulated days."""
+
+    def test_request_counts(self, month):
+        for i, (endpoint, interval) in enumerate(month.intervals.items()):
+            if endpoint not in FIXED:
+                continue
+            expected = 1 + (DAYS * DAY - i * STAGGER) / interval
+            assert month.count(endpoint) == pytest.approx(expected, abs=max(1, expected * 0.01)), endpoint
+
+    def test_no_drift(self, month):
+        """Waiting for the 30 s tick must not add up over thousands of fetches."""
+        for endpoint, interval in month.intervals.items():
+            if endpoint in FIXED and DAYS * DAY / interval >= 20:
+                assert abs(month.drift(endpoint)) < 0.01, endpoint
+
+    def test_never_fetched_early(self, month):
+        for endpoint, interval in month.intervals.items():
+            times = month.requests[endpoint]
+            gaps = [b - a for a, b in pairwise(times)]
+            assert min(gaps) >= interval * (1 - JITTER_FACTOR) - POLL_TICK, endpoint
+
+    def test_matrix_backs_off_without_uploads(self, month):
+        """The fixture watch never changes, so the matrix settles at the maximum."""
+        times = month.requests["matrix"]
+        gaps = [b - a for a, b in pairwise(times)]
+        assert gaps[0] == pytest.approx(month.intervals["matrix"], rel=JITTER_FACTOR)
+        assert gaps[-1] == pytest.approx(MATRIX_MAX_INTERVAL, rel=JITTER_FACTOR)
+        assert len(times) < DAYS * DAY / MATRIX_MAX_INTERVAL + 10
+
+    def test_memory_stable(self, month):
+        """Live allocations level off once the first week's buffers fill."""
+        assert len(month.memory) == DAYS
+        assert month.memory_growth(warmup_days=7) < 2000
+
+    def test_runs_faster_than_real_time(self, month):
+        assert month.wall_seconds < DAYS * DAY / 10_000
+
+
+class TestSimulation:
+    """Shorter scenarios."""
+
+    def test_reproducible_with_seed(self):
+        first = Simulation(1, seed=5).run()
+        second = Simulation(1, seed=5).run()
+        assert first.requests == second.requests
+
+    def test_403_pauses_all_requests(self):
+        with FakeClubLog() as fake:
+            simulation = Simulation(1, fake=fake)
+            simulation.at(6 * 3600, lambda: fake.set_fault("/watch.php", status=403))
+            simulation.at(6.5 * 3600, fake.clear_faults)
+            report = simulation.run()
+
+        tripped = next(t for t in report.requests["watch"] if t >= 6 * 3600)
+        during = [
+            t for times in report.requests.values() for t in times
+            if tripped < t < tripped + 3600
+        ]
+        assert during == []
+        for endpoint in ("matrix", "watch", "expeditions", "livestreams"):
+            assert any(t >= tripped + 3600 for t in report.requests[endpoint])
+
+    def test_upload_triggers_matrix_refresh(self):
+        """A new upload in watch brings the backed-off matrix fetch forward."""
+        with FakeClubLog() as fake:
+            watch = json.loads(fake.fixtures["/watch.php"])
+            watch["clublog_info"]["total_qsos"] += 25
+            watch["clublog_info"]["last_clublog_upload"] = "2026-02-02 09:15:00"
+            simulation = Simulation(2, fake=fake)
+            uploaded = 30 * 3600
+            simulation.at(
+                uploaded, lambda: fake.fixtures.update({"/watch.php": json.dumps(watch).encode()})
+            )
+            report = simulation.run()
+
+        bridge = simulation.bridge
+        seen = next(t for t in report.requests["watch"] if t >= uploaded)
+        before = [t for t in report.requests["matrix"] if t < seen]
+        refreshed = next(t for t in report.requests["matrix"] if t >= seen)
+        assert bridge.matrix_refresh.uploads == 1
+        assert seen - before[-1] < MATRIX_MAX_INTERVAL
+        settle = bridge.matrix_refresh.settle
+        assert refreshed <= max(seen + settle, before[-1] + 3600) + 2 * POLL_TICK
+
+    def test_stops_at_requested_time(self):
+        simulation = Simulation(0.5)
+        simulation.run()
+        assert simulation.clock.monotonic() == pytest.approx(0.5 * DAY, abs=POLL_TICK)
+        assert simulation.clock.time() > SIMULATION_EPOCH
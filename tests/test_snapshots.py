@@ -0,0 +1,175 @@
+"""Tests for the delta-encoded snapshot store."""
+
+import pytest
+
+from clublog_bridge.models import Expedition, MostWanted, Watch
+from clublog_bridge.snapshots import (
+    SnapshotStore,
+    dxcc_trend,
+    expeditions_state,
+    hourly_progress,
+    matrix_state,
+    most_wanted_state,
+    progress_keys,
+    watch_state,
+)
+
+DAY = 86400.0
+T0 = 1767225600.0  # 2026-01-01 UTC
+
+
+@pytest.fixture
+def store():
+    store = SnapshotStore(":memory:", 365 * DAY, keyframe_interval=3)
+    yield store
+    store.close()
+
+
+def test_matrix_state():
+    state = matrix_state({"1": {"20": 1, "40": 2}, "291": {"20": 3}, "64": {}})
+    assert state == {
+        "cell/1/20": 1, "cell/1/40": 2, "cell/291/20": 3,
+        "worked": 2, "confirmed": 2, "verified": 1,
+        "band/20/worked": 2, "band/20/confirmed": 2,
+        "band/40/worked": 1, "band/40/confirmed": 0,
+    }
+
+
+def test_other_states():
+    assert most_wanted_state(MostWanted((1, 2), ("246", "1"))) == {"rank/246": 1, "rank/1": 2}
+    assert expeditions_state([Expedition("3Y0K", "2026-02-01", 1200)]) == {"qsos/3Y0K": 1200}
+    assert watch_state(Watch(True, False, False, 5000, None, None, None)) == {"qsos": 5000}
+    assert watch_state(None) == {}
+
+
+class TestSnapshotStore:
+    """Tests for recording, reading and compacting snapshots."""
+
+    def test_records_only_changes(self, store):
+        assert store.record("watch", {"qsos": 10}, T0) == 1
+        assert store.record("watch", {"qsos": 10}, T0 + 600) == 0
+        assert store.record("watch", {"qsos": 12}, T0 + 1200) == 1
+        assert store.snapshots("watch", 0, T0 + DAY) == [T0, T0 + 1200]
+
+    def test_state_at_any_time(self, store):
+        store.record("m", {"a": 1, "b": 2}, T0)
+        store.record("m", {"a": 1, "c": 3}, T0 + 10)  # b removed
+        for i in range(5):  # Crosses a keyframe
+            store.record("m", {"a": 2 + i, "c": 3}, T0 + 20 + i)
+        assert store.state("m", T0 - 1) == {}
+        assert store.state("m", T0 + 5) == {"a": 1, "b": 2}
+        assert store.state("m", T0 + 10) == {"a": 1, "c": 3}
+        assert store.state("m", T0 + 23) == {"a": 5, "c": 3}
+        assert store.state("m") == {"a": 6, "c": 3}
+        assert store.value_at("m", "b", T0 + 100) is None
+
+    def test_series(self, store):
+        for day, worked in enumerate((100, 100, 101, 101, 103)):
+            store.record("matrix", {"worked": worked, "x": day}, T0 + day * DAY)
+        assert store.series("matrix", "worked", T0 + 0.5 * DAY, T0 + 10 * DAY) == [
+            (T0 + 0.5 * DAY, 100), (T0 + 2 * DAY, 101), (T0 + 4 * DAY, 103),
+        ]
+        assert store.series("matrix", "worked", T0 - DAY, T0 - 1) == [(T0 - DAY, None)]
+
+    def test_reopen_resumes_deltas(self, tmp_path):
+        path = str(tmp_path / "history.db")
+        store = SnapshotStore(path, 365 * DAY)
+        store.record("matrix", {"worked": 100, "confirmed": 80}, T0)
+        store.close()
+        store = SnapshotStore(path, 365 * DAY)
+        assert store.record("matrix", {"worked": 101, "confirmed": 80}, T0 + DAY) == 1
+        assert store.state("matrix", T0 + DAY) == {"worked": 101, "confirmed": 80}
+        store.close()
+
+    def test_compaction_keeps_the_boundary_state(self, store):
+        for day in range(400):
+            store.record("watch", {"qsos": day, "odd": day % 2}, T0 + day * DAY)
+        now = T0 + 399 * DAY  # record() has compacted along the way
+        assert store.compact(now) == 0
+        assert store.snapshots("watch", 0, now)[0] == now - 365 * DAY
+        assert store.state("watch", now - 365 * DAY) == {"qsos": 34, "odd": 0}
+        assert store.value_at("watch", "qsos", now - 366 * DAY) is None
+        assert store.state("watch") == {"qsos": 399, "odd": 1}
+        assert store.compact(now + 10 * DAY) == 10
+        assert store.state("watch", now - 355 * DAY) == {"qsos": 44, "odd": 0}
+        store.record("watch", {"qsos": 400, "odd": 0}, now + DAY)
+        assert store.state("watch", now + DAY) == {"qsos": 400, "odd": 0}
+
+    def test_record_compacts_daily(self, store):
+        store.retention = 10 * DAY
+        for day in range(30):
+            store.record("watch", {"qsos": day}, T0 + day * DAY)
+        assert len(store.snapshots("watch", 0, T0 + 30 * DAY)) <= 12
+
+
+def test_dxcc_trend(store):
+    assert dxcc_trend(store, T0) is None
+    # Jan 1: 100 worked; Feb 10: 103; Mar 5: 104 and 2 more confirmed
+    store.record("matrix", {"worked": 100, "confirmed": 90}, T0)
+    store.record("matrix", {"worked": 103, "confirmed": 90}, T0 + 40 * DAY)
+    store.record("matrix", {"worked": 104, "confirmed": 92}, T0 + 63 * DAY)
+    trend = dxcc_trend(store, T0 + 65 * DAY, months=4)
+    assert (trend["worked_30d"], trend["confirmed_30d"]) == (4, 2)
+    assert trend["monthly"] == [
+        {"month": "2026-01", "worked": 100, "confirmed": 90},
+        {"month": "2026-02", "worked": 103, "confirmed": 90},
+        {"month": "2026-03", "worked": 104, "confirmed": 92},
+    ]
+    # History younger than the window: growth since it began
+    assert dxcc_trend(store, T0 + 20 * DAY)["worked_30d"] == 0
+
+
+def test_progress_keys():
+    state = matrix_state({"1": {"20": 1, "40": 2}})
+    assert progress_keys(state) == [
+        "worked", "confirmed",
+        "band/20/confirmed", "band/20/worked", "band/40/confirmed", "band/40/worked",
+    ]
+    assert progress_keys({}) == []
+
+
+def test_hourly_progress(store):
+    assert hourly_progress(store, 0, T0) == {}
+    store.record("matrix", matrix_state({"1": {"20": 2}}), T0 + 600)
+    store.record("matrix", matrix_state({"1": {"20": 1}}), T0 + 1200)
+    store.record("matrix", matrix_state({"1": {"20": 1}, "2": {"40": 2}}), T0 + 7300)
+    progress = hourly_progress(store, 0, T0 + 7300)
+    assert progress["worked"] == [(T0, 1), (T0 + 7200, 2)]
+    assert progress["band/20/confirmed"] == [(T0, 1)]
+    assert progress["band/40/worked"] == [(T0 + 7200, 1)]
+    # From an hour boundary: the value at start, then the changes after it
+    assert hourly_progress(store, T0 + 3600, T0 + 7300)["worked"] == [
+        (T0 + 3600, 1), (T0 + 7200, 2),
+    ]
+
+
+def test_bridge_records_matrix_and_publishes_trend():
+    from clublog_bridge.scheduling import SimulatedClock
+    from clublog_bridge.simulation import load_bridge
+    from tests.test_mqtt_publish import CapturingClient
+
+    bridge = load_bridge()
+    bridge.clock = SimulatedClock(T0)
+    bridge.snapshots = SnapshotStore(":memory:", 365 * DAY)
+    matrices = iter([{"1": {"20": 2}}, {"1": {"20": 1}, "291": {"80": 3}}])
+    bridge.fetch_dxcc_matrix = lambda: next(matrices)
+    bridge._process_matrix(CapturingClient())
+    bridge.clock.advance(DAY)
+    client = CapturingClient()
+    bridge._process_matrix(client)
+    assert bridge.snapshots.series("matrix", "worked", T0, T0 + DAY) == [(T0, 1), (T0 + DAY, 2)]
+    state = [p for t, p, _ in client.messages if "dxcc_worked_30d" in t and t.endswith("/state")]
+    assert state == ["1"]
+    bridge.snapshots.close()
+
+
+def test_bridge_skips_flattening_when_disabled():
+    from clublog_bridge.simulation import load_bridge
+
+    bridge = load_bridge()
+    bridge.snapshots = None
+
+    def state_fn(_value):
+        raise AssertionError("flattened with history disabled")
+
+    assert bridge._record_snapshot("most_wanted", state_fn, object()) is False
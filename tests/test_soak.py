@@ -0,0 +1,38 @@
+"""Short soak runs of the Docker polling loop against both stand-ins."""
+
+from clublog_bridge.soak import soak
+
+# About two simulated days: warmup, an untraced stretch, then a traced one
+CYCLES = 6000
+WARMUP = 2000
+TRACE = 1500
+
+
+class TestSoak:
+    """Memory growth detection."""
+
+    def test_bounded_state_passes(self):
+        report = soak(CYCLES, warmup=WARMUP, trace=TRACE, samples=4)
+        assert report.passed, report.top
+        assert report.requests > 500
+        assert report.publishes > 100  # simulated time outruns the drain rate; the outbox coalesces
+        assert report.samples[0].cycle == WARMUP
+        assert report.samples[-1].cycle == CYCLES
+        assert report.samples[-1].retained is not None
+
+    def test_leak_fails_and_is_located(self):
+        leaked = []
+
+        def leak(bridge):
+            get = bridge._get
+
+            def leaky_get(*args, **kwargs):
+                leaked.append(bytearray(4096))
+                return get(*args, **kwargs)
+
+            bridge._get = leaky_get
+
+        report = soak(CYCLES, warmup=WARMUP, trace=TRACE, samples=4, setup=leak)
+        assert not report.passed
+        assert report.growth > 100 * 4096
+        assert "test_soak.py" in report.top[0]
@@ -0,0 +1,160 @@
+"""Tests for spot parsing, needed-spot matching and the bridge's spot handling."""
+
+import io
+import json
+import time
+
+import pytest
+
+from clublog_bridge.dxcc import CtyDatabase
+from clublog_bridge.simulation import load_bridge
+from clublog_bridge.spots import (
+    DUPLICATE,
+    NEW_BAND,
+    NEW_ENTITY,
+    UNRESOLVED,
+    WORKED,
+    Spot,
+    SpotMatcher,
+    parse_spot,
+)
+from tests.test_dxcc import CTY_XML
+from tests.test_mqtt_publish import CapturingClient
+
+NOW = 1769956200.0  # 2026-02-01 14:30 UTC
+MATRIX = {"291": {"20": 1, "40": 3}, "1": {"20": 2}}
+
+
+@pytest.fixture
+def cty():
+    database = CtyDatabase()
+    database.load(io.BytesIO(CTY_XML))
+    return database
+
+
+@pytest.fixture
+def matcher(cty):
+    matcher = SpotMatcher(900, cty)
+    matcher.load(MATRIX)
+    return matcher
+
+
+class TestParseSpot:
+    """Tests for the accepted payload shapes."""
+
+    def test_json(self):
+        spot = parse_spot(b'{"dx": "vp9xy", "freq": 14074.0, "mode": "FT8", "spotter": "k1abc"}')
+        assert spot == Spot("VP9XY", 14.074, "20", "FT8", None, "K1ABC")
+
+    def test_pskreporter(self):
+        payload = json.dumps({
+            "sq": 1, "f": 21074512, "md": "FT8", "rp": -5, "t": 1769956200,
+            "sc": "VE3XYZ", "sl": "FN03", "rc": "K1ABC", "rl": "FN42",
+            "sa": 1, "ra": 291, "b": "15m",
+        }).encode()
+        assert parse_spot(payload) == Spot("VE3XYZ", 21.074512, "15", "FT8", 1, "K1ABC")
+
+    def test_cluster_line(self):
+        spot = parse_spot(b"DX de W3LPL:     7005.0  VP9XY        CW 599            1430Z")
+        assert (spot.call, spot.freq, spot.band, spot.spotter) == ("VP9XY", 7.005, "40", "W3LPL")
+
+    def test_plain_text(self):
+        assert parse_spot(b"VP9XY 14.074") == Spot("VP9XY", 14.074, "20")
+        assert parse_spot(b"VP9XY") == Spot("VP9XY")
+
+    def test_rejected(self):
+        assert parse_spot(b"") is None
+        assert parse_spot(b"{not json") is None
+        assert parse_spot(b"[1, 2]") is None
+        assert parse_spot(b'{"freq": 14074}') is None
+        assert parse_spot(b"hello there world") is None
+        assert parse_spot(b"CQ") is None
+
+
+class TestSpotMatcher:
+    """Tests for needed-spot classification and de-duplication."""
+
+    def test_classification(self, matcher):
+        assert matcher.match(Spot("VP9XY", band="20"), NOW)[0] == NEW_ENTITY
+        assert matcher.match(Spot("K1ABC", band="15"), NOW)[0] == NEW_BAND
+        assert matcher.match(Spot("W1ABC", band="40"), NOW) == (WORKED, None)
+        assert matcher.match(Spot("ZZ9ZZ", band="20"), NOW) == (UNRESOLVED, None)
+        assert matcher.match(Spot("VP9XY"), NOW) == (UNRESOLVED, None)
+
+    def test_spot_dxcc_overrides_cty(self, matcher):
+        assert matcher.match(Spot("K1ABC", band="20", dxcc=64), NOW)[0] == NEW_ENTITY
+
+    def test_not_ready_before_matrix(self, cty):
+        matcher = SpotMatcher(900, cty)
+        assert not matcher.ready
+        assert matcher.match(Spot("VP9XY", band="20"), NOW) == (UNRESOLVED, None)
+
+    def test_dedup_window(self, matcher):
+        result, needed = matcher.match(Spot("VP9XY", 14.074, "20"), NOW)
+        assert (needed.call, needed.dxcc, needed.band, needed.need) == ("VP9XY", 64, "20", result)
+        assert matcher.match(Spot("VP9XY", 14.075, "20"), NOW + 899) == (DUPLICATE, None)
+        assert matcher.match(Spot("VP9XY", band="40"), NOW + 899)[0] == NEW_ENTITY
+        assert matcher.match(Spot("VP9XY", band="20"), NOW + 900)[0] == NEW_ENTITY
+
+    def test_recent_drops_worked_and_aged(self, matcher):
+        matcher.match(Spot("VP9XY", band="20"), NOW)
+        matcher.match(Spot("K1ABC", band="15"), NOW + 10)
+        assert [s.call for s in matcher.recent(NOW + 10)] == ["K1ABC", "VP9XY"]
+        matcher.load({**MATRIX, "64": {"20": 2}})
+        assert [s.call for s in matcher.recent(NOW + 10)] == ["K1ABC"]
+        assert matcher.recent(NOW + 1000) == []
+
+    def test_matrix_reload_changes_answers(self, matcher):
+        matcher.load({**MATRIX, "64": {"20": 2}})
+        assert matcher.match(Spot("VP9XY", band="20"), NOW)[0] == WORKED
+        assert matcher.match(Spot("VP9XY", band="17"), NOW)[0] == NEW_BAND
+
+    def test_sustains_thousands_per_second(self, matcher):
+        payloads = [
+            f'{{"dx": "{call}{i % 500}AB", "freq": 14074}}'.encode()
+            for i in range(10_000)
+            for call in ("K", "VE")
+        ]
+        start = time.perf_counter()
+        for payload in payloads:
+            matcher.match(parse_spot(payload), NOW)
+        assert time.perf_counter() - start < 2.0  # >10,000 spots/s
+
+
+@pytest.fixture
+def bridge(cty):
+    bridge = load_bridge()
+    bridge.clock.time = lambda: NOW
+    bridge.spot_matcher = SpotMatcher(900, cty)
+    bridge.dxcc_matrix = MATRIX
+    bridge._publish_matrix(CapturingClient(), MATRIX)
+    return bridge
+
+
+class TestBridgeSpots:
+    """Tests for the bridge's spot handling."""
+
+    def test_needed_spot_fires_one_event(self, bridge):
+        bridge.wake.clear()
+        for payload in (b"VP9XY 14074", b"VP9XY 14074", b"W1ABC 7005", b"junk junk junk"):
+            bridge.on_spot(payload)
+        assert bridge.wake.is_set()
+        client = CapturingClient()
+        bridge._publish_needed_spots(client)
+        events = [
+            json.loads(payload) for topic, payload, retain in client.messages
+            if topic.endswith("/needed_spot/event") and not retain
+        ]
+        assert len(events) == 1
+        assert [(s["call"], s["entity"], s["need"]) for s in events[0]["spots"]] == [
+            ("VP9XY", "BERMUDA", NEW_ENTITY)
+        ]
+        assert bridge.metrics.SPOTS.value(DUPLICATE) >= 1
+        assert bridge.metrics.SPOTS.value("invalid") >= 1
+        assert "clublog/needed_spots/state" in client.topics()
+
+    def test_no_event_without_needed_spots(self, bridge):
+        bridge.on_spot(b"W1ABC 7005")
+        client = CapturingClient()
+        bridge._publish_needed_spots(client)
+        assert not client.topics("/event")
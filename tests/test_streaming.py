@@ -0,0 +1,105 @@
+"""Tests for incremental JSON decoding of large ClubLog responses."""
+
+import json
+from array import array
+
+import pytest
+
+from clublog_bridge.streaming import (
+    ObjectStreamDecoder,
+    fold_activity,
+    fold_matrix,
+    iter_members,
+)
+
+
+def _chunks(body: bytes, size: int):
+    """Split a body into fixed-size chunks."""
+    return [body[i:i + size] for i in range(0, len(body), size)]
+
+
+class TestObjectStreamDecoder:
+    """Tests for ObjectStreamDecoder."""
+
+    @pytest.mark.parametrize("size", [1, 2, 3, 7, 64, 100000])
+    def test_matches_json_loads(self, sample_activity, sample_matrix, size):
+        """Any chunking yields the same members as a one-shot decode."""
+        for payload in (sample_activity, sample_matrix):
+            body = json.dumps(payload).encode()
+            assert dict(iter_members(_chunks(body, size))) == payload
+
+    def test_number_split_across_chunks(self):
+        """A bare number at a chunk boundary is not cut short."""
+        members = dict(iter_members([b'{"20m": 12', b'34, "40m": 5', b"6}"]))
+        assert members == {"20m": 1234, "40m": 56}
+
+    def test_multibyte_utf8_split(self):
+        """UTF-8 sequences split across chunks decode correctly."""
+        body = json.dumps({"ключ": [1]}, ensure_ascii=False).encode()
+        assert dict(iter_members(_chunks(body, 1))) == {"ключ": [1]}
+
+    def test_whitespace_and_empty_object(self):
+        assert dict(iter_members([b"  {  }  "])) == {}
+        assert dict(iter_members([b'{\n "a" : 1 ,\n "b" : 2\n}\n'])) == {"a": 1, "b": 2}
+
+    @pytest.mark.parametrize("body", [b"null", b"[]", b"", b"  "])
+    def test_empty_non_object_bodies(self, body):
+        """ClubLog returns null/[] when there is no data."""
+        assert list(iter_members([body])) == []
+
+    def test_non_object_with_data_rejected(self):
+        with pytest.raises(ValueError):
+            list(iter_members([b"[1, 2]"]))
+
+    def test_truncated_body_rejected(self):
+        with pytest.raises(ValueError):
+            list(iter_members([b'{"20m": [1, 2', b", 3]"]))
+
+    def test_malformed_body_rejected(self):
+        with pytest.raises(ValueError):
+            list(iter_members([b'{"20m" [1]}']))
+
+    def test_trailing_garbage_rejected(self):
+        with pytest.raises(ValueError):
+            list(iter_members([b'{"a": 1} x']))
+
+    def test_buffer_stays_small(self):
+        """The internal buffer never holds more than the pending member."""
+        decoder = ObjectStreamDecoder()
+        body = json.dumps({f"k{i}": list(range(24)) for i in range(2000)}).encode()
+        largest = 0
+        for chunk in _chunks(body, 512):
+            decoder.feed(chunk)
+            largest = max(largest, len(decoder._buf))
+        decoder.close()
+        assert largest < 1024
+
+
+class TestFolding:
+    """Tests for folding members into compact structures."""
+
+    def test_fold_activity_arrays(self, sample_activity):
+        activity = fold_activity(sample_activity.items())
+        assert isinstance(activity["20m"], array)
+        assert list(activity["20m"]) == sample_activity["20m"]
+        assert sum(activity["40m"]) == sum(sample_activity["40m"])
+
+    def test_fold_activity_keeps_scalars_and_odd_lists(self):
+        activity = fold_activity([("20m", 42), ("40m", [1.5, 2])])
+        assert activity == {"20m": 42, "40m": [1.5, 2]}
+
+    def test_fold_into_existing(self):
+        target = {}
+        fold_activity([("20m", [1])], target)
+        fold_activity([("40m", [2])], target)
+        assert set(target) == {"20m", "40m"}
+
+    def test_fold_matrix_interns_bands(self, sample_matrix):
+        members = iter_members([json.dumps(sample_matrix).encode()])
+        matrix = fold_matrix(members)
+        assert matrix == sample_matrix
+        bands = [band for cells in matrix.values() for band in cells if band == "20m"]
+        assert all(band is bands[0] for band in bands)
+
+    def test_fold_matrix_skips_non_dict_entities(self):
+        assert fold_matrix([("1", {"20m": 1}), ("2", None)]) == {"1": {"20m": 1}}